@@ -0,0 +1,97 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+bench.header_map
+~~~~~~~~~~~~~~~~~
+
+Micro-benchmark of the header containers of :mod:`daemon.dictionary`:
+:class:`Headers <daemon.dictionary.Headers>` against
+:class:`CaseInsensitiveDict <daemon.dictionary.CaseInsensitiveDict>` and the
+plain ``dict`` ``Request.prepare_headers`` used to build.
+
+- ``build``: construction from the header lines of a browser request;
+- ``lookup``: the reads of one request (``connection``, ``origin``,
+  ``accept``, ``accept-encoding``, ``cookie``, ``content-type``, a missing
+  ``range``), lowercase as the adapter and handlers write them;
+- ``mixed``: ``headers[name]`` of the fields present, with the names as sent
+  (``Content-Type``).
+
+Usage::
+
+  python3 bench/header_map.py --number 200000
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from daemon.dictionary import CaseInsensitiveDict, Headers
+
+LINES = [
+    "Host: 127.0.0.1:9000",
+    "User-Agent: Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0",
+    "Accept: text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language: en-US,en;q=0.5",
+    "Accept-Encoding: gzip, deflate, br",
+    "Origin: http://localhost:5173",
+    "Content-Type: application/json",
+    "Connection: keep-alive",
+    "Cookie: auth=true; session=0123456789abcdef",
+]
+NAMES = ["connection", "origin", "accept", "accept-encoding", "cookie", "content-type", "range"]
+MIXED = ["Connection", "Origin", "Accept", "Accept-Encoding", "Cookie", "Content-Type"]
+
+
+def build_dict(lines):
+    headers = {}
+    for line in lines:
+        key, sep, val = line.partition(':')
+        if sep:
+            headers[key.lower()] = val.strip()
+    return headers
+
+
+def build_ci(lines):
+    headers = CaseInsensitiveDict()
+    for line in lines:
+        key, sep, val = line.partition(':')
+        if sep:
+            headers[key] = val.strip()
+    return headers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Header container micro-benchmark")
+    parser.add_argument("--number", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5, help="best of N runs")
+    args = parser.parse_args()
+
+    containers = (("dict", build_dict), ("CaseInsensitiveDict", build_ci),
+                  ("Headers", Headers.from_lines))
+    for label, build in containers:
+        h = build(LINES)
+        cases = (("build", lambda: build(LINES)),
+                 ("lookup", lambda: [h.get(n) for n in NAMES]),
+                 ("mixed", lambda: [h[n] for n in MIXED]))
+        for name, func in cases:
+            if label == "dict" and name == "mixed":
+                continue
+            seconds = min(timeit.repeat(func, number=args.number, repeat=args.repeat))
+            print("{:<20} {:<7} {:7.0f} ns".format(label, name, seconds / args.number * 1e9))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+bench.header_render
+~~~~~~~~~~~~~~~~~
+
+Micro-benchmark of response header rendering: the current
+:meth:`Response.build_response_header <daemon.response.Response.build_response_header>`
+(cached ``Date``, pre-encoded blocks, one join), ``build_json_response``,
+``build_redirect`` and ``build_unauthorized``, against ``legacy_header``, the
+previous implementation (``utcnow().strftime`` and ``+=`` per header) kept
+here as the baseline.
+
+Usage::
+
+  python3 bench/header_render.py --number 100000
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from daemon.request import Request
+from daemon.response import Response
+
+
+def legacy_header(resp, request):
+    """The header rendering used before ``daemon.headerwriter``."""
+    if not resp.status_code:
+        resp.status_code = 200
+        resp.reason = "OK"
+    reqhdr = request.headers
+    origin = reqhdr.get("origin")
+    cors_origin = origin if origin else "*"
+    resp.headers.setdefault("Access-Control-Allow-Origin", cors_origin)
+    resp.headers.setdefault("Access-Control-Allow-Credentials", "true")
+    resp.headers.setdefault("Access-Control-Allow-Methods", "GET, POST, PUT, DELETE, OPTIONS")
+    resp.headers.setdefault("Access-Control-Allow-Headers", "Content-Type, Authorization")
+    headers = {
+        "Accept": "{}".format(reqhdr.get("accept", "application/json")),
+        "Cache-Control": "no-cache",
+        "Content-Length": "{}".format(len(resp._content) if resp._content else 0),
+        "Date": "{}".format(datetime.datetime.utcnow().strftime("%a, %d %b %Y %H:%M:%S GMT")),
+        "Pragma": "no-cache",
+        "Connection": "keep-alive" if resp.keep_alive else "close",
+    }
+    fmt_header = f"HTTP/1.1 {resp.status_code} {resp.reason}\r\n"
+    for key, value in headers.items():
+        fmt_header += f"{key}: {value}\r\n"
+    for key, value in resp.headers.items():
+        fmt_header += f"{key}: {value}\r\n"
+    fmt_header += "\r\n"
+    return fmt_header.encode("utf-8")
+
+
+def make_request():
+    req = Request()
+    req.method = "GET"
+    req.path = "/get-list"
+    req.headers = {"host": "127.0.0.1:9000", "accept": "*/*",
+                   "origin": "http://localhost:5173"}
+    return req
+
+
+def make_response(req):
+    resp = Response(req)
+    resp.keep_alive = True
+    resp.status_code = 200
+    resp.reason = "OK"
+    resp.headers["Content-Type"] = "application/json"
+    resp._content = b'{"peers": []}'
+    return resp
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Header rendering micro-benchmark")
+    parser.add_argument("--number", type=int, default=100000)
+    args = parser.parse_args()
+    req = make_request()
+
+    cases = [
+        ("legacy header", lambda: legacy_header(make_response(req), req)),
+        ("build_response_header", lambda: make_response(req).build_response_header(req)),
+        ("build_json_response", lambda: make_response(req).build_json_response('{"peers": []}')),
+        ("build_redirect", lambda: make_response(req).build_redirect("/index.html")),
+        ("build_unauthorized", lambda: make_response(req).build_unauthorized()),
+        ("Response() only", lambda: make_response(req)),
+    ]
+    for name, func in cases:
+        seconds = timeit.timeit(func, number=args.number)
+        print("{:<24} {:8.0f} ns".format(name, seconds / args.number * 1e9))
+
+
+if __name__ == "__main__":
+    main()
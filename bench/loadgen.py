@@ -0,0 +1,402 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+bench.loadgen
+~~~~~~~~~~~~~~~~~
+
+Closed-loop HTTP/1.1 load generator used by :mod:`bench.suite`.
+
+Each of ``concurrency`` clients sends one request, waits for the full response
+and sends the next, for ``duration`` seconds after a warm-up. With keep-alive
+a client reuses its connection (reconnecting when the server closes it);
+without, it opens one connection per request. Clients are threads spread over
+``procs`` processes, so the generator itself is not held back by one GIL.
+
+Requests are drawn from a weighted mix of the named requests in
+:data:`REQUESTS`. The result is a JSON-serialisable dict with RPS, latency
+percentiles and errors, overall and per request name.
+
+``idle`` more clients, left out of the report, model open browser tabs:
+they keep a keep-alive connection and send one request every
+:data:`IDLE_INTERVAL` seconds. A server that holds a worker per idle
+connection shows it as latency of the measured clients.
+
+Usage::
+
+  python3 bench/loadgen.py --port 9000 --mix static=6,login=2 \\
+      --concurrency 32 --duration 10 --keepalive on
+  python3 bench/loadgen.py --port 9000 --concurrency 1 --idle 8
+"""
+
+import argparse
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import socket
+import threading
+import time
+
+#: Named requests: (method, path, content type, body, accepted statuses).
+#: ``{n}`` in a body is replaced by a small rotating number.
+REQUESTS = {
+    "static": ("GET", "/images/welcome.png", None, None, (200,)),
+    "static-small": ("GET", "/css/styles.css", None, None, (200,)),
+    "login": ("POST", "/login", "application/x-www-form-urlencoded",
+              "username=admin&password=password", (200, 302)),
+    "submit-info": ("PUT", "/submit-info", "application/json",
+                    '{{"peer_id": "bench-{n}", "ip": "127.0.0.1", "port": {port}}}', (200,)),
+    "get-list": ("GET", "/get-list", None, None, (200,)),
+    "whoami": ("GET", "/whoami", None, None, (200, 401)),
+}
+
+#: Distinct bodies rotated through by templated requests.
+BODY_VARIANTS = 100
+#: Socket timeout of a client, in seconds.
+CLIENT_TIMEOUT = 10.0
+#: Seconds between two requests of an idle client, under the servers'
+#: 5 s keep-alive timeout.
+IDLE_INTERVAL = 2.0
+
+
+def parse_mix(text):
+    """
+    Parses ``"static=6,login=2"`` into ``{"static": 6, "login": 2}``.
+
+    :rtype: dict
+    """
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.strip().partition("=")
+        if not name:
+            continue
+        if name not in REQUESTS:
+            raise ValueError("unknown request {!r}, choose from {}".format(
+                name, ", ".join(sorted(REQUESTS))))
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def build_requests(name, host, keepalive):
+    """
+    Serializes every variant of a named request.
+
+    :rtype: list of bytes
+    """
+    method, path, content_type, body, _ = REQUESTS[name]
+    variants = []
+    for n in range(BODY_VARIANTS if body and "{n}" in body else 1):
+        data = body.format(n=n, port=6000 + n).encode() if body else b""
+        head = ["{} {} HTTP/1.1".format(method, path),
+                "Host: {}".format(host),
+                "User-Agent: weaprous-bench",
+                "Connection: {}".format("keep-alive" if keepalive else "close")]
+        if content_type:
+            head.append("Content-Type: {}".format(content_type))
+        if data or method in ("POST", "PUT"):
+            head.append("Content-Length: {}".format(len(data)))
+        variants.append(("\r\n".join(head) + "\r\n\r\n").encode() + data)
+    return variants
+
+
+class Connection:
+    """A client connection reading whole responses."""
+
+    def __init__(self, address):
+        self.sock = socket.create_connection(address, timeout=CLIENT_TIMEOUT)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.buf = b""
+
+    def close(self):
+        self.sock.close()
+
+    def _fill(self):
+        chunk = self.sock.recv(65536)
+        if not chunk:
+            raise ConnectionError("connection closed mid-response")
+        self.buf += chunk
+
+    def _read_line(self):
+        while b"\r\n" not in self.buf:
+            self._fill()
+        line, self.buf = self.buf.split(b"\r\n", 1)
+        return line
+
+    def _read_exact(self, n):
+        while len(self.buf) < n:
+            self._fill()
+        data, self.buf = self.buf[:n], self.buf[n:]
+        return data
+
+    def exchange(self, request):
+        """
+        Sends a request and reads its response.
+
+        :rtype: tuple - (status, whether the connection can be reused).
+        """
+        self.sock.sendall(request)
+        while b"\r\n\r\n" not in self.buf:
+            self._fill()
+        head, self.buf = self.buf.split(b"\r\n\r\n", 1)
+        lines = head.split(b"\r\n")
+        status = int(lines[0].split(b" ", 2)[1])
+        headers = {}
+        for line in lines[1:]:
+            key, _, value = line.partition(b":")
+            headers[key.strip().lower()] = value.strip().lower()
+
+        reusable = headers.get(b"connection") != b"close" and lines[0].startswith(b"HTTP/1.1")
+        if status == 304 or status == 204 or 100 <= status < 200:
+            return status, reusable
+        if headers.get(b"transfer-encoding") == b"chunked":
+            while True:
+                size = int(self._read_line().split(b";")[0], 16)
+                self._read_exact(size + 2)
+                if size == 0:
+                    break
+            return status, reusable
+        if b"content-length" in headers:
+            self._read_exact(int(headers[b"content-length"]))
+            return status, reusable
+        # Không có độ dài: body kết thúc khi server đóng kết nối
+        try:
+            while True:
+                self._fill()
+        except ConnectionError:
+            pass
+        return status, False
+
+
+def percentile(sorted_values, p):
+    """
+    Nearest-rank percentile of an already sorted list.
+
+    :rtype: float
+    """
+    if not sorted_values:
+        return 0.0
+    k = max(math.ceil(p / 100.0 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(k, len(sorted_values) - 1)]
+
+
+def summarize(latencies, errors, elapsed):
+    """
+    Builds the report of one run.
+
+    :param latencies (dict): request name -> list of latencies (seconds).
+    :param errors (dict): error kind -> count.
+    :param elapsed (float): Measured seconds.
+    :rtype: dict
+    """
+    def stats(values):
+        values = sorted(values)
+        return {
+            "requests": len(values),
+            "rps": round(len(values) / elapsed, 1) if elapsed else 0.0,
+            "latency_ms": {
+                "mean": round(sum(values) / len(values) * 1e3, 3) if values else 0.0,
+                "p50": round(percentile(values, 50) * 1e3, 3),
+                "p90": round(percentile(values, 90) * 1e3, 3),
+                "p99": round(percentile(values, 99) * 1e3, 3),
+                "p999": round(percentile(values, 99.9) * 1e3, 3),
+                "max": round(values[-1] * 1e3, 3) if values else 0.0,
+            },
+        }
+
+    report = stats(list(itertools.chain.from_iterable(latencies.values())))
+    report["duration_s"] = round(elapsed, 3)
+    report["errors"] = dict(errors)
+    report["error_count"] = sum(errors.values())
+    report["per_request"] = {name: stats(values) for name, values in sorted(latencies.items())}
+    return report
+
+
+def _client(address, host, mix, keepalive, warmup_end, stop_at, seed, out, lock):
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    prepared = {n: build_requests(n, host, keepalive) for n in names}
+    counters = {n: itertools.count(seed) for n in names}
+    latencies = {n: [] for n in names}
+    errors = {}
+    conn = None
+
+    while True:
+        now = time.perf_counter()
+        if now >= stop_at:
+            break
+        name = rng.choices(names, weights)[0]
+        variants = prepared[name]
+        request = variants[next(counters[name]) % len(variants)]
+        started = time.perf_counter()
+        error = None
+        try:
+            if conn is None:
+                conn = Connection(address)
+            status, reusable = conn.exchange(request)
+            if status not in REQUESTS[name][4]:
+                error = "status_{}".format(status)
+            if not (keepalive and reusable):
+                conn.close()
+                conn = None
+        except (OSError, ValueError, IndexError) as e:
+            error = type(e).__name__
+            if conn is not None:
+                conn.close()
+                conn = None
+            if isinstance(e, ConnectionRefusedError):
+                time.sleep(0.01)
+        finished = time.perf_counter()
+
+        if started < warmup_end:
+            continue
+        if error is None:
+            latencies[name].append(finished - started)
+        else:
+            errors[error] = errors.get(error, 0) + 1
+
+    if conn is not None:
+        conn.close()
+    with lock:
+        for name, values in latencies.items():
+            out[0].setdefault(name, []).extend(values)
+        for kind, n in errors.items():
+            out[1][kind] = out[1].get(kind, 0) + n
+
+
+def _idle_clients(address, host, name, count, stop):
+    request = build_requests(name, host, True)[0]
+    conns = [None] * count
+    while True:
+        for i in range(count):
+            try:
+                if conns[i] is None:
+                    conns[i] = Connection(address)
+                _, reusable = conns[i].exchange(request)
+                if not reusable:
+                    conns[i].close()
+                    conns[i] = None
+            except (OSError, ValueError, IndexError):
+                if conns[i] is not None:
+                    conns[i].close()
+                    conns[i] = None
+        if stop.wait(IDLE_INTERVAL):
+            break
+    for conn in conns:
+        if conn is not None:
+            conn.close()
+
+
+def _run_process(address, host, mix, keepalive, threads, warmup, duration, seed, queue):
+    start = time.perf_counter()
+    warmup_end = start + warmup
+    stop_at = warmup_end + duration
+    out = ({}, {})
+    lock = threading.Lock()
+    workers = [threading.Thread(target=_client,
+                                args=(address, host, mix, keepalive, warmup_end, stop_at,
+                                      seed * 1000 + i, out, lock), daemon=True)
+               for i in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join(duration + warmup + CLIENT_TIMEOUT * 2)
+    queue.put(out)
+
+
+def run_load(address, mix, concurrency=16, keepalive=True, duration=10.0,
+             warmup=1.0, procs=1, host=None, idle=0):
+    """
+    Drives a server and reports throughput, latency and errors.
+
+    :param address (tuple): (ip, port) of the server.
+    :param mix (dict): request name -> weight.
+    :param concurrency (int): Concurrent clients.
+    :param keepalive (bool): Reuse connections between requests.
+    :param duration (float): Measured seconds.
+    :param warmup (float): Seconds run before measuring.
+    :param procs (int): Client processes the clients are spread over.
+    :param host (str): ``Host`` header, ``ip:port`` by default.
+    :param idle (int): Idle keep-alive clients held open during the run.
+    :rtype: dict
+    """
+    host = host or "{}:{}".format(*address)
+    procs = max(1, min(procs, concurrency))
+    per_proc = [concurrency // procs + (1 if i < concurrency % procs else 0) for i in range(procs)]
+
+    ctx = multiprocessing.get_context("fork") if hasattr(os, "fork") else multiprocessing
+    queue = ctx.Queue()
+    stop_idle = threading.Event()
+    idler = threading.Thread(target=_idle_clients,
+                             args=(address, host, next(iter(mix)), idle, stop_idle),
+                             daemon=True)
+    if idle:
+        # Mở các kết nối idle trước khi đo
+        idler.start()
+        time.sleep(min(warmup, IDLE_INTERVAL) / 2)
+    processes = [ctx.Process(target=_run_process,
+                             args=(address, host, mix, keepalive, n, warmup, duration, i + 1, queue))
+                 for i, n in enumerate(per_proc)]
+    for p in processes:
+        p.start()
+    latencies, errors = {}, {}
+    for _ in processes:
+        lat, err = queue.get()
+        for name, values in lat.items():
+            latencies.setdefault(name, []).extend(values)
+        for kind, n in err.items():
+            errors[kind] = errors.get(kind, 0) + n
+    for p in processes:
+        p.join()
+    if idle:
+        stop_idle.set()
+        idler.join(CLIENT_TIMEOUT)
+
+    report = summarize(latencies, errors, duration)
+    report.update({
+        "concurrency": concurrency,
+        "keepalive": keepalive,
+        "mix": mix,
+        "procs": procs,
+        "idle": idle,
+    })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WeApRous HTTP load generator")
+    parser.add_argument("--ip", default="127.0.0.1")
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--host", default=None, help="Host header (default ip:port)")
+    parser.add_argument("--mix", default="static=1",
+                        help="weighted requests, e.g. static=6,login=2 ({})".format(
+                            ", ".join(sorted(REQUESTS))))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--keepalive", choices=["on", "off"], default="on")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--procs", type=int, default=1)
+    parser.add_argument("--idle", type=int, default=0,
+                        help="idle keep-alive clients held open during the run")
+    args = parser.parse_args()
+
+    report = run_load((args.ip, args.port), parse_mix(args.mix), args.concurrency,
+                      args.keepalive == "on", args.duration, args.warmup, args.procs,
+                      args.host, args.idle)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
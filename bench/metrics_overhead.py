@@ -0,0 +1,82 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+bench.metrics_overhead
+~~~~~~~~~~~~~~~~~
+
+Measures the per-request cost of :data:`daemon.metrics.METRICS`: the
+bookkeeping done by the adapters for one request (timestamps, in-flight
+gauge, phase and route histograms) with metrics enabled, against the single
+``METRICS.enabled`` check paid when they are off.
+
+Usage::
+
+  python3 bench/metrics_overhead.py --number 200000
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from daemon.metrics import Metrics, status_of
+from daemon.request import Request
+
+RESPONSE = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}"
+
+
+def handler(request, response):
+    return RESPONSE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Metrics overhead micro-benchmark")
+    parser.add_argument("--number", type=int, default=200000)
+    parser.add_argument("--routes", type=int, default=50,
+                        help="distinct (method, route) series to spread requests over")
+    args = parser.parse_args()
+
+    requests = []
+    for i in range(args.routes):
+        req = Request()
+        req.method = "GET"
+        req.hook = handler
+        req.route = "/route{}".format(i)
+        requests.append(req)
+
+    for enabled in (False, True):
+        metrics = Metrics(enabled)
+        counter = iter(range(10 ** 12))
+
+        def one_request():
+            if not metrics.enabled:
+                return
+            started = perf_counter()
+            metrics.request_started()
+            parsed = perf_counter()
+            handled = perf_counter()
+            sent = perf_counter()
+            req = requests[next(counter) % len(requests)]
+            metrics.request_finished(req, None, status_of(RESPONSE), 120, len(RESPONSE),
+                                     started, parsed, handled, sent)
+
+        seconds = timeit.timeit(one_request, number=args.number)
+        print("metrics {:<8} {:8.0f} ns/request".format(
+            "enabled" if enabled else "disabled", seconds / args.number * 1e9))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+bench.object_pool
+~~~~~~~~~~~~~~~~~
+
+Measures what a request costs in allocations with the
+:class:`Request <daemon.request.Request>` / :class:`Response
+<daemon.response.Response>` pools of the adapters, against fresh objects per
+request (pool size 0):
+
+- time per request (acquire, parse, JSON response, release);
+- peak memory allocated per request (``tracemalloc``);
+- generation-0 garbage collections per 100k requests.
+
+``--inflight`` requests are served at once, as by the connections of a loaded
+server: that many fresh objects are alive together and count towards the
+collector's allocation threshold, pooled ones are allocated once.
+
+Usage::
+
+  python3 bench/object_pool.py --number 100000 --inflight 64
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from daemon.objectpool import ObjectPool, POOL_SIZE
+from daemon.request import Request
+from daemon.response import Response
+from daemon.router import Router
+
+RAW = (b"GET /get-list HTTP/1.1\r\nHost: 127.0.0.1:9000\r\n"
+       b"Accept: */*\r\nCookie: auth=true\r\nConnection: keep-alive\r\n\r\n")
+BODY = '{"peers": []}'
+
+
+def handler(request, response):
+    return response.build_json_response(BODY)
+
+
+def make_cycle(pool_size, inflight):
+    """
+    Returns a function serving ``inflight`` requests at once, as that many
+    connections of a loaded server would.
+    """
+    requests, responses = ObjectPool(Request, pool_size), ObjectPool(Response, pool_size)
+    routes = Router()
+    routes[("GET", "/get-list")] = handler
+
+    def cycle():
+        pairs = [(requests.acquire(), responses.acquire()) for _ in range(inflight)]
+        for req, resp in pairs:
+            req.prepare(RAW, routes)
+            resp.keep_alive = req.keep_alive
+            resp.request = req
+            req.hook(request=req, response=resp)
+        for req, resp in pairs:
+            requests.release(req)
+            responses.release(resp)
+    return cycle
+
+
+def peak_bytes(cycle, number):
+    """Peak traced memory of a cycle, averaged over ``number`` cycles."""
+    total = 0
+    tracemalloc.start()
+    for _ in range(number):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        cycle()
+        total += tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return total / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Request/Response pooling benchmark")
+    parser.add_argument("--number", type=int, default=100000, help="requests")
+    parser.add_argument("--inflight", type=int, default=64, help="requests served at once")
+    args = parser.parse_args()
+    cycles = max(args.number // args.inflight, 1)
+    served = cycles * args.inflight
+
+    for label, size in (("fresh", 0), ("pooled", POOL_SIZE)):
+        cycle = make_cycle(size, args.inflight)
+        for _ in range(10):
+            cycle()
+        gc.collect()
+        before = gc.get_stats()[0]["collections"]
+        start = time.perf_counter()
+        for _ in range(cycles):
+            cycle()
+        elapsed = time.perf_counter() - start
+        collections = gc.get_stats()[0]["collections"] - before
+        peak = peak_bytes(cycle, min(cycles, 200)) / args.inflight
+        print("{:<8} {:8.0f} ns/request  {:6.0f} B/request at peak  {:6.0f} gen0 GCs per 100k".format(
+            label, elapsed / served * 1e9, peak, collections * 100000 / served))
+
+    print("Request {} B, Response {} B (__slots__, no __dict__ until used)".format(
+        sys.getsizeof(Request()), sys.getsizeof(Response())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+bench.request_parse
+~~~~~~~~~~~~~~~~~
+
+Micro-benchmark of request parsing: :meth:`Request.prepare
+<daemon.request.Request.prepare>` (one pass over bytes, lazy headers,
+cookies and body decoding) against ``legacy_prepare``, the previous parser
+(decode everything to ``str``, split it three times, always parse cookies,
+re-parse the body on each ``json_data`` / ``form_data`` access), kept here as
+the baseline.
+
+Both share :class:`Request`'s constructor and routing. Every request carries
+the session cookies a logged-in browser sends; each case parses one and then
+touches what a typical request does:
+
+- ``static``: a static file GET, reads the headers (``keep_alive``);
+- ``cookie``: a protected page, reads the ``auth`` cookie;
+- ``json``: ``get_request_data`` of the tracker (``json_data`` twice).
+
+Usage::
+
+  python3 bench/request_parse.py --number 100000
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+from urllib.parse import unquote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from daemon.dictionary import CaseInsensitiveDict
+from daemon.request import Request
+from daemon.router import Router
+
+HEADERS = (b"Host: 127.0.0.1:9000\r\n"
+           b"User-Agent: Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0\r\n"
+           b"Accept: text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8\r\n"
+           b"Accept-Language: en-US,en;q=0.5\r\n"
+           b"Accept-Encoding: gzip, deflate, br\r\n"
+           b"Connection: keep-alive\r\n"
+           b"Cookie: auth=true; session=0123456789abcdef0123456789abcdef\r\n")
+
+REQUESTS = {
+    "static": b"GET /images/welcome.png HTTP/1.1\r\n" + HEADERS + b"\r\n",
+    "cookie": b"GET /index.html HTTP/1.1\r\n" + HEADERS + b"\r\n",
+    "json": (b"PUT /submit-info HTTP/1.1\r\n" + HEADERS +
+             b"Content-Type: application/json\r\nContent-Length: 53\r\n\r\n"
+             b'{"peer_id": "peer-1", "ip": "127.0.0.1", "port": 6001}'),
+}
+
+
+class LegacyRequest(Request):
+    """The parser used before the lazy bytes-level :class:`Request`."""
+
+    def prepare(self, request, routes=None):
+        request = request.decode()
+        try:
+            header_part, body = request.split('\r\n\r\n', 1)
+        except ValueError:
+            header_part, body = request, ""
+        self._legacy_body = body
+        self.method, self.path, self.version = self.extract_request_line(header_part)
+        self.hook, self.params, self.allowed_methods = routes.match(self.method, self.path)
+        headers = {}
+        for line in header_part.split('\r\n')[1:]:
+            if ': ' in line:
+                key, val = line.split(': ', 1)
+                headers[key.lower()] = val
+        self.headers = headers
+        self.cookies = CaseInsensitiveDict()
+        cookies_str = headers.get('cookie', '')
+        if cookies_str:
+            for pair in [p.strip() for p in cookies_str.split(';')]:
+                if '=' in pair:
+                    key, value = pair.split('=', 1)
+                    self.cookies[key.strip()] = value.strip()
+
+    @property
+    def form_data(self):
+        body = self._legacy_body
+        if not body or 'application/x-www-form-urlencoded' not in self.headers.get('content-type', ''):
+            return {}
+        data = {}
+        for pair in body.split('&'):
+            if '=' in pair:
+                key, val = pair.split('=', 1)
+                data[unquote(key)] = unquote(val)
+        return data
+
+    @property
+    def json_data(self):
+        body = self._legacy_body
+        if not body or 'application/json' not in self.headers.get('content-type', ''):
+            return {}
+        return json.loads(body)
+
+
+def handler(request, response):
+    pass
+
+
+def make_routes():
+    routes = Router()
+    for path in ("/login", "/submit-info", "/get-list", "/peers/<peer_id>"):
+        routes[("PUT" if path == "/submit-info" else "GET", path)] = handler
+    return routes
+
+
+def touch(req, name):
+    req.keep_alive
+    if name == "cookie":
+        req.cookies.get('auth')
+    elif name == "json":
+        # get_request_data() của tracker_server
+        data = req.json_data
+        if not data:
+            req.form_data
+        req.json_data.get("peer_id")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Request parsing micro-benchmark")
+    parser.add_argument("--number", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5, help="best of N runs")
+    args = parser.parse_args()
+    routes = make_routes()
+
+    for name, raw in REQUESTS.items():
+        for label, cls in (("legacy", LegacyRequest), ("lazy", Request)):
+            def run():
+                req = cls()
+                req.prepare(raw, routes)
+                touch(req, name)
+            seconds = min(timeit.repeat(run, number=args.number, repeat=args.repeat))
+            print("{:<8} {:<8} {:8.0f} ns".format(name, label, seconds / args.number * 1e9))
+
+
+if __name__ == "__main__":
+    main()
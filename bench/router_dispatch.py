@@ -0,0 +1,76 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+bench.router_dispatch
+~~~~~~~~~~~~~~~~~
+
+Micro-benchmark of :meth:`Router.match <daemon.router.Router.match>`: the
+time of one dispatch should stay flat as the number of registered routes
+grows, for fixed paths, parameterised paths and 405 answers alike.
+
+Usage::
+
+  python3 bench/router_dispatch.py --sizes 10 100 1000 10000
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from daemon.router import Router
+
+
+def handler(request, response):
+    return b""
+
+
+def build_router(n):
+    """Registers ``n`` fixed and ``n`` parameterised routes."""
+    router = Router()
+    for i in range(n):
+        router[("GET", "/api/v1/items{}".format(i))] = handler
+        router[("GET", "/api/v1/group{}/<int:item_id>/detail".format(i))] = handler
+    router[("GET", "/peers/<peer_id>")] = handler
+    return router
+
+
+def bench(router, method, path, number):
+    """Returns the mean nanoseconds of one ``router.match``."""
+    seconds = timeit.timeit(lambda: router.match(method, path), number=number)
+    return seconds / number * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Router dispatch micro-benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--number", type=int, default=200000)
+    args = parser.parse_args()
+
+    print("{:>8} {:>12} {:>12} {:>12} {:>12}".format(
+        "routes", "fixed ns", "param ns", "405 ns", "miss ns"))
+    for n in args.sizes:
+        router = build_router(n)
+        last = n - 1
+        print("{:>8} {:>12.0f} {:>12.0f} {:>12.0f} {:>12.0f}".format(
+            len(router),
+            bench(router, "GET", "/api/v1/items{}".format(last), args.number),
+            bench(router, "GET", "/api/v1/group{}/42/detail".format(last), args.number),
+            bench(router, "POST", "/peers/p1", args.number),
+            bench(router, "GET", "/images/welcome.png", args.number)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+bench.slowloris
+~~~~~~~~~~~~~~~~~
+
+Slow-client check of a running WeApRous server. It opens many connections
+that misbehave in one of three ways and, at the same time, sends ordinary
+requests on fresh connections:
+
+- ``silent``: connect and send nothing;
+- ``head``: send the request head one byte every ``--interval`` seconds;
+- ``body``: send a complete head announcing a body, then trickle the body.
+
+The report gives the latency of the ordinary requests during the attack and,
+per kind, how many slow connections the server closed, after how long and
+with which status. A server with read deadlines stays responsive and closes
+every slow connection after roughly its idle, header or body timeout.
+
+Usage::
+
+  python3 bench/slowloris.py --port 9000 --silent 200 --head 200 --body 50 \\
+      --duration 20 --path /css/styles.css
+"""
+
+import argparse
+import json
+import selectors
+import socket
+import threading
+import time
+
+from loadgen import Connection, percentile
+
+#: Head trickled by ``head`` connections (never completed in time).
+SLOW_HEAD = b"GET / HTTP/1.1\r\nHost: slowloris\r\nUser-Agent: weaprous-bench\r\nX-Padding: " + b"a" * 4096
+#: Head sent at once by ``body`` connections before their body is trickled.
+SLOW_BODY_HEAD = (b"POST /login HTTP/1.1\r\nHost: slowloris\r\n"
+                  b"Content-Type: application/x-www-form-urlencoded\r\n"
+                  b"Content-Length: 100000\r\n\r\n")
+
+
+def slow_clients(address, kind, count, interval, duration, out):
+    """
+    Keeps ``count`` slow connections of one kind open until the server
+    closes them or ``duration`` runs out.
+
+    :param out (dict): Receives ``{"open": n, "closed": [(seconds, status), ...]}``.
+    """
+    sel = selectors.DefaultSelector()
+    start = {}
+    sent = {}
+    for _ in range(count):
+        try:
+            sock = socket.create_connection(address, timeout=5)
+        except OSError:
+            continue
+        sock.setblocking(False)
+        if kind == "body":
+            sock.sendall(SLOW_BODY_HEAD)
+        start[sock] = time.monotonic()
+        sent[sock] = 0
+        sel.register(sock, selectors.EVENT_READ)
+
+    closed = []
+    stop_at = time.monotonic() + duration
+    next_send = time.monotonic()
+    while start and time.monotonic() < stop_at:
+        now = time.monotonic()
+        if kind != "silent" and now >= next_send:
+            for sock in list(start):
+                n = sent[sock]
+                byte = SLOW_HEAD[n:n + 1] if kind == "head" else b"x"
+                try:
+                    if byte:
+                        sock.send(byte)
+                        sent[sock] = n + 1
+                except OSError:
+                    pass
+            next_send = now + interval
+        for key, _ in sel.select(timeout=min(interval, 0.1)):
+            sock = key.fileobj
+            try:
+                data = sock.recv(4096)
+            except OSError:
+                data = b""
+            if data:
+                status = data[9:12].decode("latin-1", "replace")
+            else:
+                status = "close"
+            # Một lần đọc là đủ: server trả lỗi rồi đóng, hoặc đóng luôn
+            closed.append((round(time.monotonic() - start.pop(sock), 2), status))
+            sel.unregister(sock)
+            sock.close()
+    for sock in start:
+        sock.close()
+    out[kind] = {"open": len(start), "closed": closed}
+
+
+def probe(address, path, duration, interval):
+    """
+    Sends ordinary ``GET`` requests on fresh connections during the attack.
+
+    :rtype: tuple - (latencies in seconds, errors by kind).
+    """
+    request = "GET {} HTTP/1.1\r\nHost: {}:{}\r\nConnection: close\r\n\r\n".format(
+        path, *address).encode()
+    latencies, errors = [], {}
+    stop_at = time.monotonic() + duration
+    while time.monotonic() < stop_at:
+        started = time.perf_counter()
+        try:
+            conn = Connection(address)
+            try:
+                status, _ = conn.exchange(request)
+            finally:
+                conn.close()
+            if status == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                kind = "status_{}".format(status)
+                errors[kind] = errors.get(kind, 0) + 1
+        except (OSError, ValueError, IndexError) as e:
+            kind = type(e).__name__
+            errors[kind] = errors.get(kind, 0) + 1
+        time.sleep(interval)
+    return latencies, errors
+
+
+def summarize_slow(result):
+    closed = result["closed"]
+    times = sorted(t for t, _ in closed)
+    statuses = {}
+    for _, status in closed:
+        statuses[status] = statuses.get(status, 0) + 1
+    return {
+        "still_open": result["open"],
+        "closed": len(closed),
+        "closed_after_s": {"min": times[0], "p50": percentile(times, 50),
+                           "max": times[-1]} if times else None,
+        "responses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WeApRous slow-client check")
+    parser.add_argument("--ip", default="127.0.0.1")
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--silent", type=int, default=100, help="connections sending nothing")
+    parser.add_argument("--head", type=int, default=100, help="connections trickling a head")
+    parser.add_argument("--body", type=int, default=20, help="connections trickling a body")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="seconds between two trickled bytes")
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--path", default="/css/styles.css", help="path of the probe requests")
+    parser.add_argument("--probe-interval", type=float, default=0.05)
+    args = parser.parse_args()
+
+    address = (args.ip, args.port)
+    slow = {}
+    threads = [threading.Thread(target=slow_clients,
+                                args=(address, kind, count, args.interval, args.duration, slow))
+               for kind, count in (("silent", args.silent), ("head", args.head),
+                                   ("body", args.body)) if count]
+    for t in threads:
+        t.start()
+    latencies, errors = probe(address, args.path, args.duration, args.probe_interval)
+    for t in threads:
+        t.join()
+
+    latencies.sort()
+    report = {
+        "probe": {
+            "requests": len(latencies),
+            "errors": errors,
+            "latency_ms": {
+                "p50": round(percentile(latencies, 50) * 1e3, 3),
+                "p99": round(percentile(latencies, 99) * 1e3, 3),
+                "max": round(latencies[-1] * 1e3, 3) if latencies else 0.0,
+            },
+        },
+        "slow": {kind: summarize_slow(result) for kind, result in sorted(slow.items())},
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+bench.suite
+~~~~~~~~~~~~~~~~~
+
+Benchmark suite of the WeApRous servers. For every combination of target,
+engine, worker count, keep-alive mode and concurrency it starts the servers
+locally (``start_backend.py``, ``start_proxy.py``, ``tracker_server.py``,
+``start_sampleapp.py``), drives them with :mod:`bench.loadgen` and collects
+one JSON report per run.
+
+Targets and their default request mix:
+
+- ``backend``: ``start_backend.py``, static files and ``/login``;
+- ``proxy``: ``start_proxy.py`` in front of ``start_backend.py``, same mix;
+- ``tracker``: ``tracker_server.py``, ``/submit-info`` and ``/get-list``;
+- ``sampleapp``: ``start_sampleapp.py``, ``/login``.
+
+``--engines`` selects the serving engines (every ``--engine`` choice of the
+start scripts), ``--workers`` the pre-forked process counts (backend only,
+the other apps keep state in memory). ``--compare`` checks the results
+against a previous ``--out`` file and exits with status 1 on a regression.
+
+Usage::
+
+  python3 bench/suite.py --targets backend,tracker --engines thread,asyncio \\
+      --concurrency 16,64 --keepalive on,off --duration 10 --out bench.json
+  python3 bench/suite.py ... --compare bench.json --threshold 10
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from loadgen import parse_mix, run_load
+
+#: Repository root, where the start scripts live.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+#: Engines accepted by the start scripts' ``--engine``.
+ENGINES = ("thread", "pool", "asyncio")
+#: Default request mix of each target.
+MIXES = {
+    "backend": "static=6,static-small=2,login=2",
+    "proxy": "static=6,static-small=2,login=2",
+    "tracker": "submit-info=1,get-list=4",
+    "sampleapp": "login=1",
+}
+#: Host name routed to the backend in the generated proxy config.
+PROXY_HOST = "bench.local"
+#: Seconds to wait for a server to accept connections.
+START_TIMEOUT = 15.0
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_port(port, proc, timeout=START_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("server exited with code {}".format(proc.returncode))
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("server did not listen on port {}".format(port))
+
+
+class Servers:
+    """Starts the processes of one target and stops them on exit.
+
+    :param target (str): One of :data:`MIXES`.
+    :param engine (str): Serving engine of the WeApRous apps.
+    :param workers (int): Pre-forked processes of the backend.
+    :param logdir (str): Directory receiving the servers' output.
+    """
+
+    def __init__(self, target, engine, workers, logdir):
+        self.target = target
+        self.engine = engine
+        self.workers = workers
+        self.logdir = logdir
+        self.procs = []
+        self.address = None
+        self.host = None
+
+    def start(self, script, port, *extra):
+        cmd = [sys.executable, os.path.join(ROOT, script),
+               "--server-ip", "127.0.0.1", "--server-port", str(port)] + list(extra)
+        log = open(os.path.join(self.logdir, "{}-{}.log".format(
+            os.path.splitext(script)[0], port)), "w")
+        env = dict(os.environ, WEAPROUS_LOG_LEVEL=os.environ.get("WEAPROUS_LOG_LEVEL", "WARNING"))
+        proc = subprocess.Popen(cmd, cwd=ROOT, stdout=log, stderr=subprocess.STDOUT, env=env)
+        log.close()
+        self.procs.append(proc)
+        wait_port(port, proc)
+        return port
+
+    def __enter__(self):
+        engine = ["--engine", self.engine]
+        try:
+            if self.target in ("backend", "proxy"):
+                port = self.start("start_backend.py", free_port(), *engine,
+                                  "--workers", str(self.workers))
+                if self.target == "proxy":
+                    conf = os.path.join(self.logdir, "proxy.conf")
+                    with open(conf, "w") as f:
+                        f.write('host "{}" {{\n    proxy_pass http://127.0.0.1:{};\n}}\n'.format(
+                            PROXY_HOST, port))
+                    port = self.start("start_proxy.py", free_port(), "--config", conf)
+                    self.host = PROXY_HOST
+            elif self.target == "tracker":
+                port = self.start("tracker_server.py", free_port(), *engine)
+            elif self.target == "sampleapp":
+                port = self.start("start_sampleapp.py", free_port(), *engine)
+            else:
+                raise ValueError("unknown target " + self.target)
+        except BaseException:
+            self.stop()
+            raise
+        self.address = ("127.0.0.1", port)
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stop(self):
+        for proc in reversed(self.procs):
+            if proc.poll() is None:
+                proc.send_signal(signal.SIGINT)
+        for proc in reversed(self.procs):
+            try:
+                proc.wait(5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+        self.procs = []
+
+
+def run_key(run):
+    """Identifies comparable runs across result files."""
+    return (run["target"], run["engine"], run["workers"], run["keepalive"],
+            run["concurrency"], run.get("idle", 0), json.dumps(run["mix"], sort_keys=True))
+
+
+def compare(runs, baseline, threshold):
+    """
+    Compares runs with a previous result file.
+
+    :param runs (list): Reports of this invocation.
+    :param baseline (dict): Content of a previous ``--out`` file.
+    :param threshold (float): Allowed RPS drop / p99 increase, in percent.
+    :rtype: tuple - (list of comparison dicts, whether any run regressed).
+    """
+    old = {run_key(r): r for r in baseline.get("runs", [])}
+    rows, regressed = [], False
+    for run in runs:
+        before = old.get(run_key(run))
+        if before is None:
+            continue
+        rps = (run["rps"] - before["rps"]) / before["rps"] * 100 if before["rps"] else 0.0
+        p99_before = before["latency_ms"]["p99"]
+        p99 = ((run["latency_ms"]["p99"] - p99_before) / p99_before * 100
+               if p99_before else 0.0)
+        bad = rps < -threshold or p99 > threshold or run["error_count"] > before["error_count"]
+        regressed = regressed or bad
+        rows.append({
+            "target": run["target"], "engine": run["engine"], "workers": run["workers"],
+            "keepalive": run["keepalive"], "concurrency": run["concurrency"],
+            "rps_change_pct": round(rps, 1), "p99_change_pct": round(p99, 1),
+            "errors": [before["error_count"], run["error_count"]],
+            "regression": bad,
+        })
+    return rows, regressed
+
+
+def split(value, cast=str):
+    return [cast(v.strip()) for v in value.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WeApRous benchmark suite")
+    parser.add_argument("--targets", default="backend,proxy,tracker,sampleapp")
+    parser.add_argument("--engines", default="thread",
+                        help="comma-separated, from {}".format(", ".join(ENGINES)))
+    parser.add_argument("--workers", default="1", help="comma-separated (backend/proxy only)")
+    parser.add_argument("--concurrency", default="16")
+    parser.add_argument("--keepalive", default="on", help="on, off or on,off")
+    parser.add_argument("--mix", action="append", default=[],
+                        help="override a target mix, e.g. tracker:get-list=1 (repeatable)")
+    parser.add_argument("--idle", type=int, default=0,
+                        help="idle keep-alive clients held open during each run")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--procs", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="load generator processes")
+    parser.add_argument("--out", help="write the JSON results to this file")
+    parser.add_argument("--compare", help="previous --out file to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="regression threshold in percent (default 10)")
+    args = parser.parse_args()
+
+    mixes = dict(MIXES)
+    for item in args.mix:
+        target, _, mix = item.partition(":")
+        mixes[target] = mix
+    engines = split(args.engines)
+    for engine in engines:
+        if engine not in ENGINES:
+            parser.error("unknown engine {!r}".format(engine))
+
+    runs = []
+    with tempfile.TemporaryDirectory(prefix="weaprous-bench-") as logdir:
+        for target, engine, workers, keepalive, concurrency in itertools.product(
+                split(args.targets), engines, split(args.workers, int),
+                split(args.keepalive), split(args.concurrency, int)):
+            if workers != 1 and target not in ("backend", "proxy"):
+                continue
+            mix = parse_mix(mixes[target])
+            print("[Bench] {} engine={} workers={} keepalive={} concurrency={}".format(
+                target, engine, workers, keepalive, concurrency), file=sys.stderr)
+            with Servers(target, engine, workers, logdir) as servers:
+                report = run_load(servers.address, mix, concurrency, keepalive == "on",
+                                  args.duration, args.warmup, args.procs, servers.host,
+                                  args.idle)
+            report.update({"target": target, "engine": engine, "workers": workers})
+            print("[Bench]   {:.1f} req/s  p50 {} ms  p99 {} ms  errors {}".format(
+                report["rps"], report["latency_ms"]["p50"], report["latency_ms"]["p99"],
+                report["error_count"]), file=sys.stderr)
+            runs.append(report)
+
+    result = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "duration_s": args.duration,
+        "runs": runs,
+    }
+    regressed = False
+    if args.compare:
+        with open(args.compare) as f:
+            result["comparison"], regressed = compare(runs, json.load(f), args.threshold)
+
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,563 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.asyncengine
+~~~~~~~~~~~~~~~~~
+
+This module serves the WeApRous ``routes`` dict on a single asyncio event loop
+(``engine="asyncio"``). Every connection is a coroutine instead of an OS
+thread, so a large number of mostly idle keep-alive peers costs little more
+than their sockets.
+
+Parsing, CORS preflight, the auth check and static responses reuse
+:class:`HttpAdapter <HttpAdapter>` and the same :class:`Request <Request>` /
+:class:`Response <Response>` objects as the threaded engines. ``async def``
+handlers are awaited on the loop; plain ``(request, response)`` handlers and
+static file reads run in the loop's thread pool executor so they never block it.
+Streamed bodies (:func:`send_stream`) are sent from the loop: ``async def``
+generators are iterated there, plain generators one chunk at a time in the
+executor.
+
+Reads follow the same :class:`Deadlines <Deadlines>` as the threaded engines,
+and each response must be sent within the adapter's ``write_timeout``. Rather
+than a timer per read or write, every connection has a :class:`Watchdog
+<Watchdog>` holding the deadline of the I/O it waits on, and one
+:class:`Sweeper <Sweeper>` task per loop cancels the connections whose
+deadline passed (checked every :data:`SWEEP_INTERVAL` seconds).
+
+On a stop or restart signal (:data:`LIFECYCLE`) the loop stops accepting,
+idle keep-alive connections are closed, the responses in flight are sent with
+``Connection: close``, and :func:`serve` returns once they are done or after
+the drain timeout.
+
+Usage Example:
+--------------
+>>> create_backend("127.0.0.1", 9000, routes=app.routes, engine="asyncio")
+"""
+
+import asyncio
+import inspect
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from time import perf_counter
+
+from .httpadapter import HttpAdapter, BAD_REQUEST, INTERNAL_ERROR, DRAIN_LIMIT, error_response
+from .framing import ConnReader, FramingError, CONTINUE, RECV_SIZE
+from .lifecycle import LIFECYCLE
+from .logger import get_logger
+from .metrics import METRICS
+from . import streaming
+
+log = get_logger(__name__)
+
+#: Default number of executor threads running synchronous handlers.
+EXECUTOR_WORKERS = 32
+#: Seconds between two deadline checks of the :class:`Sweeper <Sweeper>`;
+#: a connection is dropped at most this late.
+SWEEP_INTERVAL = 0.5
+#: ``Content-Length`` bodies up to this size are received on the loop before a
+#: synchronous handler runs, so a slow upload never holds an executor thread.
+PREREAD_LIMIT = 64 * 1024
+#: Seconds between two checks for the last open connection while draining.
+DRAIN_POLL = 0.05
+#: Connections accepted at most per readiness of the listening socket.
+ACCEPT_BATCH = 128
+#: Seconds the loop stops accepting after an ``accept()`` error such as ``EMFILE``.
+ACCEPT_RETRY_DELAY = 1.0
+
+_END = object()
+
+
+class Watchdog:
+    """Deadline of the I/O one connection task is waiting on.
+
+    :param task (asyncio.Task): Task serving the connection.
+    """
+
+    __slots__ = ("task", "deadline", "fired")
+
+    def __init__(self, task):
+        self.task = task
+        #: ``loop.time()`` after which the task is cancelled; None while not waiting.
+        self.deadline = None
+        self.fired = False
+
+    async def run(self, aw, deadline):
+        """
+        Awaits ``aw``, giving up once ``deadline`` has passed.
+
+        :param aw (awaitable): The read or write.
+        :param deadline (float): ``loop.time()`` (``time.monotonic()``) limit.
+        :raise: TimeoutError if the deadline passed first.
+        """
+        self.deadline = deadline
+        try:
+            return await aw
+        except asyncio.CancelledError:
+            if not self.fired:
+                raise
+            self.fired = False
+            self.task.uncancel()
+            raise TimeoutError from None
+        finally:
+            self.deadline = None
+
+
+class Sweeper:
+    """Cancels the connection tasks of one loop whose :class:`Watchdog
+    <Watchdog>` deadline has passed.
+
+    :param interval (float): Seconds between two checks.
+    """
+
+    def __init__(self, interval=SWEEP_INTERVAL):
+        self.interval = interval
+        self.watchdogs = set()
+
+    def watch(self, task):
+        """
+        Starts watching a connection task.
+
+        :rtype: Watchdog
+        """
+        dog = Watchdog(task)
+        self.watchdogs.add(dog)
+        return dog
+
+    def forget(self, dog):
+        """Stops watching a finished connection."""
+        self.watchdogs.discard(dog)
+
+    async def run(self):
+        """Checks every watchdog each :attr:`interval` seconds, forever."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.interval)
+            now = loop.time()
+            for dog in [d for d in self.watchdogs
+                        if d.deadline is not None and d.deadline <= now]:
+                # Task đang chờ I/O: CancelledError nổi lên trong Watchdog.run
+                dog.fired = True
+                dog.task.cancel()
+
+
+async def receive(recv, deadlines, watchdog):
+    """
+    Receives the next bytes within the current deadline.
+
+    :param recv (coroutine function): Receives the next bytes.
+    :param deadlines (Deadlines): Deadlines of the connection.
+    :param watchdog (Watchdog): Watchdog of the connection.
+    :rtype: bytes
+    """
+    try:
+        chunk = await watchdog.run(recv(), deadlines.deadline)
+    except TimeoutError:
+        deadlines.expired()
+    deadlines.received(len(chunk))
+    return chunk
+
+
+async def read_head(reader, recv, deadlines, watchdog):
+    """
+    Reads the next request head without blocking the loop.
+
+    :param reader (ConnReader): Buffer of the connection.
+    :param recv (coroutine function): Receives the next bytes.
+    :param deadlines (Deadlines): Deadlines of the connection.
+    :param watchdog (Watchdog): Watchdog of the connection.
+    :rtype: bytes or None - None on EOF before a complete head.
+    """
+    head = reader.split_head()
+    while head is None:
+        chunk = await receive(recv, deadlines, watchdog)
+        if not chunk:
+            return None
+        reader.buf += chunk
+        head = reader.split_head()
+    return head
+
+
+async def read_body(body, recv, deadlines, watchdog, limit=None):
+    """
+    Receives the rest of a request body on the loop.
+
+    :param body (BodyReader): Reader of the body.
+    :param recv (coroutine function): Receives the next bytes.
+    :param deadlines (Deadlines): Deadlines of the connection.
+    :param watchdog (Watchdog): Watchdog of the connection.
+    :param limit (int): Stop (returning None) once more than this many bytes
+        were read; None reads everything.
+    :rtype: bytes or None
+    """
+    body.start()
+    parts = []
+    start = body.decoder.received
+    while not body.done:
+        payload = body.decode_buffered()
+        if payload:
+            if limit is not None:
+                if body.decoder.received - start > limit:
+                    return None
+            else:
+                parts.append(payload)
+            continue
+        if body.done:
+            break
+        chunk = await receive(recv, deadlines, watchdog)
+        if not chunk:
+            raise FramingError(400, "Bad Request", "incomplete body")
+        body.source.unread(chunk)
+    return b"".join(parts)
+
+
+async def send_file(conn, resp):
+    """
+    Streams the pending static file body of a response with
+    ``loop.sock_sendfile`` (zero-copy, with a read/send fallback), or the
+    memory-mapped slices of a ``206`` response.
+
+    :param conn (socket.socket): Non-blocking client socket.
+    :param resp (Response): Response whose ``body_file`` is sent.
+    :rtype: int - Number of body bytes sent.
+    """
+    if resp.body_parts is not None:
+        try:
+            for part in resp.body_parts:
+                await asyncio.get_running_loop().sock_sendall(conn, part)
+        finally:
+            resp.close_file()
+        return resp.file_size
+
+    f, resp.body_file = resp.body_file, None
+    if f is None:
+        return 0
+    with f:
+        return await asyncio.get_running_loop().sock_sendfile(conn, f, 0, resp.file_size)
+
+
+async def send_response(conn, resp, response_data):
+    """
+    Sends the response head (and in-memory body), then its static file body.
+
+    :rtype: int - Number of static body bytes sent.
+    """
+    await asyncio.get_running_loop().sock_sendall(conn, response_data)
+    return await send_file(conn, resp)
+
+
+async def send_stream(conn, resp, watchdog, timeout):
+    """
+    Sends the streamed body of a response (see :meth:`Response.send_stream`)
+    as the handler produces it. Waiting for the next chunk has no deadline;
+    each chunk must be taken by the client within ``timeout`` seconds.
+
+    :param conn (socket.socket): Non-blocking client socket.
+    :param resp (Response): Response whose ``body_stream`` is sent.
+    :param watchdog (Watchdog): Watchdog of the connection.
+    :param timeout (float): Seconds the client gets to take one chunk.
+    :rtype: int - Number of body bytes sent, framing included.
+    :raise: TimeoutError if the client stops reading.
+    """
+    loop = asyncio.get_running_loop()
+    chunks, resp.body_stream = resp.body_stream, None
+    chunked = resp.chunked
+    frame = streaming.encode_chunk if chunked else streaming.as_bytes
+    try:
+        # Chunk nhỏ phải đi ngay, không chờ gộp với gói sau (Nagle)
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    except OSError:
+        pass
+    sent = 0
+    stream = streaming.aiterate(chunks)
+    try:
+        while True:
+            try:
+                chunk = await anext(stream, _END)
+            except Exception as e:
+                log.exception("Lỗi trong stream của WeApRous handler: %s", e)
+                resp.keep_alive = False
+                return sent
+            if chunk is _END:
+                break
+            data = frame(chunk)
+            if data:
+                await watchdog.run(loop.sock_sendall(conn, data), loop.time() + timeout)
+                sent += len(data)
+        if chunked:
+            await watchdog.run(loop.sock_sendall(conn, streaming.LAST_CHUNK),
+                               loop.time() + timeout)
+            sent += len(streaming.LAST_CHUNK)
+        return sent
+    finally:
+        await stream.aclose()
+
+
+async def dispatch(adapter, req, resp, body, recv, deadlines, watchdog):
+    """
+    Produces the response bytes for a parsed request.
+
+    :param adapter (HttpAdapter): Adapter of the connection.
+    :param req (Request): The parsed request.
+    :param resp (Response): The response being built.
+    :param body (BodyReader): Reader of the request body.
+    :param recv (coroutine function): Receives the next bytes of the connection.
+    :param deadlines (Deadlines): Deadlines of the connection.
+    :param watchdog (Watchdog): Watchdog of the connection.
+    :rtype: bytes
+    """
+    response_data = adapter.early_response(req, resp)
+    if response_data is not None:
+        return response_data
+
+    loop = asyncio.get_running_loop()
+    if not req.hook:
+        log.debug("Serving static file: %s", req.path)
+        return await loop.run_in_executor(None, resp.build_file_response, req)
+
+    hook = req.hook
+    if not (inspect.iscoroutinefunction(hook) or inspect.isasyncgenfunction(hook)):
+        # Handler đồng bộ chạy trong executor, không chặn event loop;
+        # body nhỏ nhận trước trên loop, body lớn qua request.stream()
+        decoder = body.decoder
+        if not decoder.done and not decoder.chunked and decoder.remaining <= PREREAD_LIMIT:
+            try:
+                req.body = await read_body(body, recv, deadlines, watchdog)
+            except FramingError as e:
+                log.info("Lỗi khi đọc body: %s", e)
+                return error_response(e.status_code, e.reason)
+        return await loop.run_in_executor(None, adapter.call_hook, req, resp)
+
+    log.debug("Awaiting async handler for %s %s", req.method, req.path)
+    try:
+        # Handler async không thể chờ socket đồng bộ: nhận body trước
+        if not body.done:
+            req.body = await read_body(body, recv, deadlines, watchdog)
+        req.dispatched = True
+        response_data = hook(request=req, response=resp)
+        if inspect.iscoroutine(response_data):
+            response_data = await response_data
+        return adapter.stream_response(resp, response_data)
+    except FramingError as e:
+        log.info("Lỗi khi đọc body: %s", e)
+        return error_response(e.status_code, e.reason)
+    except Exception as e:
+        log.exception("Lỗi nghiêm trọng trong WeApRous handler: %s", e)
+        return INTERNAL_ERROR
+
+
+async def handle_client(ip, port, routes, conn, addr, sweeper):
+    """
+    Serves one connection until it is closed, idle or used up.
+
+    :param ip (str): IP address of the server.
+    :param port (int): Port number the server is listening on.
+    :param routes (dict): Dictionary of route handlers.
+    :param conn (socket.socket): Non-blocking client socket.
+    :param addr (tuple): client address (IP, port).
+    :param sweeper (Sweeper): Enforces the deadlines of the loop's connections.
+    """
+    loop = asyncio.get_running_loop()
+    adapter = HttpAdapter(ip, port, conn, addr, routes)
+    deadlines = adapter.deadlines()
+    watchdog = sweeper.watch(asyncio.current_task())
+
+    recv = partial(loop.sock_recv, conn, RECV_SIZE)
+
+    def recv_from_thread():
+        # Dùng bởi handler đồng bộ trong executor (request.stream())
+        future = asyncio.run_coroutine_threadsafe(recv(), loop)
+        try:
+            chunk = future.result(deadlines.remaining())
+        except TimeoutError:
+            future.cancel()
+            deadlines.expired()
+        deadlines.received(len(chunk))
+        return chunk
+
+    async def send(data):
+        await watchdog.run(loop.sock_sendall(conn, data), loop.time() + adapter.write_timeout)
+
+    reader = ConnReader(recv_from_thread, adapter.max_header_size, adapter.max_body_size,
+                        adapter.max_header_count)
+    served = 0
+    connected = perf_counter()
+    try:
+        while True:
+            try:
+                deadlines.expect_request(pending=bool(reader.buf))
+                if served and LIFECYCLE.draining and not reader.buf:
+                    break
+                head = await read_head(reader, recv, deadlines, watchdog)
+                if head is None:
+                    break
+                if served == 0 and METRICS.enabled:
+                    METRICS.observe_first_byte(perf_counter() - connected)
+                deadlines.expect_body()
+                # 100 Continue chỉ 25 byte, gửi thẳng trên socket non-blocking
+                body = reader.body(head, partial(conn.send, CONTINUE))
+            except TimeoutError:
+                # Idle keep-alive connection, đóng lặng lẽ
+                break
+            except FramingError as e:
+                log.info("Request không hợp lệ từ %s: %s", addr, e)
+                await send(error_response(e.status_code, e.reason))
+                break
+
+            served += 1
+            last = served >= adapter.keepalive_max_requests or LIFECYCLE.draining
+            metrics = METRICS.enabled
+            if metrics:
+                started = perf_counter()
+                METRICS.request_started()
+            try:
+                req, resp = adapter.prepare_request(head, routes, last, body)
+            except Exception as e:
+                log.info("Lỗi khi parse request: %s", e)
+                if metrics:
+                    now = perf_counter()
+                    adapter.record_metrics(None, None, head, body, BAD_REQUEST, 0,
+                                           started, now, now, now)
+                await send(BAD_REQUEST)
+                break
+
+            if metrics:
+                parsed = handled = perf_counter()
+            response_data, sent = INTERNAL_ERROR, 0
+            try:
+                response_data = await dispatch(adapter, req, resp, body, recv,
+                                               deadlines, watchdog)
+                if metrics:
+                    handled = perf_counter()
+                sent = await watchdog.run(send_response(conn, resp, response_data),
+                                          loop.time() + adapter.write_timeout)
+                if resp.body_stream is not None:
+                    sent += await send_stream(conn, resp, watchdog, adapter.write_timeout)
+                keep_alive = resp.keep_alive and not adapter.declares_close(response_data)
+            finally:
+                if metrics:
+                    adapter.record_metrics(req, resp, head, body, response_data, sent,
+                                           started, parsed, handled, perf_counter())
+                adapter.release(req, resp)
+            if not keep_alive:
+                break
+            # Bỏ phần body handler chưa đọc trước request kế tiếp
+            if (body.expecting_continue
+                    or await read_body(body, recv, deadlines, watchdog, DRAIN_LIMIT) is None):
+                break
+            if served == 1:
+                LIFECYCLE.track(conn, deadlines)
+    except TimeoutError:
+        METRICS.limit_exceeded("write_timeout")
+        log.info("Client %s không nhận response trong %ss, đóng kết nối",
+                 addr, adapter.write_timeout)
+    except (FramingError, OSError) as e:
+        log.debug("Connection %s error: %s", addr, e)
+    finally:
+        sweeper.forget(watchdog)
+        LIFECYCLE.untrack(conn)
+        conn.close()
+
+
+async def serve(server, ip, port, routes, executor_workers=EXECUTOR_WORKERS):
+    """
+    Runs the asyncio server on an already bound, listening socket, until a
+    stop signal or a completed restart; then drains the open connections.
+
+    :param server (socket.socket): The listening socket.
+    :param ip (str): IP address of the server.
+    :param port (int): Port number the server is listening on.
+    :param routes (dict): Dictionary of route handlers.
+    :param executor_workers (int): Threads available to synchronous handlers.
+    """
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=executor_workers))
+    log.info("Serving on port %s (executor %s threads)", port, executor_workers)
+    sweeper = Sweeper()
+    # Giữ tham chiếu tới task để nó không bị thu gom
+    sweeping = loop.create_task(sweeper.run())
+    listen(loop, server, ip, port, routes, sweeper)
+
+    stop = asyncio.Event()
+    LIFECYCLE.wakeup = partial(loop.call_soon_threadsafe, stop.set)
+    LIFECYCLE.ready()
+    while LIFECYCLE.keep_accepting(server):
+        await stop.wait()
+        stop.clear()
+
+    loop.remove_reader(server)
+    # Nhận nốt kết nối đã xếp hàng: đóng socket SO_REUSEPORT sẽ reset chúng
+    accept(server, ip, port, routes, sweeper)
+    server.close()
+    LIFECYCLE.drain()
+    deadline = loop.time() + LIFECYCLE.drain_timeout
+    while LIFECYCLE.connections:
+        if loop.time() >= deadline:
+            log.warning("%s connections still open after %ss, closing them",
+                        len(LIFECYCLE.connections), LIFECYCLE.drain_timeout)
+            break
+        await asyncio.sleep(DRAIN_POLL)
+
+
+def listen(loop, server, ip, port, routes, sweeper):
+    """
+    Accepts connections from the loop, until the process stops. A reader
+    callback rather than a task awaiting ``sock_accept()``: removing it never
+    loses a connection accepted at the same moment.
+
+    :param loop (asyncio.AbstractEventLoop): The running loop.
+    :param server (socket.socket): Non-blocking listening socket.
+    :param ip (str): IP address of the server.
+    :param port (int): Port number the server is listening on.
+    :param routes (dict): Dictionary of route handlers.
+    :param sweeper (Sweeper): Enforces the deadlines of the loop's connections.
+    """
+    if not LIFECYCLE.stopping:
+        loop.add_reader(server, accept, server, ip, port, routes, sweeper)
+
+
+def accept(server, ip, port, routes, sweeper):
+    """
+    Accepts the pending connections and starts a :func:`handle_client` task
+    for each.
+    """
+    loop = asyncio.get_running_loop()
+    for _ in range(ACCEPT_BATCH):
+        try:
+            conn, addr = server.accept()
+        except (BlockingIOError, InterruptedError, ConnectionAbortedError):
+            return
+        except OSError as e:
+            # Ví dụ hết file descriptor: nghỉ một lúc thay vì quay vòng
+            log.error("Cannot accept: %s, retrying in %ss", e, ACCEPT_RETRY_DELAY)
+            loop.remove_reader(server)
+            loop.call_later(ACCEPT_RETRY_DELAY, listen, loop, server, ip, port, routes, sweeper)
+            return
+        conn.setblocking(False)
+        LIFECYCLE.track(conn)
+        loop.create_task(handle_client(ip, port, routes, conn, addr, sweeper))
+
+
+def run_asyncio(server, ip, port, routes, **options):
+    """
+    Blocking entry point used by :func:`run_backend` for ``engine="asyncio"``.
+
+    :param server (socket.socket): The listening socket.
+    :param ip (str): IP address of the server.
+    :param port (int): Port number the server is listening on.
+    :param routes (dict): Dictionary of route handlers.
+    :param options: Extra options for :func:`serve` (``executor_workers``).
+    """
+    server.setblocking(False)
+    asyncio.run(serve(server, ip, port, routes, **options))
@@ -25,6 +25,10 @@ Yêu cầu:
 - response: các tiện ích phản hồi.
 - httpadapter: lớp để xử lý các yêu cầu HTTP.
 - CaseInsensitiveDict: cung cấp từ điển để quản lý tiêu đề hoặc tuyến đường.
+- workerpool: nhóm luồng có giới hạn cho chế độ ``engine="pool"``.
+- asyncengine: vòng lặp sự kiện asyncio cho chế độ ``engine="asyncio"``.
+- prefork: tiến trình giám sát cho chế độ nhiều tiến trình (``workers=N``).
+- lifecycle: dừng êm (drain) và khởi động lại không gián đoạn theo tín hiệu.
 
 
 Notes:
@@ -32,22 +36,65 @@ Notes:
 - Máy chủ tạo các luồng daemon để xử lý máy khách.
 - Việc xử lý lỗi triển khai hiện tại là tối thiểu, các lỗi socket được in ra bảng điều khiển.
 - Việc xử lý yêu cầu thực tế được ủy quyền cho Lớp HttpAdapter.
+- Với ``engine="pool"``, kết nối được xếp vào hàng đợi có giới hạn của
+  :class:`WorkerPool <WorkerPool>`; khi hàng đợi đầy, máy chủ trả ngay
+  ``503 Service Unavailable`` kèm ``Retry-After``. Kết nối keep-alive đang
+  chờ request kế tiếp được gửi sang selector của pool nên không giữ worker.
+- Với ``engine="asyncio"``, mọi kết nối được phục vụ trên một event loop
+  duy nhất; handler đồng bộ chạy trong executor.
+- Với ``workers=N``, N tiến trình con dùng chung cổng qua ``SO_REUSEPORT``
+  (hoặc socket kế thừa); trạng thái trong bộ nhớ của handler không được chia sẻ.
+- ``SIGTERM``/``SIGINT`` dừng nhận kết nối, chờ các request đang xử lý xong
+  (tối đa ``drain_timeout`` giây) rồi thoát. ``SIGUSR2`` khởi động lại: tiến
+  trình mới kế thừa socket đang lắng nghe nên không kết nối nào bị từ chối.
 
 Usage Example:
 --------------
 >>> create_backend("127.0.0.1", 9000, routes={})
+>>> create_backend("127.0.0.1", 9000, routes={}, engine="pool",
+...                pool_workers=16, pool_max_workers=64, pool_queue=256)
+>>> create_backend("127.0.0.1", 9000, routes={}, engine="asyncio")
+>>> create_backend("127.0.0.1", 9000, routes={}, workers=16)
 
 """
 
+import os
 import socket
 import threading
 import argparse
+from functools import partial
 
 from .response import *
 from .httpadapter import HttpAdapter
 from .dictionary import CaseInsensitiveDict
+from .workerpool import WorkerPool
+from .asyncengine import run_asyncio, EXECUTOR_WORKERS
+from .prefork import Supervisor
+from .lifecycle import LIFECYCLE, ACCEPT_POLL, DRAIN_TIMEOUT, inherited_socket
+from .metrics import METRICS
+from .router import Router
+from .logger import get_logger
 
-def handle_client(ip, port, conn, addr, routes):
+log = get_logger(__name__)
+
+#: Listen backlog of the server socket.
+BACKLOG = 128
+
+#: Default number of core workers in pool mode.
+POOL_WORKERS = 16
+#: Default number of connections allowed to wait for a worker.
+POOL_QUEUE = 128
+#: Seconds advertised in ``Retry-After`` when the pool is saturated.
+RETRY_AFTER = 1
+
+#: Worker pool values exported as gauges and counters by :func:`pool_metrics`.
+POOL_GAUGES = ("workers", "busy", "queue_depth", "queue_size", "parked")
+POOL_COUNTERS = ("accepted", "rejected", "completed")
+
+#: The :class:`WorkerPool <WorkerPool>` of the running backend, if any.
+worker_pool = None
+
+def handle_client(ip, port, conn, addr, routes, resume=None):
     """
     Initializes an HttpAdapter instance and delegates the client handling logic to it.
 
@@ -56,59 +103,296 @@ def handle_client(ip, port, conn, addr, routes):
     :param conn (socket.socket): Client connection socket.
     :param addr (tuple): client address (IP, port).
     :param routes (dict): Dictionary of route handlers.
+    :param resume (tuple): State of a keep-alive connection back from the
+        pool's selector, None for a new connection.
     """
     daemon = HttpAdapter(ip, port, conn, addr, routes)
+    if worker_pool is not None:
+        daemon.park = worker_pool.park
 
     # Handle client
-    daemon.handle_client(conn, addr, routes)
+    daemon.handle_client(conn, addr, routes, resume)
+
+def close_idle(conn, addr):
+    """
+    Closes a parked keep-alive connection whose client stayed silent.
+
+    :param conn (socket.socket): Client connection socket.
+    :param addr (tuple): client address (IP, port).
+    """
+    METRICS.limit_exceeded("idle_timeout")
+    LIFECYCLE.untrack(conn)
+    try:
+        conn.close()
+    except OSError:
+        pass
+
+def reject_client(conn, addr):
+    """
+    Answers a connection the worker pool could not take with
+    ``503 Service Unavailable`` and closes it.
+
+    :param conn (socket.socket): Client connection socket.
+    :param addr (tuple): client address (IP, port).
+    """
+    stats = worker_pool.stats() if worker_pool else {}
+    log.warning("Worker pool saturated (queue %s/%s), 503 to %s",
+                stats.get("queue_depth"), stats.get("queue_size"), addr)
+    try:
+        # Không để client chậm chặn vòng accept
+        conn.settimeout(0.5)
+        conn.sendall(Response().build_unavailable(RETRY_AFTER))
+    except OSError:
+        pass
+    finally:
+        LIFECYCLE.untrack(conn)
+        conn.close()
+
+def pool_stats():
+    """
+    Returns queue depth, wait times and worker counts of the running pool.
+
+    :rtype: dict or None - None unless the backend runs with ``engine="pool"``.
+    """
+    return worker_pool.stats() if worker_pool else None
+
+def pool_metrics():
+    """
+    Collector of the worker pool for :data:`METRICS` (``weaprous_pool_*``).
+
+    :rtype: dict - Gauges and counters of the pool, empty without one.
+    """
+    stats = pool_stats()
+    if stats is None:
+        return {}
+    values = {key: stats[key] for key in POOL_GAUGES + POOL_COUNTERS if key in stats}
+    # Prometheus dùng giây
+    values["queue_wait_seconds"] = stats["wait_total_ms"] / 1000.0
+    values["queue_wait_max_seconds"] = stats["wait_max_ms"] / 1000.0
+    return values
+
+def create_server_socket(ip, port, reuse_port=False):
+    """
+    Creates the listening socket of the backend.
+
+    :param ip (str): IP address to bind the server.
+    :param port (int): Port number to listen on.
+    :param reuse_port (bool): Set ``SO_REUSEPORT`` so several processes can
+        bind the same port and let the kernel spread connections among them.
+
+    :rtype: socket.socket
+    """
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    server.bind((ip, port))
+    server.listen(BACKLOG)
+    return server
 
-def run_backend(ip, port, routes):
+def accept_connections(server):
+    """
+    Yields the accepted connections until the process stops or restarts
+    (:data:`LIFECYCLE`), then those still queued on the socket, which would
+    be reset when a ``SO_REUSEPORT`` socket closes.
+
+    :param server (socket.socket): The listening socket.
+    :rtype: generator of (conn, addr)
+    """
+    # Timeout để vòng accept thấy cờ dừng kể cả khi tín hiệu rơi vào luồng khác
+    server.settimeout(ACCEPT_POLL)
+    while LIFECYCLE.keep_accepting(server):
+        try:
+            yield server.accept()
+        except socket.timeout:
+            continue
+    server.setblocking(False)
+    for _ in range(BACKLOG):
+        try:
+            yield server.accept()
+        except OSError:
+            return
+
+def serve_backend(server, ip, port, routes, engine="thread", pool_workers=POOL_WORKERS,
+                  pool_max_workers=None, pool_queue=POOL_QUEUE,
+                  executor_workers=EXECUTOR_WORKERS):
+    """
+    Accepts and serves connections on an already listening socket, until a
+    stop or a restart signal; then closes it and drains the open connections
+    (:data:`LIFECYCLE`).
+
+    :param server (socket.socket): The listening socket.
+    :param ip (str): IP address of the server.
+    :param port (int): Port number the server is listening on.
+    :param routes (dict): Dictionary of route handlers.
+    :param engine (str): ``"thread"`` (one thread per connection), ``"pool"``
+        or ``"asyncio"``.
+    :param pool_workers (int): Core workers in pool mode.
+    :param pool_max_workers (int): Elastic upper bound of workers in pool mode.
+        Defaults to ``pool_workers`` (fixed pool).
+    :param pool_queue (int): Accept queue size in pool mode.
+    :param executor_workers (int): Threads running synchronous handlers in
+        asyncio mode.
+    """
+    global worker_pool
+
+    if engine == "asyncio":
+        run_asyncio(server, ip, port, routes, executor_workers=executor_workers)
+        return
+
+    if engine == "pool":
+        worker_pool = WorkerPool(partial(handle_client, ip, port, routes=routes),
+                                 workers=pool_workers,
+                                 max_workers=pool_max_workers,
+                                 queue_size=pool_queue,
+                                 reject=reject_client,
+                                 expire=close_idle)
+        worker_pool.start()
+        METRICS.add_collector("pool", pool_metrics,
+                              counters=POOL_COUNTERS + ("queue_wait_seconds",))
+        log.info("Worker pool %s..%s workers, queue %s",
+                 worker_pool.workers, worker_pool.max_workers, pool_queue)
+
+    LIFECYCLE.ready()
+    for conn, addr in accept_connections(server):
+        LIFECYCLE.track(conn)
+
+        if worker_pool is not None:
+            if not worker_pool.submit(conn, addr):
+                reject_client(conn, addr)
+            continue
+
+    # -------------------------------------------------------------------------- #
+        # Tạo một luồng mới để xử lý client này
+        # target=handle_client chỉ định hàm sẽ chạy trong luồng mới
+        # args=(...) là các tham số truyền cho hàm handle_client
+        # .daemon = True cho phép chương trình chính thoát 
+        # ngay cả khi luồng này vẫn đang chạy
+        client_thread = threading.Thread(target=handle_client, args=(ip, port, conn, addr, routes))
+        client_thread.daemon = True 
+        client_thread.start() # Bắt đầu luồng
+    # -------------------------------------------------------------------------- #
+
+    server.close()
+    LIFECYCLE.drain()
+    LIFECYCLE.wait_closed()
+
+def run_worker(server, ip, port, routes, serve_options, worker_id=0):
+    """
+    Body of one pre-forked worker process.
+
+    :param server (socket.socket): Listening socket inherited from the
+        supervisor, or None to bind a private ``SO_REUSEPORT`` socket.
+    :param ip (str): IP address to bind the server.
+    :param port (int): Port number to listen on.
+    :param routes (dict): Dictionary of route handlers.
+    :param serve_options (dict): Keyword arguments for :func:`serve_backend`.
+    :param worker_id (int): Index of the worker slot.
+    """
+    try:
+        if server is None:
+            server = create_server_socket(ip, port, reuse_port=True)
+        # SIGHUP: worker drain rồi thoát, supervisor khởi động lại nó
+        LIFECYCLE.install(stop=("SIGTERM", "SIGHUP"), restart=None)
+        log.info("Worker %s (pid %s) serving port %s", worker_id, os.getpid(), port)
+        serve_backend(server, ip, port, routes, **serve_options)
+    except socket.error as e:
+      log.error("Socket error: %s", e)
+
+def run_backend(ip, port, routes, engine="thread", pool_workers=POOL_WORKERS,
+                pool_max_workers=None, pool_queue=POOL_QUEUE,
+                executor_workers=EXECUTOR_WORKERS, workers=1, reuse_port=True,
+                drain_timeout=DRAIN_TIMEOUT):
     """
     Starts the backend server, binds to the specified IP and port, and listens for incoming
     connections. Each connection is handled in a separate thread. The backend accepts incoming
     connections and spawns a thread for each client.
 
+    With ``engine="pool"`` connections are handed to a bounded
+    :class:`WorkerPool <WorkerPool>` instead; once its queue is full new
+    connections get an immediate ``503``. With ``engine="asyncio"`` the
+    listening socket is served by a single event loop.
+
+    With ``workers > 1`` the backend pre-forks that many processes, each
+    running the selected engine, under a :class:`Supervisor <Supervisor>`
+    that restarts crashed workers and forwards signals. Route handlers keep
+    their in-memory state per process, so only stateless routes scale this way.
+
+    ``SIGTERM`` or ``SIGINT`` stops the backend gracefully: no new connection
+    is accepted and in-flight requests get ``drain_timeout`` seconds to
+    finish. ``SIGUSR2`` restarts it: a new process started with the same
+    command line inherits the listening socket, and this one drains once the
+    new one accepts (see :mod:`daemon.lifecycle`).
 
     :param ip (str): IP address to bind the server.
     :param port (int): Port number to listen on.
     :param routes (dict): Dictionary of route handlers.
+    :param engine (str): ``"thread"`` (one thread per connection), ``"pool"``
+        or ``"asyncio"``.
+    :param pool_workers (int): Core workers in pool mode.
+    :param pool_max_workers (int): Elastic upper bound of workers in pool mode.
+        Defaults to ``pool_workers`` (fixed pool).
+    :param pool_queue (int): Accept queue size in pool mode.
+    :param executor_workers (int): Threads running synchronous handlers in
+        asyncio mode.
+    :param workers (int): Number of worker processes.
+    :param reuse_port (bool): In multi-process mode, let every worker bind its
+        own ``SO_REUSEPORT`` socket (kernel load balancing) instead of
+        sharing one inherited socket.
+    :param drain_timeout (float): Seconds in-flight requests get to finish
+        after a stop signal.
     """
-    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    serve_options = dict(engine=engine,
+                         pool_workers=pool_workers,
+                         pool_max_workers=pool_max_workers,
+                         pool_queue=pool_queue,
+                         executor_workers=executor_workers)
+
+    if workers > 1 and not hasattr(os, "fork"):
+        log.warning("os.fork không khả dụng, chạy một tiến trình")
+        workers = 1
 
+    LIFECYCLE.drain_timeout = drain_timeout
     try:
-        server.bind((ip, port))
-        server.listen(50)
-        print("[Backend] Listening on port {}".format(port))
+        # Socket của tiến trình cũ khi được khởi động lại bằng SIGUSR2
+        server = inherited_socket(ip, port)
+
+        if workers > 1:
+            reuse_port = reuse_port and server is None and hasattr(socket, "SO_REUSEPORT")
+            # Socket kế thừa: bind một lần trước khi fork
+            if server is None and not reuse_port:
+                server = create_server_socket(ip, port)
+            log.info("Pre-forking %s workers on port %s (%s)",
+                     workers, port, "SO_REUSEPORT" if reuse_port else "inherited socket")
+            Supervisor(partial(run_worker, server, ip, port, routes, serve_options),
+                       workers, drain_timeout=drain_timeout, listener=server).run()
+            return
+
+        if server is None:
+            server = create_server_socket(ip, port)
+        LIFECYCLE.install()
+        log.info("Listening on port %s", port)
         if routes != {}:
-            print("[Backend] route settings {}".format(routes))
+            log.info("route settings %s", routes)
 
-        while True:
-            conn, addr = server.accept()
-            
-            #  TODO: triển khai bước kết nối đến máy khách 
-            #  sử dụng lập trình đa luồng (multi-thread programming) với trình xử lý handle_client được cung cấp
-            
-        # -------------------------------------------------------------------------- #
-            # Tạo một luồng mới để xử lý client này
-            # target=handle_client chỉ định hàm sẽ chạy trong luồng mới
-            # args=(...) là các tham số truyền cho hàm handle_client
-            # .daemon = True cho phép chương trình chính thoát 
-            # ngay cả khi luồng này vẫn đang chạy
-            client_thread = threading.Thread(target=handle_client, args=(ip, port, conn, addr, routes))
-            client_thread.daemon = True 
-            client_thread.start() # Bắt đầu luồng
-        # -------------------------------------------------------------------------- #
+        serve_backend(server, ip, port, routes, **serve_options)
             
     except socket.error as e:
-      print("Socket error: {}".format(e))
+      log.error("Socket error: %s", e)
 
-def create_backend(ip, port, routes={}):
+def create_backend(ip, port, routes={}, **options):
     """
     Entry point for creating and running the backend server.
 
     :param ip (str): IP address to bind the server.
     :param port (int): Port number to listen on.
     :param routes (dict, optional): Dictionary of route handlers. Defaults to empty dict.
+        A plain dict is compiled into a :class:`Router <Router>`.
+    :param options: Serving options forwarded to :func:`run_backend`
+        (``engine``, ``pool_workers``, ``pool_max_workers``, ``pool_queue``,
+        ``executor_workers``, ``workers``, ``reuse_port``, ``drain_timeout``).
     """
 
-    run_backend(ip, port, routes)
\ No newline at end of file
+    if not isinstance(routes, Router):
+        routes = Router(routes)
+    run_backend(ip, port, routes, **options)
\ No newline at end of file
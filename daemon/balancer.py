@@ -0,0 +1,310 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.balancer
+~~~~~~~~~~~~~~~~~
+
+This module provides the load-balancing policies the proxy uses to pick one
+of the ``proxy_pass`` upstreams of a host (``dist_policy`` in ``proxy.conf``):
+
+- ``round-robin`` (or ``weighted-round-robin``): upstreams in turn, a
+  ``weight=N`` one N times as often, spread out (smooth weighted
+  round-robin) rather than N in a row;
+- ``least-conn``: the upstream with the fewest requests in flight for its weight;
+- ``random-two``: the less loaded of two upstreams drawn at random in
+  proportion to their weight (power of two choices);
+- ``ip-hash``: consistent hashing of the client IP, so a client sticks to
+  one upstream and few clients move when one is added or removed;
+- ``cookie-hash <name>``: consistent hashing of a cookie (``session`` by
+  default), or of the client IP when the request has no such cookie.
+
+Every policy skips the upstreams whose circuit breaker (:mod:`daemon.health`)
+is open, and returns None when none is left.
+
+Schedules, rings and addresses are built once per host. A pick only reads
+them, the in-flight counters of the :class:`UpstreamPool <UpstreamPool>` and
+the state of the :class:`UpstreamHealth <UpstreamHealth>` of each upstream,
+so it takes no lock (unless a circuit is half-open) and builds no list, dict
+or tuple. The request head is matched as the bytes it was received as, so
+``cookie-hash`` decodes nothing; a client IP is hashed with ``crc32``.
+
+Usage Example:
+--------------
+>>> balancer = make_balancer([("10.0.0.1:9002", 3), "10.0.0.2:9002"], "least-conn")
+>>> host, port = balancer.pick("192.168.1.7", head)
+"""
+
+import abc
+import hashlib
+import itertools
+import re
+from bisect import bisect
+from math import gcd
+from random import random
+from zlib import crc32
+
+from .health import upstream_health
+from .logger import get_logger
+from .upstream import upstream_pool
+
+log = get_logger(__name__)
+
+#: Policy used when a host declares none, or an unknown one.
+DEFAULT_POLICY = "round-robin"
+#: Cookie hashed by ``cookie-hash`` without a cookie name.
+DEFAULT_HASH_COOKIE = "session"
+#: Points per unit of weight on a consistent hashing ring.
+VNODES = 160
+
+
+def parse_upstream(upstream):
+    """
+    Splits an upstream of a host's ``proxy_map``.
+
+    :param upstream: ``"ip:port"``, or an ``("ip:port", weight)`` tuple.
+    :rtype: tuple - ((ip, port), weight).
+    :raise: ValueError on a malformed address or weight.
+    """
+    if isinstance(upstream, str):
+        address, weight = upstream, 1
+    else:
+        address, weight = upstream
+    host, port = address.rsplit(":", 1)
+    weight = int(weight)
+    if weight < 1:
+        raise ValueError("weight of {} must be at least 1".format(address))
+    return (host, int(port)), weight
+
+
+def smooth_schedule(weights):
+    """
+    Orders the upstreams of one weighted round-robin cycle so that each
+    appears as evenly spread as its weight allows (weights 5, 1, 1 give
+    a a b a c a a, not a a a a a b c).
+
+    :param weights (list): Weight of each upstream.
+    :rtype: tuple - Upstream indexes, ``sum(weights)`` long (after dividing
+        the weights by their common divisor).
+    """
+    divisor = 0
+    for w in weights:
+        divisor = gcd(divisor, w)
+    weights = [w // divisor for w in weights]
+    total = sum(weights)
+    current = [0] * len(weights)
+    schedule = []
+    for _ in range(total):
+        for i, w in enumerate(weights):
+            current[i] += w
+        best = max(range(len(weights)), key=current.__getitem__)
+        current[best] -= total
+        schedule.append(best)
+    return tuple(schedule)
+
+
+class Balancer(abc.ABC):
+    """Picks one of the upstreams of a host.
+
+    :param upstreams (list): ``"ip:port"`` strings or ``("ip:port", weight)`` tuples.
+    :param arg (str): Argument of the policy, if it takes one.
+    """
+
+    def __init__(self, upstreams, arg=None):
+        parsed = [parse_upstream(u) for u in upstreams]
+        if not parsed:
+            raise ValueError("no upstream")
+        #: (ip, port) of each upstream, as returned by :meth:`pick`.
+        self.addresses = tuple(address for address, _ in parsed)
+        self.weights = tuple(weight for _, weight in parsed)
+        #: Upstream indexes of one smooth weighted round-robin cycle.
+        self.schedule = smooth_schedule(self.weights)
+        #: :class:`UpstreamHealth <UpstreamHealth>` of each upstream.
+        self.health = tuple(upstream_health(*address) for address in self.addresses)
+        # itertools.count là C, next() nguyên tử dưới GIL
+        self._counter = itertools.count()
+
+    @abc.abstractmethod
+    def pick(self, client_ip=None, head=b""):
+        """
+        Picks the upstream of one request.
+
+        :param client_ip (str): IP address of the client.
+        :param head (bytes): Request line and headers.
+        :rtype: tuple - (ip, port), or None if every upstream is ejected.
+        """
+
+
+class RoundRobin(Balancer):
+    """``round-robin``: the upstreams in smooth weighted round-robin order."""
+
+    def pick(self, client_ip=None, head=b""):
+        schedule, health = self.schedule, self.health
+        size = len(schedule)
+        start = next(self._counter)
+        for k in range(size):
+            i = schedule[(start + k) % size]
+            if health[i].available():
+                return self.addresses[i]
+        return None
+
+
+class LeastConn(Balancer):
+    """``least-conn``: fewest requests in flight per unit of weight; ties
+    are broken in weighted round-robin order."""
+
+    def __init__(self, upstreams, arg=None):
+        super().__init__(upstreams, arg)
+        self.pools = tuple(upstream_pool(*address) for address in self.addresses)
+
+    def pick(self, client_ip=None, head=b""):
+        pools, weights, health = self.pools, self.weights, self.health
+        n = len(pools)
+        start = self.schedule[next(self._counter) % len(self.schedule)]
+        best = -1
+        for i in range(start, start + n):
+            i %= n
+            if health[i].ejected_until:
+                continue
+            active, weight = pools[i].active, weights[i]
+            # active/weight < best_active/best_weight, không cần số thực
+            if best < 0 or active * best_weight < best_active * weight:
+                best, best_active, best_weight = i, active, weight
+        if best >= 0:
+            return self.addresses[best]
+        # Tất cả đang bị loại: thử upstream nào đã tới lượt half-open
+        for i in range(n):
+            if health[i].available():
+                return self.addresses[i]
+        return None
+
+
+class RandomTwo(LeastConn):
+    """``random-two``: the less loaded of two upstreams drawn at random,
+    each in proportion to its weight."""
+
+    def pick(self, client_ip=None, head=b""):
+        schedule, pools, weights = self.schedule, self.pools, self.weights
+        size = len(schedule)
+        a = schedule[int(random() * size)]
+        b = schedule[int(random() * size)]
+        health = self.health
+        if health[a].ejected_until or health[b].ejected_until:
+            return super().pick(client_ip, head)
+        if pools[b].active * weights[a] < pools[a].active * weights[b]:
+            a = b
+        return self.addresses[a]
+
+
+def _ring_point(key):
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:4], "big")
+
+
+class IpHash(Balancer):
+    """``ip-hash``: consistent hashing of the client IP on a ring holding
+    :data:`VNODES` points per unit of weight of each upstream."""
+
+    def __init__(self, upstreams, arg=None):
+        super().__init__(upstreams, arg)
+        ring = sorted(
+            (_ring_point("{}:{}-{}".format(host, port, v)), i)
+            for i, ((host, port), weight) in enumerate(zip(self.addresses, self.weights))
+            for v in range(VNODES * weight))
+        self._points = tuple(point for point, _ in ring)
+        self._owners = tuple(self.addresses[i] for _, i in ring)
+        self._owner_health = tuple(self.health[i] for _, i in ring)
+
+    def point(self, client_ip, head):
+        """Returns the position of a request on the ring: the hash of its client IP."""
+        # crc32 của vài byte rẻ hơn một bảng nhớ tạm phải khoá
+        return crc32((client_ip or "").encode("utf-8"))
+
+    def pick(self, client_ip=None, head=b""):
+        owners, health = self._owners, self._owner_health
+        size = len(owners)
+        i = bisect(self._points, self.point(client_ip, head))
+        # Đi tiếp trên vòng (quay về đầu sau điểm cuối) tới upstream còn dùng được
+        for k in range(size):
+            j = (i + k) % size
+            if health[j].available():
+                return owners[j]
+        return None
+
+
+class CookieHash(IpHash):
+    """``cookie-hash <name>``: consistent hashing of a cookie, or of the
+    client IP when the request does not carry it."""
+
+    def __init__(self, upstreams, arg=None):
+        super().__init__(upstreams, arg)
+        #: Name of the hashed cookie.
+        self.cookie = arg or DEFAULT_HASH_COOKIE
+        self._pattern = re.compile(
+            rb"\r\ncookie:[ \t]*(?:[^\r]*?;[ \t]*)?" + re.escape(self.cookie.encode("latin-1"))
+            + rb"=([^;\r]*)", re.IGNORECASE)
+
+    def point(self, client_ip, head):
+        match = self._pattern.search(head) if head else None
+        if match is None:
+            return super().point(client_ip, head)
+        return crc32(match.group(1))
+
+
+#: ``dist_policy`` name -> :class:`Balancer <Balancer>` class.
+POLICIES = {
+    "round-robin": RoundRobin,
+    "weighted-round-robin": RoundRobin,
+    "least-conn": LeastConn,
+    "random-two": RandomTwo,
+    "ip-hash": IpHash,
+    "cookie-hash": CookieHash,
+}
+
+
+def make_balancer(upstreams, policy=DEFAULT_POLICY):
+    """
+    Builds the balancer of a host.
+
+    :param upstreams (list): ``"ip:port"`` strings or ``("ip:port", weight)`` tuples.
+    :param policy (str): ``dist_policy`` value, with its argument if any
+        (``"cookie-hash session"``).
+    :rtype: Balancer
+    :raise: ValueError on a malformed upstream.
+    """
+    name, _, arg = (policy or DEFAULT_POLICY).strip().partition(" ")
+    cls = POLICIES.get(name.lower())
+    if cls is None:
+        log.warning("Unknown dist_policy %r, using %s", policy, DEFAULT_POLICY)
+        cls = POLICIES[DEFAULT_POLICY]
+    return cls(upstreams, arg.strip() or None)
+
+
+#: hostname -> (proxy_map, policy, :class:`Balancer <Balancer>`).
+BALANCERS = {}
+
+
+def balancer_for(hostname, proxy_map, policy):
+    """
+    Returns the balancer of a host, built on first use and rebuilt if its
+    upstreams or policy changed.
+
+    :param hostname (str): The host name of the request.
+    :param proxy_map (list): Upstreams of the host.
+    :param policy (str): ``dist_policy`` of the host.
+    :rtype: Balancer
+    """
+    entry = BALANCERS.get(hostname)
+    if entry is None or entry[0] is not proxy_map or entry[1] != policy:
+        entry = (proxy_map, policy, make_balancer(proxy_map, policy))
+        # Gán vào dict là nguyên tử: hai luồng cùng dựng thì bản sau thắng
+        BALANCERS[hostname] = entry
+    return entry[2]
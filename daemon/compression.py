@@ -0,0 +1,165 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.compression
+~~~~~~~~~~~~~~~~~
+
+This module provides ``Accept-Encoding`` negotiation and gzip/deflate
+compression of dynamic response bodies.
+
+Bodies shorter than :data:`MIN_SIZE` are sent as they are. Compressed bodies
+are kept in a small LRU cache keyed by a hash of the uncompressed body, so a
+payload served many times unchanged (the tracker's ``/get-list`` polled by
+every peer) is compressed only once.
+
+Usage Example:
+--------------
+>>> encoding = negotiate(request.headers.get("accept-encoding"))
+>>> if encoding and len(body) >= MIN_SIZE:
+>>>     body = compress(body, encoding)
+"""
+
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+
+from .metrics import METRICS
+
+#: Smallest body (bytes) worth compressing.
+MIN_SIZE = 1024
+#: zlib compression level, a balance between CPU and size for JSON.
+LEVEL = 6
+#: Number of compressed bodies kept in the cache.
+CACHE_ENTRIES = 256
+#: Largest body whose compressed form is cached.
+CACHE_MAX_BODY = 1024 * 1024
+
+#: Supported codings, in order of preference on equal quality.
+ENCODINGS = ("gzip", "deflate")
+
+_WBITS = {"gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS}
+
+
+def negotiate(accept_encoding):
+    """
+    Picks the content coding to use for a request.
+
+    :param accept_encoding (str): Value of the ``Accept-Encoding`` header.
+    :rtype: str or None - ``"gzip"``, ``"deflate"`` or None for identity.
+    """
+    if not accept_encoding:
+        return None
+
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        qualities[coding] = q
+
+    best, best_q = None, 0.0
+    for coding in ENCODINGS:
+        q = qualities.get(coding, qualities.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressionCache:
+    """A thread-safe LRU of compressed bodies keyed by content hash.
+
+    :param entries (int): Number of compressed bodies kept.
+    """
+
+    def __init__(self, entries=CACHE_ENTRIES):
+        self.entries = entries
+        self._store = OrderedDict()
+        self._lock = threading.Lock()
+        #: Counters reported by :meth:`stats`.
+        self.hits = 0
+        self.misses = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def compress(self, body, encoding, level=LEVEL):
+        """
+        Returns ``body`` compressed with ``encoding``, from the cache if possible.
+
+        :param body (bytes): Uncompressed body.
+        :param encoding (str): ``"gzip"`` or ``"deflate"``.
+        :param level (int): zlib compression level.
+        :rtype: bytes
+        """
+        cacheable = len(body) <= CACHE_MAX_BODY
+        if cacheable:
+            key = (hashlib.blake2b(body, digest_size=16).digest(), encoding)
+            with self._lock:
+                data = self._store.get(key)
+                if data is not None:
+                    self._store.move_to_end(key)
+                    self.hits += 1
+                    self.bytes_in += len(body)
+                    self.bytes_out += len(data)
+                    return data
+
+        compressor = zlib.compressobj(level, zlib.DEFLATED, _WBITS[encoding])
+        data = compressor.compress(body) + compressor.flush()
+
+        with self._lock:
+            self.misses += 1
+            self.bytes_in += len(body)
+            self.bytes_out += len(data)
+            if cacheable:
+                self._store[key] = data
+                if len(self._store) > self.entries:
+                    self._store.popitem(last=False)
+        return data
+
+    def stats(self):
+        """
+        Returns a snapshot of the cache counters.
+
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                "entries": len(self._store),
+                "hits": self.hits,
+                "misses": self.misses,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+            }
+
+
+#: Shared cache used by :func:`compress`.
+COMPRESSION_CACHE = CompressionCache()
+METRICS.add_collector("compression_cache", COMPRESSION_CACHE.stats,
+                      counters=("hits", "misses", "bytes_in", "bytes_out"))
+
+
+def compress(body, encoding):
+    """
+    Compresses a body with the shared :data:`COMPRESSION_CACHE`.
+
+    :param body (bytes): Uncompressed body.
+    :param encoding (str): ``"gzip"`` or ``"deflate"``.
+    :rtype: bytes
+    """
+    return COMPRESSION_CACHE.compress(body, encoding)
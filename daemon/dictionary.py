@@ -49,4 +49,201 @@ class CaseInsensitiveDict(MutableMapping):
         return iter(self.store)
 
     def __len__(self):
-        return len(self.store)
\ No newline at end of file
+        return len(self.store)
+
+
+_MISSING = object()
+
+
+class Headers(dict):
+    """The :class:`Headers <dict>` object, a multimap of HTTP header fields.
+
+    It is a ``dict`` keyed by lowercase field names. Reads and writes accept
+    the name in any case: a lowercase name is a plain ``dict`` lookup, any
+    other is retried lowercased on a miss. The value of a repeated field is
+    its first one.
+
+    Every field is also kept, in order and with its original name, for
+    :meth:`getlist` and for writing the header out (:meth:`fields`), so
+    repeated fields such as ``Set-Cookie`` survive. For headers built by
+    :meth:`from_lines` that list is only made when first needed.
+
+    Usage::
+
+      >>> h = Headers.from_lines(["Host: a", "Accept: */*", "Accept: text/html"])
+      >>> h.get('accept'), h['Accept'], h.getlist('Accept')
+      ('*/*', '*/*', ['*/*', 'text/html'])
+
+      >>> h = Headers({"Content-Type": "application/json"})
+      >>> h.add("Set-Cookie", "a=1")
+      >>> h.add("Set-Cookie", "b=2")
+      >>> h.fields()
+      [('Content-Type', 'application/json'), ('Set-Cookie', 'a=1'), ('Set-Cookie', 'b=2')]
+    """
+
+    __slots__ = ("_fields", "_lines", "_repeated")
+
+    def __init__(self, fields=None, **kwargs):
+        super().__init__()
+        #: Every field as (lowercase name, name, value), in order; None until
+        #: built from :attr:`_lines`.
+        self._fields = []
+        self._lines = None
+        #: Whether some field name occurs more than once.
+        self._repeated = False
+        if fields is not None or kwargs:
+            self.update(fields or (), **kwargs)
+
+    @classmethod
+    def from_lines(cls, lines):
+        """
+        Builds the headers from raw ``Name: value`` lines in one pass; lines
+        without a colon are skipped.
+
+        :param lines (list): Header lines, without their CRLF.
+        :rtype: Headers
+        """
+        plain = {}
+        repeated = False
+        for line in lines:
+            name, sep, value = line.partition(':')
+            if sep:
+                key = name.lower()
+                if key in plain:
+                    repeated = True
+                else:
+                    plain[key] = value.strip()
+        # Bỏ qua __init__: danh sách trường chỉ được dựng từ lines khi cần
+        headers = dict.__new__(cls)
+        dict.update(headers, plain)
+        headers._fields = None
+        headers._lines = lines
+        headers._repeated = repeated
+        return headers
+
+    def _all(self):
+        fields = self._fields
+        if fields is None:
+            fields = []
+            for line in self._lines:
+                name, sep, value = line.partition(':')
+                if sep:
+                    fields.append((name.lower(), name, value.strip()))
+            self._fields, self._lines = fields, None
+        return fields
+
+    # -- đọc ---------------------------------------------------------------- #
+
+    def __missing__(self, key):
+        lower = key.lower()
+        if lower == key:
+            raise KeyError(key)
+        return self[lower]
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or dict.__contains__(self, key.lower())
+
+    def get(self, key, default=None):
+        value = dict.get(self, key, _MISSING)
+        if value is _MISSING:
+            return dict.get(self, key.lower(), default)
+        return value
+
+    def getlist(self, key):
+        """
+        Returns every value of a field, in order.
+
+        :param key (str): Field name, in any case.
+        :rtype: list
+        """
+        key = key.lower()
+        if not self._repeated:
+            value = dict.get(self, key, _MISSING)
+            return [] if value is _MISSING else [value]
+        return [value for k, _, value in self._all() if k == key]
+
+    def fields(self):
+        """
+        Returns every field with its original name, repeated fields included.
+
+        :rtype: list - of (name, value).
+        """
+        return [(name, value) for _, name, value in self._all()]
+
+    # -- ghi ---------------------------------------------------------------- #
+
+    def add(self, key, value):
+        """Appends a field, keeping the fields already set under the same name."""
+        lower = key.lower()
+        self._all().append((lower, key, value))
+        if dict.__contains__(self, lower):
+            self._repeated = True
+        else:
+            dict.__setitem__(self, lower, value)
+
+    def __setitem__(self, key, value):
+        lower = key.lower()
+        fields = self._all()
+        if dict.__contains__(self, lower):
+            fields[:] = [f for f in fields if f[0] != lower]
+        fields.append((lower, key, value))
+        dict.__setitem__(self, lower, value)
+
+    def __delitem__(self, key):
+        lower = key.lower()
+        dict.__delitem__(self, lower)
+        fields = self._all()
+        fields[:] = [f for f in fields if f[0] != lower]
+
+    def pop(self, key, default=_MISSING):
+        lower = key.lower()
+        if dict.__contains__(self, lower):
+            value = dict.__getitem__(self, lower)
+            del self[lower]
+            return value
+        if default is _MISSING:
+            raise KeyError(key)
+        return default
+
+    def popitem(self):
+        key, value = dict.popitem(self)
+        fields = self._all()
+        fields[:] = [f for f in fields if f[0] != key]
+        return key, value
+
+    def setdefault(self, key, default=None):
+        lower = key.lower()
+        if dict.__contains__(self, lower):
+            return dict.__getitem__(self, lower)
+        self[key] = default
+        return default
+
+    def update(self, other=(), **kwargs):
+        if isinstance(other, Headers):
+            other = other.fields()
+        elif hasattr(other, "keys"):
+            other = [(k, other[k]) for k in other.keys()]
+        for key, value in other:
+            self[key] = value
+        for key, value in kwargs.items():
+            self[key] = value
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def clear(self):
+        dict.clear(self)
+        self._fields = []
+        self._lines = None
+        self._repeated = False
+
+    def copy(self):
+        headers = Headers()
+        dict.update(headers, self)
+        headers._fields = list(self._all())
+        headers._repeated = self._repeated
+        return headers
+
+    def __repr__(self):
+        return "Headers({!r})".format(self.fields())
@@ -0,0 +1,86 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.eventloop
+~~~~~~~~~~~~~~~~~
+
+This module provides the event loop on which the threaded engines (``thread``
+and ``pool``) run ``async def`` handlers and async generators.
+
+:data:`HANDLER_LOOP` is one long-lived loop per process, running in its own
+thread and started by its first use. A worker thread hands it a coroutine
+and blocks until the result is ready, so the handlers of every worker share
+the loop, its tasks and whatever they open on it (clients, connection pools),
+instead of each call paying for a fresh loop. A coroutine that blocks stalls
+the other async handlers, as it would on the asyncio engine.
+
+A pre-forked worker process starts its own loop: one inherited from the
+parent has no thread running it.
+
+Usage Example:
+--------------
+>>> async def handler(request, response): ...
+>>> response_data = HANDLER_LOOP.run(handler(request=req, response=resp))
+"""
+
+import asyncio
+import os
+import threading
+
+
+class HandlerLoop:
+    """The :class:`HandlerLoop <HandlerLoop>`, an event loop served by a
+    background thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+        self._pid = None
+
+    @property
+    def loop(self):
+        """
+        The running loop, started on first use.
+
+        :rtype: asyncio.AbstractEventLoop
+        """
+        loop = self._loop
+        if loop is not None and self._pid == os.getpid():
+            return loop
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                self._loop = asyncio.new_event_loop()
+                self._pid = os.getpid()
+                thread = threading.Thread(target=self._loop.run_forever,
+                                          name="WeApRous-handler-loop")
+                thread.daemon = True
+                thread.start()
+            return self._loop
+
+    def run(self, awaitable):
+        """
+        Runs an awaitable on the loop and waits for its result. Must not be
+        called from the loop's own thread.
+
+        :param awaitable (awaitable): Coroutine (or other awaitable) to run.
+        :rtype: object - Its result; its exception is raised here.
+        """
+        return asyncio.run_coroutine_threadsafe(_await(awaitable), self.loop).result()
+
+
+async def _await(awaitable):
+    return await awaitable
+
+
+#: Event loop of the async handlers of this process.
+HANDLER_LOOP = HandlerLoop()
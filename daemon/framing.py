@@ -0,0 +1,587 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.framing
+~~~~~~~~~~~~~~~~~
+
+This module provides incremental HTTP/1.1 request framing for the backend
+(and the response framing the proxy reads its upstreams with).
+
+- :class:`ConnReader <ConnReader>` buffers bytes received from one connection
+  and cuts the request head off at the blank line, however the request was
+  split across TCP segments, and enforces the head size limit.
+- :class:`BodyDecoder <BodyDecoder>` is a socket-free decoder for
+  ``Content-Length`` and ``Transfer-Encoding: chunked`` bodies, fed with
+  whatever bytes arrived.
+- :class:`BodyReader <BodyReader>` ties both together and hands the body out
+  chunk by chunk, so a handler can stream an upload with ``request.stream()``
+  instead of keeping all of it in memory.
+- :class:`Deadlines <Deadlines>` bounds how long a client may take to send a
+  request: an idle wait for its first byte, a total time for the head, and a
+  body deadline that moves forward with every byte received.
+
+Framing problems raise :class:`FramingError <FramingError>` carrying the
+HTTP status the client should get (400, 408, 413, 431 or 501). Requests
+breaking a size or time limit are counted in :data:`METRICS` by limit name.
+"""
+
+import re
+import socket
+from time import monotonic
+
+from .metrics import METRICS
+
+#: Size of a single ``recv`` on the client socket.
+RECV_SIZE = 4096
+#: Largest request head (request line and headers) accepted, in bytes.
+MAX_HEADER_SIZE = 64 * 1024
+#: Most header fields accepted in a request head.
+MAX_HEADER_COUNT = 100
+#: Largest request body accepted, in bytes.
+MAX_BODY_SIZE = 16 * 1024 * 1024
+#: Longest chunk-size or trailer line accepted in a chunked body.
+MAX_CHUNK_LINE = 4096
+#: Interim response sent before reading a body announced with ``Expect: 100-continue``.
+CONTINUE = b"HTTP/1.1 100 Continue\r\n\r\n"
+
+#: Seconds to wait for the first byte of a request (see ``KEEPALIVE_TIMEOUT``).
+IDLE_TIMEOUT = 5
+#: Seconds from the first byte of a request until its head is complete.
+HEADER_TIMEOUT = 10
+#: Seconds granted to receive a request body, before :data:`BODY_MIN_RATE` credit.
+BODY_TIMEOUT = 30
+#: Bytes per second a body upload must sustain: each byte received moves the
+#: body deadline forward by ``1 / BODY_MIN_RATE`` seconds. 0 disables the credit.
+BODY_MIN_RATE = 1024
+#: Seconds to send one response, including its static file body.
+WRITE_TIMEOUT = 30
+
+_CONTENT_LENGTH = re.compile(rb"\r\ncontent-length:[ \t]*([^\r]*)", re.IGNORECASE)
+_TRANSFER_ENCODING = re.compile(rb"\r\ntransfer-encoding:[ \t]*([^\r]*)", re.IGNORECASE)
+_EXPECT_CONTINUE = re.compile(rb"\r\nexpect:[ \t]*100-continue", re.IGNORECASE)
+#: A chunk size: hex digits only, no sign, ``0x`` prefix or inner whitespace.
+_CHUNK_SIZE = re.compile(rb"[0-9A-Fa-f]{1,16}")
+
+
+class FramingError(ValueError):
+    """A request that cannot be framed, with the status to answer it with.
+
+    ``limit`` names the size or time limit the request broke, if any.
+    """
+
+    def __init__(self, status_code, reason, detail="", limit=None):
+        super().__init__("{} {}{}".format(status_code, reason,
+                                          ": " + detail if detail else ""))
+        self.status_code = status_code
+        self.reason = reason
+        self.limit = limit
+
+
+def limit_error(limit, status_code, reason, detail=""):
+    """
+    Counts a broken limit in :data:`METRICS` and builds its error.
+
+    :param limit (str): Name of the limit (``header_size``, ``body_timeout``...).
+    :rtype: FramingError
+    """
+    METRICS.limit_exceeded(limit)
+    return FramingError(status_code, reason, detail, limit)
+
+
+def body_framing(head):
+    """
+    Determines how the body following a request head is delimited.
+
+    :param head (bytes): Request line and headers, up to the blank line.
+
+    :rtype: tuple - (content length, chunked flag).
+    :raise: FramingError on conflicting or invalid framing headers.
+    """
+    te = _TRANSFER_ENCODING.findall(head)
+    cl = _CONTENT_LENGTH.findall(head)
+
+    if te:
+        if cl:
+            # Cả hai header cùng lúc là dấu hiệu request smuggling
+            raise FramingError(400, "Bad Request", "both Content-Length and Transfer-Encoding")
+        codings = [c.strip().lower() for c in b",".join(te).split(b",") if c.strip()]
+        if codings != [b"chunked"]:
+            raise FramingError(501, "Not Implemented", "unsupported Transfer-Encoding")
+        return 0, True
+
+    if not cl:
+        return 0, False
+    values = {v.strip() for v in cl}
+    if len(values) != 1 or not next(iter(values)).isdigit():
+        raise FramingError(400, "Bad Request", "invalid Content-Length")
+    return int(values.pop()), False
+
+
+def response_framing(head, method="GET"):
+    """
+    Determines how the body following a response head is delimited.
+
+    :param head (bytes): Status line and headers, up to the blank line.
+    :param method (str): Method of the request the response answers.
+
+    :rtype: tuple - (content length, chunked flag); the length is None if the
+        body runs until the connection closes.
+    :raise: FramingError on conflicting or invalid framing headers.
+    """
+    status = head[9:12]
+    if method == "HEAD" or status[:1] == b"1" or status in (b"204", b"304"):
+        return 0, False
+    if not _TRANSFER_ENCODING.search(head) and not _CONTENT_LENGTH.search(head):
+        return None, False
+    return body_framing(head)
+
+
+class BodyDecoder:
+    """Incremental decoder of one request body.
+
+    :param length (int): ``Content-Length`` of the body (ignored when chunked).
+    :param chunked (bool): Whether the body uses chunked transfer coding.
+    :param max_size (int): Largest decoded body accepted.
+    """
+
+    _SIZE, _DATA, _DATA_END, _TRAILER = range(4)
+
+    def __init__(self, length=0, chunked=False, max_size=MAX_BODY_SIZE):
+        if not chunked and length > max_size:
+            raise limit_error("body_size", 413, "Content Too Large")
+        self.chunked = chunked
+        self.max_size = max_size
+        #: Bytes of the current chunk (or of the whole body) still expected.
+        self.remaining = 0 if chunked else length
+        #: Decoded bytes handed out so far.
+        self.received = 0
+        self.done = not chunked and length == 0
+        self._state = self._SIZE
+        self._pending = b""
+
+    def feed(self, data):
+        """
+        Decodes as much of ``data`` as belongs to the body.
+
+        :param data (bytes): Bytes received from the connection.
+
+        :rtype: tuple - (decoded body bytes, bytes past the end of the body).
+        """
+        if self.done:
+            return b"", data
+        if not self.chunked:
+            take = data[:self.remaining]
+            self.remaining -= len(take)
+            self.received += len(take)
+            self.done = self.remaining == 0
+            return take, data[len(take):]
+        return self._feed_chunked(data)
+
+    def _feed_chunked(self, data):
+        buf = self._pending + data if self._pending else data
+        self._pending = b""
+        out = []
+        pos = 0
+        end = len(buf)
+
+        while not self.done and pos < end:
+            if self._state == self._DATA:
+                take = buf[pos:pos + self.remaining]
+                out.append(take)
+                pos += len(take)
+                self.remaining -= len(take)
+                self.received += len(take)
+                if self.received > self.max_size:
+                    raise limit_error("body_size", 413, "Content Too Large")
+                if self.remaining == 0:
+                    self._state = self._DATA_END
+                continue
+
+            if self._state == self._DATA_END:
+                if end - pos < 2:
+                    break
+                if buf[pos:pos + 2] != b"\r\n":
+                    raise FramingError(400, "Bad Request", "missing CRLF after chunk")
+                pos += 2
+                self._state = self._SIZE
+                continue
+
+            # _SIZE và _TRAILER đều xử lý theo dòng
+            nl = buf.find(b"\r\n", pos)
+            if nl < 0:
+                if end - pos > MAX_CHUNK_LINE:
+                    raise FramingError(400, "Bad Request", "chunk line too long")
+                break
+            line = buf[pos:nl]
+            pos = nl + 2
+
+            if self._state == self._TRAILER:
+                if not line:
+                    self.done = True
+                continue
+
+            # int(x, 16) còn nhận "-5", "+5", "0x10"; kích thước âm làm
+            # vòng lặp không bao giờ tiến, nên kiểm tra từng ký tự trước
+            size = line.split(b";", 1)[0].rstrip(b" \t")
+            if not _CHUNK_SIZE.fullmatch(size):
+                raise FramingError(400, "Bad Request", "invalid chunk size")
+            self.remaining = int(size, 16)
+            if self.remaining == 0:
+                self._state = self._TRAILER
+            else:
+                self._state = self._DATA
+
+        if self.done:
+            return b"".join(out), buf[pos:]
+        self._pending = buf[pos:]
+        return b"".join(out), b""
+
+
+class ConnReader:
+    """Buffered reader of the requests arriving on one connection.
+
+    :param recv (callable): ``recv()`` returning the next bytes from the
+        connection, ``b""`` on EOF.
+    :param max_header_size (int): Largest request head accepted.
+    :param max_body_size (int): Largest request body accepted.
+    :param max_header_count (int): Most header fields accepted in a head.
+    """
+
+    def __init__(self, recv, max_header_size=MAX_HEADER_SIZE,
+                 max_body_size=MAX_BODY_SIZE, max_header_count=MAX_HEADER_COUNT):
+        self.recv = recv
+        self.max_header_size = max_header_size
+        self.max_body_size = max_body_size
+        self.max_header_count = max_header_count
+        #: Bytes received but not consumed yet.
+        self.buf = b""
+
+    def unread(self, data):
+        """Puts bytes back in front of the buffer."""
+        if data:
+            self.buf = data + self.buf if self.buf else data
+
+    def take(self):
+        """Removes and returns everything buffered."""
+        data, self.buf = self.buf, b""
+        return data
+
+    def split_head(self):
+        """
+        Cuts a complete request head off the buffer.
+
+        :rtype: bytes or None - None if the buffer holds no complete head yet.
+        :raise: FramingError if the head exceeds the size or field count limit.
+        """
+        # Bỏ CRLF thừa giữa các request pipelined
+        if self.buf[:2] == b"\r\n":
+            self.buf = self.buf.lstrip(b"\r\n")
+        idx = self.buf.find(b"\r\n\r\n")
+        end = len(self.buf) if idx < 0 else idx + 4
+        if end > self.max_header_size:
+            raise limit_error("header_size", 431, "Request Header Fields Too Large")
+        # Dòng request + các header, mỗi dòng kết thúc bằng CRLF
+        if self.buf.count(b"\r\n", 0, end) > self.max_header_count + 2:
+            raise limit_error("header_count", 431, "Request Header Fields Too Large",
+                              "too many header fields")
+        if idx < 0:
+            return None
+        head, self.buf = self.buf[:end], self.buf[end:]
+        return head
+
+    def read_head(self):
+        """
+        Reads the next request head from the connection.
+
+        :rtype: bytes or None - None on EOF before a complete head.
+        """
+        head = self.split_head()
+        while head is None:
+            chunk = self.recv()
+            if not chunk:
+                return None
+            self.buf += chunk
+            head = self.split_head()
+        return head
+
+    def body(self, head, send_continue=None):
+        """
+        Creates the :class:`BodyReader <BodyReader>` for the request whose
+        head was just read.
+
+        :param head (bytes): The request head.
+        :param send_continue (callable): Sends ``100 Continue`` to the client;
+            called before the body is first read if the client expects it.
+
+        :rtype: BodyReader
+        :raise: FramingError on invalid framing headers or an oversized body.
+        """
+        length, chunked = body_framing(head)
+        decoder = BodyDecoder(length, chunked, self.max_body_size)
+        if decoder.done or not _EXPECT_CONTINUE.search(head):
+            send_continue = None
+        return BodyReader(self, decoder, send_continue)
+
+
+class BodyReader:
+    """Streams one request body out of a :class:`ConnReader <ConnReader>`.
+
+    :param source (ConnReader): The connection reader.
+    :param decoder (BodyDecoder): Decoder of this body.
+    :param send_continue (callable): Pending ``100 Continue`` sender, if any.
+    """
+
+    def __init__(self, source, decoder, send_continue=None):
+        self.source = source
+        self.decoder = decoder
+        self._send_continue = send_continue
+
+    @property
+    def done(self):
+        return self.decoder.done
+
+    @property
+    def expecting_continue(self):
+        """Whether the client still waits for ``100 Continue`` before sending the body."""
+        return self._send_continue is not None
+
+    def decode_buffered(self):
+        """
+        Decodes whatever body bytes are already buffered, without receiving.
+
+        :rtype: bytes
+        """
+        data = self.source.take()
+        if not data:
+            return b""
+        payload, leftover = self.decoder.feed(data)
+        self.source.unread(leftover)
+        return payload
+
+    def start(self):
+        """Sends the pending ``100 Continue``, if any, and returns whether one was sent."""
+        send, self._send_continue = self._send_continue, None
+        if send is not None:
+            send()
+            return True
+        return False
+
+    def read_chunk(self):
+        """
+        Returns the next piece of the body.
+
+        :rtype: bytes - ``b""`` once the body is complete.
+        :raise: FramingError if the client closes the connection mid-body.
+        """
+        self.start()
+        while not self.decoder.done:
+            payload = self.decode_buffered()
+            if payload:
+                return payload
+            if self.decoder.done:
+                break
+            chunk = self.source.recv()
+            if not chunk:
+                raise FramingError(400, "Bad Request", "incomplete body")
+            self.source.unread(chunk)
+        return b""
+
+    def __iter__(self):
+        while True:
+            chunk = self.read_chunk()
+            if not chunk:
+                return
+            yield chunk
+
+    def read(self):
+        """Reads the rest of the body at once."""
+        return b"".join(self)
+
+    def relay(self, buffer, recv_into):
+        """
+        Yields the rest of the body as it arrives, framing included (the
+        chunk lines of a chunked body are kept), for a proxy to pass it on
+        unchanged. Bytes past the end of the body are put back in the
+        connection reader.
+
+        :param buffer (memoryview): Reusable buffer the body is received in;
+            a piece yielded may be a view of it, valid until the next one
+            is asked for.
+        :param recv_into (callable): ``recv_into(view)`` receiving into a
+            view of ``buffer``, returning the number of bytes, 0 on EOF.
+
+        :rtype: iterator of bytes-like
+        :raise: FramingError if the connection closes mid-body.
+        """
+        self.start()
+        decoder = self.decoder
+        data = self.source.take()
+        while True:
+            if data:
+                _, leftover = decoder.feed(data)
+                if leftover:
+                    self.source.unread(bytes(leftover))
+                    data = data[:len(data) - len(leftover)]
+                if data:
+                    yield data
+            if decoder.done:
+                return
+            # Biết độ dài thì không nhận quá cuối body
+            size = len(buffer) if decoder.chunked else min(len(buffer), decoder.remaining)
+            n = recv_into(buffer[:size])
+            if not n:
+                raise FramingError(400, "Bad Request", "incomplete body")
+            # Giải mã chunked cần tìm CRLF: chép ra bytes
+            data = bytes(buffer[:n]) if decoder.chunked else buffer[:n]
+
+    def drain(self, limit=MAX_BODY_SIZE):
+        """
+        Discards the unread rest of the body so the next request can be read.
+
+        :param limit (int): Most bytes worth reading just to discard them.
+        :rtype: bool - False if the connection should be closed instead.
+        """
+        if self.decoder.done:
+            return True
+        if self.expecting_continue:
+            # Client vẫn chờ 100 Continue, body chưa được gửi: đóng kết nối
+            return False
+        start = self.decoder.received
+        try:
+            while self.read_chunk():
+                if self.decoder.received - start > limit:
+                    return False
+        except (FramingError, OSError):
+            return False
+        return True
+
+
+class Deadlines:
+    """Read deadlines of one client connection.
+
+    A connection waits for a request in one of three phases:
+
+    - ``IDLE``: nothing of the next request received yet, for at most
+      ``idle`` seconds. Expiring closes the connection quietly.
+    - ``HEAD``: the head has started, and must be complete ``header``
+      seconds after its first byte.
+    - ``BODY``: the body is read within ``body`` seconds, plus
+      ``1 / min_rate`` seconds for every byte received.
+
+    An expired ``HEAD`` or ``BODY`` raises a ``408`` :class:`FramingError`.
+    The object only keeps time; :meth:`recv` applies it to a blocking
+    socket, and the asyncio engine uses :attr:`deadline` directly.
+
+    :param idle (float): Seconds to wait for the first byte of a request.
+    :param header (float): Seconds to receive a request head.
+    :param body (float): Seconds to receive a request body.
+    :param min_rate (int): Body bytes per second earning more time; 0 for none.
+    """
+
+    IDLE, HEAD, BODY = range(3)
+
+    __slots__ = ("idle", "header", "body", "min_rate", "phase", "deadline")
+
+    def __init__(self, idle=IDLE_TIMEOUT, header=HEADER_TIMEOUT, body=BODY_TIMEOUT,
+                 min_rate=BODY_MIN_RATE):
+        self.idle = idle
+        self.header = header
+        self.body = body
+        self.min_rate = min_rate
+        self.phase = self.IDLE
+        #: ``time.monotonic()`` value the current phase ends at.
+        self.deadline = monotonic() + idle
+
+    def expect_request(self, pending=False):
+        """
+        Starts waiting for the next request.
+
+        :param pending (bool): Whether part of its head is already buffered.
+        """
+        if pending:
+            self.phase, self.deadline = self.HEAD, monotonic() + self.header
+        else:
+            self.phase, self.deadline = self.IDLE, monotonic() + self.idle
+
+    def expect_body(self):
+        """Starts the body deadline of the request whose head was just read."""
+        self.phase, self.deadline = self.BODY, monotonic() + self.body
+
+    def received(self, size):
+        """
+        Accounts for ``size`` bytes received in the current phase.
+
+        :param size (int): Number of bytes.
+        """
+        if self.phase == self.IDLE:
+            if size:
+                self.phase, self.deadline = self.HEAD, monotonic() + self.header
+        elif self.phase == self.BODY and self.min_rate:
+            self.deadline += size / self.min_rate
+
+    def remaining(self):
+        """
+        Returns the seconds left in the current phase.
+
+        :rtype: float
+        :raise: see :meth:`expired` if none are left.
+        """
+        left = self.deadline - monotonic()
+        if left <= 0:
+            self.expired()
+        return left
+
+    def expired(self):
+        """
+        Raises the error of the current phase running out of time.
+
+        :raise: socket.timeout when idle, FramingError (408) otherwise.
+        """
+        if self.phase == self.IDLE:
+            METRICS.limit_exceeded("idle_timeout")
+            raise socket.timeout("idle timeout")
+        name = "header_timeout" if self.phase == self.HEAD else "body_timeout"
+        raise limit_error(name, 408, "Request Timeout", name.replace("_", " "))
+
+    def recv_into(self, conn, buffer):
+        """
+        Receives into a buffer from a blocking socket within the current
+        deadline.
+
+        :param conn (socket.socket): The client socket.
+        :param buffer (memoryview): Where to receive.
+        :rtype: int - Number of bytes received.
+        """
+        conn.settimeout(self.remaining())
+        try:
+            size = conn.recv_into(buffer)
+        except socket.timeout:
+            self.expired()
+        self.received(size)
+        return size
+
+    def recv(self, conn, size=RECV_SIZE):
+        """
+        Receives from a blocking socket within the current deadline.
+
+        :param conn (socket.socket): The client socket.
+        :param size (int): Most bytes to receive.
+        :rtype: bytes
+        """
+        conn.settimeout(self.remaining())
+        try:
+            data = conn.recv(size)
+        except socket.timeout:
+            self.expired()
+        self.received(len(data))
+        return data
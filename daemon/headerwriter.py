@@ -0,0 +1,151 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.headerwriter
+~~~~~~~~~~~~~~~~~
+
+This module provides the building blocks :class:`Response <Response>` renders
+response headers from:
+
+- status lines and the constant header blocks (CORS, no-cache, Connection)
+  encoded once at import time;
+- the ``Date`` header, formatted at most once per second;
+- :func:`render`, which assembles a header with a single ``b"".join``.
+
+Usage Example:
+--------------
+>>> render(200, "OK", [NO_CACHE, date_header(), CONNECTION[True]],
+...        {"Content-Type": "application/json"})
+b'HTTP/1.1 200 OK\\r\\nCache-Control: no-cache\\r\\n...\\r\\n\\r\\n'
+"""
+
+import time
+from email.utils import formatdate
+
+from .dictionary import Headers
+
+CRLF = b"\r\n"
+
+#: ``Connection`` header line, by keep-alive flag.
+CONNECTION = {
+    True: b"Connection: keep-alive\r\n",
+    False: b"Connection: close\r\n",
+}
+#: Caching headers sent with every response whose handler sets no ``Cache-Control``.
+NO_CACHE = b"Cache-Control: no-cache\r\nPragma: no-cache\r\n"
+
+#: Default CORS headers, in the order they are sent.
+CORS_DEFAULTS = (
+    ("Access-Control-Allow-Credentials", "true"),
+    ("Access-Control-Allow-Methods", "GET, POST, PUT, DELETE, OPTIONS"),
+    ("Access-Control-Allow-Headers", "Content-Type, Authorization"),
+)
+#: Names of the CORS headers a response may override, lowercase as in :class:`Headers`.
+CORS_KEYS = frozenset(
+    ["access-control-allow-origin"] + [k.lower() for k, _ in CORS_DEFAULTS])
+#: The default CORS headers after ``Access-Control-Allow-Origin``, pre-encoded.
+CORS_BLOCK = "".join("{}: {}\r\n".format(k, v) for k, v in CORS_DEFAULTS).encode("latin-1")
+#: ``Access-Control-Allow-Origin`` for requests without an ``Origin``.
+ANY_ORIGIN = b"Access-Control-Allow-Origin: *\r\n"
+
+_status_lines = {}
+_allow_lines = {}
+_date = (0, b"")
+
+
+def status_line(status_code, reason):
+    """
+    Returns the encoded status line, memoized per (code, reason).
+
+    :rtype: bytes
+    """
+    key = (status_code, reason)
+    line = _status_lines.get(key)
+    if line is None:
+        line = "HTTP/1.1 {} {}\r\n".format(status_code, reason).encode("latin-1")
+        if len(_status_lines) < 256:
+            _status_lines[key] = line
+    return line
+
+
+def allow_header(methods):
+    """
+    Returns the ``Allow`` header line of a ``405``, memoized per method list.
+
+    :param methods (list): Methods the path accepts.
+    :rtype: bytes
+    """
+    key = tuple(methods)
+    line = _allow_lines.get(key)
+    if line is None:
+        line = "Allow: {}\r\n".format(", ".join(key)).encode("latin-1")
+        if len(_allow_lines) < 256:
+            _allow_lines[key] = line
+    return line
+
+
+def date_header():
+    """
+    Returns the ``Date`` header line, formatted once per second.
+
+    :rtype: bytes
+    """
+    global _date
+    now = int(time.time())
+    second, line = _date
+    if second != now:
+        line = "Date: {}\r\n".format(formatdate(now, usegmt=True)).encode("latin-1")
+        # Gán tuple là nguyên tử: luồng khác thấy bản cũ hoặc bản mới
+        _date = (now, line)
+    return line
+
+
+def encode_headers(headers):
+    """
+    Encodes headers in one pass, with their original names and every
+    repeated field of a :class:`Headers`.
+
+    :param headers (dict): name -> value, or :class:`Headers`.
+    :rtype: bytes
+    """
+    if not headers:
+        return b""
+    items = headers.fields() if isinstance(headers, Headers) else headers.items()
+    return "".join(["{}: {}\r\n".format(k, v) for k, v in items]).encode("utf-8")
+
+
+def render(status_code, reason, blocks, headers=None):
+    """
+    Assembles a response header.
+
+    :param status_code (int): Status code.
+    :param reason (str): Reason phrase.
+    :param blocks (list): Pre-encoded header lines, sent first.
+    :param headers (dict): Other headers, encoded here.
+    :rtype: bytes - The header, ending with the blank line.
+    """
+    return b"".join([status_line(status_code, reason), *blocks, encode_headers(headers), CRLF])
+
+
+def fixed_head(status_code, reason, content_type, body, extra=()):
+    """
+    Pre-renders the constant part of a canned response: everything but the
+    ``Date`` and ``Connection`` lines.
+
+    :param extra (tuple): Additional ``(name, value)`` headers.
+    :rtype: bytes
+    """
+    lines = [("Content-Type", content_type), ("Content-Length", len(body))]
+    lines.extend(extra)
+    return status_line(status_code, reason) + "".join(
+        "{}: {}\r\n".format(k, v) for k, v in lines).encode("latin-1")
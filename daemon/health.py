@@ -0,0 +1,261 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.health
+~~~~~~~~~~~~~~~~~
+
+This module tracks the health of the proxy's upstreams. Every upstream
+address has an :class:`UpstreamHealth <UpstreamHealth>`, a circuit breaker
+fed from two sides:
+
+- passive checks: the outcome of every forwarded request. A failed connect
+  ejects the upstream at once; timeouts, invalid responses and ``5xx``
+  eject it after :data:`FAILURE_THRESHOLD` in a row;
+- active checks: a :class:`HealthChecker <HealthChecker>` thread per
+  upstream of the hosts with a ``health_check <path>`` line in
+  ``proxy.conf`` sends ``GET <path>`` every second (``interval=``, at least
+  :data:`MIN_PROBE_INTERVAL`). A probe that cannot connect ejects the
+  upstream at once; one timing out or answered with an invalid response or
+  a status other than 2xx/3xx counts as a failure, like a forwarded request.
+
+An ejected upstream (circuit open) gets no request: the balancer picks
+another one, and a host without any left is answered ``503`` at once, so
+no client waits on a dead upstream's connect. The ejection lasts
+:data:`BASE_EJECTION` seconds, doubled for each ejection in a row up to
+:data:`MAX_EJECTION`. Then the circuit is half-open: a single request (or
+probe) is let through, and its success re-admits the upstream while a
+failure ejects it again, for longer. After :data:`MAX_EJECTION` seconds in
+service the doubling starts over.
+
+Usage Example:
+--------------
+>>> health = upstream_health("127.0.0.1", 9000)
+>>> if health.available():
+...     ...                         # forward the request
+...     health.success()            # or health.failure(connect=True)
+"""
+
+import socket
+import threading
+from time import monotonic
+
+from .logger import get_logger
+
+log = get_logger(__name__)
+
+#: Timeouts, invalid responses or 5xx in a row ejecting an upstream.
+FAILURE_THRESHOLD = 3
+#: Seconds of the first ejection of an upstream.
+BASE_EJECTION = 1.0
+#: Longest ejection, in seconds; also the time in service that resets the doubling.
+MAX_EJECTION = 30.0
+#: Seconds the single request of a half-open circuit has before another one is let through.
+TRIAL_TIMEOUT = 5.0
+#: Seconds between two active probes of an upstream.
+PROBE_INTERVAL = 1.0
+#: Shortest ``interval=`` accepted; shorter ones are raised to it.
+MIN_PROBE_INTERVAL = 0.1
+#: Seconds an active probe has to connect and get the status line.
+PROBE_TIMEOUT = 1.0
+
+
+class UpstreamHealth:
+    """Circuit breaker of one upstream.
+
+    :param address (tuple): (host, port) of the upstream.
+    """
+
+    def __init__(self, address):
+        self.address = address
+        self._lock = threading.Lock()
+        #: ``monotonic()`` end of the current ejection; 0 while in service.
+        self.ejected_until = 0.0
+        #: Ejections in a row, doubling the next one.
+        self.ejections = 0
+        #: Failures in a row since the last success.
+        self.failures = 0
+        self._trial_until = 0.0
+        self._admitted_at = 0.0
+
+    def available(self):
+        """
+        Whether a request may be sent to the upstream. Once the ejection has
+        run out, lets a single trial request through until it reports back
+        (or :data:`TRIAL_TIMEOUT` passed).
+
+        :rtype: bool
+        """
+        if not self.ejected_until:
+            return True
+        now = monotonic()
+        if now < self.ejected_until:
+            return False
+        with self._lock:
+            if not self.ejected_until:
+                return True
+            if now < self._trial_until:
+                return False
+            self._trial_until = now + TRIAL_TIMEOUT
+            return True
+
+    def success(self):
+        """Reports a request (or probe) the upstream answered."""
+        if not self.ejected_until and not self.failures and not self.ejections:
+            return
+        now = monotonic()
+        with self._lock:
+            if self.ejected_until:
+                if now < self.ejected_until:
+                    # Kết quả của request gửi trước khi bị loại
+                    return
+                self.ejected_until = self._trial_until = 0.0
+                self._admitted_at = now
+                log.warning("Upstream %s:%s re-admitted", *self.address)
+            elif self.ejections and now - self._admitted_at >= MAX_EJECTION:
+                self.ejections = 0
+            self.failures = 0
+
+    def failure(self, connect=False):
+        """
+        Reports a failed request (or probe).
+
+        :param connect (bool): The upstream could not be reached at all,
+            which ejects it at once.
+        """
+        now = monotonic()
+        with self._lock:
+            if self.ejected_until:
+                if now >= self.ejected_until:
+                    # Request thử của circuit half-open thất bại
+                    self._eject(now, "trial request failed")
+                return
+            self.failures += 1
+            if connect:
+                self._eject(now, "connection failed")
+            elif self.failures >= FAILURE_THRESHOLD:
+                self._eject(now, "{} failures in a row".format(self.failures))
+
+    def _eject(self, now, why):
+        duration = min(BASE_EJECTION * 2 ** self.ejections, MAX_EJECTION)
+        self.ejections += 1
+        self.ejected_until = now + duration
+        self._trial_until = 0.0
+        self.failures = 0
+        log.warning("Upstream %s:%s ejected for %ss: %s",
+                    self.address[0], self.address[1], duration, why)
+
+
+#: (host, port) -> :class:`UpstreamHealth <UpstreamHealth>` of this process.
+HEALTH = {}
+
+
+def upstream_health(host, port):
+    """
+    Returns the circuit breaker of an upstream address, created on first use.
+
+    :rtype: UpstreamHealth
+    """
+    key = (host, port)
+    health = HEALTH.get(key)
+    if health is None:
+        health = HEALTH.setdefault(key, UpstreamHealth(key))
+    return health
+
+
+def probe(address, path, hostname, timeout=PROBE_TIMEOUT):
+    """
+    Sends one active health check request.
+
+    :param address (tuple): (host, port) of the upstream.
+    :param path (str): Path requested.
+    :param hostname (str): ``Host`` header of the request.
+    :rtype: int or None - The status code, 0 if the upstream timed out or
+        sent no valid status line, None if it could not be connected to.
+    """
+    request = ("GET {} HTTP/1.1\r\nHost: {}\r\nUser-Agent: weaprous-health\r\n"
+               "Connection: close\r\n\r\n").format(path, hostname).encode("latin-1")
+    try:
+        sock = socket.create_connection(address, timeout)
+    except OSError as e:
+        log.debug("Health check of %s:%s cannot connect: %s", address[0], address[1], e)
+        return None
+    status = b""
+    try:
+        with sock:
+            sock.settimeout(timeout)
+            sock.sendall(request)
+            while len(status) < 12:
+                chunk = sock.recv(12 - len(status))
+                if not chunk:
+                    break
+                status += chunk
+    except OSError as e:
+        log.debug("Health check of %s:%s failed: %s", address[0], address[1], e)
+        return 0
+    if status[:5] != b"HTTP/" or not status[9:12].isdigit():
+        return 0
+    return int(status[9:12])
+
+
+class HealthChecker:
+    """Active health checks of the upstreams of the hosts declaring a
+    ``health_check`` path.
+
+    :param routes (dict): hostname -> (proxy_map, policy, options), as
+        parsed by ``start_proxy.parse_virtual_hosts``.
+    """
+
+    def __init__(self, routes):
+        #: (host, port) -> (path, hostname, interval); one probe per address.
+        self.targets = {}
+        for hostname, entry in routes.items():
+            options = entry[2] if len(entry) > 2 else {}
+            path = options.get("health_check")
+            if not path:
+                continue
+            proxy_map = entry[0]
+            upstreams = [proxy_map] if isinstance(proxy_map, str) else proxy_map
+            for upstream in upstreams:
+                address = upstream if isinstance(upstream, str) else upstream[0]
+                host, port = address.rsplit(":", 1)
+                interval = max(options.get("health_interval", PROBE_INTERVAL),
+                               MIN_PROBE_INTERVAL)
+                self.targets.setdefault((host, int(port)), (path, hostname, interval))
+        self._stop = threading.Event()
+
+    def start(self):
+        """Starts one probing thread per upstream."""
+        for address, (path, hostname, interval) in self.targets.items():
+            threading.Thread(target=self.run, args=(address, path, hostname, interval),
+                             name="health-{}:{}".format(*address), daemon=True).start()
+        if self.targets:
+            log.info("Health checking %s upstreams", len(self.targets))
+
+    def run(self, address, path, hostname, interval):
+        """Probes one upstream every ``interval`` seconds until :meth:`stop`."""
+        health = upstream_health(*address)
+        while not self._stop.is_set():
+            # Khi đang bị loại và chưa hết hạn thì không cần probe
+            if health.available():
+                status = probe(address, path, hostname, min(PROBE_TIMEOUT, interval))
+                if status is None:
+                    health.failure(connect=True)
+                elif 200 <= status < 400:
+                    health.success()
+                else:
+                    # 5xx hay timeout: cần FAILURE_THRESHOLD lần liên tiếp
+                    health.failure()
+            self._stop.wait(interval)
+
+    def stop(self):
+        self._stop.set()
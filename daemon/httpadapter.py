@@ -108,11 +108,11 @@
 #         try:
 #             msg = conn.recv(1024).decode()
 #             if not msg:
-#                 print(f"[HttpAdapter] Client {addr} ngắt kết nối.")
+#                 log.debug("Client %s ngắt kết nối.", addr)
 #                 conn.close()
 #                 return
 #         except Exception as e:
-#             print(f"[HttpAdapter] Lỗi khi nhận dữ liệu: {e}")
+#             log.info("Lỗi khi nhận dữ liệu: %s", e)
 #             conn.close()
 #             return
             
@@ -120,7 +120,7 @@
 #         try:
 #              req.prepare(msg, routes)
 #         except Exception as e:
-#              print(f"[HttpAdapter] Lỗi khi parse request: {e}")
+#              log.info("Lỗi khi parse request: %s", e)
 #              # Gửi lỗi 400 Bad Request
 #              response_data = (
 #                 "HTTP/1.1 400 Bad Request\r\n"
@@ -338,14 +338,73 @@ raw URL paths and RESTful route definitions, and integrates with
 Request and Response objects to handle client-server communication.
 """
 
-from .request import Request
-from .response import Response
+import inspect
+import re
+import socket
+from collections.abc import AsyncIterator, Iterator
+from functools import partial
+from time import perf_counter
+
+from .request import Request, POOL as REQUEST_POOL
+from .response import Response, POOL as RESPONSE_POOL
 from .dictionary import CaseInsensitiveDict
+from .eventloop import HANDLER_LOOP
+from .framing import (ConnReader, Deadlines, FramingError, CONTINUE, MAX_HEADER_SIZE,
+                      MAX_HEADER_COUNT, MAX_BODY_SIZE, HEADER_TIMEOUT, BODY_TIMEOUT,
+                      BODY_MIN_RATE, WRITE_TIMEOUT)
+from .lifecycle import LIFECYCLE
+from .logger import get_logger
+from .metrics import METRICS, status_of
+
+log = get_logger(__name__)
+
+#: Seconds an idle persistent connection is kept open waiting for the next request.
+KEEPALIVE_TIMEOUT = 5
+#: Maximum number of requests answered on one persistent connection.
+KEEPALIVE_MAX_REQUESTS = 100
+#: Most unread request body bytes discarded to keep a connection open.
+DRAIN_LIMIT = 64 * 1024
+
+def error_response(status_code, reason):
+    """
+    Builds a plain-text error response that closes the connection.
+
+    :param status_code (int): HTTP status code.
+    :param reason (str): Reason phrase, also used as the body.
+    :rtype: bytes
+    """
+    body = "{} {}".format(status_code, reason)
+    return (
+        "HTTP/1.1 {}\r\n"
+        "Content-Type: text/plain\r\n"
+        "Content-Length: {}\r\nConnection: close\r\n\r\n"
+        "{}".format(body, len(body), body)
+    ).encode('utf-8')
+
+#: Canned replies for requests that cannot be parsed or whose handler failed.
+BAD_REQUEST = error_response(400, "Bad Request")
+INTERNAL_ERROR = error_response(500, "Internal Server Error")
+
+_CONNECTION_CLOSE = re.compile(rb"\r\nconnection:[ \t]*close", re.IGNORECASE)
 
 class HttpAdapter:
     """
     A mutable :class:`HTTP adapter <HTTP adapter>` for managing client connections
     and routing requests.
+
+    Connections are persistent (HTTP/1.1 keep-alive): the adapter answers
+    requests on the same socket until the client closes it, asks for
+    ``Connection: close``, stays idle longer than :attr:`keepalive_timeout`
+    or reaches :attr:`keepalive_max_requests`.
+
+    Slow clients cannot hold a connection forever: a request head must arrive
+    within :attr:`header_timeout` of its first byte, a body within
+    :attr:`body_timeout` (extended by :attr:`body_min_rate`), and a response
+    must be taken within :attr:`write_timeout`. Every setting is a class
+    attribute, e.g. ``HttpAdapter.header_timeout = 5``.
+
+    Request bodies are not read up front: handlers get them through
+    ``request.body`` (read on first access) or ``request.stream()``.
     """
 
     __attrs__ = [
@@ -358,6 +417,25 @@ class HttpAdapter:
         "response",
     ]
 
+    #: Idle timeout (seconds) between two requests on the same connection.
+    keepalive_timeout = KEEPALIVE_TIMEOUT
+    #: Requests served on one connection before it is closed.
+    keepalive_max_requests = KEEPALIVE_MAX_REQUESTS
+    #: Largest request head accepted (``431`` above it).
+    max_header_size = MAX_HEADER_SIZE
+    #: Largest request body accepted (``413`` above it).
+    max_body_size = MAX_BODY_SIZE
+    #: Most header fields accepted (``431`` above it).
+    max_header_count = MAX_HEADER_COUNT
+    #: Seconds from the first byte of a request until its head is complete (``408`` after).
+    header_timeout = HEADER_TIMEOUT
+    #: Seconds to receive a request body (``408`` after).
+    body_timeout = BODY_TIMEOUT
+    #: Body bytes per second that earn more :attr:`body_timeout`; 0 for a fixed deadline.
+    body_min_rate = BODY_MIN_RATE
+    #: Seconds to send one response before the connection is dropped.
+    write_timeout = WRITE_TIMEOUT
+
     def __init__(self, ip, port, conn, connaddr, routes):
         """
         Initialize a new HttpAdapter instance.
@@ -373,69 +451,272 @@ class HttpAdapter:
         self.connaddr = connaddr
         #: Routes (dictionary từ WeApRous)
         self.routes = routes
-        #: Request
-        self.request = Request()
-        #: Response
-        self.response = Response()
-
-    def handle_client(self, conn, addr, routes):
+        #: Request being served (taken from the pool per request)
+        self.request = None
+        #: Response being built
+        self.response = None
+        #: ``park(conn, addr, deadline, resume)`` taking an idle keep-alive
+        #: connection off this thread (pool mode), or None to wait here.
+        self.park = None
+
+    def handle_client(self, conn, addr, routes, resume=None):
         """
         Handle an incoming client connection.
+
+        Requests are read and answered one after another on the same socket.
+        Pipelined requests that already sit in the receive buffer are answered
+        in order without waiting on the socket again.
+
+        Every receive runs under the connection's :class:`Deadlines
+        <Deadlines>`, so a silent or trickling client is dropped once it runs
+        out of time instead of holding the thread.
+
+        Once the process drains (:data:`LIFECYCLE`), the response in flight
+        is the last one and an idle keep-alive connection is closed.
+
+        With :attr:`park` set, a connection with nothing buffered is handed
+        off between requests instead of waiting on this thread; it comes
+        back with ``resume`` once the client sends the next request.
+
+        :param resume (tuple): ``(deadlines, served)`` of a parked connection.
         """
 
-        
         # Connection handler.
-        self.conn = conn        
+        self.conn = conn
         # Connection address.
         self.connaddr = addr
-        # Request handler
-        req = self.request
-        # Response handler
-        resp = self.response
 
-        # Handle the request
+        deadlines, served = resume or (self.deadlines(), 0)
+        reader = ConnReader(partial(deadlines.recv, conn), self.max_header_size,
+                            self.max_body_size, self.max_header_count)
+        connected = perf_counter()
+        # Kết nối vừa quay lại từ selector đã có dữ liệu, đọc ngay
+        parkable = False
+        parked = False
         try:
-            # Tăng buffer size để nhận được các request lớn hơn
-            msg = conn.recv(4096).decode()
-            if not msg:
-                print(f"[HttpAdapter] Client {addr} ngắt kết nối.")
+            while True:
+                try:
+                    deadlines.expect_request(pending=bool(reader.buf))
+                    # Sau expect_request: drain() thấy IDLE hoặc ta thấy draining
+                    if served and LIFECYCLE.draining and not reader.buf:
+                        break
+                    if parkable and self.park is not None and not reader.buf:
+                        self.park(conn, addr, deadlines.deadline, (deadlines, served))
+                        parked = True
+                        return
+                    head = reader.read_head()
+                    if head is None:
+                        if served == 0:
+                            log.debug("Client %s ngắt kết nối.", addr)
+                        break
+                    if served == 0 and METRICS.enabled:
+                        METRICS.observe_first_byte(perf_counter() - connected)
+                    deadlines.expect_body()
+                    body = reader.body(head, partial(conn.sendall, CONTINUE))
+                except socket.timeout:
+                    # Idle keep-alive connection, đóng lặng lẽ
+                    break
+                except FramingError as e:
+                    log.info("Request không hợp lệ từ %s: %s", addr, e)
+                    self.send_error(conn, e)
+                    break
+                except Exception as e:
+                    log.info("Lỗi khi nhận dữ liệu: %s", e)
+                    break
+
+                served += 1
+                last = served >= self.keepalive_max_requests or LIFECYCLE.draining
+                try:
+                    if not self.handle_request(conn, addr, head, routes, last, body):
+                        break
+                except socket.timeout:
+                    METRICS.limit_exceeded("write_timeout")
+                    log.info("Client %s không nhận response trong %ss, đóng kết nối",
+                             addr, self.write_timeout)
+                    break
+                except OSError as e:
+                    log.debug("Connection %s error: %s", addr, e)
+                    break
+                # Bỏ phần body handler chưa đọc trước request kế tiếp
+                if not body.drain(DRAIN_LIMIT):
+                    break
+                if served == 1:
+                    LIFECYCLE.track(conn, deadlines)
+                parkable = True
+        finally:
+            if not parked:
+                LIFECYCLE.untrack(conn)
                 conn.close()
-                return
+
+    def deadlines(self):
+        """
+        Creates the read :class:`Deadlines <Deadlines>` of a new connection
+        from the adapter settings.
+
+        :rtype: Deadlines
+        """
+        return Deadlines(self.keepalive_timeout, self.header_timeout,
+                         self.body_timeout, self.body_min_rate)
+
+    def send_error(self, conn, error):
+        """
+        Answers a request that could not be framed, within :attr:`write_timeout`.
+
+        :param conn (socket): The client socket connection.
+        :param error (FramingError): The framing problem.
+        """
+        try:
+            conn.settimeout(self.write_timeout)
+            conn.sendall(error_response(error.status_code, error.reason))
+        except OSError:
+            pass
+
+    def handle_request(self, conn, addr, msg, routes, last=False, body=None):
+        """
+        Parses one request, dispatches it and sends the response.
+
+        :param conn (socket): The client socket connection.
+        :param addr (tuple): The client's address.
+        :param msg (bytes): The raw request head (or a complete raw request).
+        :param routes (dict): The route mapping for dispatching requests.
+        :param last (bool): Whether this is the last request allowed on the connection.
+        :param body (BodyReader): Reader of the request body, if not part of ``msg``.
+
+        :rtype: bool - True if the connection stays open for another request.
+        :raise: socket.timeout if the client does not take the response within
+            :attr:`write_timeout`.
+        """
+        metrics = METRICS.enabled
+        if metrics:
+            started = perf_counter()
+            METRICS.request_started()
+
+        try:
+            req, resp = self.prepare_request(msg, routes, last, body)
         except Exception as e:
-            print(f"[HttpAdapter] Lỗi khi nhận dữ liệu: {e}")
-            conn.close()
-            return
-            
-        # Parse request 
+            log.info("Lỗi khi parse request: %s", e)
+            conn.settimeout(self.write_timeout)
+            conn.sendall(BAD_REQUEST)
+            if metrics:
+                now = perf_counter()
+                self.record_metrics(None, None, msg, body, BAD_REQUEST, 0,
+                                    started, now, now, now)
+            return False
+
+        if metrics:
+            parsed = handled = perf_counter()
+        response_data, sent = INTERNAL_ERROR, 0
+        try:
+            response_data = self.early_response(req, resp)
+            if response_data is None:
+                if req.hook:
+                    response_data = self.call_hook(req, resp)
+                else:
+                    log.debug("Serving static file: %s", req.path)
+                    response_data = resp.build_file_response(req)
+
+            if metrics:
+                handled = perf_counter()
+            conn.settimeout(self.write_timeout)
+            conn.sendall(response_data)
+            # Body file tĩnh đi thẳng từ file xuống socket (sendfile)
+            sent = resp.send_file(conn)
+            # Handler tự dựng response có thể yêu cầu đóng kết nối
+            keep_alive = resp.keep_alive and not self.declares_close(response_data)
+        finally:
+            if metrics:
+                self.record_metrics(req, resp, msg, body, response_data, sent,
+                                    started, parsed, handled, perf_counter())
+            self.release(req, resp)
+        return keep_alive
+
+    @staticmethod
+    def record_metrics(req, resp, msg, body, response_data, body_sent,
+                       started, parsed, handled, sent):
+        """
+        Records an answered request in :data:`METRICS`.
+
+        :param msg (bytes): The raw request head.
+        :param body (BodyReader): Reader of the request body, if any.
+        :param response_data (bytes): Response bytes sent first.
+        :param body_sent (int): Static body bytes sent after them.
+        :param started, parsed, handled, sent (float): Phase timestamps.
+        """
+        bytes_in = len(msg) + (body.decoder.received if body is not None else 0)
+        METRICS.request_finished(req, resp, status_of(response_data), bytes_in,
+                                 len(response_data) + (body_sent or 0),
+                                 started, parsed, handled, sent)
+
+    def prepare_request(self, msg, routes, last=False, body=None):
+        """
+        Builds the :class:`Request <Request>` / :class:`Response <Response>`
+        pair for one raw request.
+
+        :param msg (bytes): The raw request head (or a complete raw request).
+        :param routes (dict): The route mapping for dispatching requests.
+        :param last (bool): Whether this is the last request allowed on the connection.
+        :param body (BodyReader): Reader of the request body, if not part of ``msg``.
+
+        :rtype: tuple - (Request, Response).
+        :raise: ValueError if the request cannot be parsed.
+        """
+        # Mỗi request có Request/Response riêng, lấy lại từ pool của worker
+        self.request = req = REQUEST_POOL.acquire()
+        self.response = resp = RESPONSE_POOL.acquire()
+
         try:
             req.prepare(msg, routes)
-            # --- CORS PREFLIGHT HANDLER ---
-            if req.method == "OPTIONS":
-                # Gửi header CORS
-                cors_headers = (
-                    "HTTP/1.1 204 No Content\r\n"
-                    "Access-Control-Allow-Origin: *\r\n"
-                    "Access-Control-Allow-Methods: GET, POST, PUT, DELETE, OPTIONS\r\n"
-                    "Access-Control-Allow-Headers: Content-Type, Authorization\r\n"
-                    "Access-Control-Max-Age: 86400\r\n"
-                    "Connection: close\r\n"
-                    "\r\n"
-                ).encode('utf-8')
-
-                conn.sendall(cors_headers)
-                conn.close()
-                return
-        except Exception as e:
-             print(f"[HttpAdapter] Lỗi khi parse request: {e}")
-             response_data = (
-                "HTTP/1.1 400 Bad Request\r\n"
-                "Content-Length: 15\r\nConnection: close\r\n\r\n"
-                "400 Bad Request"
-             ).encode('utf-8')
-             conn.sendall(response_data)
-             conn.close()
-             return
-        
+        except Exception:
+            self.release(req, resp)
+            raise
+        if body is not None:
+            req.attach_body(body)
+        resp.keep_alive = req.keep_alive and not last
+        resp.request = req
+        return req, resp
+
+    def release(self, req, resp):
+        """
+        Returns an answered request's :class:`Request <Request>` and
+        :class:`Response <Response>` to the pools. A pair handed to a
+        WeApRous handler belongs to it (the handler may keep either object)
+        and is discarded instead (see :mod:`daemon.objectpool`).
+        """
+        self.request = self.response = None
+        if req.dispatched:
+            # File tĩnh đã gửi xong, không chờ GC mới đóng
+            resp.close_file()
+            RESPONSE_POOL.discard(resp)
+            REQUEST_POOL.discard(req)
+            return
+        RESPONSE_POOL.release(resp)
+        REQUEST_POOL.release(req)
+
+    def early_response(self, req, resp):
+        """
+        Answers requests that never reach a handler: CORS preflight, routed
+        paths called with a method they do not accept, and protected pages
+        without the auth cookie.
+
+        :rtype: bytes or None - None if the request should be dispatched.
+        """
+        # --- CORS PREFLIGHT HANDLER ---
+        if req.method == "OPTIONS":
+            # Gửi header CORS
+            return (
+                "HTTP/1.1 204 No Content\r\n"
+                "Access-Control-Allow-Origin: *\r\n"
+                "Access-Control-Allow-Methods: GET, POST, PUT, DELETE, OPTIONS\r\n"
+                "Access-Control-Allow-Headers: Content-Type, Authorization\r\n"
+                "Access-Control-Max-Age: 86400\r\n"
+                "Connection: {}\r\n"
+                "\r\n".format("keep-alive" if resp.keep_alive else "close")
+            ).encode('utf-8')
+
+        # Path có route nhưng không cho method này
+        if req.allowed_methods:
+            return resp.build_method_not_allowed(req.allowed_methods)
+
         # Các trang cần bảo vệ
         protected_paths = ['/index.html'] 
         
@@ -446,46 +727,68 @@ class HttpAdapter:
             
             if auth_cookie == 'true':
                 # --- ĐÃ XÁC THỰC ---
-                print(f"[Auth] Client {addr} đã xác thực, cho phép truy cập {req.path}.")
+                log.debug("Client %s đã xác thực, cho phép truy cập %s.", self.connaddr, req.path)
             else:
                 # --- CHƯA XÁC THỰC ---
-                print(f"[Auth] Client {addr} truy cập {req.path} bị từ chối. Yêu cầu đăng nhập.")
-                
-                # Gán request vào response để build_unauthorized
-                resp.request = req 
-                
-                response_data = resp.build_unauthorized()
-                conn.sendall(response_data)
-                conn.close()
-                return # Kết thúc xử lý
+                log.debug("Client %s truy cập %s bị từ chối. Yêu cầu đăng nhập.", self.connaddr, req.path)
+                return resp.build_unauthorized()
 
-        if req.hook:
-            print(f"[HttpAdapter] Routing to WeApRous handler for {req.method} {req.path}")
-            try:
-                response_data = req.hook(request=req, response=resp)
-                
-                conn.sendall(response_data)
-                conn.close()
-                return 
-                
-            except Exception as e:
-                print(f"[HttpAdapter] Lỗi nghiêm trọng trong WeApRous handler: {e}")
-                # Gửi lỗi 500 Internal Server Error
-                resp.request = req # Gán request để build lỗi
-                response_data = (
-                    "HTTP/1.1 500 Internal Server Error\r\n"
-                    "Content-Length: 21\r\nConnection: close\r\n\r\n"
-                    "500 Internal Server Error"
-                ).encode('utf-8')
-                conn.sendall(response_data)
-                conn.close()
-                return
+        return None
+
+    def call_hook(self, req, resp):
+        """
+        Runs the WeApRous handler matched for the request.
+
+        ``async def`` handlers are run to completion on the process's
+        :data:`HANDLER_LOOP <daemon.eventloop.HANDLER_LOOP>`, so they also
+        work with the threaded engines. A handler returning a
+        generator streams its response (see :meth:`stream_response`).
 
-        print(f"[HttpAdapter] Serving static file: {req.path}")
-        response = resp.build_response(req)
+        :rtype: bytes - The handler response, or a 500 if it raised.
+        """
+        log.debug("Routing to WeApRous handler for %s %s", req.method, req.path)
+        req.dispatched = True
+        try:
+            response_data = req.hook(request=req, response=resp)
+            if inspect.iscoroutine(response_data):
+                response_data = HANDLER_LOOP.run(response_data)
+            return self.stream_response(resp, response_data)
+        except FramingError as e:
+            # Body không đọc được (quá lớn, client ngắt giữa chừng...)
+            log.info("Lỗi khi đọc body: %s", e)
+            return error_response(e.status_code, e.reason)
+        except Exception as e:
+            log.exception("Lỗi nghiêm trọng trong WeApRous handler: %s", e)
+            # Gửi lỗi 500 Internal Server Error
+            return INTERNAL_ERROR
+
+    @staticmethod
+    def stream_response(resp, response_data):
+        """
+        Turns a handler that returned an iterator (a generator, ``async def``
+        generator, ...) of chunks instead of bytes into a streamed response:
+        the header now, the chunks by :meth:`Response.send_stream`.
 
-        conn.sendall(response)
-        conn.close()
+        :param resp (Response): The response of the handler.
+        :param response_data: What the handler returned.
+        :rtype: bytes - The response (header) to send first.
+        """
+        if type(response_data) is bytes:
+            return response_data
+        if isinstance(response_data, (Iterator, AsyncIterator)):
+            return resp.build_stream(response_data)
+        return response_data
+
+    @staticmethod
+    def declares_close(response_data):
+        """
+        Checks whether a raw response carries ``Connection: close`` in its head.
+
+        :param response_data (bytes): The raw HTTP response.
+        :rtype: bool
+        """
+        head_end = response_data.find(b"\r\n\r\n")
+        return _CONNECTION_CLOSE.search(response_data, 0, head_end) is not None
 
 
     @property
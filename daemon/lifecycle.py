@@ -0,0 +1,302 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.lifecycle
+~~~~~~~~~~~~~~~~~
+
+This module provides the graceful shutdown and restart of a backend process.
+
+Signal handlers only raise flags on :data:`LIFECYCLE`; the accept loop of the
+engine checks them between two accepts (at least every :data:`ACCEPT_POLL`
+seconds) and does the work outside the handler:
+
+- ``SIGTERM`` / ``SIGINT``: stop accepting and drain. Requests in flight are
+  answered with ``Connection: close``, keep-alive connections waiting for
+  their next request are closed at once, and the process exits when its last
+  connection is closed or after ``drain_timeout`` seconds. A second
+  ``SIGINT`` exits immediately.
+- ``SIGUSR2``: restart. A new copy of the program (same interpreter and
+  command line) is started and inherits the listening socket through
+  :data:`LISTEN_FD_ENV`. This process keeps serving until the new one reports
+  that it accepts, then drains as above. The socket itself is never closed,
+  so connection attempts made meanwhile wait in its backlog instead of being
+  refused. If the new process does not come up, this one goes on serving.
+
+Usage Example:
+--------------
+>>> server = inherited_socket(ip, port) or create_server_socket(ip, port)
+>>> LIFECYCLE.install()
+>>> LIFECYCLE.ready()
+>>> while LIFECYCLE.keep_accepting(server):
+...     ...
+>>> LIFECYCLE.drain()
+>>> LIFECYCLE.wait_closed()
+"""
+
+import os
+import select
+import signal
+import socket
+import subprocess
+import sys
+import threading
+from time import monotonic
+
+from .framing import Deadlines
+from .logger import get_logger
+
+log = get_logger(__name__)
+
+#: Environment variable carrying the fd of an inherited listening socket.
+LISTEN_FD_ENV = "WEAPROUS_LISTEN_FD"
+#: Environment variable carrying the pipe a restarted process reports ready on.
+READY_FD_ENV = "WEAPROUS_READY_FD"
+#: Default seconds in-flight requests get to finish after a stop signal.
+DRAIN_TIMEOUT = 10.0
+#: Seconds a blocking accept loop waits before checking the flags again.
+ACCEPT_POLL = 0.5
+#: Seconds a restarted process gets to report that it accepts.
+RESTART_TIMEOUT = 30.0
+#: Signals stopping the process gracefully.
+STOP_SIGNALS = ("SIGTERM", "SIGINT")
+#: Signal restarting the process on the same listening socket.
+RESTART_SIGNAL = "SIGUSR2"
+
+
+class Lifecycle:
+    """Stop and restart state, and open connections, of one process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._closed = threading.Condition(self._lock)
+        self._restarting = None
+        #: socket -> :class:`Deadlines <Deadlines>` of a keep-alive connection
+        #: :meth:`drain` may close while idle, or None.
+        self.connections = {}
+        #: Set by a stop signal, or once a restarted process took over.
+        self.stopping = False
+        #: Set by a restart signal until the accept loop starts the restart.
+        self.restart_requested = False
+        #: Set by :meth:`drain`: every later response closes its connection.
+        self.draining = False
+        self.drain_timeout = DRAIN_TIMEOUT
+        #: Called from the signal handlers to wake an accept loop that does
+        #: not poll (the asyncio engine). Must be safe in a signal handler.
+        self.wakeup = None
+        #: Write end of the pipe the process that restarted us waits on.
+        self.ready_fd = None
+
+    def install(self, stop=STOP_SIGNALS, restart=RESTART_SIGNAL):
+        """
+        Installs the signal handlers. Does nothing outside the main thread,
+        where Python cannot install them.
+
+        :param stop (tuple): Names of the signals stopping the process.
+        :param restart (str): Name of the signal restarting it, or None.
+        :rtype: bool - True if the handlers were installed.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return False
+        for name in stop:
+            signal.signal(getattr(signal, name), self._on_stop)
+        if restart and hasattr(signal, restart):
+            signal.signal(getattr(signal, restart), self._on_restart)
+        return True
+
+    def ready(self, notify=True):
+        """
+        Reports to the process that restarted us that we accept connections.
+        Only the first call of a process does something.
+
+        :param notify (bool): False to only close the pipe (a supervisor
+            leaves the report to its workers).
+        """
+        fd, self.ready_fd = self.ready_fd, None
+        if fd is None:
+            return
+        try:
+            if notify:
+                os.write(fd, b"1")
+        except OSError:
+            # Tiến trình cũ đã thôi chờ
+            pass
+        finally:
+            os.close(fd)
+
+    def keep_accepting(self, server):
+        """
+        Checked by the accept loop between two accepts. Starts a requested
+        restart in the background; the loop goes on accepting until the new
+        process took over.
+
+        :param server (socket.socket): The listening socket.
+        :rtype: bool - False once the loop must stop accepting.
+        """
+        if self.restart_requested and not self.stopping:
+            self.restart_requested = False
+            if self._restarting is None or not self._restarting.is_alive():
+                self._restarting = threading.Thread(target=self._restart, args=(server,),
+                                                    daemon=True)
+                self._restarting.start()
+        return not self.stopping
+
+    def track(self, conn, deadlines=None):
+        """
+        Registers an open connection, until :meth:`untrack`.
+
+        :param conn (socket.socket): Client connection socket.
+        :param deadlines (Deadlines): Deadlines of a connection that has
+            answered a request; while they are ``IDLE`` :meth:`drain` closes it.
+        """
+        with self._lock:
+            self.connections[conn] = deadlines
+
+    def untrack(self, conn):
+        """
+        Forgets a closed connection.
+
+        :param conn (socket.socket): Client connection socket.
+        """
+        with self._lock:
+            self.connections.pop(conn, None)
+            if not self.connections:
+                self._closed.notify_all()
+
+    def drain(self):
+        """
+        Ends keep-alive: later responses close their connection, and
+        keep-alive connections waiting for their next request are closed now.
+        """
+        with self._lock:
+            self.draining = True
+            idle = [conn for conn, deadlines in self.connections.items()
+                    if deadlines is not None and deadlines.phase == Deadlines.IDLE]
+            total = len(self.connections)
+        log.info("Draining %s connections (%s idle) for up to %ss",
+                 total, len(idle), self.drain_timeout)
+        for conn in idle:
+            try:
+                # recv đang chờ trả về b"", như khi client tự đóng
+                conn.shutdown(socket.SHUT_RD)
+            except OSError:
+                pass
+
+    def wait_closed(self, timeout=None):
+        """
+        Waits until every tracked connection is closed.
+
+        :param timeout (float): Seconds to wait; :attr:`drain_timeout` by default.
+        :rtype: bool - True if they all closed in time.
+        """
+        deadline = monotonic() + (self.drain_timeout if timeout is None else timeout)
+        with self._lock:
+            while self.connections:
+                left = deadline - monotonic()
+                if left <= 0:
+                    log.warning("%s connections still open after %ss, closing them",
+                                len(self.connections), self.drain_timeout)
+                    return False
+                self._closed.wait(left)
+        return True
+
+    def _restart(self, server):
+        if spawn_replacement(server.fileno()):
+            self.stopping = True
+            self._wake()
+
+    def _on_stop(self, signum, frame):
+        if self.stopping and signum == signal.SIGINT:
+            # Ctrl-C lần hai: không chờ nữa
+            raise KeyboardInterrupt
+        self.stopping = True
+        self._wake()
+
+    def _on_restart(self, signum, frame):
+        self.restart_requested = True
+        self._wake()
+
+    def _wake(self):
+        if self.wakeup is not None:
+            self.wakeup()
+
+
+#: The lifecycle of this process.
+LIFECYCLE = Lifecycle()
+
+
+def inherited_socket(ip, port):
+    """
+    Takes over the listening socket passed on by a restarting process, and
+    the pipe :meth:`Lifecycle.ready` reports on.
+
+    :param ip (str): IP address the server binds.
+    :param port (int): Port number the server listens on.
+    :rtype: socket.socket or None - None unless started by a restart on the same port.
+    """
+    ready = os.environ.pop(READY_FD_ENV, None)
+    if ready is not None:
+        LIFECYCLE.ready_fd = int(ready)
+    fd = os.environ.pop(LISTEN_FD_ENV, None)
+    if fd is None:
+        return None
+    server = socket.socket(fileno=int(fd))
+    if server.getsockname()[1] != port:
+        log.warning("Inherited socket listens on %s, not %s:%s; binding a new one",
+                    server.getsockname(), ip, port)
+        server.close()
+        return None
+    log.info("Inherited listening socket on port %s", port)
+    return server
+
+
+def spawn_replacement(fd, timeout=RESTART_TIMEOUT):
+    """
+    Starts a new copy of the running program and waits until it accepts.
+
+    :param fd (int): File descriptor of the listening socket to pass on, or
+        None to let the new process bind its own.
+    :param timeout (float): Seconds the new process gets to become ready.
+    :rtype: bool - True once the new process accepts. Otherwise it is
+        terminated and the caller goes on serving.
+    """
+    read_fd, write_fd = os.pipe()
+    env = dict(os.environ)
+    env[READY_FD_ENV] = str(write_fd)
+    pass_fds = [write_fd]
+    if fd is not None:
+        env[LISTEN_FD_ENV] = str(fd)
+        pass_fds.append(fd)
+    argv = getattr(sys, "orig_argv", [sys.executable] + sys.argv)[1:]
+    try:
+        proc = subprocess.Popen([sys.executable] + argv, env=env, pass_fds=pass_fds)
+    except OSError as e:
+        log.error("Cannot start a new process: %s", e)
+        os.close(read_fd)
+        return False
+    finally:
+        os.close(write_fd)
+
+    log.info("Restarting: new process %s, waiting up to %ss", proc.pid, timeout)
+    try:
+        # EOF (b"") nếu tiến trình mới chết trước khi sẵn sàng
+        readable, _, _ = select.select([read_fd], [], [], timeout)
+        ok = bool(readable) and os.read(read_fd, 1) == b"1"
+    finally:
+        os.close(read_fd)
+    if ok:
+        log.info("New process %s accepts connections, draining this one", proc.pid)
+        return True
+    log.error("New process %s did not become ready, going on serving", proc.pid)
+    if proc.poll() is None:
+        proc.terminate()
+    return False
@@ -0,0 +1,201 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.logger
+~~~~~~~~~~~~~~~~~
+
+This module provides the non-blocking, leveled logging of the daemon.
+
+Every module logs through ``get_logger(__name__)``. Records go into a bounded
+queue and are formatted and written by one background thread, so a handler
+thread never waits on the stdout lock. Messages below the configured level are
+dropped by ``logger.debug(...)`` before any formatting happens; per-request
+messages are all ``DEBUG``, so the default ``INFO`` level costs one level check
+per call on the hot path.
+
+- per-module levels: ``configure(levels={"daemon.proxy": "DEBUG"})``;
+- sampling: ``configure(sample={"daemon.httpadapter": 100})`` keeps one in
+  100 records below ``WARNING`` from that module;
+- when the queue is full records are dropped (and counted), never waited on.
+
+The same settings are read from the environment at first use::
+
+  WEAPROUS_LOG_LEVEL=DEBUG
+  WEAPROUS_LOG_LEVELS=daemon.request=DEBUG,daemon.proxy=INFO
+  WEAPROUS_LOG_SAMPLE=daemon.httpadapter=100
+
+Usage Example:
+--------------
+>>> log = get_logger(__name__)
+>>> log.debug("%s path %s", method, path)   # no formatting unless DEBUG
+"""
+
+import atexit
+import itertools
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+
+#: Root logger of the daemon modules.
+ROOT = "daemon"
+#: Level used when none is configured.
+DEFAULT_LEVEL = "INFO"
+#: Records buffered for the writer thread before new ones are dropped.
+QUEUE_SIZE = 10000
+#: Format applied by the writer thread.
+FORMAT = "%(asctime)s %(levelname)-7s [%(name)s] %(message)s"
+
+_lock = threading.Lock()
+_listener = None
+_handler = None
+_formatter = None
+_stream = None
+_configured = False
+#: Number of records dropped because the queue was full.
+dropped = 0
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the writer thread without formatting or blocking."""
+
+    def prepare(self, record):
+        # Định dạng được dời sang luồng ghi
+        return record
+
+    def enqueue(self, record):
+        global dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            dropped += 1
+
+
+class SampleFilter(logging.Filter):
+    """Keeps one in N records below ``WARNING`` for the configured loggers.
+
+    :param rates (dict): logger name -> N.
+    """
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = {name: max(int(n), 1) for name, n in rates.items()}
+        self._counters = {name: itertools.count() for name in self.rates}
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        name = record.name
+        while name:
+            n = self.rates.get(name)
+            if n is not None:
+                # next() trên itertools.count là nguyên tử với GIL
+                return next(self._counters[name]) % n == 0
+            name = name.rpartition(".")[0]
+        return True
+
+
+def _parse_pairs(value):
+    pairs = {}
+    for item in (value or "").split(","):
+        name, sep, setting = item.partition("=")
+        if sep and name.strip():
+            pairs[name.strip()] = setting.strip()
+    return pairs
+
+
+def _start_listener():
+    global _listener, _handler
+    _handler.queue = queue.Queue(QUEUE_SIZE)
+    writer = logging.StreamHandler(_stream or sys.stdout)
+    writer.setFormatter(_formatter)
+    _listener = logging.handlers.QueueListener(_handler.queue, writer)
+    _listener.start()
+
+
+def _after_fork():
+    # Luồng ghi không tồn tại trong tiến trình con sau fork()
+    global _lock
+    _lock = threading.Lock()
+    if _listener is not None:
+        _start_listener()
+
+
+def shutdown():
+    """Writes the records still queued and stops the writer thread."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def configure(level=None, levels=None, sample=None, stream=None, fmt=FORMAT):
+    """
+    Configures the ``daemon`` loggers; may be called again to change settings.
+
+    :param level (str): Level of the ``daemon`` root logger. Defaults to
+        ``WEAPROUS_LOG_LEVEL`` or :data:`DEFAULT_LEVEL`.
+    :param levels (dict): Per-module levels, e.g. ``{"daemon.proxy": "DEBUG"}``.
+    :param sample (dict): Per-module sampling, logger name -> keep one in N.
+    :param stream (file): Output stream, stdout by default.
+    :param fmt (str): Record format.
+    """
+    global _handler, _formatter, _stream, _configured
+    with _lock:
+        if level is None:
+            level = os.environ.get("WEAPROUS_LOG_LEVEL", DEFAULT_LEVEL)
+        if levels is None:
+            levels = _parse_pairs(os.environ.get("WEAPROUS_LOG_LEVELS"))
+        if sample is None:
+            sample = _parse_pairs(os.environ.get("WEAPROUS_LOG_SAMPLE"))
+
+        root = logging.getLogger(ROOT)
+        root.setLevel(level.upper())
+        root.propagate = False
+        for name, lvl in levels.items():
+            logging.getLogger(name).setLevel(lvl.upper())
+
+        _formatter = logging.Formatter(fmt)
+        _stream = stream
+        if _handler is None:
+            _handler = _QueueHandler(None)
+            root.addHandler(_handler)
+            atexit.register(shutdown)
+        for f in list(_handler.filters):
+            _handler.removeFilter(f)
+        if sample:
+            _handler.addFilter(SampleFilter(sample))
+
+        if _listener is not None:
+            _listener.stop()
+        _start_listener()
+        _configured = True
+
+
+def get_logger(name):
+    """
+    Returns the logger of a module, configuring the daemon logging on first use.
+
+    :param name (str): Module name, usually ``__name__``.
+    :rtype: logging.Logger
+    """
+    if not _configured:
+        configure()
+    return logging.getLogger(name)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
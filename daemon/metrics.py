@@ -0,0 +1,301 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.metrics
+~~~~~~~~~~~~~~~~~
+
+This module provides the request instrumentation of the backend and its
+Prometheus text exposition.
+
+When :data:`METRICS` is enabled, every request served by
+:class:`HttpAdapter <HttpAdapter>` or the asyncio engine records:
+
+- time per phase: ``first_byte`` (connection handed to the server until the
+  first request head is received), ``parse``, ``handler``, ``serialize``
+  (JSON encoding, compression and header) and ``send``;
+- a latency histogram per ``(method, route)``, where route is the registered
+  pattern (``/peers/<peer_id>``), ``<static>`` for static files or
+  ``<unmatched>``;
+- requests in flight, bytes in and out, and errors by status code.
+
+Other components export their state through collectors registered with
+:meth:`Metrics.add_collector`, read each time the metrics are rendered: the
+worker pool (queue depth, queue wait, workers), the static file cache and the
+compression cache (entries, hits, misses, bytes).
+
+Connections closed for breaking a limit (idle, header or body timeouts, write
+timeouts, oversized heads and bodies) are counted by limit name even while
+metrics are disabled: they are rare and worth knowing about.
+
+Metrics are disabled by default and cost one attribute check per request
+then. They are enabled with ``app.enable_metrics()``, which also registers
+the ``GET /metrics`` route. Each worker process of a pre-forked backend
+keeps its own metrics.
+
+Usage Example:
+--------------
+>>> app = WeApRous()
+>>> app.enable_metrics()            # GET /metrics
+>>> METRICS.render()
+'# HELP weaprous_requests_in_flight ...'
+"""
+
+import threading
+from bisect import bisect_left
+
+#: Upper bounds (seconds) of the latency histogram buckets.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+           0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+#: Phases timed for every request.
+PHASES = ("first_byte", "parse", "handler", "serialize", "send")
+#: Content type of the Prometheus text format.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram (not thread-safe on its own)."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        #: Per-bucket counts; the last slot is ``+Inf``.
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, labels, out):
+        cumulative = 0
+        for bound, n in zip(BUCKETS + ("+Inf",), self.counts):
+            cumulative += n
+            out.append('{}_bucket{{{}le="{}"}} {}'.format(name, labels, bound, cumulative))
+        labels = labels.rstrip(",")
+        out.append("{}_sum{{{}}} {:.6f}".format(name, labels, self.sum))
+        out.append("{}_count{{{}}} {}".format(name, labels, self.count))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def route_label(req):
+    """
+    Returns the ``route`` label of a request: its route pattern, never the
+    raw path, so the number of series stays bounded.
+
+    :rtype: str
+    """
+    route = getattr(req, "route", None)
+    if route:
+        return route
+    hook = getattr(req, "hook", None)
+    if hook is not None:
+        return getattr(hook, "__name__", "<handler>")
+    if getattr(req, "allowed_methods", None):
+        return "<unmatched>"
+    return "<static>"
+
+
+def status_of(response_data):
+    """
+    Reads the status code from serialized response bytes.
+
+    :rtype: int - 0 if it cannot be read.
+    """
+    code = response_data[9:12]
+    return int(code) if code.isdigit() else 0
+
+
+class Metrics:
+    """The :class:`Metrics <Metrics>` registry of one server process.
+
+    :param enabled (bool): Whether requests are instrumented.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        #: name -> (collect, counters), see :meth:`add_collector`.
+        self.collectors = {}
+        self.reset()
+
+    def reset(self):
+        """Drops every recorded value."""
+        with self._lock:
+            self.in_flight = 0
+            self.bytes_in = 0
+            self.bytes_out = 0
+            #: status -> count, for statuses >= 400
+            self.errors = {}
+            #: status -> count
+            self.responses = {}
+            #: phase -> Histogram
+            self.phases = {phase: Histogram() for phase in PHASES}
+            #: (method, route) -> Histogram
+            self.latency = {}
+            #: limit name -> count, recorded even when disabled
+            self.limits = {}
+
+    def add_collector(self, name, collect, counters=()):
+        """
+        Exports the state of another component: ``collect()`` is called on
+        each :meth:`render` and every value it returns is rendered as
+        ``weaprous_<name>_<key>``. Registering a name again replaces it.
+
+        :param name (str): Prefix of the metric names, e.g. ``pool``.
+        :param collect (callable): Returns the current values (dict of numbers).
+        :param counters (tuple): Keys of values that only grow, rendered as
+            counters (``_total``); the others are gauges.
+        """
+        with self._lock:
+            self.collectors[name] = (collect, frozenset(counters))
+
+    def limit_exceeded(self, limit):
+        """
+        Counts a request or connection cut short by a limit.
+
+        :param limit (str): Name of the limit, e.g. ``header_timeout``.
+        """
+        with self._lock:
+            self.limits[limit] = self.limits.get(limit, 0) + 1
+
+    def observe_first_byte(self, seconds):
+        """
+        Records the ``first_byte`` phase of a connection.
+
+        :param seconds (float): Seconds until its first request head was received.
+        """
+        with self._lock:
+            self.phases["first_byte"].observe(seconds)
+
+    def request_started(self):
+        """Counts a request entering the server (see :meth:`request_finished`)."""
+        with self._lock:
+            self.in_flight += 1
+
+    def request_finished(self, req, resp, status, bytes_in, bytes_out,
+                         started, parsed, handled, sent):
+        """
+        Records one answered request.
+
+        :param req (Request): The request, or None if it could not be parsed.
+        :param resp (Response): The response (for its ``serialize_time``), or None.
+        :param status (int): Status code sent.
+        :param bytes_in (int): Request bytes received (head and body).
+        :param bytes_out (int): Response bytes sent.
+        :param started, parsed, handled, sent (float): ``perf_counter()`` taken
+            when the head was received, parsed, answered and sent.
+        """
+        serialize = getattr(resp, "serialize_time", 0.0)
+        handler = max(handled - parsed - serialize, 0.0)
+        key = (getattr(req, "method", None) or "-", route_label(req))
+
+        with self._lock:
+            self.in_flight -= 1
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            self.responses[status] = self.responses.get(status, 0) + 1
+            if status >= 400:
+                self.errors[status] = self.errors.get(status, 0) + 1
+            phases = self.phases
+            phases["parse"].observe(parsed - started)
+            phases["handler"].observe(handler)
+            phases["serialize"].observe(serialize)
+            phases["send"].observe(sent - handled)
+            hist = self.latency.get(key)
+            if hist is None:
+                hist = self.latency[key] = Histogram()
+            hist.observe(sent - started)
+
+    def render(self):
+        """
+        Renders every metric in the Prometheus text exposition format.
+
+        :rtype: str
+        """
+        out = []
+        with self._lock:
+            collectors = sorted(self.collectors.items())
+        # Collector lấy lock của chính nó, gọi ngoài lock của registry
+        collected = [(name, collect(), counters) for name, (collect, counters) in collectors]
+
+        with self._lock:
+            out.append("# HELP weaprous_requests_in_flight Requests being served.")
+            out.append("# TYPE weaprous_requests_in_flight gauge")
+            out.append("weaprous_requests_in_flight {}".format(self.in_flight))
+
+            for name, value, help_text in (
+                    ("weaprous_received_bytes_total", self.bytes_in, "Request bytes received."),
+                    ("weaprous_sent_bytes_total", self.bytes_out, "Response bytes sent.")):
+                out.append("# HELP {} {}".format(name, help_text))
+                out.append("# TYPE {} counter".format(name))
+                out.append("{} {}".format(name, value))
+
+            for name, counts, help_text in (
+                    ("weaprous_responses_total", self.responses, "Responses by status code."),
+                    ("weaprous_errors_total", self.errors, "Error responses (>= 400) by status code.")):
+                out.append("# HELP {} {}".format(name, help_text))
+                out.append("# TYPE {} counter".format(name))
+                for status in sorted(counts):
+                    out.append('{}{{status="{}"}} {}'.format(name, status, counts[status]))
+
+            name = "weaprous_limit_exceeded_total"
+            out.append("# HELP {} Requests or connections cut short by a limit.".format(name))
+            out.append("# TYPE {} counter".format(name))
+            for limit in sorted(self.limits):
+                out.append('{}{{limit="{}"}} {}'.format(name, _escape(limit), self.limits[limit]))
+
+            name = "weaprous_phase_duration_seconds"
+            out.append("# HELP {} Time spent in each phase of a request.".format(name))
+            out.append("# TYPE {} histogram".format(name))
+            for phase in PHASES:
+                self.phases[phase].render(name, 'phase="{}",'.format(phase), out)
+
+            name = "weaprous_request_duration_seconds"
+            out.append("# HELP {} Request latency by method and route.".format(name))
+            out.append("# TYPE {} histogram".format(name))
+            for (method, route) in sorted(self.latency):
+                labels = 'method="{}",route="{}",'.format(_escape(method), _escape(route))
+                self.latency[(method, route)].render(name, labels, out)
+
+        for prefix, values, counters in collected:
+            for key in sorted(values):
+                name = "weaprous_{}_{}".format(prefix, key)
+                if key in counters:
+                    name += "_total"
+                    out.append("# TYPE {} counter".format(name))
+                else:
+                    out.append("# TYPE {} gauge".format(name))
+                out.append("{} {}".format(name, values[key]))
+        out.append("")
+        return "\n".join(out)
+
+
+#: Metrics of this process, used by the adapters.
+METRICS = Metrics()
+
+
+def metrics_handler(request, response):
+    """
+    WeApRous handler of ``GET /metrics`` (see ``WeApRous.enable_metrics``).
+    """
+    body = METRICS.render().encode("utf-8")
+    response.status_code = 200
+    response.reason = "OK"
+    response.headers["Content-Type"] = CONTENT_TYPE
+    response._content = body
+    return response.build_response_header(request) + body
@@ -0,0 +1,99 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.objectpool
+~~~~~~~~~~~~~~~~~
+
+This module provides the free lists the adapters take their
+:class:`Request <Request>` and :class:`Response <Response>` objects from.
+
+A pool belongs to one worker process (a pre-forked child gets its own copy)
+and is shared by the threads of that process: ``list.pop()`` and
+``list.append()`` are atomic under the GIL, so no lock is taken. An object is
+``reset()`` when it is released, which drops its references to the request
+data at once, and handed out again by the next :meth:`ObjectPool.acquire`.
+
+Ownership is explicit: the server only releases objects no handler has
+seen. A request dispatched to a WeApRous handler may be kept by it (in a
+closure, a thread, a global), so its pair is given to the handler for good:
+:meth:`ObjectPool.discard` leaves it out of the pool, and its holder keeps
+seeing its own request and never another client's.
+
+Usage Example:
+--------------
+>>> pool = ObjectPool(Request, size=256)
+>>> req = pool.acquire()
+>>> ...
+>>> pool.release(req)           # req.reset(), kept for the next request
+"""
+
+#: Idle objects kept by a pool.
+POOL_SIZE = 256
+
+
+class ObjectPool:
+    """A bounded :class:`ObjectPool <ObjectPool>` of reusable objects.
+
+    :param factory (callable): Creates a new object; objects must provide ``reset()``.
+    :param size (int): Most idle objects kept; 0 disables pooling.
+    """
+
+    def __init__(self, factory, size=POOL_SIZE):
+        self.factory = factory
+        self.size = size
+        self._free = []
+        #: Objects created because the pool was empty.
+        self.created = 0
+        #: Objects handed out again.
+        self.reused = 0
+        #: Objects given away by :meth:`discard` instead of being pooled.
+        self.discarded = 0
+
+    def acquire(self):
+        """
+        Takes an idle object, or creates one.
+
+        :rtype: object
+        """
+        try:
+            obj = self._free.pop()
+        except IndexError:
+            self.created += 1
+            return self.factory()
+        self.reused += 1
+        return obj
+
+    def release(self, obj):
+        """
+        Resets an object that is no longer used and keeps it if there is room.
+
+        The caller must own ``obj``: nothing else may reference it afterwards.
+
+        :param obj (object): Object taken from :meth:`acquire`.
+        """
+        obj.reset()
+        if len(self._free) < self.size:
+            self._free.append(obj)
+
+    def discard(self, obj):
+        """
+        Gives up an object that may still be in use elsewhere: it is neither
+        reset nor pooled, and is freed once its last holder drops it.
+
+        :param obj (object): Object taken from :meth:`acquire`.
+        """
+        self.discarded += 1
+
+    def clear(self):
+        """Drops every idle object."""
+        self._free = []
@@ -0,0 +1,217 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.prefork
+~~~~~~~~~~~~~~~~~
+
+This module provides the process supervisor of the multi-process backend
+(``create_backend(..., workers=N)``). The supervisor forks N worker processes
+running the same target, restarts any worker that exits while the server is
+running, and forwards signals to the workers:
+
+- ``SIGINT`` / ``SIGTERM``: stop restarting and send ``SIGTERM`` to every
+  worker, which drains its connections and exits. Workers still running
+  ``drain_timeout`` seconds later are killed; a second ``SIGINT`` kills them
+  at once.
+- ``SIGUSR2``: restart the whole server. A new copy of the program inherits
+  the shared listening socket (see :mod:`daemon.lifecycle`); once one of its
+  workers accepts, this supervisor stops as above.
+- ``SIGHUP``, ``SIGUSR1``: passed on unchanged (a worker drains and exits on
+  ``SIGHUP`` and is restarted, which gives a rolling reload).
+
+Workers ignore ``SIGINT`` so that Ctrl-C in a terminal goes through the
+supervisor instead of racing it.
+
+Usage Example:
+--------------
+>>> Supervisor(partial(run_worker, server, ip, port, routes, options), 4).run()
+"""
+
+import os
+import signal
+import sys
+import time
+
+from . import logger
+from .lifecycle import LIFECYCLE, DRAIN_TIMEOUT, RESTART_SIGNAL, spawn_replacement
+
+log = logger.get_logger(__name__)
+
+#: Signals passed on to the workers unchanged.
+FORWARDED_SIGNALS = ("SIGHUP", "SIGUSR1")
+#: Minimum seconds between two restarts of the same worker slot.
+RESTART_DELAY = 1.0
+#: Seconds between two checks for exited workers.
+REAP_INTERVAL = 0.2
+#: Seconds granted to draining workers beyond ``drain_timeout`` before SIGKILL.
+KILL_GRACE = 1.0
+
+
+class Supervisor:
+    """The :class:`Supervisor <Supervisor>` of pre-forked worker processes.
+
+    :param target (callable): ``target(worker_id=i)`` run in each child.
+    :param workers (int): Number of worker processes.
+    :param restart_delay (float): Minimum seconds between two restarts of one slot.
+    :param drain_timeout (float): Seconds stopped workers get to drain.
+    :param listener (socket.socket): Listening socket shared by the workers,
+        passed on by a restart; None when every worker binds its own.
+    """
+
+    def __init__(self, target, workers, restart_delay=RESTART_DELAY,
+                 drain_timeout=DRAIN_TIMEOUT, listener=None):
+        self.target = target
+        self.workers = workers
+        self.restart_delay = restart_delay
+        self.drain_timeout = drain_timeout
+        self.listener = listener
+        #: pid -> worker slot
+        self.children = {}
+        #: slot -> monotonic time of its last start
+        self.started_at = {}
+        self.stopping = False
+        self.restart_requested = False
+        #: monotonic time after which the draining workers are killed
+        self.kill_at = None
+
+    def run(self):
+        """Forks the workers and supervises them until shutdown."""
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGTERM, self._on_stop)
+        for name in FORWARDED_SIGNALS:
+            if hasattr(signal, name):
+                signal.signal(getattr(signal, name), self._on_forward)
+        if hasattr(signal, RESTART_SIGNAL):
+            signal.signal(getattr(signal, RESTART_SIGNAL), self._on_restart)
+
+        for slot in range(self.workers):
+            self.spawn(slot)
+        # Worker đầu tiên nhận kết nối sẽ báo cho tiến trình cũ
+        LIFECYCLE.ready(notify=False)
+
+        while self.children:
+            if self.restart_requested and not self.stopping:
+                self.restart_requested = False
+                self.restart()
+            try:
+                pid, status = self.reap()
+            except ChildProcessError:
+                break
+            if pid == 0:
+                continue
+
+            slot = self.children.pop(pid, None)
+            if slot is None or self.stopping:
+                continue
+
+            log.warning("Worker %s (pid %s) exited with code %s, restarting",
+                        slot, pid, os.waitstatus_to_exitcode(status))
+            # Tránh vòng lặp crash-restart quá nhanh
+            wait = self.started_at[slot] + self.restart_delay - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            if not self.stopping:
+                self.spawn(slot)
+
+        log.info("All workers stopped")
+
+    def spawn(self, slot):
+        """
+        Forks one worker process for a slot.
+
+        :param slot (int): Index of the worker slot.
+        """
+        # Không để buffer stdout của supervisor bị in lại trong tiến trình con
+        sys.stdout.flush()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                signal.signal(signal.SIGINT, signal.SIG_IGN)
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                for name in FORWARDED_SIGNALS + (RESTART_SIGNAL,):
+                    if hasattr(signal, name):
+                        signal.signal(getattr(signal, name), signal.SIG_DFL)
+                self.target(worker_id=slot)
+            except BaseException as e:
+                log.error("Worker %s crashed: %s", slot, e)
+                code = 1
+            finally:
+                # os._exit bỏ qua atexit: ghi nốt log còn trong hàng đợi
+                logger.shutdown()
+                os._exit(code)
+
+        self.children[pid] = slot
+        self.started_at[slot] = time.monotonic()
+
+    def reap(self):
+        """
+        Collects an exited worker, waiting at most :data:`REAP_INTERVAL`
+        seconds, and kills the workers that outlive the drain deadline.
+
+        :rtype: tuple - (pid, status) of the exited child, (0, 0) if none.
+        """
+        pid, status = os.waitpid(-1, os.WNOHANG)
+        if pid == 0:
+            if self.kill_at is not None and time.monotonic() >= self.kill_at:
+                log.warning("%s workers still running after %ss, killing them",
+                            len(self.children), self.drain_timeout)
+                self.kill_at = None
+                self.signal_workers(signal.SIGKILL)
+            time.sleep(REAP_INTERVAL)
+        return pid, status
+
+    def stop(self):
+        """Stops restarting workers and asks each one to drain and exit."""
+        if not self.stopping:
+            log.info("Stopping %s workers (drain %ss)", len(self.children), self.drain_timeout)
+            self.stopping = True
+            self.kill_at = time.monotonic() + self.drain_timeout + KILL_GRACE
+        self.signal_workers(signal.SIGTERM)
+
+    def restart(self):
+        """
+        Starts a new copy of the server on the shared listening socket and
+        stops this one once the new one accepts.
+        """
+        if self.listener is None:
+            log.warning("Restart without a shared socket: connections queued on the "
+                        "SO_REUSEPORT sockets of the old workers may be reset")
+        fd = self.listener.fileno() if self.listener is not None else None
+        if spawn_replacement(fd):
+            self.stop()
+
+    def signal_workers(self, signum):
+        """
+        Sends a signal to every live worker.
+
+        :param signum (int): The signal number.
+        """
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def _on_stop(self, signum, frame):
+        if self.stopping and signum == signal.SIGINT:
+            # Ctrl-C lần hai: không chờ worker drain
+            self.signal_workers(signal.SIGKILL)
+            return
+        self.stop()
+
+    def _on_restart(self, signum, frame):
+        self.restart_requested = True
+
+    def _on_forward(self, signum, frame):
+        self.signal_workers(signum)
@@ -25,13 +25,53 @@ Requirement:
 - response: customized :class: `Response <Response>` utilities.
 - httpadapter: :class: `HttpAdapter <HttpAdapter >` adapter for HTTP request processing.
 - dictionary: :class: `CaseInsensitiveDict <CaseInsensitiveDict>` for managing headers and cookies.
+- framing: :class: `ConnReader <ConnReader>` and :class: `Deadlines <Deadlines>` for reading
+  client requests under the same size and time limits as the backend.
+- upstream: :class: `UpstreamPool <UpstreamPool>` of keep-alive connections to each backend,
+  and the bounded buffers requests and responses are relayed through.
+- balancer: the ``dist_policy`` choosing among the ``proxy_pass`` upstreams of a host.
+- health: circuit breaker of each upstream, fed by forwarded requests and active probes.
+- proxycache: :class: `ProxyCache <ProxyCache>` of the hosts declaring ``proxy_cache``.
 
 """
+import json
+import re
 import socket
 import threading
+import time
+from functools import partial
 from .response import *
-from .httpadapter import HttpAdapter
+from .httpadapter import HttpAdapter, error_response
 from .dictionary import CaseInsensitiveDict
+from .framing import (ConnReader, Deadlines, FramingError, CONTINUE, IDLE_TIMEOUT,
+                      HEADER_TIMEOUT, BODY_TIMEOUT, BODY_MIN_RATE, WRITE_TIMEOUT)
+from .logger import get_logger
+from .metrics import METRICS
+from .upstream import (upstream_pool, upstream_request, client_response, ConnectFailed,
+                       DownstreamError, BUFFERS, RELAY_BUFFER)
+from .balancer import balancer_for, parse_upstream
+from .health import HealthChecker, upstream_health
+from .proxycache import cache_for, conditional_head, BYPASS, USE
+
+log = get_logger(__name__)
+
+#: Seconds allowed to connect to a backend server. A backend on the network
+#: answers a connect in milliseconds; one whose SYNs are dropped would hold
+#: the request this long before it is ejected and another one is tried.
+UPSTREAM_CONNECT_TIMEOUT = 1.0
+#: Seconds a backend server may stay silent while the request is sent or the
+#: response received.
+UPSTREAM_TIMEOUT = 30
+#: Reply when a backend server does not answer in time.
+GATEWAY_TIMEOUT = error_response(504, "Gateway Timeout")
+#: Reply when a backend server sends a response that cannot be framed.
+BAD_GATEWAY = error_response(502, "Bad Gateway")
+#: Reply when no upstream of the host can be reached.
+SERVICE_UNAVAILABLE = error_response(503, "Service Unavailable")
+#: Upstreams tried for one request whose connects fail.
+FAILOVER_ATTEMPTS = 3
+#: The Host header of a raw request head.
+_HOST = re.compile(rb"\r\nhost:[ \t]*([^\r]*?)[ \t]*\r\n", re.IGNORECASE)
 
 #: A dictionary mapping hostnames to backend IP and port tuples.
 #: Used to determine routing targets for incoming requests.
@@ -48,76 +88,195 @@ def forward_request(host, port, request):
 
     :params host (str): IP address of the backend server.
     :params port (int): port number of the backend server.
-    :params request (str): incoming HTTP request.
+    :params request (bytes or str): incoming HTTP request.
+
+    The request is sent on a pooled keep-alive connection to the backend
+    (see :mod:`daemon.upstream`) and the response is read up to the end of
+    its body, so the connection can serve the next request. The proxy's
+    own clients are served by :func:`relay_upstream` instead, which does
+    not hold the response in memory.
+
+    The outcome is reported to the backend's circuit breaker (see
+    :mod:`daemon.health`).
+
+    :rtype bytes: Raw HTTP response from the backend server, with
+                  ``Connection: close`` for the client. If the backend
+                  does not answer within :data:`UPSTREAM_TIMEOUT`, returns a
+                  504 Gateway Timeout; if its response cannot be framed or
+                  the connection breaks, a 502 Bad Gateway; if it cannot be
+                  reached, a 503 Service Unavailable.
+    """
+    if not isinstance(request, bytes):
+        request = request.encode()
+    health = upstream_health(host, port)
+    try:
+        response = upstream_pool(host, port).forward(
+            upstream_request(request), connect_timeout=UPSTREAM_CONNECT_TIMEOUT,
+            timeout=UPSTREAM_TIMEOUT)
+    except ConnectFailed as e:
+        log.error("Cannot reach backend: %s", e)
+        health.failure(connect=True)
+        return SERVICE_UNAVAILABLE
+    except socket.timeout as e:
+        log.error("Backend %s:%s timed out: %s", host, port, e)
+        health.failure()
+        return GATEWAY_TIMEOUT
+    except FramingError as e:
+        log.error("Invalid response from backend %s:%s: %s", host, port, e)
+        health.failure()
+        return BAD_GATEWAY
+    except socket.error as e:
+        log.error("Socket error: %s", e)
+        health.failure()
+        return BAD_GATEWAY
 
-    :rtype bytes: Raw HTTP response from the backend server. If the connection
-                  fails, returns a 404 Not Found response.
+    # 5xx liên tiếp cũng tính là lỗi (outlier detection)
+    if response[9:10] == b"5":
+        health.failure()
+    else:
+        health.success()
+    # Proxy đóng kết nối client sau mỗi response
+    return client_response(response)
+
+
+def relay_upstream(host, port, head, body, conn, buffer, fill=None):
     """
+    Relays a request to a backend server and streams the response back to
+    the client as it arrives, so the time to first byte is the backend's
+    and memory stays bounded by the relay ``buffer`` whatever the size of
+    the request or response.
 
-    backend = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    The outcome is reported to the backend's circuit breaker, as in
+    :func:`forward_request`.
+
+    :params host (str): IP address of the backend server.
+    :params port (int): port number of the backend server.
+    :params head (bytes): request line and headers.
+    :params body (bytes or iterable): the complete request body, or its
+                                      pieces read from the client while
+                                      they are sent.
+    :params conn (socket.socket): client connection socket.
+    :params buffer (RelayBuffer): relay buffer of the request.
+    :params fill (Fill): records the response for the cache and decides
+                         what of it reaches the client (see :mod:`daemon.proxycache`).
+
+    :rtype bytes: Error response still to send to the client, or None once
+                  the response was relayed (or the connection is beyond
+                  saving because part of it was already sent).
+    :raise: ConnectFailed when the backend cannot be reached, so the caller
+            can try another upstream: nothing of the request was read or sent.
+    """
+    health = upstream_health(host, port)
+    started = False
+
+    def send(data):
+        nonlocal started
+        if fill is not None:
+            data = fill.feed(data)
+            if data is None:
+                return
+        if not started:
+            started = True
+            # Gửi từng phần ngay, không chờ Nagle gộp gói
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            conn.settimeout(WRITE_TIMEOUT)
+            # Proxy đóng kết nối client sau mỗi response
+            data = client_response(data)
+        conn.sendall(data)
 
     try:
-        backend.connect((host, port))
-        backend.sendall(request.encode())
-        response = b""
-        while True:
-            chunk = backend.recv(4096)
-            if not chunk:
-                break
-            response += chunk
-        return response
+        response = upstream_pool(host, port).relay(
+            upstream_request(head), body, send, buffer,
+            connect_timeout=UPSTREAM_CONNECT_TIMEOUT, timeout=UPSTREAM_TIMEOUT)
+    except ConnectFailed as e:
+        log.error("Cannot reach backend: %s", e)
+        health.failure(connect=True)
+        raise
+    except DownstreamError as e:
+        cause = e.__cause__
+        if isinstance(cause, FramingError) and not started:
+            log.info("Request không hợp lệ từ client: %s", cause)
+            return error_response(cause.status_code, cause.reason)
+        if isinstance(cause, socket.timeout):
+            METRICS.limit_exceeded("write_timeout")
+        log.debug("Client connection failed during relay: %s", e)
+        return None
+    except socket.timeout as e:
+        log.error("Backend %s:%s timed out: %s", host, port, e)
+        health.failure()
+        return None if started else GATEWAY_TIMEOUT
+    except FramingError as e:
+        log.error("Invalid response from backend %s:%s: %s", host, port, e)
+        health.failure()
+        return None if started else BAD_GATEWAY
     except socket.error as e:
-      print("Socket error: {}".format(e))
-      return (
-            "HTTP/1.1 404 Not Found\r\n"
-            "Content-Type: text/plain\r\n"
-            "Content-Length: 13\r\n"
-            "Connection: close\r\n"
-            "\r\n"
-            "404 Not Found"
-        ).encode('utf-8')
+        log.error("Socket error: %s", e)
+        health.failure()
+        return None if started else BAD_GATEWAY
 
+    # 5xx liên tiếp cũng tính là lỗi (outlier detection)
+    if response[9:10] == b"5":
+        health.failure()
+    else:
+        health.success()
+    if fill is not None:
+        fill.complete()
+    return None
 
-def resolve_routing_policy(hostname, routes):
+
+def resolve_routing_policy(hostname, routes, client_ip=None, head=b""):
     """
     Handles an routing policy to return the matching proxy_pass.
     It determines the target backend to forward the request to.
 
-    :params host (str): IP address of the request target server.
-    :params port (int): port number of the request target server.
+    A host with several ``proxy_pass`` upstreams is balanced by its
+    ``dist_policy`` (see :mod:`daemon.balancer`).
+
+    :params hostname (str): The Host header of the request.
     :params routes (dict): dictionary mapping hostnames and location.
+    :params client_ip (str): IP address of the client, for ``ip-hash``.
+    :params head (bytes): request line and headers, for ``cookie-hash``.
+
+    :rtype tuple: (host, port); (None, None) if every upstream of the host is
+                  ejected by its circuit breaker.
     """
 
-    print(hostname)
-    proxy_map, policy = routes.get(hostname,('127.0.0.1:9000','round-robin'))
-    print(proxy_map)
-    print(policy)
+    proxy_map, policy = routes.get(hostname,('127.0.0.1:9000','round-robin'))[:2]
+    log.debug("hostname %s proxy_map %s policy %s", hostname, proxy_map, policy)
 
     proxy_host = ''
     proxy_port = '9000'
     if isinstance(proxy_map, list):
         if len(proxy_map) == 0:
-            print("[Proxy] Emtpy resolved routing of hostname {}".format(hostname))
-            print("Empty proxy_map result")
-            # TODO: implement the error handling for non mapped host
-            #       the policy is design by team, but it can be 
-            #       basic default host in your self-defined system
-            # Use a dummy host to raise an invalid connection
+            log.warning("Emtpy resolved routing of hostname %s", hostname)
+            # Host không có proxy_pass: về backend mặc định, như host chưa khai báo
             proxy_host = '127.0.0.1'
             proxy_port = '9000'
         elif len(proxy_map) == 1:
-            proxy_host, proxy_port = proxy_map[0].split(":", 2)
-        #elif: # apply the policy handling 
-        #   proxy_map
-        #   policy
+            (proxy_host, proxy_port), _ = parse_upstream(proxy_map[0])
         else:
-            # Out-of-handle mapped host
-            proxy_host = '127.0.0.1'
-            proxy_port = '9000'
+            try:
+                picked = balancer_for(hostname, proxy_map, policy).pick(client_ip, head)
+            except ValueError as e:
+                log.error("Invalid upstreams of hostname %s: %s", hostname, e)
+                # Use a dummy host to raise an invalid connection
+                return '127.0.0.1', '9000'
+            if picked is None:
+                log.debug("Every upstream of hostname %s is ejected", hostname)
+                return None, None
+            # Balancer đã bỏ qua các upstream bị loại
+            return picked
     else:
-        print("[Proxy] resolve route of hostname {} is a singulair to".format(hostname))
+        log.debug("resolve route of hostname %s is a singulair to", hostname)
         proxy_host, proxy_port = proxy_map.split(":", 2)
 
+    try:
+        health = upstream_health(proxy_host, int(proxy_port))
+    except ValueError:
+        return proxy_host, proxy_port
+    if not health.available():
+        log.debug("The upstream of hostname %s is ejected", hostname)
+        return None, None
     return proxy_host, proxy_port
 
 def handle_client(ip, port, conn, addr, routes):
@@ -132,6 +291,15 @@ def handle_client(ip, port, conn, addr, routes):
     The handler sends the backend response back to the client or
     returns 404 if the hostname is unreachable or is not recognized.
 
+    The request is read under the backend's limits: a client that sends
+    nothing within ``IDLE_TIMEOUT`` is dropped, one that trickles its head or
+    body past ``HEADER_TIMEOUT`` / ``BODY_TIMEOUT`` gets a 408, and the
+    response must be taken within ``WRITE_TIMEOUT``.
+
+    A body of up to ``RELAY_BUFFER`` bytes is read before the backend is
+    picked; a larger or chunked one is passed on while it is read, after
+    the backend connection is open.
+
     :params ip (str): IP address of the proxy server.
     :params port (int): port number of the proxy server.
     :params conn (socket.socket): client connection socket.
@@ -139,37 +307,210 @@ def handle_client(ip, port, conn, addr, routes):
     :params routes (dict): dictionary mapping hostnames and location.
     """
 
-    request = conn.recv(1024).decode()
+    deadlines = Deadlines(IDLE_TIMEOUT, HEADER_TIMEOUT, BODY_TIMEOUT, BODY_MIN_RATE)
+    reader = ConnReader(partial(deadlines.recv, conn))
+    buffer = None
+    try:
+        try:
+            head = reader.read_head()
+            if head is None:
+                return
+            deadlines.expect_body()
+            body = reader.body(head, partial(conn.sendall, CONTINUE))
+            buffer = BUFFERS.acquire()
+            if body.decoder.chunked or body.decoder.remaining > RELAY_BUFFER:
+                # Body lớn: đọc dần trong lúc gửi cho backend, giữ nguyên framing
+                payload = body.relay(buffer.view, partial(deadlines.recv_into, conn))
+            else:
+                payload = body.read()
+        except socket.timeout:
+            log.debug("Client %s không gửi request, đóng kết nối", addr)
+            return
+        except FramingError as e:
+            log.info("Request không hợp lệ từ %s: %s", addr, e)
+            response = error_response(e.status_code, e.reason)
+        else:
+            response = route_request(addr, head, payload, conn, routes, buffer)
+        if response is not None:
+            conn.settimeout(WRITE_TIMEOUT)
+            conn.sendall(response)
+    except socket.timeout:
+        METRICS.limit_exceeded("write_timeout")
+        log.info("Client %s không nhận response trong %ss, đóng kết nối", addr, WRITE_TIMEOUT)
+    except OSError as e:
+        log.debug("Connection %s error: %s", addr, e)
+    finally:
+        if buffer is not None:
+            BUFFERS.release(buffer)
+        conn.close()
+
+def route_request(addr, head, body, conn, routes, buffer):
+    """
+    Relays a request to the backend its Host header maps to, or answers it
+    from the host's cache (see :func:`cached_request`).
+
+    :params addr (tuple): client address (IP, port).
+    :params head (bytes): request line and headers of the request.
+    :params body (bytes or iterable): the request body (see :func:`relay_upstream`).
+    :params conn (socket.socket): client connection socket.
+    :params routes (dict): dictionary mapping hostnames and location.
+    :params buffer (RelayBuffer): relay buffer of the request.
+
+    :rtype bytes: Response still to send back to the client, or None if the
+                  backend's response was relayed.
+    """
 
     # Extract hostname
-    for line in request.splitlines():
-        if line.lower().startswith('host:'):
-            hostname = line.split(':', 1)[1].strip()
+    match = _HOST.search(head)
+    hostname = match.group(1).decode("latin-1") if match else ''
 
-    print("[Proxy] {} at Host: {}".format(addr, hostname))
+    log.debug("%s at Host: %s", addr, hostname)
 
-    # Resolve the matching destination in routes and need conver port
-    # to integer value
-    resolved_host, resolved_port = resolve_routing_policy(hostname, routes)
-    try:
-        resolved_port = int(resolved_port)
-    except ValueError:
-        print("Not a valid integer")
+    cache = cache_for(hostname, routes.get(hostname))
+    if cache is not None:
+        return cached_request(addr, hostname, head, body, conn, routes, buffer, cache)
+    return relay_route(addr, hostname, head, body, conn, routes, buffer)
+
+def relay_route(addr, hostname, head, body, conn, routes, buffer, fill=None):
+    """
+    Relays a request to one of the upstreams of its host, trying another
+    one when the connect fails.
 
-    if resolved_host:
-        print("[Proxy] Host name {} is forwarded to {}:{}".format(hostname,resolved_host, resolved_port))
-        response = forward_request(resolved_host, resolved_port, request)        
+    :params hostname (str): the Host header of the request.
+    :params fill (Fill): cache fill recording the response, if any.
+
+    See :func:`route_request` for the other parameters and the return value.
+    """
+    for _ in range(FAILOVER_ATTEMPTS):
+        # Resolve the matching destination in routes and need conver port
+        # to integer value
+        resolved_host, resolved_port = resolve_routing_policy(hostname, routes, addr[0], head)
+        if resolved_host is None:
+            # Mọi upstream đều đang bị loại: trả lời ngay, không chờ connect
+            return SERVICE_UNAVAILABLE
+        try:
+            resolved_port = int(resolved_port)
+        except ValueError:
+            log.warning("Not a valid integer: %s", resolved_port)
+
+        if not resolved_host:
+            break
+        log.debug("Host name %s is forwarded to %s:%s", hostname, resolved_host, resolved_port)
+        try:
+            return relay_upstream(resolved_host, resolved_port, head, body, conn, buffer, fill)
+        except ConnectFailed:
+            # Upstream vừa bị loại; lần chọn sau sẽ bỏ qua nó
+            continue
     else:
-        response = (
-            "HTTP/1.1 404 Not Found\r\n"
-            "Content-Type: text/plain\r\n"
-            "Content-Length: 13\r\n"
-            "Connection: close\r\n"
-            "\r\n"
-            "404 Not Found"
-        ).encode('utf-8')
-    conn.sendall(response)
-    conn.close()
+        return SERVICE_UNAVAILABLE
+    return (
+        "HTTP/1.1 404 Not Found\r\n"
+        "Content-Type: text/plain\r\n"
+        "Content-Length: 13\r\n"
+        "Connection: close\r\n"
+        "\r\n"
+        "404 Not Found"
+    ).encode('utf-8')
+
+def cached_request(addr, hostname, head, body, conn, routes, buffer, cache):
+    """
+    Answers a request of a host with a ``proxy_cache``: from a fresh entry,
+    from a stale one while it is refreshed in the background, after the
+    upstream revalidated it, or by relaying the upstream's response and
+    storing it. Concurrent misses of one key wait for a single fetch.
+
+    :params cache (ProxyCache): the cache of the host.
+
+    See :func:`route_request` for the other parameters and the return value.
+    """
+    method, _, rest = head.partition(b" ")
+    method = method.decode("latin-1")
+    target = rest.split(b" ", 1)[0].decode("latin-1")
+    if cache.status_path and target == cache.status_path:
+        return cache_status(cache)
+
+    has_body = not isinstance(body, bytes) or bool(body)
+    mode = cache.classify(method, head, has_body)
+    if mode == BYPASS:
+        cache.count_miss(bypassed=True)
+        return relay_route(addr, hostname, head, body, conn, routes, buffer)
+
+    key = (hostname, target)
+    head_only = method == "HEAD"
+    now = time.time()
+    entry = cache.lookup(key, head)
+    if entry is not None and mode == USE:
+        if entry.fresh(now):
+            return client_response(cache.serve(entry, "HIT", now, head_only, head))
+        if entry.usable_stale(now):
+            refresh_cache(addr, hostname, head, routes, cache, key, entry)
+            return client_response(cache.serve(entry, "STALE", now, head_only, head))
+    if head_only:
+        # Chỉ response của GET mới được lưu
+        cache.count_miss()
+        return relay_route(addr, hostname, head, body, conn, routes, buffer)
+
+    fill, leader = cache.begin(key, head, entry)
+    if not leader:
+        result = fill.wait()
+        # Bản vừa lấy về có thể thuộc biến thể Vary khác
+        if result is not None and cache.lookup(key, head) is result:
+            return client_response(cache.serve(result, "COALESCED", time.time(),
+                                               request_head=head))
+        cache.count_miss()
+        return relay_route(addr, hostname, head, body, conn, routes, buffer)
+
+    try:
+        response = relay_route(addr, hostname, conditional_head(head, entry), body, conn,
+                               routes, buffer, fill)
+    finally:
+        fill.finish()
+    if fill.not_modified and fill.result is not None:
+        return client_response(cache.serve(fill.result, "REVALIDATED", time.time(),
+                                           request_head=head))
+    cache.count_miss()
+    return response
+
+def refresh_cache(addr, hostname, head, routes, cache, key, entry):
+    """
+    Refreshes a stale entry in the background (``stale-while-revalidate``),
+    unless a fetch of its key is already in flight.
+
+    See :func:`cached_request` for the parameters.
+    """
+    fill, leader = cache.begin(key, head, entry, passthrough=False)
+    if not leader:
+        return
+
+    def refresh():
+        buffer = BUFFERS.acquire()
+        try:
+            relay_route(addr, hostname, conditional_head(head, entry), b"", None, routes,
+                        buffer, fill)
+        except Exception as e:
+            log.error("Refresh of %s%s failed: %s", hostname, key[1], e)
+        finally:
+            BUFFERS.release(buffer)
+            fill.finish()
+
+    threading.Thread(target=refresh, name="cache-refresh", daemon=True).start()
+
+def cache_status(cache):
+    """
+    Builds the response of the ``status=`` path of a ``proxy_cache``.
+
+    :params cache (ProxyCache): the cache of the host.
+    :rtype bytes: JSON of :meth:`ProxyCache.stats`.
+    """
+    body = json.dumps(cache.stats()).encode("utf-8")
+    return (
+        b"HTTP/1.1 200 OK\r\n"
+        b"Content-Type: application/json\r\n"
+        b"Content-Length: %d\r\n"
+        b"Cache-Control: no-store\r\n"
+        b"Connection: close\r\n"
+        b"\r\n%s" % (len(body), body)
+    )
 
 def run_proxy(ip, port, routes):
     """
@@ -187,19 +528,15 @@ def run_proxy(ip, port, routes):
     """
 
     proxy = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    HealthChecker(routes).start()
 
     try:
         proxy.bind((ip, port))
         proxy.listen(50)
-        print("[Proxy] Listening on IP {} port {}".format(ip,port))
+        log.info("Listening on IP %s port %s", ip, port)
         while True:
             conn, addr = proxy.accept()
-            #
-            #  TODO: implement the step of the client incomping connection
-            #        using multi-thread programming with the
-            #        provided handle_client routine
-            #
-            
+
         # -------------------------------------------------------------------------- #
             client_thread = threading.Thread(target=handle_client, args=(ip, port, conn, addr, routes))
             client_thread.daemon = True
@@ -207,7 +544,7 @@ def run_proxy(ip, port, routes):
         # -------------------------------------------------------------------------- #
 
     except socket.error as e:
-      print("Socket error: {}".format(e))
+      log.error("Socket error: %s", e)
 
 def create_proxy(ip, port, routes):
     """
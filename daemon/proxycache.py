@@ -0,0 +1,649 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.proxycache
+~~~~~~~~~~~~~~~~~
+
+This module provides the shared response cache of the proxy, turned on per
+host with a ``proxy_cache [size] [max_entry=size] [status=/path];`` line in
+``proxy.conf``. Each host gets its own size-bounded LRU
+:class:`ProxyCache <ProxyCache>` of ``GET`` responses, keyed by request target
+and by the request headers the response ``Vary`` lists.
+
+A response is stored only if a shared cache may reuse it: a cacheable status,
+no ``no-store``, ``private`` or ``Set-Cookie``, and either a freshness
+lifetime (``s-maxage``, ``max-age``, ``Expires``, or 10% of the time since
+``Last-Modified``) or a validator (``ETag``, ``Last-Modified``) to revalidate
+it with. Then, for a later request:
+
+- a fresh entry is served without asking the upstream (``X-Cache: HIT``);
+- a stale one still within ``stale-while-revalidate`` is served at once
+  (``STALE``) while a single background request refreshes it;
+- any other stale one, such as a ``Cache-Control: no-cache`` response, is
+  revalidated with ``If-None-Match``/``If-Modified-Since`` and, on
+  ``304 Not Modified``, served from the cache (``REVALIDATED``).
+
+Whichever way an entry is served, a client whose ``If-None-Match`` (or,
+without one, ``If-Modified-Since``) matches it gets a ``304 Not Modified``
+built from the entry instead of the whole response.
+
+Concurrent misses for one key are collapsed: the first request fetches the
+response (a :class:`Fill <Fill>` records it while it is relayed) and the
+others wait for it instead of reaching the upstream too.
+
+Usage Example:
+--------------
+>>> cache = cache_for("app1.local", routes["app1.local"])
+>>> entry = cache.lookup(("app1.local", "/index.html"), head)
+>>> cache.stats()
+{'entries': 1, 'bytes': 2048, 'hits': 10, 'misses': 1, 'hit_ratio': 0.909, ...}
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+
+from .logger import get_logger
+
+log = get_logger(__name__)
+
+#: Bytes of responses kept per host by default.
+MAX_BYTES = 32 * 1024 * 1024
+#: Largest response (head and body) stored by default.
+MAX_ENTRY_SIZE = 1024 * 1024
+#: Share of the time since ``Last-Modified`` a response without explicit
+#: freshness is considered fresh for.
+HEURISTIC_FRACTION = 0.1
+#: Longest heuristic freshness, in seconds.
+HEURISTIC_MAX = 3600
+#: Seconds a request waits for a concurrent fetch of the same key.
+COALESCE_TIMEOUT = 30.0
+#: Statuses whose responses are stored.
+CACHEABLE_STATUSES = frozenset([200, 203, 204, 300, 301, 308, 404, 410])
+
+#: How a request may use the cache (see :meth:`ProxyCache.classify`).
+BYPASS, USE, REVALIDATE = range(3)
+
+
+_fields = {}
+
+
+def _field(name):
+    pattern = _fields.get(name)
+    if pattern is None:
+        pattern = _fields[name] = re.compile(
+            rb"\r\n" + re.escape(name) + rb":[ \t]*([^\r]*)", re.IGNORECASE)
+    return pattern
+
+
+_CACHE_CONTROL = _field(rb"cache-control")
+_PRAGMA = _field(rb"pragma")
+_EXPIRES = _field(rb"expires")
+_DATE = _field(rb"date")
+_AGE = _field(rb"age")
+_VARY = _field(rb"vary")
+_ETAG = _field(rb"etag")
+_LAST_MODIFIED = _field(rb"last-modified")
+_SET_COOKIE = _field(rb"set-cookie")
+_AUTHORIZATION = _field(rb"authorization")
+_IF_NONE_MATCH = _field(rb"if-none-match")
+_IF_MODIFIED_SINCE = _field(rb"if-modified-since")
+#: Request headers making a response partial or conditional on the client's copy.
+_UNCACHEABLE_REQUEST = re.compile(
+    rb"\r\n(?:range|if-match|if-unmodified-since|if-range):", re.IGNORECASE)
+#: Client validators, replaced by the cache's own when it revalidates.
+_CONDITIONAL = re.compile(rb"\r\n(?:if-none-match|if-modified-since):[^\r]*", re.IGNORECASE)
+#: Headers not stored with a response.
+_NOT_STORED = re.compile(rb"\r\n(?:connection|keep-alive|age|x-cache):[^\r]*", re.IGNORECASE)
+#: Body framing headers, left out of a ``304`` built from an entry.
+_FRAMING = re.compile(rb"\r\n(?:content-length|transfer-encoding):[^\r]*", re.IGNORECASE)
+
+
+def header(head, pattern):
+    """
+    Returns the value of a header, its repeated fields joined by commas.
+
+    :param head (bytes): Request or response head.
+    :param pattern: One of the compiled header patterns of this module.
+    :rtype: bytes - Empty if the header is missing.
+    """
+    values = pattern.findall(head)
+    if not values:
+        return b""
+    return values[0].strip() if len(values) == 1 else b", ".join(v.strip() for v in values)
+
+
+def directives(value):
+    """
+    Parses a ``Cache-Control`` value.
+
+    :param value (bytes): The header value.
+    :rtype: dict - Lowercase directive name -> argument (None without one).
+    """
+    result = {}
+    for part in value.decode("latin-1").split(","):
+        name, eq, arg = part.strip().partition("=")
+        if name:
+            result[name.lower()] = arg.strip().strip('"') if eq else None
+    return result
+
+
+def _seconds(value):
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _http_date(value):
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value.decode("latin-1")).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class CachedResponse:
+    """One stored response.
+
+    :param head (bytes): Status line and headers, without hop-by-hop fields.
+    :param body (bytes): The body, framed as the upstream sent it.
+    :param now (float): ``time.time()`` the response was received at.
+    :param received (bytes): The head as received, with its ``Age``.
+    """
+
+    __slots__ = ("head", "body", "size", "stored", "initial_age", "fresh_until",
+                 "stale_until", "etag", "last_modified")
+
+    def __init__(self, head, body, now, received=None):
+        self.head = head
+        self.body = body
+        self.size = len(head) + len(body)
+        self.etag = header(head, _ETAG)
+        self.last_modified = header(head, _LAST_MODIFIED)
+        self.update(received or head, now)
+
+    def update(self, head, now):
+        """
+        Computes the freshness of the entry from a response head: the stored
+        one, or that of a ``304`` revalidating it.
+
+        :param head (bytes): The response head.
+        :param now (float): ``time.time()`` the response was received at.
+        """
+        # 304 không kèm Cache-Control/Expires: giữ chính sách của response đã lưu
+        policy = head if _CACHE_CONTROL.search(head) or _EXPIRES.search(head) else self.head
+        cc = directives(header(policy, _CACHE_CONTROL))
+        date = _http_date(header(head, _DATE)) or now
+        self.stored = now
+        self.initial_age = max(_seconds(header(head, _AGE)) or 0, now - date, 0)
+
+        if "no-cache" in cc:
+            lifetime = 0
+        elif _seconds(cc.get("s-maxage")) is not None:
+            lifetime = _seconds(cc["s-maxage"])
+        elif _seconds(cc.get("max-age")) is not None:
+            lifetime = _seconds(cc["max-age"])
+        elif _EXPIRES.search(policy):
+            # Expires không đọc được nghĩa là đã hết hạn
+            lifetime = max((_http_date(header(policy, _EXPIRES)) or 0) - date, 0)
+        else:
+            modified = _http_date(self.last_modified)
+            lifetime = min((date - modified) * HEURISTIC_FRACTION, HEURISTIC_MAX) if modified else 0
+        self.fresh_until = now + lifetime - self.initial_age
+
+        stale = _seconds(cc.get("stale-while-revalidate")) or 0
+        if "no-cache" in cc or "must-revalidate" in cc or "proxy-revalidate" in cc:
+            stale = 0
+        self.stale_until = self.fresh_until + stale
+
+    def fresh(self, now):
+        """Whether the entry may be served without asking the upstream."""
+        return now < self.fresh_until
+
+    def usable_stale(self, now):
+        """Whether the entry may be served while it is refreshed (``stale-while-revalidate``)."""
+        return now < self.stale_until
+
+    def validators(self):
+        """
+        Returns the header lines of a request revalidating the entry.
+
+        :rtype: bytes
+        """
+        lines = []
+        if self.etag:
+            lines.append(b"If-None-Match: " + self.etag + b"\r\n")
+        if self.last_modified:
+            lines.append(b"If-Modified-Since: " + self.last_modified + b"\r\n")
+        return b"".join(lines)
+
+    def matches(self, request_head):
+        """
+        Whether the client already has the entry: its ``If-None-Match`` lists
+        the entry's ETag (weak comparison), or it has no ``If-None-Match`` and
+        its ``If-Modified-Since`` is not older than ``Last-Modified``.
+
+        :param request_head (bytes): Head of the client's request.
+        :rtype: bool
+        """
+        none_match = header(request_head, _IF_NONE_MATCH)
+        if none_match:
+            if none_match == b"*":
+                return True
+            if not self.etag:
+                return False
+            etag = self.etag[2:] if self.etag[:2] == b"W/" else self.etag
+            for tag in none_match.split(b","):
+                tag = tag.strip()
+                if (tag[2:] if tag[:2] == b"W/" else tag) == etag:
+                    return True
+            return False
+        since = _http_date(header(request_head, _IF_MODIFIED_SINCE))
+        modified = _http_date(self.last_modified)
+        return since is not None and modified is not None and modified <= since
+
+    def render(self, state, now, head_only=False, not_modified=False):
+        """
+        Returns the entry as a response, with its ``Age`` and ``X-Cache``.
+
+        :param state (str): ``HIT``, ``STALE`` or ``REVALIDATED``.
+        :param now (float): ``time.time()``.
+        :param head_only (bool): Leave the body out (``HEAD`` request).
+        :param not_modified (bool): Answer ``304 Not Modified`` with the
+            entry's headers, without body or framing headers.
+        :rtype: bytes
+        """
+        age = int(self.initial_age + now - self.stored)
+        fields = self.head[:-2]
+        if not_modified:
+            fields = b"HTTP/1.1 304 Not Modified" + _FRAMING.sub(b"", fields[fields.find(b"\r\n"):])
+        head = b"%sAge: %d\r\nX-Cache: %s\r\n\r\n" % (fields, age, state.encode("ascii"))
+        return head if head_only or not_modified else head + self.body
+
+
+class Fill:
+    """The upstream fetch of one key, shared by the requests waiting for it.
+
+    It is fed the response as it is relayed (see ``proxy.relay_upstream``)
+    and keeps a copy of it while it may be stored.
+
+    :param cache (ProxyCache): The cache to store the response in.
+    :param key (tuple): Key of the request, before ``Vary``.
+    :param head (bytes): Head of the request, for the ``Vary`` headers.
+    :param entry (CachedResponse): Stale entry being revalidated, if any.
+    :param passthrough (bool): Whether the response also goes to a client;
+        False for a background refresh.
+    """
+
+    def __init__(self, cache, key, head, entry=None, passthrough=True):
+        self.cache = cache
+        self.key = key
+        self.head = head
+        self.entry = entry
+        self.passthrough = passthrough
+        #: Entry stored or revalidated by this fetch, once finished.
+        self.result = None
+        #: The upstream answered ``304`` to the revalidation of :attr:`entry`.
+        self.not_modified = False
+        self._parts = None
+        self._size = 0
+        self._response = None
+        self._complete = False
+        self._done = threading.Event()
+
+    def feed(self, data):
+        """
+        Records the next bytes of the response.
+
+        :param data (bytes-like): The bytes; the first call gets the head.
+        :rtype: bytes-like or None - What to send to the client, None for nothing.
+        """
+        if self._response is None:
+            data = bytes(data)
+            end = data.find(b"\r\n\r\n") + 4
+            self._response = head = data[:end]
+            status = int(head[9:12]) if end > 4 and head[9:12].isdigit() else 0
+            if status == 304 and self.entry is not None:
+                self.not_modified = True
+            elif self.cache.storable(status, head):
+                self._parts = [_NOT_STORED.sub(b"", head[:-4]) + b"\r\n\r\n", data[end:]]
+                self._size = len(data)
+            else:
+                # Không lưu được: các request đang chờ tự đi lấy
+                self._done.set()
+        elif self._parts is not None:
+            self._size += len(data)
+            if self._size > self.cache.max_entry_size:
+                self._parts = None
+                self._done.set()
+            else:
+                self._parts.append(bytes(data))
+        if self.not_modified or not self.passthrough:
+            return None
+        return data
+
+    def complete(self):
+        """Marks the response as received completely."""
+        self._complete = True
+
+    def wait(self, timeout=COALESCE_TIMEOUT):
+        """
+        Waits for the fetch of another request.
+
+        :rtype: CachedResponse or None - The entry it stored or revalidated.
+        """
+        self._done.wait(timeout)
+        return self.result
+
+    def finish(self):
+        """Stores the response if it was received completely, and wakes the waiting requests."""
+        try:
+            if not self._complete:
+                return
+            now = time.time()
+            if self.not_modified:
+                self.result = self.cache.revalidated(self.entry, self._response, now)
+            elif self._parts is not None:
+                head, body = self._parts[0], b"".join(self._parts[1:])
+                self.result = self.cache.store(self.key, self.head, head, body, now,
+                                               self._response)
+        finally:
+            self.cache.finished(self)
+            self._done.set()
+
+
+class ProxyCache:
+    """A thread-safe LRU :class:`ProxyCache <ProxyCache>` of the responses of one host.
+
+    :param max_bytes (int): Bytes of responses kept.
+    :param max_entry_size (int): Largest response stored.
+    :param status_path (str): Path answered with :meth:`stats` as JSON, if any.
+    """
+
+    def __init__(self, max_bytes=MAX_BYTES, max_entry_size=MAX_ENTRY_SIZE, status_path=None):
+        self.max_bytes = max_bytes
+        self.max_entry_size = min(max_entry_size, max_bytes)
+        self.status_path = status_path
+        self._entries = OrderedDict()
+        #: Request key -> names of the request headers its response varies on.
+        self._vary = {}
+        #: Request key -> :class:`Fill` in flight.
+        self._fills = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+        #: Counters reported by :meth:`stats`.
+        self.hits = 0
+        self.stale = 0
+        self.revalidations = 0
+        self.coalesced = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self.not_modified = 0
+        self.bytes_saved = 0
+
+    @staticmethod
+    def classify(method, head, has_body=False):
+        """
+        Tells how a request may use the cache.
+
+        :param method (str): The request method.
+        :param head (bytes): The request head.
+        :param has_body (bool): Whether the request has a body.
+        :rtype: int - :data:`BYPASS`, :data:`USE`, or :data:`REVALIDATE`
+            when the client asks for a response checked with the upstream.
+        """
+        if method not in ("GET", "HEAD") or has_body:
+            return BYPASS
+        if _AUTHORIZATION.search(head) or _UNCACHEABLE_REQUEST.search(head):
+            return BYPASS
+        cc = directives(header(head, _CACHE_CONTROL))
+        if "no-store" in cc:
+            return BYPASS
+        if "no-cache" in cc or cc.get("max-age") == "0" or b"no-cache" in header(head, _PRAGMA):
+            return REVALIDATE
+        return USE
+
+    def storable(self, status, head):
+        """
+        Whether a response may be stored.
+
+        :param status (int): Its status code.
+        :param head (bytes): Its head.
+        :rtype: bool
+        """
+        if status not in CACHEABLE_STATUSES or _SET_COOKIE.search(head):
+            return False
+        if header(head, _VARY) == b"*":
+            return False
+        cc = directives(header(head, _CACHE_CONTROL))
+        if "no-store" in cc or "private" in cc:
+            return False
+        if "no-cache" in cc:
+            # Chỉ dùng lại được nếu có validator để hỏi lại upstream
+            return bool(_ETAG.search(head) or _LAST_MODIFIED.search(head))
+        return bool("s-maxage" in cc or "max-age" in cc or _EXPIRES.search(head)
+                    or _ETAG.search(head) or _LAST_MODIFIED.search(head))
+
+    def _variant(self, key, head):
+        names = self._vary.get(key)
+        if not names:
+            return key
+        return key + tuple(header(head, _field(name)).lower() for name in names)
+
+    def lookup(self, key, head):
+        """
+        Returns the entry stored for a request, fresh or not.
+
+        :param key (tuple): (hostname, request target).
+        :param head (bytes): The request head.
+        :rtype: CachedResponse or None
+        """
+        with self._lock:
+            variant = self._variant(key, head)
+            entry = self._entries.get(variant)
+            if entry is not None:
+                self._entries.move_to_end(variant)
+            return entry
+
+    def begin(self, key, head, entry=None, passthrough=True):
+        """
+        Starts the upstream fetch of a key, unless one is in flight.
+
+        :rtype: tuple - (:class:`Fill`, True if the caller must fetch it or
+            False if it should wait for it).
+        """
+        with self._lock:
+            fill = self._fills.get(key)
+            if fill is not None:
+                return fill, False
+            fill = self._fills[key] = Fill(self, key, head, entry, passthrough)
+            return fill, True
+
+    def finished(self, fill):
+        """Forgets a fill once its fetch is over."""
+        with self._lock:
+            if self._fills.get(fill.key) is fill:
+                del self._fills[fill.key]
+
+    def store(self, key, request_head, head, body, now, received=None):
+        """
+        Stores a response received for a request.
+
+        :param key (tuple): Key of the request, before ``Vary``.
+        :param request_head (bytes): Head of the request.
+        :param head (bytes): Head of the response, without hop-by-hop fields.
+        :param body (bytes): Body of the response.
+        :param now (float): ``time.time()`` the response was received at.
+        :param received (bytes): The response head as received.
+        :rtype: CachedResponse
+        """
+        entry = CachedResponse(head, body, now, received)
+        names = tuple(sorted({name.strip().lower() for name in
+                              header(head, _VARY).split(b",") if name.strip()}))
+        with self._lock:
+            if self._vary.get(key, ()) != names:
+                # Vary đổi: bỏ các bản lưu theo danh sách header cũ
+                for variant in [k for k in self._entries if k[:len(key)] == key]:
+                    self._remove(variant)
+                self._vary[key] = names
+            variant = self._variant(key, request_head)
+            if variant in self._entries:
+                self._remove(variant)
+            self._entries[variant] = entry
+            self._bytes += entry.size
+            # Loại bỏ mục ít dùng nhất đến khi vừa giới hạn
+            while self._bytes > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return entry
+
+    def revalidated(self, entry, head, now):
+        """
+        Refreshes an entry the upstream answered ``304 Not Modified`` for.
+
+        :rtype: CachedResponse
+        """
+        with self._lock:
+            entry.update(head, now)
+        return entry
+
+    def serve(self, entry, state, now, head_only=False, request_head=b""):
+        """
+        Renders an entry for a client and counts it: a ``304`` if the
+        client's validators match it (see :meth:`CachedResponse.matches`).
+
+        :param state (str): ``HIT``, ``STALE``, ``REVALIDATED`` or ``COALESCED``
+            (a hit on the fetch of a concurrent request).
+        :param request_head (bytes): Head of the client's request.
+        :rtype: bytes
+        """
+        not_modified = bool(request_head) and entry.matches(request_head)
+        data = entry.render("HIT" if state == "COALESCED" else state, now, head_only,
+                            not_modified)
+        if not_modified:
+            # Tính như bản đầy đủ: upstream không phải gửi lại nó
+            size = len(entry.head) + (0 if head_only else len(entry.body))
+        else:
+            size = len(data)
+        with self._lock:
+            if not_modified:
+                self.not_modified += 1
+            if state == "HIT":
+                self.hits += 1
+            elif state == "STALE":
+                self.stale += 1
+            elif state == "COALESCED":
+                self.coalesced += 1
+            if state == "REVALIDATED":
+                # Upstream vẫn gửi head của 304, chỉ body được tiết kiệm
+                self.revalidations += 1
+                self.bytes_saved += 0 if head_only else len(entry.body)
+            else:
+                self.bytes_saved += size
+        return data
+
+    def count_miss(self, bypassed=False):
+        """Counts a request answered by the upstream."""
+        with self._lock:
+            if bypassed:
+                self.bypassed += 1
+            else:
+                self.misses += 1
+
+    def clear(self):
+        """Drops every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._vary.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Returns a snapshot of the cache counters. ``hit_ratio`` is the share
+        of cacheable requests answered without the upstream sending a body,
+        ``not_modified`` how many of them got a ``304`` from the cache and
+        ``bytes_saved`` the response bytes the upstream did not send.
+
+        :rtype: dict
+        """
+        with self._lock:
+            served = self.hits + self.stale + self.coalesced + self.revalidations
+            lookups = served + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "stale": self.stale,
+                "revalidated": self.revalidations,
+                "coalesced": self.coalesced,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "evictions": self.evictions,
+                "not_modified": self.not_modified,
+                "hit_ratio": round(served / lookups, 3) if lookups else 0.0,
+                "bytes_saved": self.bytes_saved,
+            }
+
+    def _remove(self, variant):
+        entry = self._entries.pop(variant)
+        self._bytes -= entry.size
+
+
+def conditional_head(head, entry=None):
+    """
+    Prepares the head of a request fetching a response for the cache: the
+    client's own validators are dropped, so the upstream sends a whole
+    response to store, and those of a stale ``entry`` are added. The client
+    still gets its ``304`` from :meth:`ProxyCache.serve`.
+
+    :param head (bytes): The request head.
+    :param entry (CachedResponse): Entry to revalidate, if any.
+    :rtype: bytes
+    """
+    head = _CONDITIONAL.sub(b"", head)
+    if entry is None:
+        return head
+    validators = entry.validators()
+    return head[:-2] + validators + b"\r\n" if validators else head
+
+
+#: hostname -> (options, :class:`ProxyCache <ProxyCache>`).
+CACHES = {}
+
+
+def cache_for(hostname, route):
+    """
+    Returns the cache of a host, created on first use, or None if the host
+    has no ``proxy_cache``.
+
+    :param hostname (str): The host name of the request.
+    :param route (tuple): (proxy_map, policy, options) of the host, or None.
+    :rtype: ProxyCache or None
+    """
+    options = route[2] if route is not None and len(route) > 2 else None
+    if not options or "cache_size" not in options:
+        return None
+    entry = CACHES.get(hostname)
+    if entry is None or entry[0] is not options:
+        entry = (options, ProxyCache(options["cache_size"],
+                                     options.get("cache_max_entry", MAX_ENTRY_SIZE),
+                                     options.get("cache_status")))
+        # Gán vào dict là nguyên tử: hai luồng cùng tạo thì bản sau thắng
+        CACHES[hostname] = entry
+    return entry[1]
@@ -0,0 +1,119 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.ranges
+~~~~~~~~~~~~~~~~~
+
+This module provides ``Range`` request support for static files:
+parsing of ``bytes=`` range sets and the framing of ``multipart/byteranges``
+bodies. The file slices themselves are taken from a memory map by
+:class:`Response <Response>`, so serving a range never reads the whole file.
+
+Usage Example:
+--------------
+>>> parse_range("bytes=0-99,-100", 1000)
+[(0, 99), (900, 999)]
+>>> parse_range("bytes=5000-", 1000)
+[]
+"""
+
+import secrets
+
+#: Most ranges served in one response; larger sets are ignored (full 200).
+MAX_RANGES = 16
+
+
+def parse_range(value, size):
+    """
+    Parses a ``Range`` header against a representation of ``size`` bytes.
+
+    Overlapping or adjacent ranges are coalesced, as allowed by RFC 9110.
+
+    :param value (str): Value of the ``Range`` header.
+    :param size (int): Size of the file in bytes.
+
+    :rtype: list or None - sorted ``(first, last)`` byte positions (inclusive);
+        an empty list if no range is satisfiable (answer ``416``); None if the
+        header is invalid or unsupported and must be ignored.
+    """
+    unit, _, spec = value.partition("=")
+    if unit.strip().lower() != "bytes" or not spec:
+        return None
+
+    specs = [s.strip() for s in spec.split(",") if s.strip()]
+    if not specs or len(specs) > MAX_RANGES:
+        return None
+
+    ranges = []
+    for s in specs:
+        first, dash, last = s.partition("-")
+        if not dash:
+            return None
+        first, last = first.strip(), last.strip()
+        if not first:
+            # Suffix range: n byte cuối cùng
+            if not last.isdigit():
+                return None
+            length = int(last)
+            if length > 0 and size > 0:
+                ranges.append((max(size - length, 0), size - 1))
+            continue
+        if not first.isdigit() or (last and not last.isdigit()):
+            return None
+        start = int(first)
+        end = int(last) if last else size - 1
+        if last and end < start:
+            return None
+        if start < size:
+            ranges.append((start, min(end, size - 1)))
+
+    ranges.sort()
+    merged = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def content_range(start, end, size):
+    """
+    Formats a ``Content-Range`` value.
+
+    :rtype: str
+    """
+    return "bytes {}-{}/{}".format(start, end, size)
+
+
+def multipart_parts(view, ranges, size, content_type):
+    """
+    Frames several ranges as a ``multipart/byteranges`` body.
+
+    :param view (memoryview): The whole file (memory-mapped).
+    :param ranges (list): ``(first, last)`` byte positions, as returned by
+        :func:`parse_range`.
+    :param size (int): Size of the file.
+    :param content_type (str): ``Content-Type`` of the file.
+
+    :rtype: tuple - (boundary, list of bytes / memoryview pieces of the body).
+    """
+    boundary = secrets.token_hex(12)
+    parts = []
+    for start, end in ranges:
+        parts.append("\r\n--{}\r\nContent-Type: {}\r\nContent-Range: {}\r\n\r\n".format(
+            boundary, content_type, content_range(start, end, size)).encode("latin-1"))
+        parts.append(view[start:end + 1])
+    parts.append("\r\n--{}--\r\n".format(boundary).encode("latin-1"))
+    return boundary, parts
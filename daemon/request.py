@@ -5,8 +5,14 @@ daemon.request
 This module provides a Request object to manage and persist 
 request settings (cookies, auth, proxies).
 """
-from .dictionary import CaseInsensitiveDict
-from urllib.parse import unquote
+import json
+
+from .dictionary import CaseInsensitiveDict, Headers
+from urllib.parse import unquote, parse_qsl
+from .logger import get_logger
+from .objectpool import ObjectPool
+
+log = get_logger(__name__)
 
 class Request():
     """The fully mutable "class" `Request <Request>` object.
@@ -21,25 +27,63 @@ class Request():
         "body",
         "routes",
         "hook",
+        "params",
+        "query_string",
     ]
 
+    __slots__ = (
+        "method", "url", "path", "query_string", "_query", "version",
+        "_head", "_headers", "_cookies",
+        "_body", "_text", "_json", "_form", "_body_reader",
+        "routes", "hook", "route", "params", "allowed_methods", "dispatched",
+    )
+
     def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Returns the request to its initial state, so it can be reused for
+        the next request (see :data:`POOL`).
+        """
         #: HTTP verb to send to the server.
         self.method = None
         #: HTTP URL to send the request to.
         self.url = None
-        #: dictionary of HTTP headers.
-        self.headers = None
+        #: dictionary of HTTP headers (see :attr:`headers`).
+        self._headers = None
+        #: Raw header lines, parsed on first access to :attr:`headers`.
+        self._head = None
         #: HTTP path
         self.path = None        
+        #: Raw query string (after ``?``), parsed lazily by :attr:`query`.
+        self.query_string = ""
+        self._query = None
+        #: HTTP version of the request line.
+        self.version = None
         # The cookies set used to create Cookie header
-        self.cookies = None
-        #: request body to send to the server.
-        self.body = None
+        self._cookies = None
+        #: request body to send to the server (bytes or memoryview).
+        self._body = None
+        #: Memoized decodings of the body (text, JSON, form).
+        self._text = None
+        self._json = None
+        self._form = None
+        #: Reader of a body still on the socket (see :meth:`attach_body`).
+        self._body_reader = None
         #: Routes
         self.routes = {}
         #: Hook point for routed mapped-path
         self.hook = None
+        #: Path the matched route was registered with, e.g. ``/peers/<peer_id>``.
+        self.route = None
+        #: Path parameters of the matched route, e.g. ``{'peer_id': 'p1'}``.
+        self.params = {}
+        #: Methods accepted by the path when the request method is not (405).
+        self.allowed_methods = None
+        #: Whether the request was handed to a WeApRous handler, which may
+        #: keep it: it is then not recycled (see :meth:`HttpAdapter.release`).
+        self.dispatched = False
 
     def extract_request_line(self, request):
         try:
@@ -50,6 +94,8 @@ class Request():
             first_line = lines[0]
             method, path, version = first_line.split()
 
+            # Query string không thuộc path khi tìm route/file
+            path, _, self.query_string = path.partition('?')
             if path == '/':
                 path = '/index.html'
         except Exception:
@@ -58,34 +104,58 @@ class Request():
         return method, path, version
              
     def prepare_headers(self, request):
-        """Prepares the given HTTP headers."""
-        lines = request.split('\r\n')
-        headers = {}
-        for line in lines[1:]: # Bắt đầu từ dòng thứ 2
-            if ': ' in line:
-                key, val = line.split(': ', 1)
-                headers[key.lower()] = val # Lưu key dạng lowercase
-        return headers
+        """
+        Prepares the given HTTP headers.
+
+        :param request (bytes): Header lines, without the request line.
+        :rtype: Headers - lowercase name -> value, repeated fields kept.
+        """
+        if not isinstance(request, str):
+            request = bytes(request).decode('utf-8', 'replace')
+        return Headers.from_lines(request.split('\r\n'))
 
     def prepare(self, request, routes=None):
-        """Prepares the entire request with the given parameters."""
+        """
+        Prepares the entire request with the given parameters.
+
+        Only the request line is parsed here, in one pass over the raw bytes.
+        Headers, cookies, the query string and the body are decoded on first
+        access and memoized.
+
+        :param request (bytes): The raw request head, or a complete raw request.
+        :param routes (dict): The route mapping for dispatching requests.
+        :raise: ValueError if the request line is invalid.
+        """
+        if isinstance(request, str):
+            request = request.encode('utf-8')
+        elif not isinstance(request, bytes):
+            request = bytes(request)
 
     # -------------------------------------------------------------------------- #
-        # Tách Header và Body 
-        try:
-            header_part, self.body = request.split('\r\n\r\n', 1)
-        except ValueError:
+        # Tìm ranh giới request line / header / body, không copy hay decode
+        head_end = request.find(b'\r\n\r\n')
+        if head_end < 0:
             # Nếu không có body (ví dụ: request GET), request chỉ là header
-            header_part = request
-            self.body = ""
+            head_end = body_start = len(request)
+        else:
+            body_start = head_end + 4
+        line_end = request.find(b'\r\n', 0, head_end)
+        if line_end < 0:
+            line_end = head_end
+
+        self._head = request[line_end + 2:head_end]
+        self._headers = None
+        self._cookies = None
+        # Body rỗng ở đây có thể vẫn đang nằm trên socket (attach_body)
+        if body_start < len(request):
+            self.body = memoryview(request)[body_start:]
     # -------------------------------------------------------------------------- #
 
-        # Prepare the request line (chỉ parse từ header_part)
-        self.method, self.path, self.version = self.extract_request_line(header_part)
+        # Prepare the request line
+        self.method, self.path, self.version = self.extract_request_line(
+            request[:line_end].decode('latin-1'))
         if not self.method:
              raise ValueError("Invalid HTTP request line")
-             
-        print("[Request] {} path {} version {}".format(self.method, self.path, self.version))
 
         #
         # @bksysnet Preapring the webapp hook with WeApRous instance
@@ -94,32 +164,151 @@ class Request():
         if routes is not None and routes != {}:
             self.routes = routes
             # Tìm hook (hàm handler) dựa trên (METHOD, PATH)
-            self.hook = routes.get((self.method, self.path))
-            
-            if self.hook:
-                print(f"[Request] Found WeApRous hook for {self.method} {self.path}")
-            
-        # Parse headers (chỉ parse từ header_part)
-        self.headers = self.prepare_headers(header_part)
-        cookies_str = self.headers.get('cookie', '')
-        
+            lookup = getattr(routes, 'lookup', None)
+            if lookup is not None:
+                self.hook, self.params, self.allowed_methods, self.route = lookup(
+                    self.method, self.path)
+            else:
+                self.hook = routes.get((self.method, self.path))
+                if self.hook is not None:
+                    self.route = self.path
+
+        # Một dòng log cho mỗi request: log.debug không miễn phí kể cả khi tắt
+        log.debug("%s path %s version %s hook %s", self.method, self.path,
+                  self.version, getattr(self.hook, '__name__', None))
+        return
+
+    @property
+    def headers(self):
+        """
+        The request headers, lowercase name -> value, parsed on first access.
+        """
+        if self._headers is None and self._head is not None:
+            head, self._head = self._head, None
+            self._headers = self.prepare_headers(head)
+        return self._headers
+
+    @headers.setter
+    def headers(self, value):
+        self._headers = value
+        self._head = None
+
+    @property
+    def cookies(self):
+        """
+        The cookies of the ``Cookie`` header, parsed on first access.
+        """
+        if self._cookies is None and self.headers is not None:
+            # Cookie có thể bị tách thành nhiều dòng header
+            cookies_str = '; '.join(self.headers.getlist('cookie'))
     # -------------------------------------------------------------------------- #      
-        # logic parse cookies from header
-        self.cookies = CaseInsensitiveDict()
-        if cookies_str:
-            try:
-                # Phân tích chuỗi cookie (ví dụ: "auth=true; session=abc")
-                pairs = [p.strip() for p in cookies_str.split(';')]
-                for pair in pairs:
-                    if '=' in pair:
-                        key, value = pair.split('=', 1)
-                        # Lưu cookie vào self.cookies
-                        self.cookies[key.strip()] = value.strip()
-            except Exception as e:
-                print(f"[Request] Error parsing cookie string: {e}")
+            # logic parse cookies from header
+            self._cookies = CaseInsensitiveDict()
+            if cookies_str:
+                try:
+                    # Phân tích chuỗi cookie (ví dụ: "auth=true; session=abc")
+                    for pair in cookies_str.split(';'):
+                        key, sep, value = pair.partition('=')
+                        if sep:
+                            # Lưu cookie vào self.cookies
+                            self._cookies[key.strip()] = value.strip()
+                except Exception as e:
+                    log.warning("Error parsing cookie string: %s", e)
     # -------------------------------------------------------------------------- #
-    
-        return
+        return self._cookies
+
+    @cookies.setter
+    def cookies(self, value):
+        self._cookies = value
+
+    @property
+    def query(self):
+        """
+        The query string parameters as a dict, parsed on first access.
+        A repeated parameter keeps its last value.
+
+        Usage::
+
+          >>> # GET /get-list?limit=10
+          >>> int(request.query.get('limit', 50))
+          10
+        """
+        if self._query is None:
+            self._query = dict(parse_qsl(self.query_string, keep_blank_values=True))
+        return self._query
+
+    def attach_body(self, reader):
+        """
+        Attaches the reader of a body that has not been received yet.
+
+        :param reader (BodyReader): Reader positioned at the start of the body.
+        """
+        self.body = None
+        self._body_reader = reader
+
+    @property
+    def content(self):
+        """
+        The request body as bytes, read from the connection on first access.
+        """
+        if self._body is None:
+            reader, self._body_reader = self._body_reader, None
+            self._body = reader.read() if reader else b""
+        elif not isinstance(self._body, bytes):
+            self._body = bytes(self._body)
+        return self._body
+
+    @property
+    def body(self):
+        """
+        The request body as text, decoded on first access.
+        """
+        if self._text is None:
+            self._text = self.content.decode('utf-8', 'replace')
+        return self._text
+
+    @body.setter
+    def body(self, value):
+        if isinstance(value, str):
+            self._text = value
+            value = value.encode('utf-8')
+        else:
+            self._text = None
+        self._body = value
+        self._body_reader = None
+        self._json = self._form = None
+
+    def stream(self):
+        """
+        Iterates over the request body as it arrives, in ``bytes`` chunks,
+        without keeping all of it in memory.
+
+        The body can be consumed once: after streaming it, :attr:`body` is empty.
+
+        Usage::
+
+          >>> for chunk in request.stream():
+          >>>     f.write(chunk)
+        """
+        reader, self._body_reader = self._body_reader, None
+        body, self.body = self._body, b""
+        if reader is not None:
+            yield from reader
+        elif body:
+            yield bytes(body)
+
+    @property
+    def keep_alive(self):
+        """
+        Whether the client wants the connection kept open after this request.
+
+        HTTP/1.1 connections are persistent unless the client sends
+        ``Connection: close``; HTTP/1.0 ones only with ``Connection: keep-alive``.
+        """
+        connection = (self.headers or {}).get('connection', '').lower()
+        if self.version == 'HTTP/1.0':
+            return 'keep-alive' in connection
+        return 'close' not in connection
 
     def prepare_body(self, data, files, json=None):
         self.prepare_content_length(self.body)
@@ -148,13 +337,16 @@ class Request():
     @property
     def form_data(self):
         """
-        Parses 'application/x-www-form-urlencoded' body.
+        Parses 'application/x-www-form-urlencoded' body, once.
         Trả về một dictionary.
         """
-        content_type = self.headers.get('content-type', '')
+        if self._form is not None:
+            return self._form
+        content_type = (self.headers or {}).get('content-type', '')
         # Chỉ parse nếu body tồn tại và Content-Type là 'application/x-www-form-urlencoded'
-        if not self.body or 'application/x-www-form-urlencoded' not in content_type:
-            return {}
+        if 'application/x-www-form-urlencoded' not in content_type or not self.content:
+            self._form = {}
+            return self._form
         
         data = {}
         try:
@@ -165,25 +357,34 @@ class Request():
                     # unquote() để xử lý các ký tự đặc biệt
                     data[unquote(key)] = unquote(val)
         except Exception as e:
-            print(f"[Request] Lỗi khi parse form data (x-www-form-urlencoded): {e}")
+            log.warning("Lỗi khi parse form data (x-www-form-urlencoded): %s", e)
             
+        self._form = data
         return data
         
     # Property để parse JSON Data (raw)
     @property
     def json_data(self):
         """
-        Parses 'application/json' body (từ Postman Raw).
+        Parses 'application/json' body (từ Postman Raw), once.
         Trả về một dictionary.
         """
-        content_type = self.headers.get('content-type', '')
-        if not self.body or 'application/json' not in content_type:
-            return {}
+        if self._json is not None:
+            return self._json
+        content_type = (self.headers or {}).get('content-type', '')
+        if 'application/json' not in content_type or not self.content:
+            self._json = {}
+            return self._json
             
         try:
-            import json
-            return json.loads(self.body)
+            # json.loads đọc thẳng bytes, không cần decode trước
+            self._json = json.loads(self.content)
         except Exception as e:
-            print(f"[Request] Lỗi khi parse JSON body: {e}")
-            return {}
-    # -------------------------------------------------------------------------- #
\ No newline at end of file
+            log.warning("Lỗi khi parse JSON body: %s", e)
+            self._json = {}
+        return self._json
+    # -------------------------------------------------------------------------- #
+
+
+#: Requests reused by the adapters of this worker process.
+POOL = ObjectPool(Request)
@@ -10,11 +10,54 @@ based on incoming requests.
 The current version supports MIME type detection, content loading and header formatting
 """
 import datetime
+import mmap
 import os
 import mimetypes
-from .dictionary import CaseInsensitiveDict
+import socket
+from time import perf_counter
+from .dictionary import CaseInsensitiveDict, Headers
+from .staticcache import StaticCache
+from . import compression
+from . import ranges
+from . import streaming
+from .lifecycle import LIFECYCLE
+from .logger import get_logger
+from .metrics import METRICS
+from . import headerwriter
+from .objectpool import ObjectPool
+
+log = get_logger(__name__)
 
 BASE_DIR = ""
+#: Buffer size of the chunked fallback used when ``sendfile`` is unavailable.
+SEND_CHUNK = 64 * 1024
+
+#: Shared cache of static assets (content, headers, validators).
+STATIC_CACHE = StaticCache()
+METRICS.add_collector("static_cache", STATIC_CACHE.stats,
+                      counters=("hits", "misses", "evictions", "invalidations", "not_modified"))
+
+_END = object()
+
+#: ``elapsed`` of every response; timedelta is immutable, so one is shared.
+_NO_TIME = datetime.timedelta(0)
+
+_UNAUTHORIZED_BODY = b"401 Unauthorized"
+#: Constant part of :meth:`Response.build_unauthorized`, rendered once.
+_UNAUTHORIZED_HEAD = headerwriter.fixed_head(
+    401, "Unauthorized", "text/plain", _UNAUTHORIZED_BODY,
+    (("Access-Control-Allow-Origin", "*"),) + headerwriter.CORS_DEFAULTS[1:])
+
+_NOT_ALLOWED_BODY = b"405 Method Not Allowed"
+#: Constant part of :meth:`Response.build_method_not_allowed`.
+_NOT_ALLOWED_HEAD = headerwriter.fixed_head(
+    405, "Method Not Allowed", "text/plain", _NOT_ALLOWED_BODY,
+    (("Access-Control-Allow-Origin", "*"),))
+
+_UNAVAILABLE_BODY = b"503 Service Unavailable"
+#: Constant part of :meth:`Response.build_unavailable`.
+_UNAVAILABLE_HEAD = headerwriter.fixed_head(
+    503, "Service Unavailable", "text/plain", _UNAVAILABLE_BODY)
 
 class Response():   
     """The :class:`Response <Response>` object, which contains a
@@ -36,30 +79,92 @@ class Response():
         "request",
         "body",
         "reason",
+        "keep_alive",
+        "body_file",
+        "file_size",
+        "body_parts",
+        "body_stream",
     ]
 
 
+    __slots__ = (
+        "_content", "_content_consumed", "_next", "_header",
+        "status_code", "reason", "headers", "url", "encoding",
+        "_history", "_cookies", "elapsed", "request", "keep_alive",
+        "body_file", "file_size", "body_parts", "body_stream", "_mmap", "serialize_time",
+    )
+
     def __init__(self, request=None):
         """
         Initializes a new :class:`Response <Response>` object.
         """
+        #: Response headers; ``Set-Cookie`` and other fields may repeat.
+        self.headers = Headers()
+        #: Open static file sent as the body after the header (see :meth:`send_file`).
+        self.body_file = None
+        #: Pieces of a ``206`` body (slices of a memory-mapped file), sent by
+        #: :meth:`send_file`; their total length is :attr:`file_size`.
+        self.body_parts = None
+        #: Chunks of a streamed body, sent by :meth:`send_stream` (see
+        #: :meth:`build_stream`).
+        self.body_stream = None
+        self._mmap = None
+        self.reset(request)
+
+    def reset(self, request=None):
+        """
+        Returns the response to its initial state, so it can be reused for
+        the next request (see :data:`POOL`). A static file still open is closed.
+        """
+        self.close_file()
 
         self._content = False
         self._content_consumed = False
         self._next = None
+        self._header = None
 
         self.status_code = None
         
-        self.headers = {} 
+        self.headers.clear()
 
         self.url = None
         self.encoding = None
-        self.history = []
         self.reason = None
-        self.cookies = CaseInsensitiveDict()
-        self.elapsed = datetime.timedelta(0)
+        # history/cookies chỉ được tạo khi có code dùng tới
+        self._history = None
+        self._cookies = None
+        self.elapsed = _NO_TIME
         
         self.request = request
+        #: Whether the connection stays open after this response
+        #: (set by :class:`HttpAdapter <HttpAdapter>`).
+        self.keep_alive = False
+        #: Size of :attr:`body_file`, used as its ``Content-Length``.
+        self.file_size = 0
+        #: Seconds spent serializing the body and header (recorded with metrics on).
+        self.serialize_time = 0.0
+
+    @property
+    def history(self):
+        """Responses this one follows (always empty for a server response)."""
+        if self._history is None:
+            self._history = []
+        return self._history
+
+    @history.setter
+    def history(self, value):
+        self._history = value
+
+    @property
+    def cookies(self):
+        """Cookies of the response, created on first access."""
+        if self._cookies is None:
+            self._cookies = CaseInsensitiveDict()
+        return self._cookies
+
+    @cookies.setter
+    def cookies(self, value):
+        self._cookies = value
 
 
     def get_mime_type(self, path):
@@ -90,7 +195,7 @@ class Response():
             main_type = 'application'
             sub_type = 'octet-stream'
 
-        print("[Response] processing MIME main_type={} sub_type={}".format(main_type,sub_type))
+        log.debug("processing MIME main_type=%s sub_type=%s", main_type, sub_type)
         if main_type == 'text':
             self.headers['Content-Type']='text/{}'.format(sub_type)
             if sub_type == 'plain' or sub_type == 'css':
@@ -110,7 +215,7 @@ class Response():
                 base_dir = BASE_DIR+"apps/"
                 self.headers['Content-Type']='application/{}'.format(sub_type)
         else:
-            print("[Response] MIME type không xác định: {}. Mặc định là 'static/'".format(mime_type))
+            log.debug("MIME type không xác định: %s. Mặc định là 'static/'", mime_type)
             base_dir = BASE_DIR+"static/"
             self.headers['Content-Type'] = mime_type
 
@@ -124,12 +229,12 @@ class Response():
 
         # Chặn truy cập file bên ngoài (Directory Traversal)
         if '..' in path:
-            print(f"[Response] Lỗi: Phát hiện cố gắng truy cập trái phép {path}")
+            log.warning("Phát hiện cố gắng truy cập trái phép %s", path)
             return 0, b""
 
         filepath = os.path.join(base_dir, path.lstrip('/'))
 
-        print("[Response] serving the object at location {}".format(filepath))
+        log.debug("serving the object at location %s", filepath)
             
         try:
             # 'rb' = read binary
@@ -137,16 +242,141 @@ class Response():
                 content = f.read()
             return len(content), content
         except FileNotFoundError:
-            print(f"[Response] Lỗi: Không tìm thấy file {filepath}")
+            log.debug("Không tìm thấy file %s", filepath)
             return 0, b"" 
         except IsADirectoryError:
-            print(f"[Response] Lỗi: {filepath} là một thư mục, không phải file.")
+            log.debug("%s là một thư mục, không phải file.", filepath)
             return 0, b""
         except Exception as e:
-            print(f"[Response] Lỗi khi đọc file: {e}")
+            log.error("Lỗi khi đọc file: %s", e)
             return 0, b""
 
 
+    def open_content(self, path, base_dir):
+        """
+        Opens the objects file for streaming instead of loading it.
+
+        :rtype: tuple - (size, open binary file), or (0, None) if it cannot be served.
+        """
+
+        # Chặn truy cập file bên ngoài (Directory Traversal)
+        if '..' in path:
+            log.warning("Phát hiện cố gắng truy cập trái phép %s", path)
+            return 0, None
+
+        filepath = os.path.join(base_dir, path.lstrip('/'))
+
+        log.debug("streaming the object at location %s", filepath)
+
+        try:
+            f = open(filepath, 'rb')
+        except FileNotFoundError:
+            log.debug("Không tìm thấy file %s", filepath)
+            return 0, None
+        except IsADirectoryError:
+            log.debug("%s là một thư mục, không phải file.", filepath)
+            return 0, None
+        except Exception as e:
+            log.error("Lỗi khi mở file: %s", e)
+            return 0, None
+
+        # Content-Length lấy từ chính file descriptor đã mở
+        return os.fstat(f.fileno()).st_size, f
+
+
+    def send_file(self, conn):
+        """
+        Sends the pending :attr:`body_file` on the socket, zero-copy with
+        ``socket.sendfile`` where available, otherwise in fixed-size chunks.
+        A :attr:`body_stream` is sent by :meth:`send_stream`. Does nothing if
+        there is no file body.
+
+        :param conn (socket): The client socket connection.
+        :rtype: int - Number of body bytes sent.
+        """
+        if self.body_stream is not None:
+            return self.send_stream(conn)
+        if self.body_parts is not None:
+            sent = 0
+            try:
+                for part in self.body_parts:
+                    conn.sendall(part)
+                    sent += len(part)
+            finally:
+                self.close_file()
+            return sent
+
+        f, self.body_file = self.body_file, None
+        if f is None:
+            return 0
+
+        with f:
+            sendfile = getattr(conn, "sendfile", None)
+            if sendfile is not None:
+                return sendfile(f, 0, self.file_size)
+
+            buf = bytearray(SEND_CHUNK)
+            view = memoryview(buf)
+            sent = 0
+            while sent < self.file_size:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                n = min(n, self.file_size - sent)
+                conn.sendall(view[:n])
+                sent += n
+            return sent
+
+    def send_stream(self, conn):
+        """
+        Sends the pending :attr:`body_stream` on the socket, one chunk per
+        ``sendall`` as the handler produces them. If the handler fails in the
+        middle, the body is cut short (no last chunk) and the connection is
+        closed, so the client sees an incomplete response instead of a
+        truncated one.
+
+        :param conn (socket): The client socket connection.
+        :rtype: int - Number of body bytes sent, framing included.
+        :raise: OSError if the client is gone or does not take the chunks
+            within the socket timeout.
+        """
+        chunks, self.body_stream = self.body_stream, None
+        frame = streaming.encode_chunk if self.chunked else streaming.as_bytes
+        try:
+            # Chunk nhỏ phải đi ngay, không chờ gộp với gói sau (Nagle)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            pass
+        sent = 0
+        stream = streaming.iterate(chunks)
+        try:
+            while True:
+                try:
+                    chunk = next(stream, _END)
+                except Exception as e:
+                    log.exception("Lỗi trong stream của WeApRous handler: %s", e)
+                    self.keep_alive = False
+                    return sent
+                if chunk is _END:
+                    break
+                data = frame(chunk)
+                if data:
+                    conn.sendall(data)
+                    sent += len(data)
+            if self.chunked:
+                conn.sendall(streaming.LAST_CHUNK)
+                sent += len(streaming.LAST_CHUNK)
+            return sent
+        finally:
+            streaming.close(stream)
+            streaming.close(chunks)
+
+    @property
+    def chunked(self):
+        """Whether a :attr:`body_stream` is sent with ``Transfer-Encoding: chunked``
+        (HTTP/1.0 clients read it until the connection closes instead)."""
+        return self.request is None or self.request.version != "HTTP/1.0"
+
     def build_response_header(self, request):
         """
         Constructs the HTTP response headers based on the request.
@@ -165,38 +395,42 @@ class Response():
             reqhdr = {}
             origin = None
 
-        # Nếu có Origin thì trả lại đúng Origin, không dùng '*'
-        cors_origin = origin if origin else "*"
-
-        self.headers.setdefault("Access-Control-Allow-Origin", cors_origin)
-        self.headers.setdefault("Access-Control-Allow-Credentials", "true")
-        self.headers.setdefault("Access-Control-Allow-Methods", "GET, POST, PUT, DELETE, OPTIONS")
-        self.headers.setdefault("Access-Control-Allow-Headers", "Content-Type, Authorization")
-
-        # 4) Dynamic headers cơ bản
-        headers = {
-            "Accept": "{}".format(reqhdr.get("accept", "application/json")),
-            "Cache-Control": "no-cache",
-            "Content-Length": "{}".format(
-                len(self._content) if getattr(self, "_content", None) else 0
-            ),
-            "Date": "{}".format(
-                datetime.datetime.utcnow().strftime("%a, %d %b %Y %H:%M:%S GMT")
-            ),
-            "Pragma": "no-cache",
-            "Connection": "close",
-        }
-
-        fmt_header = f"HTTP/1.1 {self.status_code} {self.reason}\r\n"
-
-        for key, value in headers.items():
-            fmt_header += f"{key}: {value}\r\n"
-
-        for key, value in self.headers.items():
-            fmt_header += f"{key}: {value}\r\n"
+        # 3) Dynamic headers cơ bản; các khối cố định đã được encode sẵn
+        if self.status_code == 304:
+            # 304 không có body, không gửi Content-Length
+            length = ""
+        elif self.body_stream is not None:
+            length = "Transfer-Encoding: chunked\r\n" if self.chunked else ""
+        else:
+            length = "Content-Length: {}\r\n".format(
+                self.file_size if self.body_file is not None or self.body_parts is not None
+                else len(self._content) if getattr(self, "_content", None) else 0
+            )
+        dynamic = "Accept: {}\r\n{}".format(reqhdr.get("accept", "application/json"), length)
+
+        if self.keep_alive and LIFECYCLE.draining:
+            # Tiến trình bắt đầu drain trong lúc handler chạy
+            self.keep_alive = False
+        headers = self.headers
+        # Handler tự đặt Cache-Control (cho proxy cache) thì không gửi no-cache mặc định
+        blocks = [dynamic.encode("utf-8"),
+                  b"" if "cache-control" in headers else headerwriter.NO_CACHE,
+                  headerwriter.date_header(), headerwriter.CONNECTION[self.keep_alive]]
+
+        if headers.keys().isdisjoint(headerwriter.CORS_KEYS):
+            # Nếu có Origin thì trả lại đúng Origin, không dùng '*'
+            blocks.append(headerwriter.ANY_ORIGIN if not origin else
+                          "Access-Control-Allow-Origin: {}\r\n".format(origin).encode("utf-8"))
+            blocks.append(headerwriter.CORS_BLOCK)
+        else:
+            # Handler đã đặt một phần CORS: bổ sung phần còn thiếu
+            cors = {"Access-Control-Allow-Origin": origin or "*"}
+            cors.update(headerwriter.CORS_DEFAULTS)
+            headers = headers.copy()
+            for key, value in cors.items():
+                headers.setdefault(key, value)
 
-        fmt_header += "\r\n"
-        return fmt_header.encode("utf-8")
+        return headerwriter.render(self.status_code, self.reason, blocks, headers)
 
 
 
@@ -220,24 +454,49 @@ class Response():
     def set_header(self, key, value):
         """
         Thêm hoặc cập nhật một header cho response.
+
+        ``Set-Cookie`` is added instead of replaced, so each call sets
+        another cookie.
+        """
+        if key.lower() == 'set-cookie':
+            self.headers.add(key, value)
+        else:
+            self.headers[key] = value
+
+    def add_header(self, key, value):
+        """
+        Adds a header field, keeping the fields already set under that name.
         """
-        self.headers[key] = value
+        self.headers.add(key, value)
 
     def build_unauthorized(self):
-        body = b"401 Unauthorized"
-        response = (
-            "HTTP/1.1 401 Unauthorized\r\n"
-            "Content-Type: text/plain\r\n"
-            f"Content-Length: {len(body)}\r\n"
-            "Access-Control-Allow-Origin: *\r\n"
-            "Access-Control-Allow-Methods: GET, POST, PUT, DELETE, OPTIONS\r\n"
-            "Access-Control-Allow-Headers: Content-Type, Authorization\r\n"
-            "Connection: close\r\n"
-            "\r\n"
-        ).encode("utf-8") + body
-        return response
+        return b"".join((_UNAUTHORIZED_HEAD, headerwriter.date_header(),
+                         headerwriter.CONNECTION[self.keep_alive], headerwriter.CRLF,
+                         _UNAUTHORIZED_BODY))
+
+
+
+    def build_method_not_allowed(self, allowed):
+        """
+        Constructs a ``405 Method Not Allowed`` response listing the methods
+        the path accepts in its ``Allow`` header.
 
+        :param allowed (list): Methods registered for the path.
+        """
+        return b"".join((_NOT_ALLOWED_HEAD, headerwriter.allow_header(allowed),
+                         headerwriter.date_header(),
+                         headerwriter.CONNECTION[self.keep_alive], headerwriter.CRLF,
+                         _NOT_ALLOWED_BODY))
 
+    def build_unavailable(self, retry_after=1):
+        """
+        Constructs a ``503 Service Unavailable`` response telling the client
+        to retry after ``retry_after`` seconds. The connection is always closed.
+        """
+        return b"".join((_UNAVAILABLE_HEAD, b"Retry-After: %d\r\n" % retry_after,
+                         headerwriter.date_header(),
+                         headerwriter.CONNECTION[False], headerwriter.CRLF,
+                         _UNAVAILABLE_BODY))
 
     def build_redirect(self, location='/index.html'):
         """
@@ -257,53 +516,215 @@ class Response():
         return fmt_header + self._content
 
 
-    def build_response(self, request):
+    def build_file_response(self, request):
         """
-        Builds a full HTTP response (cho file tĩnh)
+        Builds the header of a static file response and opens the file as
+        :attr:`body_file`, to be streamed by :meth:`send_file`. The file is
+        never loaded into memory.
+
+        :rtype: bytes - The response header, or a complete 404 response.
         """
         self.request = request 
         
         if not request.method or not request.path:
-             print("[Response] Request không hợp lệ.")
+             log.debug("Request không hợp lệ.")
              return self.build_notfound()
 
         path = request.path
-        mime_type = self.get_mime_type(path)
-        print("[Response] {} path {} mime_type {}".format(request.method, request.path, mime_type))
-
-        base_dir = ""
-
-        #If HTML, parse and serve embedded objects
-        if path.endswith('.html') or mime_type == 'text/html':
-            base_dir = self.prepare_content_type(mime_type = 'text/html')
-        elif mime_type == 'text/css':
-            base_dir = self.prepare_content_type(mime_type = 'text/css')
-        elif mime_type.startswith('image/'):
-            base_dir = self.prepare_content_type(mime_type = mime_type)
-        elif mime_type == 'application/javascript' or mime_type == 'application/x-javascript':
-             base_dir = self.prepare_content_type(mime_type = 'application/javascript')
-        else:
-            print(f"[Response] Thử tìm {path} trong 'static/'")
-            base_dir = self.prepare_content_type(mime_type = mime_type)
+        entry = STATIC_CACHE.lookup(path)
+        if entry is None:
+            mime_type = self.get_mime_type(path)
+            log.debug("%s path %s mime_type %s", request.method, request.path, mime_type)
+
+            base_dir = ""
+
+            #If HTML, parse and serve embedded objects
+            if path.endswith('.html') or mime_type == 'text/html':
+                base_dir = self.prepare_content_type(mime_type = 'text/html')
+            elif mime_type == 'text/css':
+                base_dir = self.prepare_content_type(mime_type = 'text/css')
+            elif mime_type.startswith('image/'):
+                base_dir = self.prepare_content_type(mime_type = mime_type)
+            elif mime_type == 'application/javascript' or mime_type == 'application/x-javascript':
+                 base_dir = self.prepare_content_type(mime_type = 'application/javascript')
+            else:
+                log.debug("Thử tìm %s trong 'static/'", path)
+                base_dir = self.prepare_content_type(mime_type = mime_type)
 
-        c_len, self._content = self.build_content(path, base_dir)
-        
-        # Trả về 404 nếu không tìm thấy file
-        if c_len == 0 and not self._content:
-            return self.build_notfound()
+            self.file_size, self.body_file = self.open_content(path, base_dir)
+            
+            # Trả về 404 nếu không tìm thấy file
+            if self.body_file is None:
+                return self.build_notfound()
+
+            entry = STATIC_CACHE.store(path, self.body_file.name, self.body_file,
+                                       self.headers['Content-Type'])
+
+        self.headers.update(entry.headers)
+
+        # Conditional GET: trình duyệt đã có bản mới nhất
+        if entry.not_modified(request.headers or {}):
+            self.close_file()
+            STATIC_CACHE.count_not_modified()
+            return self.build_not_modified()
+
+        range_header = (request.headers or {}).get('range')
+        if range_header and request.method == 'GET':
+            if_range = request.headers.get('if-range')
+            if if_range is None or entry.if_range(if_range):
+                byte_ranges = ranges.parse_range(range_header, entry.size)
+                if byte_ranges is not None:
+                    return self.build_partial_response(entry, byte_ranges)
+
+        if entry.content is not None:
+            # File nhỏ: phục vụ từ bộ nhớ, không đụng tới đĩa
+            self.close_file()
+            self._content = entry.content
+            return self.build_response_header(request) + entry.content
+
+        if self.body_file is None:
+            # File lớn: chỉ metadata được cache, nội dung đi qua sendfile
+            try:
+                self.body_file = open(entry.filepath, 'rb')
+            except OSError:
+                return self.build_notfound()
+            self.file_size = os.fstat(self.body_file.fileno()).st_size
 
         # self._header được tạo bởi build_response_header
         self._header = self.build_response_header(request)
 
-        return self._header + self._content
+        return self._header
+
+    def build_partial_response(self, entry, byte_ranges):
+        """
+        Builds a ``206 Partial Content`` response for the requested ranges of
+        a static file, or ``416 Range Not Satisfiable`` if there are none.
+
+        The slices come from the cached content or from a read-only memory
+        map of the file, so only the requested pages are ever read. They are
+        sent after the header by :meth:`send_file`.
+
+        :param entry (CacheEntry): The static file.
+        :param byte_ranges (list): ``(first, last)`` positions from
+            :func:`ranges.parse_range`.
+        :rtype: bytes - The response header.
+        """
+        self.close_file()
+        if not byte_ranges:
+            return self.build_range_not_satisfiable(entry.size)
+
+        if entry.content is not None:
+            view = memoryview(entry.content)
+        else:
+            try:
+                with open(entry.filepath, 'rb') as f:
+                    self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                return self.build_notfound()
+            if len(self._mmap) != entry.size:
+                # File vừa bị thay đổi sau khi kiểm tra cache
+                self.close_file()
+                return self.build_notfound()
+            view = memoryview(self._mmap)
+
+        self.status_code = 206
+        self.reason = "Partial Content"
+        if len(byte_ranges) == 1:
+            start, end = byte_ranges[0]
+            self.headers['Content-Range'] = ranges.content_range(start, end, entry.size)
+            self.body_parts = [view[start:end + 1]]
+        else:
+            boundary, self.body_parts = ranges.multipart_parts(
+                view, byte_ranges, entry.size, self.headers['Content-Type'])
+            self.headers['Content-Type'] = "multipart/byteranges; boundary=" + boundary
+        view.release()
+        self.file_size = sum(len(part) for part in self.body_parts)
+        return self.build_response_header(self.request)
+
+    def build_range_not_satisfiable(self, size):
+        """
+        Constructs a ``416 Range Not Satisfiable`` response.
+
+        :param size (int): Size of the file the ranges were checked against.
+        """
+        self.status_code = 416
+        self.reason = "Range Not Satisfiable"
+        self.headers['Content-Range'] = "bytes */{}".format(size)
+        self._content = b""
+        return self.build_response_header(self.request)
+
+    def close_file(self):
+        """Closes :attr:`body_file` (or the memory map of :attr:`body_parts`,
+        or :attr:`body_stream`) without sending it."""
+        stream, self.body_stream = self.body_stream, None
+        if stream is not None:
+            streaming.close(stream)
+        f, self.body_file = self.body_file, None
+        if f is not None:
+            f.close()
+        parts, self.body_parts = self.body_parts, None
+        for part in parts or ():
+            if isinstance(part, memoryview):
+                part.release()
+        mm, self._mmap = self._mmap, None
+        if mm is not None:
+            mm.close()
+
+    def build_not_modified(self):
+        """
+        Constructs a ``304 Not Modified`` response (header only).
+        """
+        self.status_code = 304
+        self.reason = "Not Modified"
+        self._content = b""
+        return self.build_response_header(self.request)
+
+    def build_response(self, request):
+        """
+        Builds a full HTTP response (cho file tĩnh)
+        """
+        header = self.build_file_response(request)
+        if self.body_parts is not None:
+            self._content = b"".join(self.body_parts)
+            self.close_file()
+            return header + self._content
+
+        f, self.body_file = self.body_file, None
+        if f is None:
+            return header
+
+        with f:
+            self._content = f.read(self.file_size)
+        return header + self._content
     
+    def compress_content(self):
+        """
+        Compresses :attr:`_content` with the coding negotiated from the
+        request's ``Accept-Encoding``, if the body is at least
+        :data:`compression.MIN_SIZE` bytes. Adds ``Vary: Accept-Encoding``
+        to every response whose representation depends on it.
+        """
+        if not self._content or len(self._content) < compression.MIN_SIZE:
+            return
+
+        self.headers['Vary'] = 'Accept-Encoding'
+        reqhdr = getattr(self.request, "headers", None) or {}
+        encoding = compression.negotiate(reqhdr.get('accept-encoding'))
+        if encoding is None:
+            return
+
+        self._content = compression.compress(self._content, encoding)
+        self.headers['Content-Encoding'] = encoding
+
     def build_json_response(self, body_str, status_code=200, reason="OK"):
+        started = perf_counter() if METRICS.enabled else None
         self.status_code = status_code
         self.reason = reason
         self.headers['Content-Type'] = 'application/json'
 
         # body_str là một chuỗi JSON đã được .dumps()
         self._content = body_str.encode('utf-8')
+        self.compress_content()
         
         # Gán request (nếu có) để build_response_header
         # Đảm bảo self.request đã được gán trước khi gọi hàm này
@@ -311,4 +732,51 @@ class Response():
         # Gọi hàm build_response_header để tạo header chuẩn
         fmt_header = self.build_response_header(self.request) 
 
-        return fmt_header + self._content
\ No newline at end of file
+        if started is not None:
+            self.serialize_time += perf_counter() - started
+        return fmt_header + self._content
+
+    def build_stream(self, chunks, content_type=None, status_code=200, reason="OK"):
+        """
+        Constructs the header of a streamed response. Its body is sent after
+        the header by :meth:`send_stream`, chunk by chunk as ``chunks``
+        produces them, with ``Transfer-Encoding: chunked`` (HTTP/1.0: until
+        the connection closes).
+
+        A handler may also return the iterator itself, which is passed here.
+
+        :param chunks (iterable or async iterable): Body chunks, ``bytes`` or ``str``.
+        :param content_type (str): Content type; ``application/octet-stream``
+            unless the handler set one.
+        :rtype: bytes - The response header.
+        """
+        self.status_code = status_code
+        self.reason = reason
+        if content_type is not None:
+            self.headers['Content-Type'] = content_type
+        else:
+            self.headers.setdefault('Content-Type', 'application/octet-stream')
+        self._content = b""
+        self.body_stream = chunks
+        if not self.chunked:
+            self.keep_alive = False
+        return self.build_response_header(self.request)
+
+    def build_event_stream(self, events):
+        """
+        Constructs a ``text/event-stream`` (Server-Sent Events) response;
+        each item of ``events`` is encoded by :func:`streaming.sse_event`
+        (None sends a heartbeat). The stream ends after the current event
+        once the process drains.
+
+        :param events (iterable or async iterable): The events.
+        :rtype: bytes - The response header.
+        """
+        # Proxy (nginx) không được gom các sự kiện lại
+        self.headers['X-Accel-Buffering'] = 'no'
+        return self.build_stream(streaming.event_stream(events),
+                                 "text/event-stream; charset=utf-8")
+
+
+#: Responses reused by the adapters of this worker process.
+POOL = ObjectPool(Response)
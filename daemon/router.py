@@ -0,0 +1,281 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.router
+~~~~~~~~~~~~~~~~~
+
+This module provides the compiled route table of WeApRous.
+
+:class:`Router <Router>` is still the ``{(METHOD, path): handler}`` dict the
+rest of the daemon passes around, but every route is also compiled when it
+is registered:
+
+- paths without parameters go into a plain dict, ``path -> {method: handler}``;
+- paths with parameters (``/peers/<peer_id>``, ``/files/<int:size>``,
+  ``/static/<path:rest>``) go into a tree with one level per path segment.
+
+A lookup is therefore one dict probe for fixed paths, and one probe per path
+segment for parameterised ones, whatever the number of routes. A fixed path
+that lacks the request method still falls through to the tree, so
+``POST /users/new`` does not hide ``GET /users/<name>``. Removing routes
+(``del``, ``pop``...) removes them from both as well.
+
+Supported converters: ``str`` (default, one non-empty segment), ``int``,
+``float`` and ``path`` (the rest of the path, slashes included; last segment only).
+
+Usage Example:
+--------------
+>>> router = Router()
+>>> router[("GET", "/peers/<int:peer_id>")] = get_peer
+>>> router.match("GET", "/peers/7")
+(get_peer, {'peer_id': 7}, None)
+>>> router.match("DELETE", "/peers/7")
+(None, {}, ['GET'])
+"""
+
+import math
+from urllib.parse import unquote
+
+_MISSING = object()
+
+
+def _to_int(value):
+    if not value.isdigit():
+        raise ValueError(value)
+    return int(value)
+
+
+def _to_float(value):
+    number = float(value)
+    # float() còn nhận "nan", "inf", "-infinity"
+    if not math.isfinite(number):
+        raise ValueError(value)
+    return number
+
+
+#: Converters of typed path parameters, ``<name>`` uses ``str``.
+CONVERTERS = {
+    "str": str,
+    "int": _to_int,
+    "float": _to_float,
+    "path": str,
+}
+
+
+class _Node:
+    """One path segment of the parameterised route tree."""
+
+    __slots__ = ("literals", "params", "catchall", "methods", "routes")
+
+    def __init__(self):
+        #: segment text -> child node
+        self.literals = {}
+        #: [(converter, name, child node)], tried in registration order
+        self.params = []
+        #: (name, node) of a trailing ``<path:name>`` parameter
+        self.catchall = None
+        #: method -> handler of a route ending at this node
+        self.methods = {}
+        #: method -> path the route was registered with
+        self.routes = {}
+
+
+class Router(dict):
+    """The :class:`Router <Router>` of a WeApRous app: a ``(METHOD, path) ->
+    handler`` dict that compiles each route as it is added.
+    """
+
+    def __init__(self, routes=None):
+        super().__init__()
+        self._static = {}
+        self._root = _Node()
+        if routes:
+            self.update(routes)
+
+    def __setitem__(self, key, handler):
+        method, path = key
+        if "<" not in path:
+            self._static.setdefault(path, {})[method] = handler
+        else:
+            node = self._compile(path)
+            node.methods[method] = handler
+            node.routes[method] = path
+        super().__setitem__(key, handler)
+
+    def update(self, routes=(), **kwargs):
+        items = routes.items() if hasattr(routes, "items") else routes
+        for key, handler in items:
+            self[key] = handler
+
+    def __ior__(self, routes):
+        self.update(routes)
+        return self
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._forget(key)
+
+    def pop(self, key, default=_MISSING):
+        if key in self:
+            handler = super().pop(key)
+            self._forget(key)
+            return handler
+        if default is _MISSING:
+            raise KeyError(key)
+        return default
+
+    def popitem(self):
+        key, handler = super().popitem()
+        self._forget(key)
+        return key, handler
+
+    def setdefault(self, key, handler=None):
+        if key not in self:
+            self[key] = handler
+        return super().__getitem__(key)
+
+    def clear(self):
+        super().clear()
+        self._static = {}
+        self._root = _Node()
+
+    def _forget(self, key):
+        method, path = key
+        if "<" not in path:
+            methods = self._static[path]
+            del methods[method]
+            if not methods:
+                del self._static[path]
+        else:
+            # Route đã được đăng ký nên _compile chỉ đi lại các nút có sẵn
+            node = self._compile(path)
+            del node.methods[method]
+            del node.routes[method]
+
+    def _compile(self, path):
+        node = self._root
+        segments = path.strip("/").split("/")
+        for i, segment in enumerate(segments):
+            if not (segment.startswith("<") and segment.endswith(">")):
+                node = node.literals.setdefault(segment, _Node())
+                continue
+
+            conv, _, name = segment[1:-1].rpartition(":")
+            conv = conv or "str"
+            if conv not in CONVERTERS:
+                raise ValueError("Unknown converter {!r} in route {}".format(conv, path))
+            if conv == "path":
+                if i != len(segments) - 1:
+                    raise ValueError("<path:...> must be the last segment of " + path)
+                if node.catchall is None:
+                    node.catchall = (name, _Node())
+                return node.catchall[1]
+
+            for c, n, child in node.params:
+                if c is CONVERTERS[conv] and n == name:
+                    node = child
+                    break
+            else:
+                child = _Node()
+                node.params.append((CONVERTERS[conv], name, child))
+                node = child
+        return node
+
+    def _walk(self, node, segments, i, params, method):
+        if i == len(segments):
+            return node if method in node.methods else None
+
+        segment = segments[i]
+        child = node.literals.get(segment)
+        if child is not None:
+            found = self._walk(child, segments, i + 1, params, method)
+            if found is not None:
+                return found
+
+        if segment:
+            for conv, name, child in node.params:
+                try:
+                    params[name] = conv(unquote(segment))
+                except ValueError:
+                    continue
+                found = self._walk(child, segments, i + 1, params, method)
+                if found is not None:
+                    return found
+                del params[name]
+
+        if node.catchall is not None and method in node.catchall[1].methods:
+            name, child = node.catchall
+            params[name] = unquote("/".join(segments[i:]))
+            return child
+        return None
+
+    def _allowed(self, node, segments, i, methods):
+        # Như _walk nhưng gom phương thức của mọi route khớp đường dẫn (405)
+        if i == len(segments):
+            methods.update(node.methods)
+            return
+
+        segment = segments[i]
+        child = node.literals.get(segment)
+        if child is not None:
+            self._allowed(child, segments, i + 1, methods)
+
+        if segment:
+            for conv, name, child in node.params:
+                try:
+                    conv(unquote(segment))
+                except ValueError:
+                    continue
+                self._allowed(child, segments, i + 1, methods)
+
+        if node.catchall is not None:
+            methods.update(node.catchall[1].methods)
+
+    def match(self, method, path):
+        """
+        Finds the handler of a request.
+
+        :param method (str): The request method.
+        :param path (str): The request path, without the query string.
+
+        :rtype: tuple - (handler, path parameters, allowed methods). The handler
+            is None if nothing matches; allowed methods is then the sorted list
+            of methods the path does accept (answer ``405``), or None if the
+            path is not routed at all.
+        """
+        return self.lookup(method, path)[:3]
+
+    def lookup(self, method, path):
+        """
+        Like :meth:`match`, also returning the path the matched route was
+        registered with (``/peers/<peer_id>``), which labels its metrics.
+        One handler registered on several paths gets the label of each.
+
+        :rtype: tuple - (handler, path parameters, allowed methods, route);
+            route is None if nothing matches.
+        """
+        static = self._static.get(path)
+        if static is not None:
+            handler = static.get(method)
+            if handler is not None:
+                return handler, {}, None, path
+
+        params = {}
+        segments = path.strip("/").split("/")
+        node = self._walk(self._root, segments, 0, params, method)
+        if node is not None:
+            return node.methods[method], params, None, node.routes[method]
+
+        allowed = set(static or ())
+        self._allowed(self._root, segments, 0, allowed)
+        return None, {}, sorted(allowed) if allowed else None, None
@@ -0,0 +1,226 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.staticcache
+~~~~~~~~~~~~~~~~~
+
+This module provides a size-bounded LRU cache of static assets for
+:class:`Response <Response>`. An entry keeps everything a repeat hit needs:
+the resolved file path, its content (for small files), the response headers
+(``Content-Type``, ``ETag``, ``Last-Modified``) and the validators used to
+answer conditional requests with ``304 Not Modified``.
+
+Entries are checked against ``os.stat`` on every hit and dropped as soon as
+the file's mtime or size changes.
+
+Usage Example:
+--------------
+>>> cache = StaticCache(max_bytes=32 * 1024 * 1024)
+>>> entry = cache.lookup("/index.html")
+>>> cache.stats()
+{'entries': 1, 'bytes': 2048, 'hits': 10, 'misses': 1, ...}
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+
+#: Total bytes of file content kept in memory.
+MAX_BYTES = 32 * 1024 * 1024
+#: Files larger than this are cached without content (streamed with sendfile).
+MAX_ENTRY_SIZE = 1024 * 1024
+
+
+class CacheEntry:
+    """One cached static asset."""
+
+    __slots__ = ("filepath", "mtime_ns", "size", "content", "headers",
+                 "etag", "mtime")
+
+    def __init__(self, filepath, st, content_type, content=None):
+        self.filepath = filepath
+        self.mtime_ns = st.st_mtime_ns
+        self.size = st.st_size
+        #: File content, or None if the file is too large to keep in memory.
+        self.content = content
+        #: Whole seconds of the mtime, the resolution of ``Last-Modified``.
+        self.mtime = int(st.st_mtime)
+        self.etag = '"{:x}-{:x}"'.format(st.st_mtime_ns, st.st_size)
+        #: Response headers rendered once for every hit.
+        self.headers = {
+            "Content-Type": content_type,
+            "ETag": self.etag,
+            "Last-Modified": formatdate(self.mtime, usegmt=True),
+            "Accept-Ranges": "bytes",
+        }
+
+    def fresh(self):
+        """
+        Checks the entry against the file on disk.
+
+        :rtype: bool - False if the file changed or disappeared.
+        """
+        try:
+            st = os.stat(self.filepath)
+        except OSError:
+            return False
+        return st.st_mtime_ns == self.mtime_ns and st.st_size == self.size
+
+    def not_modified(self, headers):
+        """
+        Evaluates ``If-None-Match`` / ``If-Modified-Since`` against the entry.
+
+        :param headers (dict): Request headers (lowercase keys).
+        :rtype: bool - True if a ``304 Not Modified`` can be sent.
+        """
+        if_none_match = headers.get("if-none-match")
+        if if_none_match is not None:
+            if if_none_match.strip() == "*":
+                return True
+            # So sánh yếu: bỏ tiền tố W/
+            tags = (t.strip() for t in if_none_match.split(","))
+            return any((t[2:] if t.startswith("W/") else t) == self.etag for t in tags)
+
+        if_modified_since = headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+            return self.mtime <= since
+        return False
+
+    def if_range(self, value):
+        """
+        Evaluates an ``If-Range`` validator against the entry.
+
+        :param value (str): Value of the ``If-Range`` header.
+        :rtype: bool - True if the ``Range`` header may be honoured.
+        """
+        value = value.strip()
+        if value.startswith('"') or value.startswith("W/"):
+            # If-Range chỉ dùng so sánh mạnh: ETag yếu không bao giờ khớp
+            return value == self.etag
+        try:
+            return parsedate_to_datetime(value).timestamp() == self.mtime
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return False
+
+
+class StaticCache:
+    """A thread-safe LRU :class:`StaticCache <StaticCache>` keyed by request path.
+
+    :param max_bytes (int): Total content bytes kept in memory.
+    :param max_entry_size (int): Largest file whose content is cached.
+    """
+
+    def __init__(self, max_bytes=MAX_BYTES, max_entry_size=MAX_ENTRY_SIZE):
+        self.max_bytes = max_bytes
+        self.max_entry_size = max_entry_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        #: Counters reported by :meth:`stats`.
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.not_modified = 0
+
+    def lookup(self, path):
+        """
+        Returns the fresh entry cached for a request path.
+
+        :param path (str): The request path.
+        :rtype: CacheEntry or None
+        """
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                self._entries.move_to_end(path)
+
+        if entry is not None and not entry.fresh():
+            with self._lock:
+                if self._entries.get(path) is entry:
+                    self._remove(path)
+                    self.invalidations += 1
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def store(self, path, filepath, f, content_type):
+        """
+        Caches the file just opened for a request path.
+
+        :param path (str): The request path.
+        :param filepath (str): Resolved path of the file on disk.
+        :param f (file): The open file, positioned at its start.
+        :param content_type (str): ``Content-Type`` of the file.
+        :rtype: CacheEntry
+        """
+        st = os.fstat(f.fileno())
+        content = None
+        if st.st_size <= self.max_entry_size:
+            content = f.read(st.st_size)
+            f.seek(0)
+        entry = CacheEntry(filepath, st, content_type, content)
+
+        with self._lock:
+            if path in self._entries:
+                self._remove(path)
+            self._entries[path] = entry
+            self._bytes += len(content) if content else 0
+            # Loại bỏ mục ít dùng nhất đến khi vừa giới hạn
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return entry
+
+    def count_not_modified(self):
+        """Counts a request answered with ``304 Not Modified``."""
+        with self._lock:
+            self.not_modified += 1
+
+    def clear(self):
+        """Drops every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Returns a snapshot of the cache counters.
+
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "not_modified": self.not_modified,
+            }
+
+    def _remove(self, path):
+        entry = self._entries.pop(path)
+        self._bytes -= len(entry.content) if entry.content else 0
@@ -0,0 +1,212 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.streaming
+~~~~~~~~~~~~~~~~~
+
+This module provides the building blocks of streamed responses, whose body a
+handler produces chunk by chunk (see :meth:`Response.build_stream`):
+
+- :func:`encode_chunk` frames one chunk for ``Transfer-Encoding: chunked``;
+- :func:`sse_event` encodes one Server-Sent Event (``text/event-stream``);
+- :func:`iterate` and :func:`aiterate` walk a stream from a thread or from the
+  event loop, whether the handler gave a plain or an async iterator.
+
+A chunk is ``bytes`` (or any bytes-like object) or ``str``, encoded as UTF-8.
+Empty chunks are skipped: a zero-length chunk would end the body.
+
+Usage Example:
+--------------
+>>> encode_chunk(b"hello")
+b'5\\r\\nhello\\r\\n'
+>>> sse_event({"event": "peer", "data": "joined", "id": 7})
+b'event: peer\\nid: 7\\ndata: joined\\n\\n'
+"""
+
+import asyncio
+import json
+
+from .eventloop import HANDLER_LOOP
+from .lifecycle import LIFECYCLE
+
+#: End of a chunked body (last chunk, no trailers).
+LAST_CHUNK = b"0\r\n\r\n"
+#: Comment line keeping an idle event stream (and the proxies on its way) open.
+HEARTBEAT = b":\n\n"
+
+_DONE = object()
+
+
+def as_bytes(chunk):
+    """
+    Converts a chunk produced by a handler to bytes.
+
+    :param chunk (bytes or str): The chunk.
+    :rtype: bytes-like
+    """
+    if isinstance(chunk, str):
+        return chunk.encode("utf-8")
+    return chunk
+
+
+def encode_chunk(chunk):
+    """
+    Frames one chunk of a ``Transfer-Encoding: chunked`` body.
+
+    :param chunk (bytes or str): The chunk.
+    :rtype: bytes - Empty for an empty chunk.
+    """
+    data = as_bytes(chunk)
+    if not data:
+        return b""
+    return b"".join((b"%x\r\n" % len(data), data, b"\r\n"))
+
+
+def sse_event(item):
+    """
+    Encodes one Server-Sent Event.
+
+    :param item: ``str``/``bytes`` data; a dict with ``data`` (a non-string
+        is sent as JSON), ``event``, ``id``, ``retry`` and ``comment`` fields;
+        or None for a :data:`HEARTBEAT`.
+    :rtype: bytes
+    """
+    if item is None:
+        return HEARTBEAT
+    if not isinstance(item, dict):
+        item = {"data": item}
+
+    lines = []
+    if item.get("comment") is not None:
+        lines.append(": " + str(item["comment"]))
+    for field in ("event", "id", "retry"):
+        if item.get(field) is not None:
+            # Xuống dòng trong giá trị sẽ cắt ngang sự kiện
+            lines.append("{}: {}".format(field, str(item[field]).replace("\n", " ")))
+    data = item.get("data")
+    if data is not None:
+        if isinstance(data, (bytes, bytearray)):
+            data = data.decode("utf-8")
+        elif not isinstance(data, str):
+            data = json.dumps(data)
+        # Mỗi dòng của data là một trường data: riêng
+        lines.extend("data: " + line for line in
+                     data.replace("\r\n", "\n").replace("\r", "\n").split("\n"))
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+def event_stream(events):
+    """
+    Encodes a stream of events with :func:`sse_event`. The stream ends after
+    the current event once the process drains, so clients reconnect to
+    another process instead of holding this one.
+
+    :param events (iterable or async iterable): Items for :func:`sse_event`.
+    :rtype: iterator or async iterator of bytes
+    """
+    if hasattr(events, "__aiter__"):
+        return _async_event_stream(events)
+    return _event_stream(events)
+
+
+def _event_stream(events):
+    for item in events:
+        yield sse_event(item)
+        if LIFECYCLE.draining:
+            break
+
+
+async def _async_event_stream(events):
+    async for item in events:
+        yield sse_event(item)
+        if LIFECYCLE.draining:
+            break
+
+
+def iterate(chunks):
+    """
+    Iterates a stream from a thread. An async iterable is driven on
+    :data:`HANDLER_LOOP <daemon.eventloop.HANDLER_LOOP>`, so ``async def``
+    generators also work with the threaded engines, on the same loop as the
+    async handlers.
+
+    :param chunks (iterable or async iterable): The stream.
+    :rtype: iterator
+    """
+    if hasattr(chunks, "__aiter__"):
+        return _iterate_async(chunks)
+    return iter(chunks)
+
+
+def _iterate_async(chunks):
+    it = chunks.__aiter__()
+    try:
+        while True:
+            try:
+                yield HANDLER_LOOP.run(it.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        aclose = getattr(it, "aclose", None)
+        if aclose is not None:
+            HANDLER_LOOP.run(aclose())
+
+
+async def aiterate(chunks):
+    """
+    Iterates a stream on the event loop. A plain iterator is advanced in the
+    loop's executor, one chunk at a time, so a generator that blocks (a
+    queue, a database cursor) never stalls the loop.
+
+    :param chunks (iterable or async iterable): The stream.
+    :rtype: async iterator
+    """
+    if hasattr(chunks, "__aiter__"):
+        it = chunks.__aiter__()
+        try:
+            async for chunk in it:
+                yield chunk
+        finally:
+            aclose = getattr(it, "aclose", None)
+            if aclose is not None:
+                await aclose()
+        return
+
+    loop = asyncio.get_running_loop()
+    it = iter(chunks)
+    try:
+        while True:
+            chunk = await loop.run_in_executor(None, next, it, _DONE)
+            if chunk is _DONE:
+                return
+            yield chunk
+    finally:
+        close(it)
+
+
+def close(chunks):
+    """
+    Closes a stream that was not (or not fully) consumed, so the ``finally``
+    blocks of a generator run. Async generators are left to the garbage
+    collector; :func:`aiterate` and :func:`iterate` close them themselves.
+
+    :param chunks: The stream.
+    """
+    close = getattr(chunks, "close", None)
+    if close is None:
+        return
+    try:
+        close()
+    except ValueError:
+        # Generator vẫn đang chạy trong executor: nó tự kết thúc ở chunk sau
+        pass
@@ -0,0 +1,563 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.upstream
+~~~~~~~~~~~~~~~~~
+
+This module provides the persistent connections the proxy forwards requests
+on. Every backend address has an :class:`UpstreamPool <UpstreamPool>` of idle
+keep-alive connections: a request checks one out, sends the request with
+``Connection: keep-alive``, reads exactly one response - framed by its
+``Content-Length`` or chunked coding instead of by the backend closing the
+socket - and puts the connection back.
+
+A connection is not reused:
+
+- once it has been idle for :data:`IDLE_TIMEOUT` seconds, shorter than the
+  backend's own ``keepalive_timeout``, so the backend never closes it under
+  a request;
+- once it is :data:`MAX_LIFETIME` seconds old;
+- if the checkout check finds it closed by the backend, or holding bytes
+  nobody asked for;
+- if the response says ``Connection: close`` or runs until EOF.
+
+A request failing on a reused connection before any byte of the response
+arrived is retried once on a new connection, if its method is idempotent.
+
+:meth:`UpstreamPool.relay` streams instead of buffering: the response is
+passed on to the client as it arrives, through a :class:`RelayBuffer
+<RelayBuffer>` taken from :data:`BUFFERS`, and a large request body is read
+from the client while it is sent. Memory per request stays under
+:data:`RELAY_BUFFER` bytes whatever the size of either body. A streamed
+request body cannot be sent twice, so it goes on a new connection and is not
+retried.
+
+Usage Example:
+--------------
+>>> pool = upstream_pool("127.0.0.1", 9000)
+>>> response = pool.forward(b"GET / HTTP/1.1\\r\\nHost: app1.local\\r\\n\\r\\n")
+>>> buffer = BUFFERS.acquire()
+>>> head = pool.relay(request_head, b"", client.sendall, buffer)
+>>> BUFFERS.release(buffer)
+"""
+
+import re
+import socket
+import threading
+from functools import partial
+from time import monotonic
+
+from .framing import ConnReader, BodyDecoder, BodyReader, FramingError, response_framing
+from .logger import get_logger
+from .objectpool import ObjectPool
+
+log = get_logger(__name__)
+
+#: Seconds allowed to connect to a backend server (see
+#: ``daemon.proxy.UPSTREAM_CONNECT_TIMEOUT``).
+CONNECT_TIMEOUT = 1.0
+#: Seconds a backend server may stay silent while the request is sent or the
+#: response received.
+TIMEOUT = 30
+#: Idle connections kept per backend.
+MAX_IDLE = 32
+#: Seconds an idle connection is kept; below the backend's keepalive_timeout (5s).
+IDLE_TIMEOUT = 4.0
+#: Seconds after which a connection is closed instead of reused.
+MAX_LIFETIME = 60.0
+#: Size of a single ``recv`` on a backend connection.
+RECV_SIZE = 64 * 1024
+#: Largest response body read from a backend.
+MAX_RESPONSE_SIZE = 1 << 30
+#: Size of a relay buffer: the most bytes of a streamed body held at once.
+RELAY_BUFFER = 64 * 1024
+#: Idle relay buffers kept for the next requests.
+MAX_IDLE_BUFFERS = 64
+#: Methods retried on a new connection when a reused one turns out dead.
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"])
+
+#: Hop-by-hop request headers replaced on the way to the backend.
+_HOP_BY_HOP = re.compile(rb"\r\n(?:connection|keep-alive|proxy-connection|expect):[^\r]*",
+                         re.IGNORECASE)
+#: Hop-by-hop response headers replaced on the way to the client.
+_RESPONSE_HOP_BY_HOP = re.compile(rb"\r\n(?:connection|keep-alive):[^\r]*", re.IGNORECASE)
+_CONNECTION = re.compile(rb"\r\nconnection:[ \t]*([^\r]*)", re.IGNORECASE)
+
+
+class StaleConnection(ConnectionError):
+    """A reused connection failed before any byte of the response arrived."""
+
+
+class ConnectFailed(ConnectionError):
+    """The backend could not be reached; nothing of the request was sent."""
+
+
+class DownstreamError(ConnectionError):
+    """The client side failed while a request was relayed: its body could
+    not be read, or the response could not be sent to it. The original
+    error is the ``__cause__``."""
+
+
+class RelayBuffer:
+    """Reusable buffer the bodies of one relayed request go through.
+
+    :param size (int): Size of the buffer.
+    """
+
+    __slots__ = ("view",)
+
+    def __init__(self, size=RELAY_BUFFER):
+        self.view = memoryview(bytearray(size))
+
+    def reset(self):
+        # Không cần xoá: lần relay sau ghi đè lên
+        pass
+
+
+#: Relay buffers shared by the threads of this process.
+BUFFERS = ObjectPool(RelayBuffer, MAX_IDLE_BUFFERS)
+
+
+def _to_client(send, data):
+    try:
+        send(data)
+    except OSError as e:
+        raise DownstreamError(str(e)) from e
+
+
+class UpstreamConnection:
+    """One connection to a backend server.
+
+    :param address (tuple): (host, port) of the backend.
+    :param timeout (float): Seconds allowed to connect.
+    """
+
+    __slots__ = ("sock", "created", "idle_since", "requests")
+
+    def __init__(self, address, timeout=CONNECT_TIMEOUT):
+        self.sock = socket.create_connection(address, timeout)
+        # Request nhỏ đi ngay, không chờ Nagle gộp gói
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.created = self.idle_since = monotonic()
+        #: Responses read on this connection so far.
+        self.requests = 0
+
+    def expired(self, now, idle_timeout, max_lifetime):
+        """Whether the connection is too old, or was idle too long, to be reused."""
+        return now - self.idle_since >= idle_timeout or now - self.created >= max_lifetime
+
+    def alive(self):
+        """
+        Checks, without blocking, that the backend has neither closed the
+        connection nor sent anything while it was idle.
+
+        :rtype: bool
+        """
+        sock = self.sock
+        try:
+            sock.setblocking(False)
+            try:
+                sock.recv(1, socket.MSG_PEEK)
+            finally:
+                sock.setblocking(True)
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+        # b"" là backend đã đóng; có dữ liệu là lệch khung, không dùng được
+        return False
+
+    def exchange(self, request, method, timeout=TIMEOUT):
+        """
+        Sends one request and reads its response.
+
+        :param request (bytes): The complete request.
+        :param method (str): Its method (a ``HEAD`` response has no body).
+        :param timeout (float): Seconds the backend may stay silent.
+
+        :rtype: tuple - (raw response, whether the connection can be reused).
+        :raise: StaleConnection if a reused connection failed before the
+            response started; socket.timeout, OSError or FramingError otherwise.
+        """
+        sock = self.sock
+        sock.settimeout(timeout)
+        reader = ConnReader(partial(sock.recv, RECV_SIZE))
+        try:
+            sock.sendall(request)
+            head = reader.read_head()
+            # Bỏ qua các response 1xx tạm thời (100 Continue...)
+            while head is not None and head[9:10] == b"1" and head[9:12] != b"101":
+                head = reader.read_head()
+        except socket.timeout:
+            raise
+        except OSError as e:
+            if self.requests and not reader.buf:
+                raise StaleConnection(str(e)) from e
+            raise
+        if head is None:
+            if self.requests and not reader.buf:
+                raise StaleConnection("closed by the backend")
+            raise FramingError(502, "Bad Gateway", "incomplete response head")
+        self.requests += 1
+
+        length, chunked = response_framing(head, method)
+        parts = [head]
+        if length is None:
+            # Không có Content-Length/chunked: body kéo dài tới khi backend đóng
+            while True:
+                data = reader.take() or reader.recv()
+                if not data:
+                    return b"".join(parts), False
+                parts.append(data)
+
+        decoder = BodyDecoder(length, chunked, MAX_RESPONSE_SIZE)
+        while not decoder.done:
+            data = reader.take() or reader.recv()
+            if not data:
+                raise FramingError(502, "Bad Gateway", "incomplete response body")
+            _, leftover = decoder.feed(data)
+            parts.append(data[:len(data) - len(leftover)] if leftover else data)
+            reader.unread(leftover)
+        # Byte thừa sau response: kết nối lệch khung, không dùng lại
+        return b"".join(parts), not reader.buf and keeps_alive(head)
+
+    def relay(self, head, body, method, send, buffer, timeout=TIMEOUT):
+        """
+        Sends one request and passes its response on as it arrives: the head
+        together with whatever of the body came with it, then the rest of
+        the body one ``buffer`` at a time.
+
+        :param head (bytes): The request head.
+        :param body (bytes or iterable): The complete request body, or an
+            iterable of its pieces, read from the client as they are sent.
+        :param method (str): Its method (a ``HEAD`` response has no body).
+        :param send (callable): Sends bytes to the client.
+        :param buffer (RelayBuffer): Buffer of this request.
+        :param timeout (float): Seconds the backend may stay silent.
+
+        :rtype: tuple - (response head, whether the connection can be reused).
+        :raise: StaleConnection if a reused connection failed before the
+            response started and the body was given complete;
+            DownstreamError if reading the request body from the client or
+            sending it the response failed; socket.timeout, OSError or
+            FramingError otherwise.
+        """
+        sock = self.sock
+        sock.settimeout(timeout)
+        reader = ConnReader(partial(sock.recv, RECV_SIZE))
+        complete = isinstance(body, bytes)
+        try:
+            if complete:
+                sock.sendall(head + body if body else head)
+            else:
+                sock.sendall(head)
+                pieces = iter(body)
+                while True:
+                    try:
+                        piece = next(pieces, None)
+                    except (FramingError, OSError) as e:
+                        raise DownstreamError(str(e)) from e
+                    if piece is None:
+                        break
+                    sock.sendall(piece)
+            response = reader.read_head()
+            while response is not None and response[9:10] == b"1" and response[9:12] != b"101":
+                response = reader.read_head()
+        except (socket.timeout, DownstreamError):
+            raise
+        except OSError as e:
+            if complete and self.requests and not reader.buf:
+                raise StaleConnection(str(e)) from e
+            raise
+        if response is None:
+            if complete and self.requests and not reader.buf:
+                raise StaleConnection("closed by the backend")
+            raise FramingError(502, "Bad Gateway", "incomplete response head")
+        self.requests += 1
+
+        length, chunked = response_framing(response, method)
+        view = buffer.view
+        if length is None:
+            # Không có Content-Length/chunked: chuyển tiếp tới khi backend đóng
+            _to_client(send, response + reader.take())
+            while True:
+                n = sock.recv_into(view)
+                if not n:
+                    return response, False
+                _to_client(send, view[:n])
+
+        decoder = BodyDecoder(length, chunked, MAX_RESPONSE_SIZE)
+        data = reader.take()
+        _, leftover = decoder.feed(data)
+        if leftover:
+            reader.unread(leftover)
+            data = data[:len(data) - len(leftover)]
+        # Head và phần body đã nhận đi chung một lần gửi
+        _to_client(send, response + data)
+        if not decoder.done:
+            for piece in BodyReader(reader, decoder).relay(view, sock.recv_into):
+                _to_client(send, piece)
+        return response, not reader.buf and keeps_alive(response)
+
+    def close(self):
+        self.sock.close()
+
+
+class UpstreamPool:
+    """Idle keep-alive connections to one backend server.
+
+    Connections are handed out newest first, so the oldest ones expire when
+    traffic drops instead of all being kept barely alive.
+
+    :param address (tuple): (host, port) of the backend.
+    :param max_idle (int): Most idle connections kept; 0 disables reuse.
+    :param idle_timeout (float): Seconds an idle connection is kept.
+    :param max_lifetime (float): Seconds a connection is reused for.
+    """
+
+    def __init__(self, address, max_idle=MAX_IDLE, idle_timeout=IDLE_TIMEOUT,
+                 max_lifetime=MAX_LIFETIME):
+        self.address = address
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self._idle = []
+        self._lock = threading.Lock()
+        #: Connections opened because no idle one was usable.
+        self.created = 0
+        #: Requests sent on an idle connection.
+        self.reused = 0
+        #: Idle connections dropped by the checkout check.
+        self.discarded = 0
+        #: Requests being forwarded right now (read by the ``least-conn``
+        #: and ``random-two`` balancing policies).
+        self.active = 0
+
+    def acquire(self, connect_timeout=CONNECT_TIMEOUT):
+        """
+        Takes a usable idle connection, or opens one.
+
+        :rtype: UpstreamConnection
+        :raise: ConnectFailed if the backend cannot be reached.
+        """
+        now = monotonic()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn = self._idle.pop()
+            if not conn.expired(now, self.idle_timeout, self.max_lifetime) and conn.alive():
+                self.reused += 1
+                return conn
+            self.discarded += 1
+            conn.close()
+        return self.connect(connect_timeout)
+
+    def connect(self, connect_timeout=CONNECT_TIMEOUT):
+        """
+        Opens a new connection, bypassing the idle ones.
+
+        :rtype: UpstreamConnection
+        :raise: ConnectFailed if the backend cannot be reached.
+        """
+        self.created += 1
+        try:
+            return UpstreamConnection(self.address, connect_timeout)
+        except OSError as e:
+            raise ConnectFailed("{}:{}: {}".format(self.address[0], self.address[1], e)) from e
+
+    def release(self, conn, reusable=True):
+        """
+        Gives a connection back after its response was read completely.
+
+        :param conn (UpstreamConnection): Connection from :meth:`acquire`.
+        :param reusable (bool): False to close it instead.
+        """
+        now = monotonic()
+        conn.idle_since = now
+        stale = []
+        if reusable and now - conn.created < self.max_lifetime:
+            with self._lock:
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(conn)
+                    conn = None
+                # Kết nối cũ nhất nằm ở đáy: dọn những cái đã hết hạn
+                while self._idle and now - self._idle[0].idle_since >= self.idle_timeout:
+                    stale.append(self._idle.pop(0))
+        if conn is not None:
+            stale.append(conn)
+        for c in stale:
+            c.close()
+
+    def forward(self, request, method=None, connect_timeout=CONNECT_TIMEOUT, timeout=TIMEOUT):
+        """
+        Sends a request to the backend on a pooled connection and reads the
+        response.
+
+        :param request (bytes): The complete request, prepared by :func:`upstream_request`.
+        :param method (str): Its method; read from the request line by default.
+
+        :rtype: bytes - The raw response.
+        :raise: ConnectFailed if the backend cannot be reached; socket.timeout,
+            OSError, or FramingError for an invalid response.
+        """
+        if method is None:
+            method = request[:request.find(b" ")].decode("latin-1")
+        with self._lock:
+            self.active += 1
+        try:
+            return self._forward(request, method, connect_timeout, timeout)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def _forward(self, request, method, connect_timeout, timeout):
+        conn = self.acquire(connect_timeout)
+        while True:
+            try:
+                response, reusable = conn.exchange(request, method, timeout)
+            except StaleConnection as e:
+                conn.close()
+                if method not in IDEMPOTENT_METHODS:
+                    raise
+                log.debug("Reused connection to %s:%s failed (%s), retrying",
+                          self.address[0], self.address[1], e)
+                # Kết nối mới không bao giờ StaleConnection: chỉ thử lại một lần
+                conn = self.connect(connect_timeout)
+                continue
+            except BaseException:
+                conn.close()
+                raise
+            self.release(conn, reusable)
+            return response
+
+    def relay(self, head, body, send, buffer, method=None, connect_timeout=CONNECT_TIMEOUT,
+              timeout=TIMEOUT):
+        """
+        Sends a request to the backend and streams the response to the
+        client (see :meth:`UpstreamConnection.relay`). A complete body goes
+        on a pooled connection, retried like :meth:`forward`; a streamed one
+        on a new connection.
+
+        :param head (bytes): The request head, prepared by :func:`upstream_request`.
+        :param body (bytes or iterable): The complete body, or its pieces.
+        :param send (callable): Sends bytes to the client.
+        :param buffer (RelayBuffer): Buffer of this request.
+        :param method (str): Its method; read from the request line by default.
+
+        :rtype: bytes - The response head.
+        :raise: ConnectFailed if the backend cannot be reached (nothing of the
+            request was read from the client or sent); DownstreamError,
+            socket.timeout, OSError or FramingError.
+        """
+        if method is None:
+            method = head[:head.find(b" ")].decode("latin-1")
+        with self._lock:
+            self.active += 1
+        try:
+            if isinstance(body, bytes):
+                conn = self.acquire(connect_timeout)
+            else:
+                conn = self.connect(connect_timeout)
+            while True:
+                try:
+                    response, reusable = conn.relay(head, body, method, send, buffer, timeout)
+                except StaleConnection as e:
+                    conn.close()
+                    if method not in IDEMPOTENT_METHODS:
+                        raise
+                    log.debug("Reused connection to %s:%s failed (%s), retrying",
+                              self.address[0], self.address[1], e)
+                    conn = self.connect(connect_timeout)
+                    continue
+                except BaseException:
+                    conn.close()
+                    raise
+                self.release(conn, reusable)
+                return response
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def clear(self):
+        """Closes every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+#: (host, port) -> :class:`UpstreamPool <UpstreamPool>` of this process.
+POOLS = {}
+
+
+def upstream_pool(host, port):
+    """
+    Returns the pool of a backend address, created on first use.
+
+    :rtype: UpstreamPool
+    """
+    key = (host, port)
+    pool = POOLS.get(key)
+    if pool is None:
+        # setdefault là nguyên tử: hai luồng cùng tạo thì chỉ một pool được giữ
+        pool = POOLS.setdefault(key, UpstreamPool(key))
+    return pool
+
+
+def keeps_alive(head):
+    """
+    Whether the backend keeps the connection open after a response.
+
+    :param head (bytes): The response head.
+    :rtype: bool
+    """
+    match = _CONNECTION.search(head)
+    value = match.group(1).lower() if match else b""
+    if head.startswith(b"HTTP/1.0"):
+        return b"keep-alive" in value
+    return b"close" not in value
+
+
+def upstream_request(request):
+    """
+    Prepares a client request for a pooled backend connection: the
+    hop-by-hop ``Connection``/``Keep-Alive``/``Expect`` headers of the client
+    are replaced by ``Connection: keep-alive`` (the body is already complete,
+    so no ``100 Continue`` is needed).
+
+    :param request (bytes): The complete request.
+    :rtype: bytes
+    """
+    end = request.find(b"\r\n\r\n")
+    if end < 0:
+        return request
+    head = _HOP_BY_HOP.sub(b"", request[:end])
+    return b"".join((head, b"\r\nConnection: keep-alive\r\n\r\n", request[end + 4:]))
+
+
+def client_response(response, keep_alive=False):
+    """
+    Replaces the hop-by-hop ``Connection`` header of a backend response with
+    the one of the client connection.
+
+    :param response (bytes): The raw response.
+    :param keep_alive (bool): Whether the client connection stays open.
+    :rtype: bytes
+    """
+    end = response.find(b"\r\n\r\n")
+    if end < 0:
+        return response
+    head = _RESPONSE_HOP_BY_HOP.sub(b"", response[:end])
+    return b"".join((head, b"\r\nConnection: ", b"keep-alive" if keep_alive else b"close",
+                     b"\r\n\r\n", response[end + 4:]))
@@ -17,7 +17,14 @@ deamon.weaproute
 This module provides a WeApRous object to deploy RESTful url web app with routing
 """
 
+import inspect
+
 from .backend import create_backend
+from .router import Router
+from .metrics import METRICS, metrics_handler
+from .logger import get_logger
+
+log = get_logger(__name__)
 
 class WeApRous:
     """The fully mutable :class:`WeApRous <WeApRous>` object, which is a lightweight,
@@ -40,7 +47,36 @@ class WeApRous:
       >>> def hello(headers, body):
       >>>     return {'message': 'Hello, world!'}
 
-      >>> app.run()
+      >>> @app.route('/peers', methods=['GET'])
+      >>> async def peers(request, response):
+      >>>     return response.build_json_response('[]')
+
+      >>> @app.route('/peers/<peer_id>', methods=['GET', 'DELETE'])
+      >>> def peer(request, response):
+      >>>     return response.build_json_response(json.dumps(request.params))
+
+      >>> @app.route('/events', methods=['GET'])
+      >>> async def events(request, response):
+      >>>     return response.build_event_stream(peer_updates())
+
+      >>> app.run(engine="asyncio")
+
+    Handlers may be plain functions or ``async def`` coroutines. With
+    ``engine="asyncio"`` coroutines are awaited on the event loop and plain
+    handlers run in an executor; the threaded engines run coroutines to
+    completion in the connection thread.
+
+    A handler may also be a generator (or return an iterator) of ``bytes`` /
+    ``str`` chunks: the response is sent with ``Transfer-Encoding: chunked``,
+    each chunk as soon as it is produced. ``response.build_stream()`` sets the
+    status and content type, ``response.build_event_stream()`` sends
+    Server-Sent Events. On the threaded engines a stream holds its connection
+    thread until it ends; long-lived streams belong on ``engine="asyncio"``.
+
+    Paths may contain typed parameters (``<name>``, ``<int:name>``,
+    ``<float:name>``, ``<path:name>``), available to the handler as
+    ``request.params``; the query string is in ``request.query``. A routed
+    path called with another method is answered ``405`` with an ``Allow`` header.
     """
 
     def __init__(self):
@@ -49,7 +85,7 @@ class WeApRous:
 
         Sets up an empty route registry and prepares placeholders for IP and port.
         """
-        self.routes = {}
+        self.routes = Router()
         self.ip = None
         self.port = None
         return
@@ -68,9 +104,14 @@ class WeApRous:
         """
         Decorator to register a route handler for a specific path and HTTP methods.
 
-        :param path (str): The URL path to route.
+        :param path (str): The URL path to route, optionally with
+            ``<converter:name>`` parameters.
         :param methods (list): A list of HTTP methods (e.g., ['GET', 'POST']) to bind.
 
+        The ``request`` and ``response`` passed to the handler belong to it:
+        they are never recycled for another request, so the handler may keep
+        them (or hand them to a thread) after its response is sent.
+
         :rtype: function - A decorator that registers the handler function.
         """
         def decorator(func):
@@ -80,22 +121,36 @@ class WeApRous:
             # Optional attach route metadata to the function
             func._route_path = path
             func._route_methods = methods
+            func._route_async = inspect.iscoroutinefunction(func)
 
             return func
         return decorator
 
-    def run(self):
+    def enable_metrics(self, path='/metrics'):
+        """
+        Turns on request instrumentation and registers a ``GET`` route
+        exposing it in the Prometheus text format.
+
+        :param path (str): The URL path of the metrics endpoint.
+        """
+        METRICS.enabled = True
+        self.route(path, methods=['GET'])(metrics_handler)
+
+    def run(self, **options):
         """
         Start the backend server and begin handling requests.
 
         This method launches the TCP server using the configured IP and port,
         and dispatches incoming requests to the registered route handlers.
 
+        :param options: Serving options forwarded to :func:`create_backend`,
+            e.g. ``engine="pool"`` or ``engine="asyncio"``.
+
         :raise: Error if IP or port has not been configured.
         """
         if not self.ip or not self.port:
-            print("Rous app need to preapre address"
-                  "by calling app.prepare_address(ip,port)")
+            log.error("Rous app need to preapre address "
+                      "by calling app.prepare_address(ip,port)")
 
-        create_backend(self.ip, self.port, self.routes)
+        create_backend(self.ip, self.port, self.routes, **options)
         
@@ -0,0 +1,271 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.workerpool
+~~~~~~~~~~~~~~~~~
+
+This module provides a bounded pool of worker threads for the backend daemon.
+Accepted connections are put on a fixed-size queue and picked up by the
+workers; when the queue is full the caller is told to reject the connection
+instead of spawning yet another thread.
+
+The pool is either fixed (``max_workers == workers``) or elastic: extra
+workers up to ``max_workers`` are started when every worker is busy and
+retire again after ``idle_timeout`` seconds without work.
+
+A keep-alive connection waiting for its next request does not keep its
+worker: the handler :meth:`parks <WorkerPool.park>` it on the pool's
+selector, which queues it again once the client sends something, or hands
+it to ``expire`` when it stays silent past its deadline.
+
+Usage Example:
+--------------
+>>> pool = WorkerPool(handler, workers=8, max_workers=32, queue_size=128)
+>>> pool.start()
+>>> if not pool.submit(conn, addr):
+>>>     reject(conn)
+"""
+
+import queue
+import selectors
+import socket
+import threading
+import time
+
+from .logger import get_logger
+
+log = get_logger(__name__)
+
+#: Seconds between two sweeps of the parked connections for expired ones.
+PARK_SWEEP = 0.25
+
+
+class WorkerPool:
+    """A bounded :class:`WorkerPool <WorkerPool>` of threads running a
+    connection handler.
+
+    :param handler (callable): ``handler(conn, addr)`` run for each connection,
+        ``handler(conn, addr, resume=state)`` for one coming back from
+        :meth:`park`.
+    :param workers (int): Number of core workers, always running.
+    :param max_workers (int): Upper bound of workers in elastic mode.
+        Defaults to ``workers`` (fixed pool).
+    :param queue_size (int): Connections allowed to wait for a worker.
+    :param idle_timeout (float): Seconds an extra (elastic) worker waits
+        for work before it exits.
+    :param reject (callable): ``reject(conn, addr)`` for a parked connection
+        with a new request that finds the queue full. Closes it by default.
+    :param expire (callable): ``expire(conn, addr)`` for a parked connection
+        past its deadline. Closes it by default.
+    """
+
+    def __init__(self, handler, workers=8, max_workers=None, queue_size=64,
+                 idle_timeout=30.0, reject=None, expire=None):
+        self.handler = handler
+        self.workers = workers
+        self.max_workers = max(max_workers or workers, workers)
+        self.queue_size = queue_size
+        self.idle_timeout = idle_timeout
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        #: Live worker threads and how many of them are waiting for work.
+        self._threads = 0
+        self._idle = 0
+        #: Counters reported by :meth:`stats`.
+        self.accepted = 0
+        self.rejected = 0
+        self.completed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+        self.reject = reject or _close
+        self.expire = expire or _close
+        #: Connections handed to :meth:`park`, not yet on the selector.
+        self._parking = []
+        #: Selector of the parked connections, started by the first :meth:`park`.
+        self._selector = None
+        self._waker = None
+        self.parked = 0
+
+    def start(self):
+        """Starts the core workers."""
+        for _ in range(self.workers):
+            self._spawn(core=True)
+
+    def submit(self, conn, addr, resume=None):
+        """
+        Queues a connection for the workers.
+
+        :param conn (socket.socket): Client connection socket.
+        :param addr (tuple): Client address (IP, port).
+        :param resume: State of a parked connection, passed back to the handler.
+
+        :rtype: bool - False if the queue is full and the connection was not taken.
+        """
+        try:
+            self._queue.put_nowait((conn, addr, time.monotonic(), resume))
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            return False
+
+        with self._lock:
+            self.accepted += 1
+            grow = self._idle == 0 and self._threads < self.max_workers
+        if grow:
+            self._spawn(core=False)
+        return True
+
+    def park(self, conn, addr, deadline, resume=None):
+        """
+        Watches an idle keep-alive connection without holding a worker.
+
+        Once the client sends data the connection is queued again and the
+        handler is called with ``resume``; past ``deadline`` it goes to
+        ``expire`` instead. The caller must not touch ``conn`` afterwards.
+
+        :param conn (socket.socket): Client connection socket, nothing buffered.
+        :param addr (tuple): Client address (IP, port).
+        :param deadline (float): ``time.monotonic()`` value the wait ends at.
+        :param resume: State handed back to the handler.
+        """
+        with self._lock:
+            self._parking.append((conn, addr, deadline, resume))
+            if self._selector is None:
+                self._start_selector()
+        try:
+            self._waker[1].send(b"\0")
+        except OSError:
+            # Bộ đệm đầy: selector đã có tín hiệu đánh thức chưa đọc
+            pass
+
+    def stats(self):
+        """
+        Returns a snapshot of the pool state.
+
+        :rtype: dict - workers, busy workers, queue depth and wait times (ms).
+        """
+        with self._lock:
+            done = self.completed
+            return {
+                "workers": self._threads,
+                "busy": self._threads - self._idle,
+                "queue_depth": self._queue.qsize(),
+                "queue_size": self.queue_size,
+                "parked": self.parked,
+                "accepted": self.accepted,
+                "rejected": self.rejected,
+                "completed": done,
+                "wait_avg_ms": (self._wait_total / done * 1000.0) if done else 0.0,
+                "wait_max_ms": self._wait_max * 1000.0,
+                "wait_total_ms": self._wait_total * 1000.0,
+            }
+
+    def _spawn(self, core):
+        with self._lock:
+            if self._threads >= self.max_workers:
+                return
+            self._threads += 1
+            self._idle += 1
+        worker = threading.Thread(target=self._run, args=(core,))
+        worker.daemon = True
+        worker.start()
+
+    def _run(self, core):
+        timeout = None if core else self.idle_timeout
+        while True:
+            try:
+                conn, addr, queued_at, resume = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                # Extra worker không còn việc, tự thu hồi
+                with self._lock:
+                    self._threads -= 1
+                    self._idle -= 1
+                return
+
+            waited = time.monotonic() - queued_at
+            with self._lock:
+                self._idle -= 1
+                self._wait_total += waited
+                if waited > self._wait_max:
+                    self._wait_max = waited
+            try:
+                if resume is None:
+                    self.handler(conn, addr)
+                else:
+                    self.handler(conn, addr, resume=resume)
+            except Exception as e:
+                log.exception("Handler error: %s", e)
+                try:
+                    conn.close()
+                except OSError:
+                    pass
+            finally:
+                with self._lock:
+                    self._idle += 1
+                    self.completed += 1
+
+    def _start_selector(self):
+        self._selector = selectors.DefaultSelector()
+        self._waker = socket.socketpair()
+        for end in self._waker:
+            end.setblocking(False)
+        self._selector.register(self._waker[0], selectors.EVENT_READ)
+        watcher = threading.Thread(target=self._watch, name="WorkerPool-park")
+        watcher.daemon = True
+        watcher.start()
+
+    def _watch(self):
+        selector = self._selector
+        sweep_at = time.monotonic() + PARK_SWEEP
+        while True:
+            with self._lock:
+                incoming, self._parking = self._parking, []
+            for conn, addr, deadline, resume in incoming:
+                try:
+                    selector.register(conn, selectors.EVENT_READ, (addr, deadline, resume))
+                except (ValueError, OSError):
+                    # Socket đã bị đóng trong lúc chuyển sang selector
+                    self.expire(conn, addr)
+            self.parked = len(selector.get_map()) - 1
+
+            for key, _ in selector.select(PARK_SWEEP):
+                if key.fileobj is self._waker[0]:
+                    try:
+                        while key.fileobj.recv(4096):
+                            pass
+                    except OSError:
+                        pass
+                    continue
+                selector.unregister(key.fileobj)
+                addr, deadline, resume = key.data
+                if not self.submit(key.fileobj, addr, resume):
+                    self.reject(key.fileobj, addr)
+
+            now = time.monotonic()
+            if now >= sweep_at:
+                sweep_at = now + PARK_SWEEP
+                expired = [key for key in selector.get_map().values()
+                           if key.data is not None and key.data[1] <= now]
+                for key in expired:
+                    selector.unregister(key.fileobj)
+                    self.expire(key.fileobj, key.data[0])
+            self.parked = len(selector.get_map()) - 1
+
+
+def _close(conn, addr):
+    try:
+        conn.close()
+    except OSError:
+        pass
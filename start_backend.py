@@ -180,9 +180,28 @@ if __name__ == "__main__":
         default=PORT,
         help='Port number to bind the server. Default is {}.'.format(PORT)
     )
+    parser.add_argument(
+        '--engine',
+        choices=['thread', 'pool', 'asyncio'],
+        default='thread',
+        help='Serving engine. Default is thread (one thread per connection).'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of pre-forked worker processes. Default is 1.'
+    )
+    parser.add_argument(
+        '--drain-timeout',
+        type=float,
+        default=10.0,
+        help='Seconds in-flight requests get to finish on SIGTERM/SIGINT. Default is 10.'
+    )
  
     args = parser.parse_args()
     ip = args.server_ip
     port = args.server_port
 
-    create_backend(ip, port, routes=app.routes)
\ No newline at end of file
+    create_backend(ip, port, routes=app.routes, engine=args.engine, workers=args.workers,
+                   drain_timeout=args.drain_timeout)
\ No newline at end of file
@@ -44,16 +44,63 @@ from urllib.parse import urlparse
 from collections import defaultdict
 
 from daemon import create_proxy
+from daemon.proxycache import MAX_BYTES as CACHE_SIZE
+from daemon.health import MIN_PROBE_INTERVAL
+from daemon.logger import get_logger
+
+# Dưới logger gốc "daemon" để dùng chung handler và WEAPROUS_LOG_LEVEL(S)
+log = get_logger("daemon.start_proxy")
 
 PROXY_PORT = 8081
+#: Multipliers of the size suffixes accepted in the config file.
+SIZE_UNITS = {'': 1, 'k': 1024, 'm': 1024 * 1024, 'g': 1024 * 1024 * 1024}
+
+
+def parse_size(value):
+    """
+    Parses a size such as ``64m`` or ``512k``.
+
+    :value (str): Number of bytes, with an optional ``k``, ``m`` or ``g`` suffix.
+    :rtype int: Number of bytes.
+    """
+    match = re.fullmatch(r'(\d+)([kmg]?)', value.strip().lower())
+    if not match:
+        raise ValueError("invalid size: {!r}".format(value))
+    return int(match.group(1)) * SIZE_UNITS[match.group(2)]
+
+
+def parse_interval(value):
+    """
+    Parses the ``interval=`` of a ``health_check``, raised to at least
+    ``MIN_PROBE_INTERVAL``.
+
+    :value (str): Seconds, such as ``2`` or ``0.5``.
+    :rtype float: Seconds, or None if ``value`` is not a number.
+    """
+    if not re.fullmatch(r'\d+(?:\.\d*)?|\.\d+', value):
+        return None
+    return max(float(value), MIN_PROBE_INTERVAL)
 
 
 def parse_virtual_hosts(config_file):
     """
     Parses virtual host blocks from a config file.
 
+    An upstream may carry a weight (``proxy_pass http://10.0.0.1:9002 weight=3;``),
+    and a host with several upstreams a ``dist_policy``: ``round-robin``
+    (default), ``weighted-round-robin``, ``least-conn``, ``random-two``,
+    ``ip-hash`` or ``cookie-hash <cookie name>`` (see ``daemon.balancer``).
+    ``health_check /path [interval=seconds];`` turns on active health checks
+    of the upstreams of the host (see ``daemon.health``).
+    ``proxy_cache [size] [max_entry=size] [status=/path];`` caches the
+    responses of the host in the proxy (``32m`` and ``1m`` by default), and
+    answers ``status`` with the hit ratio and bytes saved (see
+    ``daemon.proxycache``).
+
     :config_file (str): Path to the NGINX config file.
-    :rtype list of dict: Each dict contains 'listen'and 'server_name'.
+    :rtype dict: hostname -> (proxy_map, dist_policy, options); proxy_map is
+        the ``"ip:port"`` of a single upstream, or a list of
+        ``("ip:port", weight)``; options holds the other settings of the host.
     """
 
     with open(config_file, 'r') as f:
@@ -68,37 +115,56 @@ def parse_virtual_hosts(config_file):
     for host, block in host_blocks:
         proxy_map = {}
 
-        # Find all proxy_pass entries
-        proxy_passes = re.findall(r'proxy_pass\s+http://([^\s;]+);', block)
+        # Find all proxy_pass entries, with their optional weight=N
+        proxy_passes = [(address, int(weight or 1)) for address, weight in re.findall(
+            r'proxy_pass\s+http://([^\s;]+)(?:\s+weight=(\d+))?\s*;', block)]
         map = proxy_map.get(host,[])
         map = map + proxy_passes
         proxy_map[host] = map
 
-        # Find dist_policy if present
-        policy_match = re.search(r'dist_policy\s+(\w+)', block)
+        # Find dist_policy if present (tên có dấu '-', có thể kèm tham số)
+        policy_match = re.search(r'dist_policy\s+([\w-]+(?:[ \t]+[^\s;]+)?)', block)
         if policy_match:
             dist_policy_map = policy_match.group(1)
         else: #default policy is round_robin
             dist_policy_map = 'round-robin'
+
+        options = {}
+        health_match = re.search(r'health_check\s+(/[^\s;]*)(?:\s+interval=([^\s;]*))?\s*;', block)
+        if health_match:
+            options['health_check'] = health_match.group(1)
+            if health_match.group(2) is not None:
+                interval = parse_interval(health_match.group(2))
+                if interval is None:
+                    # Giá trị sai: bỏ qua, dùng chu kỳ mặc định
+                    log.warning("Host %s: invalid health_check interval %r, using the default",
+                                host, health_match.group(2))
+                else:
+                    options['health_interval'] = interval
+        cache_match = re.search(r'proxy_cache((?:[ \t]+[^\s;]+)*)\s*;', block)
+        if cache_match:
+            options['cache_size'] = CACHE_SIZE
+            for arg in cache_match.group(1).split():
+                name, _, value = arg.rpartition('=')
+                if name == 'max_entry':
+                    options['cache_max_entry'] = parse_size(value)
+                elif name == 'status':
+                    options['cache_status'] = value
+                elif not name:
+                    options['cache_size'] = parse_size(value)
             
         #
         # @bksysnet: Build the mapping and policy
-        # TODO: this policy varies among scenarios 
-        #       the default policy is provided with one proxy_pass
-        #       In the multi alternatives of proxy_pass then
-        #       the policy is applied to identify the highes matching
-        #       proxy_pass
+        # One proxy_pass is used as is; several are balanced by dist_policy
+        # (see daemon.balancer)
         #
         if len(proxy_map.get(host,[])) == 1:
-            routes[host] = (proxy_map.get(host,[])[0], dist_policy_map)
-        # esle if:
-        #         TODO:  apply further policy matching here
-        #
+            routes[host] = (proxy_map.get(host,[])[0][0], dist_policy_map, options)
         else:
-            routes[host] = (proxy_map.get(host,[]), dist_policy_map)
+            routes[host] = (proxy_map.get(host,[]), dist_policy_map, options)
 
     for key, value in routes.items():
-        print(key, value)
+        log.debug("Route %s -> %s", key, value)
     return routes
 
 
@@ -112,16 +178,18 @@ if __name__ == "__main__":
 
     :arg --server-ip (str): IP address to bind the server (default: 127.0.0.1).
     :arg --server-port (int): Port number to bind the server (default: 9000).
+    :arg --config (str): Virtual host config file (default: config/proxy.conf).
     """
 
     parser = argparse.ArgumentParser(prog='Proxy', description='', epilog='Proxy daemon')
     parser.add_argument('--server-ip', default='0.0.0.0')
     parser.add_argument('--server-port', type=int, default=PROXY_PORT)
+    parser.add_argument('--config', default='config/proxy.conf')
  
     args = parser.parse_args()
     ip = args.server_ip
     port = args.server_port
 
-    routes = parse_virtual_hosts("config/proxy.conf")
+    routes = parse_virtual_hosts(args.config)
 
     create_proxy(ip, port, routes)
@@ -203,6 +203,8 @@ if __name__ == "__main__":
     )
     parser.add_argument('--server-ip', default='0.0.0.0')
     parser.add_argument('--server-port', type=int, default=9000)
+    # Session lưu trong bộ nhớ: chỉ chọn engine, không chạy nhiều tiến trình
+    parser.add_argument('--engine', choices=['thread', 'pool', 'asyncio'], default='thread')
 
     args = parser.parse_args()
     ip = args.server_ip
@@ -211,4 +213,4 @@ if __name__ == "__main__":
     print(f"[+] Cookie/session backend running on http://{ip}:{port}")
 
     app.prepare_address(ip, port)
-    app.run()
+    app.run(engine=args.engine)
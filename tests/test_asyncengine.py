@@ -0,0 +1,144 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_asyncengine
+~~~~~~~~~~~~~~~~~
+
+Tests of the asyncio engine (:mod:`daemon.asyncengine`): connections served
+by coroutines, ``async def`` handlers awaited on the loop, plain handlers in
+the executor, and the watchdog deadlines.
+"""
+
+import asyncio
+import json
+import re
+import socket
+import threading
+import time
+import unittest
+
+from daemon.asyncengine import Sweeper, handle_client
+from daemon.router import Router
+
+
+def tcp_pair():
+    """
+    :rtype: tuple - (server side, non-blocking; client side)
+    """
+    with socket.socket() as listener:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+        client = socket.create_connection(listener.getsockname())
+        conn, _ = listener.accept()
+    conn.setblocking(False)
+    return conn, client
+
+
+def read_all(client):
+    with client:
+        return client.makefile("rb").read()
+
+
+def serve(routes, *payloads):
+    """
+    Sends each payload on its own connection, half-closes it, and serves all
+    the connections on one event loop.
+
+    :rtype: tuple - (responses, seconds the loop took)
+    """
+    pairs = [tcp_pair() for _ in payloads]
+    for (_, client), payload in zip(pairs, payloads):
+        client.sendall(payload)
+        client.shutdown(socket.SHUT_WR)
+
+    async def main():
+        sweeper = Sweeper()
+        await asyncio.gather(*(handle_client("127.0.0.1", 0, routes, conn,
+                                             ("127.0.0.1", 0), sweeper)
+                               for conn, _ in pairs))
+
+    started = time.monotonic()
+    asyncio.run(main())
+    elapsed = time.monotonic() - started
+    return [read_all(client) for _, client in pairs], elapsed
+
+
+class HandlerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.routes = Router()
+        self.threads = []
+
+        async def slow(request, response):
+            self.threads.append(threading.current_thread())
+            await asyncio.sleep(0.3)
+            return response.build_json_response(json.dumps({"id": request.params["id"]}))
+
+        def echo(request, response):
+            self.threads.append(threading.current_thread())
+            return response.build_json_response(json.dumps({"len": len(request.body)}))
+
+        self.routes[("GET", "/slow/<id>")] = slow
+        self.routes[("POST", "/echo")] = echo
+
+    def test_async_handlers_run_concurrently(self):
+        requests = [b"GET /slow/%d HTTP/1.1\r\nHost: x\r\n\r\n" % i for i in range(5)]
+        responses, elapsed = serve(self.routes, *requests)
+        for i, response in enumerate(responses):
+            self.assertTrue(response.startswith(b"HTTP/1.1 200"))
+            self.assertTrue(response.endswith(b'{"id": "%d"}' % i))
+        # Năm handler cùng chờ trên một loop, không nối tiếp nhau
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(set(self.threads), {threading.current_thread()})
+
+    def test_sync_handler_runs_in_executor(self):
+        responses, _ = serve(self.routes, b"POST /echo HTTP/1.1\r\nHost: x\r\n"
+                                          b"Content-Length: 5\r\n\r\nhello")
+        self.assertTrue(responses[0].endswith(b'{"len": 5}'))
+        self.assertNotEqual(self.threads, [threading.current_thread()])
+
+    def test_pipelined_requests_answered_in_order(self):
+        payload = (b"GET /slow/1 HTTP/1.1\r\nHost: x\r\n\r\n"
+                   b"POST /echo HTTP/1.1\r\nHost: x\r\nContent-Length: 3\r\n\r\nabc"
+                   b"DELETE /echo HTTP/1.1\r\nHost: x\r\n\r\n")
+        responses, _ = serve(self.routes, payload)
+        statuses = re.findall(rb"HTTP/1\.1 (\d{3}) ", responses[0])
+        self.assertEqual(statuses, [b"200", b"200", b"405"])
+        self.assertLess(responses[0].index(b'{"id": "1"}'), responses[0].index(b'{"len": 3}'))
+
+    def test_malformed_request_gets_400(self):
+        responses, _ = serve(self.routes, b"NONSENSE\r\n\r\n")
+        self.assertTrue(responses[0].startswith(b"HTTP/1.1 400"))
+
+
+class WatchdogTest(unittest.TestCase):
+
+    def test_deadline_cancels_only_the_wait(self):
+        async def main():
+            sweeper = Sweeper(interval=0.01)
+            sweeping = asyncio.create_task(sweeper.run())
+            dog = sweeper.watch(asyncio.current_task())
+            loop = asyncio.get_running_loop()
+            with self.assertRaises(TimeoutError):
+                await dog.run(asyncio.sleep(5), loop.time() + 0.05)
+            # Task vẫn chạy tiếp bình thường sau timeout
+            self.assertEqual(await dog.run(asyncio.sleep(0, "ok"), loop.time() + 1), "ok")
+            sweeping.cancel()
+
+        started = time.monotonic()
+        asyncio.run(main())
+        self.assertLess(time.monotonic() - started, 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,220 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_balancer
+~~~~~~~~~~~~~~~~~
+
+Tests of the load-balancing policies of the proxy (:mod:`daemon.balancer`).
+"""
+
+import itertools
+import unittest
+from collections import Counter
+from unittest import mock
+
+from daemon import balancer, health, proxy, upstream
+from daemon.balancer import (CookieHash, IpHash, LeastConn, RandomTwo, RoundRobin,
+                             balancer_for, make_balancer, parse_upstream, smooth_schedule)
+
+#: Ports handed to the upstreams of each test, never connected to.
+_ports = itertools.count(40000)
+
+
+def upstreams(*weights):
+    """
+    :rtype: list - One ``("ip:port", weight)`` upstream per weight, on fresh ports.
+    """
+    return [("192.0.2.1:{}".format(next(_ports)), w) for w in weights]
+
+
+def address(upstream):
+    host, port = upstream[0].rsplit(":", 1)
+    return host, int(port)
+
+
+class BalancerTest(unittest.TestCase):
+
+    def tearDown(self):
+        # Trạng thái health và pool là theo địa chỉ, dùng chung cả tiến trình
+        for table in (health.HEALTH, upstream.POOLS):
+            for key in [k for k in table if k[0] == "192.0.2.1"]:
+                del table[key]
+
+    def eject(self, upstream):
+        health.upstream_health(*address(upstream)).failure(connect=True)
+
+
+class ScheduleTest(BalancerTest):
+
+    def test_smooth_schedule(self):
+        self.assertEqual(smooth_schedule([5, 1, 1]), (0, 0, 1, 0, 2, 0, 0))
+        self.assertEqual(smooth_schedule([2, 2]), (0, 1))
+        self.assertEqual(smooth_schedule([1]), (0,))
+
+    def test_parse_upstream(self):
+        self.assertEqual(parse_upstream("10.0.0.1:9000"), (("10.0.0.1", 9000), 1))
+        self.assertEqual(parse_upstream(("10.0.0.1:9000", "3")), (("10.0.0.1", 9000), 3))
+        for bad in ("10.0.0.1", ("10.0.0.1:9000", 0), "10.0.0.1:http"):
+            with self.subTest(upstream=bad), self.assertRaises(ValueError):
+                parse_upstream(bad)
+
+    def test_make_balancer(self):
+        ups = upstreams(1)
+        self.assertIsInstance(make_balancer(ups, "weighted-round-robin"), RoundRobin)
+        self.assertIsInstance(make_balancer(ups, "no-such-policy"), RoundRobin)
+        self.assertIsInstance(make_balancer(ups, None), RoundRobin)
+        b = make_balancer(ups, "cookie-hash  sid ")
+        self.assertIsInstance(b, CookieHash)
+        self.assertEqual(b.cookie, "sid")
+        with self.assertRaises(ValueError):
+            make_balancer([], "round-robin")
+
+    def test_balancer_for_rebuilds_on_change(self):
+        ups = upstreams(1, 1)
+        b = balancer_for("t.test", ups, "round-robin")
+        self.assertIs(balancer_for("t.test", ups, "round-robin"), b)
+        self.assertIsInstance(balancer_for("t.test", ups, "least-conn"), LeastConn)
+        other = upstreams(1)
+        self.assertEqual(balancer_for("t.test", other, "least-conn").addresses,
+                         (address(other[0]),))
+        del balancer.BALANCERS["t.test"]
+
+
+class RoundRobinTest(BalancerTest):
+
+    def test_weights(self):
+        ups = upstreams(3, 1)
+        b = RoundRobin(ups)
+        picks = Counter(b.pick() for _ in range(400))
+        self.assertEqual(picks, {address(ups[0]): 300, address(ups[1]): 100})
+
+    def test_skips_ejected(self):
+        ups = upstreams(1, 1, 1)
+        b = RoundRobin(ups)
+        self.eject(ups[1])
+        picks = Counter(b.pick() for _ in range(30))
+        # Lượt của upstream bị loại chuyển sang upstream kế tiếp
+        self.assertEqual(picks, {address(ups[0]): 10, address(ups[2]): 20})
+
+    def test_none_when_all_ejected(self):
+        ups = upstreams(1, 2)
+        b = RoundRobin(ups)
+        for u in ups:
+            self.eject(u)
+        self.assertIsNone(b.pick())
+
+
+class LeastConnTest(BalancerTest):
+
+    def test_fewest_in_flight_per_weight(self):
+        ups = upstreams(1, 2, 1)
+        b = LeastConn(ups)
+        for pool, active in zip(b.pools, (2, 3, 1)):
+            pool.active = active
+        self.assertEqual({b.pick() for _ in range(10)}, {address(ups[2])})
+        b.pools[2].active = 2
+        # 3/2 < 2/1: upstream nặng gấp đôi nhận thêm
+        self.assertEqual({b.pick() for _ in range(10)}, {address(ups[1])})
+
+    def test_ties_rotate(self):
+        ups = upstreams(1, 1)
+        b = LeastConn(ups)
+        self.assertEqual(len({b.pick() for _ in range(4)}), 2)
+
+    def test_skips_ejected(self):
+        ups = upstreams(1, 1)
+        b = LeastConn(ups)
+        b.pools[1].active = 5
+        self.eject(ups[0])
+        self.assertEqual({b.pick() for _ in range(4)}, {address(ups[1])})
+        self.eject(ups[1])
+        self.assertIsNone(b.pick())
+
+    def test_random_two_takes_less_loaded(self):
+        ups = upstreams(1, 1)
+        b = RandomTwo(ups)
+        b.pools[0].active = 4
+        with mock.patch.object(balancer, "random", side_effect=[0.1, 0.9] * 5):
+            self.assertEqual({b.pick() for _ in range(5)}, {address(ups[1])})
+        # Hai lần rút trúng cùng một upstream thì lấy nó
+        with mock.patch.object(balancer, "random", return_value=0.1):
+            self.assertEqual(b.pick(), address(ups[0]))
+        self.eject(ups[1])
+        with mock.patch.object(balancer, "random", side_effect=[0.1, 0.9]):
+            self.assertEqual(b.pick(), address(ups[0]))
+
+
+class HashTest(BalancerTest):
+
+    def clients(self, n=500):
+        return ["10.1.{}.{}".format(i // 250, i % 250) for i in range(n)]
+
+    def test_ip_hash_is_sticky_and_spread(self):
+        ups = upstreams(1, 1, 1)
+        b = IpHash(ups)
+        first = {ip: b.pick(ip) for ip in self.clients()}
+        self.assertEqual(first, {ip: b.pick(ip) for ip in self.clients()})
+        self.assertEqual(set(first.values()), {address(u) for u in ups})
+
+    def test_ip_hash_moves_few_clients(self):
+        ups = upstreams(1, 1, 1)
+        before = IpHash(ups)
+        after = IpHash(ups + upstreams(1))
+        moved = sum(before.pick(ip) != after.pick(ip) for ip in self.clients())
+        # Chỉ khoảng 1/4 client chuyển sang upstream mới
+        self.assertLess(moved, 500 // 2)
+
+    def test_ip_hash_skips_ejected_owner(self):
+        ups = upstreams(1, 1)
+        b = IpHash(ups)
+        owner = b.pick("10.9.9.9")
+        self.eject(next(u for u in ups if address(u) == owner))
+        self.assertNotEqual(b.pick("10.9.9.9"), owner)
+
+    def test_cookie_hash(self):
+        ups = upstreams(1, 1, 1)
+        b = CookieHash(ups)
+        head = b"GET / HTTP/1.1\r\nHost: x\r\nCookie: theme=dark; session=%d\r\n"
+        for n in range(20):
+            picks = {b.pick(ip, head % n) for ip in self.clients(20)}
+            self.assertEqual(len(picks), 1)
+        spread = {b.pick("10.0.0.1", head % n) for n in range(100)}
+        self.assertEqual(len(spread), 3)
+
+    def test_cookie_hash_falls_back_to_ip(self):
+        ups = upstreams(1, 1, 1)
+        b = CookieHash(ups, "sid")
+        by_ip = IpHash(ups)
+        head = b"GET / HTTP/1.1\r\nCookie: session=1\r\n"
+        for ip in self.clients(50):
+            self.assertEqual(b.pick(ip, head), by_ip.pick(ip))
+            self.assertEqual(b.pick(ip), by_ip.pick(ip))
+
+
+class HostHeaderTest(unittest.TestCase):
+
+    def test_host_regex(self):
+        cases = [
+            (b"GET / HTTP/1.1\r\nHost: app1.local\r\n\r\n", b"app1.local"),
+            (b"GET / HTTP/1.1\r\nhOsT:\tapp1.local:8080 \r\n\r\n", b"app1.local:8080"),
+            (b"GET / HTTP/1.1\r\nX-Host: a\r\nHost: b\r\n\r\n", b"b"),
+            (b"GET / HTTP/1.1\r\nAccept: */*\r\n\r\n", None),
+        ]
+        for head, expected in cases:
+            with self.subTest(head=head):
+                match = proxy._HOST.search(head)
+                self.assertEqual(match.group(1) if match else None, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_compression
+~~~~~~~~~~~~~~~~~
+
+Tests of ``Accept-Encoding`` negotiation and of the compressed body cache
+(:mod:`daemon.compression`).
+"""
+
+import gzip
+import json
+import unittest
+import zlib
+
+from daemon import compression
+from daemon.compression import CompressionCache, negotiate
+from daemon.request import Request
+from daemon.response import Response
+
+BODY = json.dumps([{"peer": i, "ip": "10.0.0.%d" % i} for i in range(100)]).encode()
+
+
+class NegotiateTest(unittest.TestCase):
+
+    def test_choices(self):
+        cases = [
+            (None, None),
+            ("", None),
+            ("identity", None),
+            ("gzip", "gzip"),
+            ("deflate", "deflate"),
+            ("deflate, gzip", "gzip"),
+            ("gzip;q=0.5, deflate", "deflate"),
+            ("GZIP", "gzip"),
+            ("*", "gzip"),
+            ("*;q=0.3, gzip;q=0", "deflate"),
+            ("gzip;q=0, deflate;q=0", None),
+            ("gzip;q=bad", None),
+            ("br", None),
+        ]
+        for header, expected in cases:
+            with self.subTest(header=header):
+                self.assertEqual(negotiate(header), expected)
+
+
+class CompressionCacheTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        cache = CompressionCache()
+        self.assertEqual(gzip.decompress(cache.compress(BODY, "gzip")), BODY)
+        self.assertEqual(zlib.decompress(cache.compress(BODY, "deflate")), BODY)
+
+    def test_repeat_body_is_a_hit(self):
+        cache = CompressionCache()
+        first = cache.compress(BODY, "gzip")
+        self.assertIs(cache.compress(BODY, "gzip"), first)
+        cache.compress(BODY, "deflate")
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 2, 2))
+        self.assertEqual(stats["bytes_in"], 3 * len(BODY))
+        self.assertLess(stats["bytes_out"], stats["bytes_in"])
+
+    def test_least_recently_used_is_evicted(self):
+        cache = CompressionCache(entries=2)
+        bodies = [BODY + b"%d" % i for i in range(3)]
+        cache.compress(bodies[0], "gzip")
+        cache.compress(bodies[1], "gzip")
+        cache.compress(bodies[0], "gzip")
+        cache.compress(bodies[2], "gzip")
+        # bodies[1] ít dùng nhất nên bị loại
+        cache.compress(bodies[0], "gzip")
+        cache.compress(bodies[1], "gzip")
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (2, 4, 2))
+
+    def test_oversized_body_is_not_cached(self):
+        cache = CompressionCache()
+        big = b"x" * (compression.CACHE_MAX_BODY + 1)
+        cache.compress(big, "gzip")
+        cache.compress(big, "gzip")
+        self.assertEqual(cache.stats()["entries"], 0)
+        self.assertEqual(cache.stats()["misses"], 2)
+
+
+class JsonResponseTest(unittest.TestCase):
+
+    def build(self, body, accept=None):
+        raw = "GET /get-list HTTP/1.1\r\nHost: x\r\n"
+        if accept is not None:
+            raw += "Accept-Encoding: {}\r\n".format(accept)
+        req = Request()
+        req.prepare(raw + "\r\n", None)
+        head, _, content = Response(req).build_json_response(body).partition(b"\r\n\r\n")
+        return head + b"\r\n", content
+
+    def test_large_body_is_compressed(self):
+        head, content = self.build(BODY.decode(), "gzip, deflate")
+        self.assertIn(b"Content-Encoding: gzip\r\n", head)
+        self.assertIn(b"Vary: Accept-Encoding\r\n", head)
+        self.assertIn(b"Content-Length: %d\r\n" % len(content), head)
+        self.assertEqual(gzip.decompress(content), BODY)
+
+    def test_identity_still_varies(self):
+        head, content = self.build(BODY.decode())
+        self.assertNotIn(b"Content-Encoding", head)
+        self.assertIn(b"Vary: Accept-Encoding\r\n", head)
+        self.assertEqual(content, BODY)
+
+    def test_small_body_is_sent_as_is(self):
+        head, content = self.build('{"ok": true}', "gzip")
+        self.assertNotIn(b"Content-Encoding", head)
+        self.assertNotIn(b"Vary", head)
+        self.assertEqual(content, b'{"ok": true}')
+
+
+if __name__ == "__main__":
+    unittest.main()
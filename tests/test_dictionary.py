@@ -0,0 +1,54 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_dictionary
+~~~~~~~~~~~~~~~~~
+
+Tests of the :class:`Headers <daemon.dictionary.Headers>` multimap.
+"""
+
+import unittest
+
+from daemon.dictionary import Headers
+
+
+class HeadersCaseTest(unittest.TestCase):
+
+    def check(self, headers):
+        self.assertEqual(headers.get("Content-Type"), "text/html")
+        self.assertEqual(headers.get("content-type"), "text/html")
+        self.assertEqual(headers.get("CONTENT-TYPE"), "text/html")
+        self.assertEqual(headers["Content-Type"], "text/html")
+        self.assertIsNone(headers.get("X-Missing"))
+        self.assertEqual(headers.get("X-Missing", "d"), "d")
+        self.assertIn("Cache-Control", headers)
+        self.assertIn("cache-control", headers)
+        self.assertNotIn("Pragma", headers)
+
+        self.assertEqual(headers.setdefault("CACHE-CONTROL", "x"), "no-store")
+        self.assertEqual(headers.setdefault("X-New", "1"), "1")
+        self.assertIn("x-new", headers)
+        self.assertEqual(headers.pop("Cache-Control"), "no-store")
+        self.assertNotIn("cache-control", headers)
+        self.assertEqual(headers.pop("Cache-Control", None), None)
+        self.assertNotIn(("Cache-Control", "no-store"), headers.fields())
+
+    def test_built(self):
+        self.check(Headers({"Content-Type": "text/html", "Cache-Control": "no-store"}))
+
+    def test_parsed(self):
+        self.check(Headers.from_lines(["Content-Type: text/html", "Cache-Control: no-store"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
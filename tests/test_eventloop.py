@@ -0,0 +1,72 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_eventloop
+~~~~~~~~~~~~~~~~~
+
+Tests of the loop running ``async def`` handlers for the threaded engines
+(:mod:`daemon.eventloop`).
+"""
+
+import asyncio
+import threading
+import unittest
+
+from daemon.eventloop import HANDLER_LOOP
+from daemon.httpadapter import HttpAdapter
+
+RAW = b"GET /a HTTP/1.1\r\nHost: x\r\n\r\n"
+
+
+async def current_loop():
+    return asyncio.get_running_loop()
+
+
+class HandlerLoopTest(unittest.TestCase):
+
+    def test_one_loop_for_every_thread(self):
+        loops = []
+        threads = [threading.Thread(target=lambda: loops.append(HANDLER_LOOP.run(current_loop())))
+                   for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(loops), 4)
+        self.assertEqual(len(set(map(id, loops))), 1)
+        self.assertFalse(loops[0].is_closed())
+
+    def test_exception_is_raised_in_caller(self):
+        async def fail():
+            raise KeyError("x")
+        with self.assertRaises(KeyError):
+            HANDLER_LOOP.run(fail())
+
+    def test_async_handler_through_call_hook(self):
+        seen = []
+
+        async def handler(request, response):
+            seen.append(asyncio.get_running_loop())
+            await asyncio.sleep(0)
+            return b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok"
+
+        adapter = HttpAdapter(None, None, None, None, {})
+        for _ in range(2):
+            req, resp = adapter.prepare_request(RAW, {("GET", "/a"): handler})
+            self.assertTrue(adapter.call_hook(req, resp).endswith(b"ok"))
+            adapter.release(req, resp)
+        self.assertIs(seen[0], seen[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_framing
+~~~~~~~~~~~~~~~~~
+
+Tests of the chunked body decoding in :mod:`daemon.framing`.
+"""
+
+import unittest
+
+from daemon.framing import BodyDecoder, FramingError
+
+
+class ChunkSizeTest(unittest.TestCase):
+
+    def decode(self, data):
+        decoder = BodyDecoder(chunked=True)
+        body, rest = decoder.feed(data)
+        return decoder, body, rest
+
+    def test_hex_sizes(self):
+        decoder, body, rest = self.decode(b"5\r\nhello\r\nA;ext=1\r\n0123456789\r\n0\r\n\r\nX")
+        self.assertTrue(decoder.done)
+        self.assertEqual(body, b"hello0123456789")
+        self.assertEqual(rest, b"X")
+
+    def test_malformed_sizes(self):
+        for size in (b"-5", b"+5", b" 5", b"0x10", b"1 0", b"", b"g", b"1" * 17):
+            with self.subTest(size=size):
+                with self.assertRaises(FramingError) as ctx:
+                    self.decode(size + b"\r\nabcdefghij\r\n0\r\n\r\n")
+                self.assertEqual(ctx.exception.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_headerwriter
+~~~~~~~~~~~~~~~~~
+
+Tests of the response header building blocks (:mod:`daemon.headerwriter`)
+and of the canned responses rendered from them.
+"""
+
+import re
+import unittest
+from email.utils import parsedate_to_datetime
+from unittest import mock
+
+from daemon import headerwriter
+from daemon.dictionary import Headers
+from daemon.request import Request
+from daemon.response import Response
+
+
+class BlocksTest(unittest.TestCase):
+
+    def test_status_line_is_memoized(self):
+        line = headerwriter.status_line(299, "Custom")
+        self.assertEqual(line, b"HTTP/1.1 299 Custom\r\n")
+        self.assertIs(headerwriter.status_line(299, "Custom"), line)
+
+    def test_allow_header(self):
+        line = headerwriter.allow_header(["GET", "POST"])
+        self.assertEqual(line, b"Allow: GET, POST\r\n")
+        self.assertIs(headerwriter.allow_header(("GET", "POST")), line)
+
+    def test_date_header_changes_once_per_second(self):
+        with mock.patch.object(headerwriter.time, "time", return_value=1700000000.2):
+            first = headerwriter.date_header()
+        with mock.patch.object(headerwriter.time, "time", return_value=1700000000.9):
+            self.assertIs(headerwriter.date_header(), first)
+        with mock.patch.object(headerwriter.time, "time", return_value=1700000001.0):
+            second = headerwriter.date_header()
+        self.assertEqual(first, b"Date: Tue, 14 Nov 2023 22:13:20 GMT\r\n")
+        self.assertEqual(second, b"Date: Tue, 14 Nov 2023 22:13:21 GMT\r\n")
+
+    def test_encode_headers_keeps_repeated_fields(self):
+        headers = Headers()
+        headers["Content-Type"] = "text/plain"
+        headers.add("Set-Cookie", "a=1")
+        headers.add("Set-Cookie", "b=2")
+        self.assertEqual(headerwriter.encode_headers(headers),
+                         b"Content-Type: text/plain\r\nSet-Cookie: a=1\r\nSet-Cookie: b=2\r\n")
+        self.assertEqual(headerwriter.encode_headers({"X-Name": "café"}),
+                         "X-Name: café\r\n".encode("utf-8"))
+        self.assertEqual(headerwriter.encode_headers(None), b"")
+
+    def test_render(self):
+        head = headerwriter.render(200, "OK", [headerwriter.NO_CACHE,
+                                               headerwriter.CONNECTION[True]],
+                                   {"Content-Length": 0})
+        self.assertEqual(head, b"HTTP/1.1 200 OK\r\nCache-Control: no-cache\r\n"
+                               b"Pragma: no-cache\r\nConnection: keep-alive\r\n"
+                               b"Content-Length: 0\r\n\r\n")
+
+    def test_fixed_head(self):
+        head = headerwriter.fixed_head(404, "Not Found", "text/plain", b"gone",
+                                       (("X-A", "1"),))
+        self.assertEqual(head, b"HTTP/1.1 404 Not Found\r\nContent-Type: text/plain\r\n"
+                               b"Content-Length: 4\r\nX-A: 1\r\n")
+
+
+class CannedResponseTest(unittest.TestCase):
+
+    def response(self, keep_alive=True):
+        req = Request()
+        req.prepare("GET / HTTP/1.1\r\nHost: x\r\n\r\n", None)
+        resp = Response(req)
+        resp.keep_alive = keep_alive
+        return resp
+
+    def check(self, data, status):
+        head, _, body = data.partition(b"\r\n\r\n")
+        self.assertTrue(head.startswith(b"HTTP/1.1 " + status))
+        length = int(re.search(rb"Content-Length: (\d+)", head).group(1))
+        self.assertEqual(length, len(body))
+        date = re.search(rb"Date: ([^\r]+)", head).group(1).decode()
+        self.assertIsNotNone(parsedate_to_datetime(date))
+        self.assertEqual(head.count(b"Connection:"), 1)
+        return head + b"\r\n", body
+
+    def test_method_not_allowed(self):
+        head, body = self.check(self.response().build_method_not_allowed(["GET", "PUT"]),
+                                b"405")
+        self.assertIn(b"Allow: GET, PUT\r\n", head)
+        self.assertIn(b"Connection: keep-alive\r\n", head)
+        self.assertEqual(body, b"405 Method Not Allowed")
+
+    def test_unavailable_always_closes(self):
+        head, body = self.check(self.response().build_unavailable(retry_after=3), b"503")
+        self.assertIn(b"Retry-After: 3\r\n", head)
+        self.assertIn(b"Connection: close\r\n", head)
+        self.assertEqual(body, b"503 Service Unavailable")
+
+    def test_unauthorized(self):
+        head, body = self.check(self.response(False).build_unauthorized(), b"401")
+        self.assertIn(b"Access-Control-Allow-Origin: *\r\n", head)
+        self.assertIn(b"Connection: close\r\n", head)
+        self.assertEqual(body, b"401 Unauthorized")
+
+
+if __name__ == "__main__":
+    unittest.main()
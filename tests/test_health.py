@@ -0,0 +1,295 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_health
+~~~~~~~~~~~~~~~~~
+
+Tests of the upstream circuit breakers of :mod:`daemon.health` and of the
+proxy's failover around them.
+"""
+
+import socket
+import threading
+import time
+import unittest
+from unittest import mock
+
+from daemon import health, proxy
+from daemon.health import HealthChecker, UpstreamHealth, probe, upstream_health
+from daemon.upstream import BUFFERS
+
+#: Longest a request may wait on an upstream that drops its connects.
+MAX_WAIT = 2.0
+
+OK = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: close\r\n\r\nok"
+
+
+def dropping_upstream():
+    """
+    A listener whose accept queue is full and never drained: the kernel
+    drops the SYNs of new connects, like a firewall or a dead host would.
+
+    :rtype: tuple - (listening socket, held sockets, port)
+    """
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(0)
+    port = listener.getsockname()[1]
+    held = []
+    try:
+        while True:
+            held.append(socket.create_connection(("127.0.0.1", port), 0.2))
+    except OSError:
+        pass
+    return listener, held, port
+
+
+def serving_upstream():
+    """
+    A backend answering every connection with :data:`OK`.
+
+    :rtype: tuple - (listening socket, port)
+    """
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(16)
+
+    def serve():
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except OSError:
+                return
+            with conn:
+                data = b""
+                while b"\r\n\r\n" not in data:
+                    chunk = conn.recv(4096)
+                    if not chunk:
+                        break
+                    data += chunk
+                conn.sendall(OK)
+    threading.Thread(target=serve, daemon=True).start()
+    return listener, listener.getsockname()[1]
+
+
+def answering_upstream(reply):
+    """
+    A backend answering every connection with ``reply`` and closing it.
+
+    :rtype: tuple - (listening socket, port)
+    """
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(16)
+
+    def serve():
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except OSError:
+                return
+            with conn:
+                conn.recv(4096)
+                conn.sendall(reply)
+    threading.Thread(target=serve, daemon=True).start()
+    return listener, listener.getsockname()[1]
+
+
+def client_pair():
+    """
+    A TCP connection standing for a proxy client.
+
+    :rtype: tuple - (proxy side, client side)
+    """
+    with socket.socket() as listener:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+        client = socket.create_connection(listener.getsockname())
+        conn, _ = listener.accept()
+    return conn, client
+
+
+class DroppingUpstreamTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dropping, self.held, self.dead_port = dropping_upstream()
+        self.serving, self.live_port = serving_upstream()
+
+    def tearDown(self):
+        for s in [self.dropping, self.serving] + self.held:
+            s.close()
+
+    def test_forward_gives_up_after_connect_timeout(self):
+        started = time.monotonic()
+        response = proxy.forward_request("127.0.0.1", self.dead_port,
+                                         b"GET / HTTP/1.1\r\nHost: x\r\n\r\n")
+        elapsed = time.monotonic() - started
+        self.assertEqual(response[9:12], b"503")
+        self.assertLess(elapsed, MAX_WAIT)
+        self.assertFalse(upstream_health("127.0.0.1", self.dead_port).available())
+
+    def test_request_fails_over_to_live_upstream(self):
+        host = "drop-{}.test".format(self.dead_port)
+        routes = {host: (["127.0.0.1:{}".format(self.dead_port),
+                          "127.0.0.1:{}".format(self.live_port)], "round-robin", {})}
+        head = "GET / HTTP/1.1\r\nHost: {}\r\n\r\n".format(host).encode()
+        for _ in range(3):
+            conn, client = client_pair()
+            buffer = BUFFERS.acquire()
+            started = time.monotonic()
+            try:
+                response = proxy.relay_route(("127.0.0.1", 1), host, head, b"",
+                                             conn, routes, buffer)
+            finally:
+                BUFFERS.release(buffer)
+                conn.close()
+            elapsed = time.monotonic() - started
+            # Chỉ request đầu tiên phải chờ connect timeout
+            self.assertLess(elapsed, MAX_WAIT)
+            self.assertIsNone(response)
+            with client:
+                self.assertTrue(client.makefile("rb").read().endswith(b"ok"))
+        self.assertFalse(upstream_health("127.0.0.1", self.dead_port).available())
+
+
+class Clock:
+    """Stands for ``monotonic()`` in :mod:`daemon.health`."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        patcher = mock.patch.object(health, "monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.health = UpstreamHealth(("127.0.0.1", 1))
+
+    def test_failures_in_a_row_eject(self):
+        for _ in range(health.FAILURE_THRESHOLD - 1):
+            self.health.failure()
+        self.health.success()
+        for _ in range(health.FAILURE_THRESHOLD - 1):
+            self.health.failure()
+        self.assertTrue(self.health.available())
+        self.health.failure()
+        self.assertFalse(self.health.available())
+
+    def test_connect_failure_ejects_at_once(self):
+        self.health.failure(connect=True)
+        self.assertFalse(self.health.available())
+        self.clock.now += health.BASE_EJECTION
+        self.assertTrue(self.health.available())
+
+    def test_half_open_lets_one_trial_through(self):
+        self.health.failure(connect=True)
+        self.clock.now += health.BASE_EJECTION
+        self.assertTrue(self.health.available())
+        self.assertFalse(self.health.available())
+        # Request thử không báo lại: sau TRIAL_TIMEOUT cho request khác thử
+        self.clock.now += health.TRIAL_TIMEOUT
+        self.assertTrue(self.health.available())
+        self.health.success()
+        self.assertEqual(self.health.ejected_until, 0)
+        self.assertTrue(self.health.available())
+        self.assertTrue(self.health.available())
+
+    def test_ejections_double_until_reset(self):
+        durations = []
+        for _ in range(7):
+            # Từ lần thứ hai là request thử của circuit half-open thất bại
+            self.health.failure(connect=True)
+            durations.append(self.health.ejected_until - self.clock.now)
+            self.clock.now = self.health.ejected_until
+            self.assertTrue(self.health.available())
+        self.assertEqual(durations, [1.0, 2.0, 4.0, 8.0, 16.0, 30.0, 30.0])
+
+        self.health.success()
+        self.clock.now += health.MAX_EJECTION
+        self.health.failure()
+        self.health.success()
+        self.health.failure(connect=True)
+        self.assertEqual(self.health.ejected_until - self.clock.now, health.BASE_EJECTION)
+
+    def test_late_success_does_not_readmit(self):
+        self.health.failure(connect=True)
+        self.health.success()
+        self.assertFalse(self.health.available())
+
+
+class ProbeTest(unittest.TestCase):
+
+    def upstream(self, reply):
+        listener, port = answering_upstream(reply)
+        self.addCleanup(listener.close)
+        return ("127.0.0.1", port)
+
+    def test_status(self):
+        self.assertEqual(probe(self.upstream(OK), "/health", "app"), 200)
+        self.assertEqual(probe(self.upstream(b"HTTP/1.1 503 Unavailable\r\n\r\n"),
+                               "/health", "app"), 503)
+
+    def test_invalid_or_silent_upstream(self):
+        self.assertEqual(probe(self.upstream(b"garbage"), "/health", "app"), 0)
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+        with listener:
+            self.assertEqual(probe(listener.getsockname(), "/health", "app", 0.1), 0)
+
+    def test_unreachable(self):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            address = s.getsockname()
+        self.assertIsNone(probe(address, "/health", "app"))
+
+
+class HealthCheckerTest(unittest.TestCase):
+
+    def test_targets(self):
+        routes = {
+            "a.test": (["127.0.0.1:9001", ("127.0.0.1:9002", 2)], "round-robin",
+                       {"health_check": "/ping", "health_interval": 0.01}),
+            "b.test": ("127.0.0.1:9003", "round-robin", {"health_check": "/hc"}),
+            "c.test": ("127.0.0.1:9004", "round-robin", {}),
+            "d.test": ("127.0.0.1:9005", "round-robin"),
+        }
+        self.assertEqual(HealthChecker(routes).targets, {
+            ("127.0.0.1", 9001): ("/ping", "a.test", health.MIN_PROBE_INTERVAL),
+            ("127.0.0.1", 9002): ("/ping", "a.test", health.MIN_PROBE_INTERVAL),
+            ("127.0.0.1", 9003): ("/hc", "b.test", health.PROBE_INTERVAL),
+        })
+
+    def test_failing_probes_eject(self):
+        listener, port = answering_upstream(b"HTTP/1.1 500 Error\r\n\r\n")
+        self.addCleanup(listener.close)
+        routes = {"e.test": ("127.0.0.1:{}".format(port), "round-robin",
+                             {"health_check": "/hc", "health_interval": 0.1})}
+        checker = HealthChecker(routes)
+        checker.start()
+        self.addCleanup(checker.stop)
+        state = upstream_health("127.0.0.1", port)
+        deadline = time.monotonic() + MAX_WAIT
+        while state.available() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertFalse(state.available())
+
+
+if __name__ == "__main__":
+    unittest.main()
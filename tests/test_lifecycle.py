@@ -0,0 +1,177 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_lifecycle
+~~~~~~~~~~~~~~~~~
+
+Tests of the graceful shutdown state of :mod:`daemon.lifecycle`: tracked
+connections, draining, and the signal flags.
+"""
+
+import os
+import signal
+import socket
+import threading
+import time
+import unittest
+from unittest import mock
+
+from daemon import lifecycle
+from daemon.framing import Deadlines
+from daemon.lifecycle import Lifecycle
+
+
+def tcp_pair():
+    with socket.socket() as listener:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+        client = socket.create_connection(listener.getsockname())
+        conn, _ = listener.accept()
+    return conn, client
+
+
+class DrainTest(unittest.TestCase):
+
+    def setUp(self):
+        self.life = Lifecycle()
+        self.socks = []
+
+    def tearDown(self):
+        for s in self.socks:
+            s.close()
+
+    def pair(self):
+        conn, client = tcp_pair()
+        self.socks += [conn, client]
+        return conn
+
+    def test_drain_closes_only_idle_connections(self):
+        idle, busy, fresh = self.pair(), self.pair(), self.pair()
+        deadlines = Deadlines()
+        working = Deadlines()
+        working.phase = Deadlines.BODY
+        self.life.track(idle, deadlines)
+        self.life.track(busy, working)
+        self.life.track(fresh)
+        busy.settimeout(0.2)
+        fresh.settimeout(0.2)
+
+        self.life.drain()
+        self.assertTrue(self.life.draining)
+        # recv trên kết nối rảnh trả về b"" như khi client đóng
+        self.assertEqual(idle.recv(1), b"")
+        for conn in (busy, fresh):
+            with self.assertRaises(socket.timeout):
+                conn.recv(1)
+
+    def test_wait_closed_returns_when_last_connection_goes(self):
+        conns = [self.pair(), self.pair()]
+        for conn in conns:
+            self.life.track(conn)
+
+        def close_all():
+            for conn in conns:
+                time.sleep(0.05)
+                self.life.untrack(conn)
+
+        threading.Thread(target=close_all).start()
+        started = time.monotonic()
+        self.assertTrue(self.life.wait_closed(timeout=5))
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(self.life.connections, {})
+
+    def test_wait_closed_gives_up_after_timeout(self):
+        self.life.track(self.pair())
+        started = time.monotonic()
+        self.assertFalse(self.life.wait_closed(timeout=0.1))
+        self.assertGreaterEqual(time.monotonic() - started, 0.1)
+
+    def test_nothing_tracked_is_closed(self):
+        self.assertTrue(self.life.wait_closed(timeout=0))
+
+
+class SignalFlagsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.life = Lifecycle()
+        self.woken = 0
+
+        def wake():
+            self.woken += 1
+
+        self.life.wakeup = wake
+
+    def test_stop_ends_accepting(self):
+        with socket.socket() as server:
+            self.assertTrue(self.life.keep_accepting(server))
+            self.life._on_stop(signal.SIGTERM, None)
+            self.assertFalse(self.life.keep_accepting(server))
+        self.assertEqual(self.woken, 1)
+
+    def test_second_sigint_exits_at_once(self):
+        self.life._on_stop(signal.SIGINT, None)
+        with self.assertRaises(KeyboardInterrupt):
+            self.life._on_stop(signal.SIGINT, None)
+
+    def test_restart_runs_in_background(self):
+        started = threading.Event()
+
+        def restart(server):
+            started.set()
+
+        self.life._on_restart(signal.SIGUSR2, None)
+        with socket.socket() as server, \
+                mock.patch.object(self.life, "_restart", restart):
+            self.assertTrue(self.life.keep_accepting(server))
+            self.assertTrue(started.wait(1))
+        self.assertFalse(self.life.restart_requested)
+        self.assertEqual(self.woken, 1)
+
+    def test_ready_reports_once(self):
+        read_fd, write_fd = os.pipe()
+        self.life.ready_fd = write_fd
+        self.life.ready()
+        self.life.ready()
+        try:
+            self.assertEqual(os.read(read_fd, 8), b"1")
+            # Đầu ghi đã đóng: lần đọc sau là EOF
+            self.assertEqual(os.read(read_fd, 8), b"")
+        finally:
+            os.close(read_fd)
+
+
+class InheritedSocketTest(unittest.TestCase):
+
+    def test_takes_over_listening_socket(self):
+        with socket.socket() as server:
+            server.bind(("127.0.0.1", 0))
+            server.listen(1)
+            port = server.getsockname()[1]
+            fd = os.dup(server.fileno())
+            with mock.patch.dict(os.environ, {lifecycle.LISTEN_FD_ENV: str(fd)}):
+                inherited = lifecycle.inherited_socket("127.0.0.1", port)
+                self.assertNotIn(lifecycle.LISTEN_FD_ENV, os.environ)
+            with inherited:
+                self.assertEqual(inherited.getsockname()[1], port)
+
+    def test_other_port_is_not_used(self):
+        with socket.socket() as server:
+            server.bind(("127.0.0.1", 0))
+            fd = os.dup(server.fileno())
+            with mock.patch.dict(os.environ, {lifecycle.LISTEN_FD_ENV: str(fd)}):
+                self.assertIsNone(lifecycle.inherited_socket("127.0.0.1", 1))
+        self.assertIsNone(lifecycle.inherited_socket("127.0.0.1", 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
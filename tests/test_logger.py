@@ -0,0 +1,105 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_logger
+~~~~~~~~~~~~~~~~~
+
+Tests of the daemon logging (:mod:`daemon.logger`): levels, per-module
+settings, sampling, and the queue that never blocks the caller.
+"""
+
+import io
+import logging
+import queue
+import time
+import unittest
+
+from daemon import logger
+from daemon.logger import SampleFilter, configure, get_logger
+
+
+class ConfigureTest(unittest.TestCase):
+
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.addCleanup(self.restore)
+
+    def restore(self):
+        for name in ("daemon.test_a", "daemon.test_b"):
+            logging.getLogger(name).setLevel(logging.NOTSET)
+        configure()
+
+    def output(self):
+        # Dừng luồng ghi để mọi record trong queue được ghi ra
+        logger.shutdown()
+        return self.stream.getvalue().splitlines()
+
+    def test_level_filters_before_formatting(self):
+        configure(level="INFO", stream=self.stream)
+        log = get_logger("daemon.test_a")
+
+        class Loud:
+            def __str__(self):
+                raise AssertionError("formatted below the level")
+
+        log.debug("%s", Loud())
+        log.info("kept %d", 1)
+        lines = self.output()
+        self.assertEqual(len(lines), 1)
+        self.assertIn("INFO    [daemon.test_a] kept 1", lines[0])
+
+    def test_per_module_levels(self):
+        configure(level="WARNING", levels={"daemon.test_a": "DEBUG"}, stream=self.stream)
+        get_logger("daemon.test_a").debug("a")
+        get_logger("daemon.test_b").info("b")
+        get_logger("daemon.test_b").warning("c")
+        self.assertEqual([line.rsplit(" ", 1)[1] for line in self.output()], ["a", "c"])
+
+    def test_sampling_keeps_warnings(self):
+        configure(level="DEBUG", sample={"daemon.test_a": 10}, stream=self.stream)
+        log = get_logger("daemon.test_a")
+        for i in range(100):
+            log.debug("d%d", i)
+        log.error("boom")
+        get_logger("daemon.test_b").debug("other")
+        lines = self.output()
+        self.assertEqual(sum(" d" in line for line in lines), 10)
+        self.assertTrue(any(line.endswith("boom") for line in lines))
+        self.assertTrue(any(line.endswith("other") for line in lines))
+
+
+class SampleFilterTest(unittest.TestCase):
+
+    def test_child_logger_uses_parent_rate(self):
+        f = SampleFilter({"daemon.proxy": 3})
+        record = logging.LogRecord("daemon.proxy.pool", logging.INFO, "", 0, "m", (), None)
+        self.assertEqual([f.filter(record) for _ in range(6)],
+                         [True, False, False, True, False, False])
+
+
+class QueueHandlerTest(unittest.TestCase):
+
+    def test_full_queue_drops_without_waiting(self):
+        handler = logger._QueueHandler(queue.Queue(1))
+        record = logging.LogRecord("daemon.x", logging.INFO, "", 0, "m", (), None)
+        before = logger.dropped
+        started = time.monotonic()
+        for _ in range(3):
+            handler.handle(record)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(logger.dropped - before, 2)
+        self.assertIs(handler.queue.get_nowait(), record)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_metrics
+~~~~~~~~~~~~~~~~~
+
+Tests of the collectors exported by :mod:`daemon.metrics`.
+"""
+
+import os
+import unittest
+
+from daemon import compression
+from daemon.metrics import METRICS, Metrics
+from daemon.response import STATIC_CACHE
+
+
+def value_of(text, name):
+    for line in text.splitlines():
+        if line.startswith(name + " "):
+            return float(line.split()[1])
+    raise AssertionError("{} not rendered".format(name))
+
+
+class CollectorTest(unittest.TestCase):
+
+    def test_counters_and_gauges(self):
+        metrics = Metrics()
+        metrics.add_collector("thing", lambda: {"hits": 3, "size": 7}, counters=("hits",))
+        lines = metrics.render().splitlines()
+        self.assertIn("# TYPE weaprous_thing_hits_total counter", lines)
+        self.assertIn("weaprous_thing_hits_total 3", lines)
+        self.assertIn("# TYPE weaprous_thing_size gauge", lines)
+        self.assertIn("weaprous_thing_size 7", lines)
+
+    def test_collected_on_each_render(self):
+        metrics = Metrics()
+        state = {"n": 1}
+        metrics.add_collector("thing", lambda: dict(state))
+        self.assertEqual(value_of(metrics.render(), "weaprous_thing_n"), 1)
+        state["n"] = 2
+        self.assertEqual(value_of(metrics.render(), "weaprous_thing_n"), 2)
+
+    def test_reset_keeps_collectors(self):
+        metrics = Metrics()
+        metrics.add_collector("thing", lambda: {"n": 1})
+        metrics.reset()
+        self.assertIn("weaprous_thing_n 1", metrics.render())
+
+
+class CacheExportTest(unittest.TestCase):
+
+    def test_static_cache_misses(self):
+        before = value_of(METRICS.render(), "weaprous_static_cache_misses_total")
+        STATIC_CACHE.lookup("/__no_such_file__.html")
+        after = value_of(METRICS.render(), "weaprous_static_cache_misses_total")
+        self.assertEqual(after, before + 1)
+
+    def test_compression_cache_hits(self):
+        body = os.urandom(16) * 256
+        compression.compress(body, "gzip")
+        before = value_of(METRICS.render(), "weaprous_compression_cache_hits_total")
+        compression.compress(body, "gzip")
+        text = METRICS.render()
+        self.assertEqual(value_of(text, "weaprous_compression_cache_hits_total"), before + 1)
+        self.assertGreaterEqual(value_of(text, "weaprous_compression_cache_entries"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_objectpool
+~~~~~~~~~~~~~~~~~
+
+Tests of the Request/Response free lists in :mod:`daemon.objectpool`.
+"""
+
+import unittest
+
+from daemon.httpadapter import HttpAdapter
+from daemon.objectpool import ObjectPool
+from daemon.request import Request, POOL as REQUEST_POOL
+from daemon.response import Response
+
+
+class Item:
+
+    def __init__(self):
+        self.data = None
+
+    def reset(self):
+        self.data = None
+
+
+class ReleaseTest(unittest.TestCase):
+
+    def test_released_object_is_reused(self):
+        pool = ObjectPool(Item)
+        item = pool.acquire()
+        item.data = "a"
+        pool.release(item)
+        self.assertIs(pool.acquire(), item)
+        self.assertIsNone(item.data)
+        self.assertEqual((pool.created, pool.reused, pool.discarded), (1, 1, 0))
+
+    def test_discarded_object_is_not_reused(self):
+        pool = ObjectPool(Item)
+        item = pool.acquire()
+        item.data = "client A"
+        pool.discard(item)
+        self.assertEqual(pool.discarded, 1)
+        # Người giữ vẫn thấy dữ liệu của mình, request sau nhận object mới
+        self.assertEqual(item.data, "client A")
+        self.assertIsNot(pool.acquire(), item)
+
+    def test_slots_reject_unknown_attributes(self):
+        with self.assertRaises(AttributeError):
+            Request().user = "x"
+        with self.assertRaises(AttributeError):
+            Response().user = "x"
+
+
+class AdapterReleaseTest(unittest.TestCase):
+
+    RAW = b"GET /a HTTP/1.1\r\nHost: x\r\n\r\n"
+
+    def setUp(self):
+        self.adapter = HttpAdapter(None, None, None, None, {})
+
+    def test_static_pair_is_recycled(self):
+        req, resp = self.adapter.prepare_request(self.RAW, {})
+        free = len(REQUEST_POOL._free)
+        self.adapter.release(req, resp)
+        self.assertEqual(len(REQUEST_POOL._free), min(free + 1, REQUEST_POOL.size))
+        self.assertIsNone(req.path)
+
+    def test_dispatched_pair_is_kept_by_handler(self):
+        kept = []
+
+        def handler(request, response):
+            kept.append((request, response))
+            return b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n"
+
+        routes = {("GET", "/a"): handler}
+        req, resp = self.adapter.prepare_request(self.RAW, routes)
+        self.adapter.call_hook(req, resp)
+        discarded = REQUEST_POOL.discarded
+        self.adapter.release(req, resp)
+        self.assertEqual(REQUEST_POOL.discarded, discarded + 1)
+        self.assertEqual(kept[0][0].path, "/a")
+        self.assertIs(kept[0][1].request, kept[0][0])
+        # Request kế tiếp không bao giờ nhận lại object handler đang giữ
+        nxt, nresp = self.adapter.prepare_request(self.RAW, {})
+        self.assertIsNot(nxt, kept[0][0])
+        self.assertIsNot(nresp, kept[0][1])
+        self.adapter.release(nxt, nresp)
+
+
+if __name__ == "__main__":
+    unittest.main()
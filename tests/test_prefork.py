@@ -0,0 +1,120 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_prefork
+~~~~~~~~~~~~~~~~~
+
+Tests of the pre-forked backend (:mod:`daemon.prefork`): worker processes
+sharing one port, restarted when they die, stopped with the supervisor.
+"""
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+APP = textwrap.dedent("""
+    import os, sys
+    sys.path.insert(0, {root!r})
+    from daemon.weaprous import WeApRous
+
+    app = WeApRous()
+
+    @app.route("/pid", methods=["GET"])
+    def pid(request, response):
+        return response.build_json_response('{{"pid": %d}}' % os.getpid())
+
+    app.prepare_address("127.0.0.1", int(sys.argv[1]))
+    app.run(workers=2, drain_timeout=2)
+""")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get_pid(port):
+    with socket.create_connection(("127.0.0.1", port), timeout=2) as s:
+        s.sendall(b"GET /pid HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n")
+        data = s.makefile("rb").read()
+    return int(data.rsplit(b":", 1)[1].strip(b" }"))
+
+
+@unittest.skipUnless(hasattr(os, "fork") and hasattr(socket, "SO_REUSEPORT"),
+                     "needs fork and SO_REUSEPORT")
+class SupervisorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        script = os.path.join(self.dir.name, "app.py")
+        with open(script, "w") as f:
+            f.write(APP.format(root=ROOT))
+        self.port = free_port()
+        self.proc = subprocess.Popen([sys.executable, script, str(self.port)], cwd=ROOT,
+                                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.wait_pids(2)
+
+    def tearDown(self):
+        if self.proc.poll() is None:
+            self.proc.kill()
+            self.proc.wait()
+        self.dir.cleanup()
+
+    def pids(self, n=40):
+        seen = set()
+        for _ in range(n):
+            try:
+                seen.add(get_pid(self.port))
+            except OSError:
+                time.sleep(0.05)
+        return seen
+
+    def wait_pids(self, count, exclude=(), timeout=10):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            seen = self.pids() - set(exclude)
+            if len(seen) >= count:
+                return seen
+        self.fail("expected {} workers".format(count))
+
+    def test_workers_share_the_port(self):
+        pids = self.pids()
+        self.assertEqual(len(pids), 2)
+        self.assertNotIn(self.proc.pid, pids)
+
+    def test_dead_worker_is_replaced(self):
+        dead = self.pids().pop()
+        os.kill(dead, signal.SIGKILL)
+        # Slot bị chết được fork lại, vẫn đủ hai worker
+        self.assertEqual(len(self.wait_pids(2, exclude=[dead])), 2)
+
+    def test_sigterm_stops_every_worker(self):
+        workers = self.pids()
+        self.proc.send_signal(signal.SIGTERM)
+        self.assertEqual(self.proc.wait(10), 0)
+        for pid in workers:
+            with self.assertRaises(OSError):
+                os.kill(pid, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_proxycache
+~~~~~~~~~~~~~~~~~
+
+Tests of the ``304`` answers of :mod:`daemon.proxycache`.
+"""
+
+import time
+import unittest
+
+from daemon.proxycache import CachedResponse, ProxyCache
+
+HEAD = (b"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\nContent-Length: 5\r\n"
+        b"Cache-Control: max-age=60\r\nETag: \"v1\"\r\n"
+        b"Last-Modified: Tue, 18 Nov 2025 03:14:37 GMT\r\n\r\n")
+
+
+def request(*fields):
+    return b"GET /a HTTP/1.1\r\nHost: h\r\n" + b"".join(f + b"\r\n" for f in fields) + b"\r\n"
+
+
+class NotModifiedTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = time.time()
+        self.entry = CachedResponse(HEAD, b"hello", self.now)
+        self.cache = ProxyCache()
+
+    def test_matches(self):
+        cases = [
+            (request(b'If-None-Match: "v1"'), True),
+            (request(b'If-None-Match: "x", W/"v1"'), True),
+            (request(b"If-None-Match: *"), True),
+            (request(b'If-None-Match: "x"'), False),
+            # If-None-Match được ưu tiên hơn If-Modified-Since
+            (request(b'If-None-Match: "x"', b"If-Modified-Since: Wed, 19 Nov 2025 00:00:00 GMT"), False),
+            (request(b"If-Modified-Since: Wed, 19 Nov 2025 00:00:00 GMT"), True),
+            (request(b"If-Modified-Since: Tue, 18 Nov 2025 03:14:37 GMT"), True),
+            (request(b"If-Modified-Since: Mon, 17 Nov 2025 00:00:00 GMT"), False),
+            (request(b"If-Modified-Since: garbage"), False),
+            (request(), False),
+        ]
+        for head, expected in cases:
+            with self.subTest(head=head):
+                self.assertEqual(self.entry.matches(head), expected)
+
+    def test_serve_304(self):
+        data = self.cache.serve(self.entry, "HIT", self.now, request_head=request(b'If-None-Match: "v1"'))
+        self.assertTrue(data.startswith(b"HTTP/1.1 304 Not Modified\r\n"))
+        self.assertTrue(data.endswith(b"X-Cache: HIT\r\n\r\n"))
+        self.assertIn(b'ETag: "v1"', data)
+        self.assertNotIn(b"Content-Length", data)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["not_modified"]), (1, 1))
+        self.assertEqual(stats["bytes_saved"], len(HEAD) + 5)
+
+    def test_serve_full(self):
+        data = self.cache.serve(self.entry, "HIT", self.now, request_head=request(b'If-None-Match: "v0"'))
+        self.assertTrue(data.startswith(b"HTTP/1.1 200 OK\r\n"))
+        self.assertTrue(data.endswith(b"\r\n\r\nhello"))
+        self.assertEqual(self.cache.stats()["not_modified"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
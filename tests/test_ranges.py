@@ -0,0 +1,132 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_ranges
+~~~~~~~~~~~~~~~~~
+
+Tests of ``Range`` requests on static files (:mod:`daemon.ranges`):
+parsing of range sets and the ``206`` / ``416`` responses built from them.
+"""
+
+import os
+import re
+import tempfile
+import unittest
+from unittest import mock
+
+from daemon import response as response_module
+from daemon.ranges import parse_range
+from daemon.request import Request
+from daemon.response import Response, STATIC_CACHE
+from daemon.staticcache import MAX_ENTRY_SIZE
+
+
+class ParseRangeTest(unittest.TestCase):
+
+    def test_ranges(self):
+        cases = [
+            ("bytes=0-99", [(0, 99)]),
+            ("bytes=900-", [(900, 999)]),
+            ("bytes=-100", [(900, 999)]),
+            ("bytes=-5000", [(0, 999)]),
+            ("bytes=0-5000", [(0, 999)]),
+            ("bytes=0-99,-100", [(0, 99), (900, 999)]),
+            ("bytes=50-99, 0-49", [(0, 99)]),
+            ("bytes=0-10,5-20", [(0, 20)]),
+            ("Bytes=1-1", [(1, 1)]),
+            ("bytes=1000-", []),
+            ("bytes=-0", []),
+            ("bytes=5-1", None),
+            ("bytes=a-b", None),
+            ("bytes=10", None),
+            ("bytes=", None),
+            ("items=0-1", None),
+            ("bytes=" + ",".join("%d-%d" % (i, i) for i in range(0, 40, 2)), None),
+        ]
+        for header, expected in cases:
+            with self.subTest(header=header):
+                self.assertEqual(parse_range(header, 1000), expected)
+
+
+class PartialResponseTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.dir.name, "static", "images"))
+        self.small = bytes(range(256)) * 4
+        self.big = os.urandom(MAX_ENTRY_SIZE + 4096)
+        for name, data in (("small.png", self.small), ("big.png", self.big)):
+            with open(os.path.join(self.dir.name, "static", "images", name), "wb") as f:
+                f.write(data)
+        patcher = mock.patch.object(response_module, "BASE_DIR", self.dir.name + "/")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        STATIC_CACHE.clear()
+        self.addCleanup(STATIC_CACHE.clear)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def get(self, name, *fields):
+        raw = "GET /images/{} HTTP/1.1\r\nHost: x\r\n{}\r\n".format(
+            name, "".join(f + "\r\n" for f in fields))
+        req = Request()
+        req.prepare(raw, None)
+        head, _, body = Response(req).build_response(req).partition(b"\r\n\r\n")
+        return head + b"\r\n", body
+
+    def test_single_range(self):
+        for name, data in (("small.png", self.small), ("big.png", self.big)):
+            with self.subTest(name=name):
+                head, body = self.get(name, "Range: bytes=10-19")
+                self.assertTrue(head.startswith(b"HTTP/1.1 206"))
+                self.assertIn(b"Content-Range: bytes 10-19/%d\r\n" % len(data), head)
+                self.assertIn(b"Content-Length: 10\r\n", head)
+                self.assertEqual(body, data[10:20])
+
+    def test_multiple_ranges(self):
+        head, body = self.get("big.png", "Range: bytes=0-3,-4")
+        self.assertTrue(head.startswith(b"HTTP/1.1 206"))
+        boundary = re.search(rb"multipart/byteranges; boundary=(\w+)\r\n", head).group(1)
+        self.assertIn(b"Content-Length: %d\r\n" % len(body), head)
+        parts = body.split(b"--" + boundary)
+        self.assertEqual(len(parts), 4)
+        self.assertEqual(parts[-1], b"--\r\n")
+        size = len(self.big)
+        self.assertIn(b"Content-Range: bytes 0-3/%d\r\n\r\n" % size + self.big[:4], parts[1])
+        self.assertIn(b"Content-Range: bytes %d-%d/%d\r\n\r\n" % (size - 4, size - 1, size)
+                      + self.big[-4:], parts[2])
+
+    def test_unsatisfiable_range_is_416(self):
+        head, body = self.get("small.png", "Range: bytes=5000-")
+        self.assertTrue(head.startswith(b"HTTP/1.1 416"))
+        self.assertIn(b"Content-Range: bytes */%d\r\n" % len(self.small), head)
+        self.assertEqual(body, b"")
+
+    def test_invalid_range_gets_whole_file(self):
+        head, body = self.get("small.png", "Range: bytes=9-1")
+        self.assertTrue(head.startswith(b"HTTP/1.1 200"))
+        self.assertEqual(body, self.small)
+
+    def test_stale_if_range_gets_whole_file(self):
+        head, body = self.get("small.png", "Range: bytes=0-9", 'If-Range: "stale"')
+        self.assertTrue(head.startswith(b"HTTP/1.1 200"))
+        self.assertEqual(body, self.small)
+        etag = re.search(rb"ETag: (\S+)\r\n", head).group(1).decode()
+        head, body = self.get("small.png", "Range: bytes=0-9", "If-Range: " + etag)
+        self.assertTrue(head.startswith(b"HTTP/1.1 206"))
+        self.assertEqual(body, self.small[:10])
+
+
+if __name__ == "__main__":
+    unittest.main()
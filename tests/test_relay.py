@@ -0,0 +1,223 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_relay
+~~~~~~~~~~~~~~~~~
+
+Tests of the streaming relay of the proxy (:func:`daemon.proxy.relay_upstream`):
+bodies pass through a fixed buffer as they arrive, whatever their size.
+"""
+
+import re
+import socket
+import threading
+import unittest
+
+from daemon import proxy, upstream
+from daemon.health import upstream_health
+from daemon.upstream import RelayBuffer
+
+#: Size of the relay buffer of the tests, small so its bound shows.
+BUFFER = 4096
+#: A body many times the buffer.
+BIG = bytes(range(256)) * 16 * 1024
+
+
+class RecordingConn:
+    """A client connection recording what the proxy sends it."""
+
+    def __init__(self, on_send=None):
+        self.data = bytearray()
+        self.sizes = []
+        self.on_send = on_send
+
+    def setsockopt(self, *args):
+        pass
+
+    def settimeout(self, timeout):
+        pass
+
+    def sendall(self, data):
+        self.sizes.append(len(data))
+        self.data += data
+        if self.on_send is not None:
+            self.on_send()
+
+
+class Backend:
+    """A backend reading one request per connection and answering it with
+    ``reply(conn, body)``."""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.listener = socket.socket()
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen(4)
+        self.port = self.listener.getsockname()[1]
+        threading.Thread(target=self.serve, daemon=True).start()
+
+    def serve(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                return
+            with conn:
+                data = b""
+                while b"\r\n\r\n" not in data:
+                    data += conn.recv(65536)
+                head, _, body = data.partition(b"\r\n\r\n")
+                match = re.search(rb"content-length: *(\d+)", head, re.IGNORECASE)
+                length = int(match.group(1)) if match else 0
+                while len(body) < length:
+                    body += conn.recv(65536)
+                try:
+                    self.reply(conn, body)
+                except OSError:
+                    pass
+
+    def close(self):
+        self.listener.close()
+
+
+def sized(body, step=65536):
+    def reply(conn, _):
+        conn.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n" % len(body))
+        for i in range(0, len(body), step):
+            conn.sendall(body[i:i + step])
+    return reply
+
+
+def chunked(body, step=10000):
+    def reply(conn, _):
+        conn.sendall(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n")
+        for i in range(0, len(body), step):
+            piece = body[i:i + step]
+            conn.sendall(b"%x\r\n%s\r\n" % (len(piece), piece))
+        conn.sendall(b"0\r\n\r\n")
+    return reply
+
+
+def dechunk(data):
+    body, pos = b"", 0
+    while True:
+        end = data.index(b"\r\n", pos)
+        size = int(data[pos:end], 16)
+        if not size:
+            return body
+        body += data[end + 2:end + 2 + size]
+        pos = end + 4 + size
+
+
+class RelayTest(unittest.TestCase):
+
+    def backend(self, reply):
+        backend = Backend(reply)
+        self.addCleanup(backend.close)
+        self.addCleanup(self.forget, backend.port)
+        return backend
+
+    def forget(self, port):
+        pool = upstream.POOLS.pop(("127.0.0.1", port), None)
+        if pool is not None:
+            pool.clear()
+
+    def relay(self, port, body=b"", conn=None, method=b"GET"):
+        conn = conn or RecordingConn()
+        length = len(body) if isinstance(body, bytes) else len(BIG)
+        head = (b"%s /big HTTP/1.1\r\nHost: app\r\nContent-Length: %d\r\n\r\n"
+                % (method, length))
+        result = proxy.relay_upstream("127.0.0.1", port, head, body, conn,
+                                      RelayBuffer(BUFFER))
+        return result, conn
+
+    def split(self, conn):
+        head, _, body = bytes(conn.data).partition(b"\r\n\r\n")
+        return head, body
+
+    def test_large_body_through_the_buffer(self):
+        backend = self.backend(sized(BIG))
+        result, conn = self.relay(backend.port)
+        self.assertIsNone(result)
+        head, body = self.split(conn)
+        self.assertIn(b"Connection: close", head)
+        self.assertEqual(body, BIG)
+        # Sau lần gửi đầu (head + phần đã nhận), mỗi lần gửi không quá buffer
+        self.assertLessEqual(max(conn.sizes[1:]), BUFFER)
+        self.assertLessEqual(conn.sizes[0], upstream.RECV_SIZE + len(head) + 4)
+
+    def test_chunked_body_relayed_with_framing(self):
+        backend = self.backend(chunked(BIG))
+        result, conn = self.relay(backend.port)
+        self.assertIsNone(result)
+        head, body = self.split(conn)
+        self.assertIn(b"Transfer-Encoding: chunked", head)
+        self.assertEqual(dechunk(body), BIG)
+        self.assertLessEqual(max(conn.sizes[1:]), BUFFER)
+
+    def test_first_bytes_sent_before_the_backend_finishes(self):
+        first_sent = threading.Event()
+        waited = []
+
+        def reply(conn, _):
+            conn.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\nhello")
+            # Phần còn lại chỉ được gửi khi client đã nhận phần đầu
+            waited.append(first_sent.wait(5))
+            conn.sendall(b"world")
+
+        backend = self.backend(reply)
+        result, conn = self.relay(backend.port, conn=RecordingConn(first_sent.set))
+        self.assertIsNone(result)
+        self.assertEqual(waited, [True])
+        self.assertEqual(self.split(conn)[1], b"helloworld")
+
+    def test_streamed_request_body(self):
+        got = []
+
+        def reply(conn, body):
+            got.append(body)
+            conn.sendall(b"HTTP/1.1 201 Created\r\nContent-Length: 0\r\n\r\n")
+
+        def pieces():
+            for i in range(0, len(BIG), BUFFER):
+                yield BIG[i:i + BUFFER]
+
+        backend = self.backend(reply)
+        result, conn = self.relay(backend.port, pieces(), method=b"POST")
+        self.assertIsNone(result)
+        self.assertTrue(conn.data.startswith(b"HTTP/1.1 201 Created"))
+        self.assertEqual(got, [BIG])
+
+    def test_backend_dying_mid_body(self):
+        def reply(conn, _):
+            conn.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 100000\r\n\r\npartial")
+
+        backend = self.backend(reply)
+        result, conn = self.relay(backend.port)
+        # Một phần response đã gửi: chỉ còn cách đóng kết nối client
+        self.assertIsNone(result)
+        self.assertTrue(conn.data.endswith(b"partial"))
+        self.assertEqual(upstream_health("127.0.0.1", backend.port).failures, 1)
+
+    def test_backend_silent_before_head_is_502(self):
+        def reply(conn, _):
+            conn.sendall(b"HTTP/1.1 200")
+
+        backend = self.backend(reply)
+        result, conn = self.relay(backend.port)
+        self.assertEqual(result, proxy.BAD_GATEWAY)
+        self.assertEqual(conn.data, b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
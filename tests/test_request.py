@@ -0,0 +1,153 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_request
+~~~~~~~~~~~~~~~~~
+
+Tests of the lazy request parsing of :class:`Request <daemon.request.Request>`:
+only the request line is parsed up front, everything else on first access.
+"""
+
+import unittest
+
+from daemon.request import Request
+
+
+class FakeReader:
+    """A body still on the socket, counting how it is read."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.reads = 0
+
+    def read(self):
+        self.reads += 1
+        return b"".join(self.chunks)
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+
+def prepare(raw):
+    req = Request()
+    req.prepare(raw, None)
+    return req
+
+
+class RequestLineTest(unittest.TestCase):
+
+    def test_request_line(self):
+        req = prepare(b"GET /peers?limit=10&x=%20y HTTP/1.0\r\nHost: x\r\n\r\n")
+        self.assertEqual((req.method, req.path, req.version), ("GET", "/peers", "HTTP/1.0"))
+        self.assertEqual(req.query_string, "limit=10&x=%20y")
+        self.assertEqual(prepare(b"GET / HTTP/1.1\r\n\r\n").path, "/index.html")
+
+    def test_invalid_request_line(self):
+        with self.assertRaises(ValueError):
+            prepare(b"NONSENSE\r\n\r\n")
+
+    def test_nothing_else_parsed_up_front(self):
+        req = prepare(b"POST /a HTTP/1.1\r\nContent-Type: application/json\r\n\r\n{}")
+        self.assertIsNone(req._headers)
+        self.assertIsNone(req._query)
+        self.assertIsNone(req._cookies)
+        self.assertIsNone(req._text)
+        self.assertIsInstance(req._body, memoryview)
+
+
+class LazyFieldsTest(unittest.TestCase):
+
+    def test_headers_parsed_once(self):
+        req = prepare(b"GET / HTTP/1.1\r\nHost: x\r\nX-Tag: a\r\nx-tag: b\r\n\r\n")
+        headers = req.headers
+        self.assertIs(req.headers, headers)
+        self.assertEqual(headers["host"], "x")
+        self.assertEqual(headers.getlist("X-TAG"), ["a", "b"])
+
+    def test_query(self):
+        req = prepare(b"GET /p?limit=10&x=%20y&limit=20&empty= HTTP/1.1\r\n\r\n")
+        self.assertEqual(req.query, {"limit": "20", "x": " y", "empty": ""})
+        self.assertIs(req.query, req.query)
+
+    def test_cookies_across_header_lines(self):
+        req = prepare(b"GET / HTTP/1.1\r\nCookie: auth=true; a=1\r\nCookie: session=abc\r\n\r\n")
+        self.assertEqual(req.cookies["auth"], "true")
+        self.assertEqual(req.cookies["session"], "abc")
+        self.assertEqual(len(req.cookies), 3)
+        self.assertEqual(len(prepare(b"GET / HTTP/1.1\r\n\r\n").cookies), 0)
+
+    def test_keep_alive(self):
+        self.assertTrue(prepare(b"GET / HTTP/1.1\r\n\r\n").keep_alive)
+        self.assertFalse(prepare(b"GET / HTTP/1.1\r\nConnection: close\r\n\r\n").keep_alive)
+        self.assertFalse(prepare(b"GET / HTTP/1.0\r\n\r\n").keep_alive)
+        self.assertTrue(prepare(b"GET / HTTP/1.0\r\nConnection: Keep-Alive\r\n\r\n").keep_alive)
+
+
+class BodyTest(unittest.TestCase):
+
+    def test_json_memoized(self):
+        req = prepare(b'POST /a HTTP/1.1\r\nContent-Type: application/json\r\n\r\n{"id": 1}')
+        data = req.json_data
+        self.assertEqual(data, {"id": 1})
+        self.assertIs(req.json_data, data)
+        self.assertEqual(req.form_data, {})
+
+    def test_invalid_json_is_empty(self):
+        req = prepare(b"POST /a HTTP/1.1\r\nContent-Type: application/json\r\n\r\n{oops")
+        self.assertEqual(req.json_data, {})
+
+    def test_form_memoized(self):
+        req = prepare(b"POST /a HTTP/1.1\r\n"
+                      b"Content-Type: application/x-www-form-urlencoded\r\n\r\n"
+                      b"user=a%20b&pass=x%3Dy")
+        data = req.form_data
+        self.assertEqual(data, {"user": "a b", "pass": "x=y"})
+        self.assertIs(req.form_data, data)
+
+    def test_setting_body_clears_decodings(self):
+        req = prepare(b'POST /a HTTP/1.1\r\nContent-Type: application/json\r\n\r\n{"id": 1}')
+        self.assertEqual(req.json_data, {"id": 1})
+        req.body = '{"id": 2}'
+        self.assertEqual(req.json_data, {"id": 2})
+        self.assertEqual(req.content, b'{"id": 2}')
+
+    def test_body_read_from_reader_once(self):
+        req = prepare(b"POST /a HTTP/1.1\r\nContent-Length: 5\r\n\r\n")
+        reader = FakeReader([b"he", b"llo"])
+        req.attach_body(reader)
+        self.assertEqual(reader.reads, 0)
+        self.assertEqual(req.body, "hello")
+        self.assertEqual(req.content, b"hello")
+        self.assertEqual(reader.reads, 1)
+
+    def test_stream_consumes_body(self):
+        req = prepare(b"POST /a HTTP/1.1\r\n\r\n")
+        req.attach_body(FakeReader([b"he", b"llo"]))
+        self.assertEqual(list(req.stream()), [b"he", b"llo"])
+        self.assertEqual(req.body, "")
+
+        req = prepare(b"POST /a HTTP/1.1\r\n\r\nhello")
+        self.assertEqual(list(req.stream()), [b"hello"])
+
+    def test_reset_clears_everything(self):
+        req = prepare(b"POST /a?x=1 HTTP/1.1\r\nCookie: a=1\r\n\r\nbody")
+        req.headers, req.cookies, req.query, req.body
+        req.reset()
+        self.assertIsNone(req.headers)
+        self.assertEqual(req.query, {})
+        self.assertEqual(req.content, b"")
+        self.assertFalse(req.dispatched)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_router
+~~~~~~~~~~~~~~~~~
+
+Tests of the compiled route table in :mod:`daemon.router`.
+"""
+
+import unittest
+
+from daemon.metrics import route_label
+from daemon.request import Request
+from daemon.router import Router
+from daemon.weaprous import WeApRous
+
+
+def get_user(request, response):
+    pass
+
+
+def new_user(request, response):
+    pass
+
+
+def get_point(request, response):
+    pass
+
+
+class MatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.router = Router()
+        self.router[("GET", "/users/<name>")] = get_user
+        self.router[("POST", "/users/new")] = new_user
+
+    def test_static_falls_through_to_params(self):
+        self.assertEqual(self.router.match("GET", "/users/new"), (get_user, {"name": "new"}, None))
+        self.assertEqual(self.router.match("POST", "/users/new"), (new_user, {}, None))
+
+    def test_allow_merges_static_and_params(self):
+        self.assertEqual(self.router.match("DELETE", "/users/new"), (None, {}, ["GET", "POST"]))
+        self.assertEqual(self.router.match("POST", "/users/bob"), (None, {}, ["GET"]))
+        self.assertEqual(self.router.match("GET", "/nope"), (None, {}, None))
+
+    def test_float_rejects_non_finite(self):
+        self.router[("GET", "/points/<float:x>")] = get_point
+        self.assertEqual(self.router.match("GET", "/points/1.5"), (get_point, {"x": 1.5}, None))
+        for value in ("nan", "inf", "-inf", "Infinity"):
+            with self.subTest(value=value):
+                self.assertEqual(self.router.match("GET", "/points/" + value), (None, {}, None))
+
+
+class MutationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.router = Router({("GET", "/users/<name>"): get_user,
+                              ("POST", "/users/new"): new_user})
+
+    def test_del_and_pop(self):
+        del self.router[("POST", "/users/new")]
+        self.assertEqual(self.router.match("POST", "/users/new"), (None, {}, ["GET"]))
+        self.assertIs(self.router.pop(("GET", "/users/<name>")), get_user)
+        self.assertEqual(self.router.match("GET", "/users/bob"), (None, {}, None))
+        self.assertIsNone(self.router.pop(("GET", "/users/<name>"), None))
+        self.assertEqual(len(self.router), 0)
+
+    def test_setdefault_and_clear(self):
+        self.assertIs(self.router.setdefault(("POST", "/users/new"), get_user), new_user)
+        self.assertIs(self.router.setdefault(("PUT", "/users/<name>"), get_user), get_user)
+        self.assertEqual(self.router.match("PUT", "/users/bob")[0], get_user)
+        self.router.clear()
+        self.assertEqual(self.router.match("GET", "/users/bob"), (None, {}, None))
+        self.assertEqual(self.router.match("POST", "/users/new"), (None, {}, None))
+
+
+class RouteLabelTest(unittest.TestCase):
+
+    def setUp(self):
+        app = WeApRous()
+        # Một handler đăng ký trên nhiều đường dẫn
+        for path in ("/users/<name>", "/members/<name>", "/me"):
+            app.route(path, methods=["GET"])(get_user)
+        self.routes = app.routes
+
+    def label(self, path):
+        req = Request()
+        req.prepare("GET {} HTTP/1.1\r\nHost: x\r\n\r\n".format(path), self.routes)
+        return route_label(req)
+
+    def test_label_of_each_registration(self):
+        self.assertEqual(self.label("/users/bob"), "/users/<name>")
+        self.assertEqual(self.label("/members/bob"), "/members/<name>")
+        self.assertEqual(self.label("/me"), "/me")
+
+    def test_lookup_returns_route(self):
+        self.assertEqual(self.routes.lookup("GET", "/members/bob"),
+                         (get_user, {"name": "bob"}, None, "/members/<name>"))
+        self.assertEqual(self.routes.lookup("POST", "/me"), (None, {}, ["GET"], None))
+        del self.routes[("GET", "/members/<name>")]
+        self.assertEqual(self.routes.lookup("GET", "/members/bob"), (None, {}, None, None))
+
+    def test_unmatched_and_static(self):
+        self.assertEqual(self.label("/login.html"), "<static>")
+        req = Request()
+        req.prepare("POST /me HTTP/1.1\r\nHost: x\r\n\r\n", self.routes)
+        self.assertEqual(route_label(req), "<unmatched>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_sendfile
+~~~~~~~~~~~~~~~~~
+
+Tests of the static file bodies sent by :meth:`Response.send_file
+<daemon.response.Response.send_file>`: the file goes from disk to the socket
+after the header, and is never loaded into memory when it is large.
+"""
+
+import os
+import socket
+import tempfile
+import unittest
+from unittest import mock
+
+from daemon import response as response_module
+from daemon.request import Request
+from daemon.response import Response, STATIC_CACHE
+from daemon.staticcache import MAX_ENTRY_SIZE
+
+
+class FakeConn:
+    """A socket without ``sendfile``, collecting what is sent."""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def sendall(self, data):
+        self.data += data
+
+
+def tcp_pair():
+    with socket.socket() as listener:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+        client = socket.create_connection(listener.getsockname())
+        conn, _ = listener.accept()
+    return conn, client
+
+
+class SendFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.dir.name, "static", "images"))
+        self.big = os.urandom(MAX_ENTRY_SIZE + 12345)
+        with open(os.path.join(self.dir.name, "static", "images", "big.png"), "wb") as f:
+            f.write(self.big)
+        patcher = mock.patch.object(response_module, "BASE_DIR", self.dir.name + "/")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        STATIC_CACHE.clear()
+        self.addCleanup(STATIC_CACHE.clear)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def build(self, path="/images/big.png"):
+        req = Request()
+        req.prepare("GET {} HTTP/1.1\r\nHost: x\r\n\r\n".format(path), None)
+        resp = Response(req)
+        return resp, resp.build_file_response(req)
+
+    def test_header_then_file_over_socket(self):
+        resp, header = self.build()
+        self.assertIn(b"Content-Length: %d\r\n" % len(self.big), header)
+        self.assertTrue(header.endswith(b"\r\n\r\n"))
+        # Chỉ metadata được cache, nội dung không nằm trong bộ nhớ
+        self.assertIsNone(STATIC_CACHE.lookup("/images/big.png").content)
+
+        f = resp.body_file
+        conn, client = tcp_pair()
+        with conn, client:
+            conn.sendall(header)
+            sent = resp.send_file(conn)
+            conn.shutdown(socket.SHUT_WR)
+            received = client.makefile("rb").read()
+        self.assertEqual(sent, len(self.big))
+        self.assertEqual(received, header + self.big)
+        self.assertTrue(f.closed)
+        self.assertIsNone(resp.body_file)
+
+    def test_chunked_fallback_without_sendfile(self):
+        resp, _ = self.build()
+        conn = FakeConn()
+        self.assertEqual(resp.send_file(conn), len(self.big))
+        self.assertEqual(bytes(conn.data), self.big)
+
+    def test_repeat_request_reopens_large_file(self):
+        self.build()[0].close_file()
+        resp, _ = self.build()
+        conn = FakeConn()
+        resp.send_file(conn)
+        self.assertEqual(bytes(conn.data), self.big)
+
+    def test_missing_file_is_404_without_body_file(self):
+        resp, data = self.build("/images/none.png")
+        self.assertTrue(data.startswith(b"HTTP/1.1 404"))
+        self.assertIsNone(resp.body_file)
+        self.assertEqual(resp.send_file(FakeConn()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_staticcache
+~~~~~~~~~~~~~~~~~
+
+Tests of the static asset cache (:mod:`daemon.staticcache`): LRU eviction by
+size, invalidation on file change, and ``304 Not Modified`` answers.
+"""
+
+import os
+import tempfile
+import unittest
+from email.utils import formatdate
+from unittest import mock
+
+from daemon import response as response_module
+from daemon.request import Request
+from daemon.response import Response, STATIC_CACHE
+from daemon.staticcache import StaticCache
+
+
+class StaticCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.cache = StaticCache(max_bytes=250, max_entry_size=100)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.dir.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def store(self, name, data):
+        path = self.write(name, data)
+        with open(path, "rb") as f:
+            return self.cache.store("/" + name, path, f, "text/plain")
+
+    def test_hit_and_miss(self):
+        self.assertIsNone(self.cache.lookup("/a"))
+        entry = self.store("a", b"a" * 10)
+        self.assertIs(self.cache.lookup("/a"), entry)
+        self.assertEqual(entry.content, b"a" * 10)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 1, 1))
+
+    def test_large_file_keeps_metadata_only(self):
+        entry = self.store("big", b"b" * 101)
+        self.assertIsNone(entry.content)
+        self.assertEqual(entry.size, 101)
+        self.assertEqual(self.cache.stats()["bytes"], 0)
+
+    def test_least_recently_used_is_evicted(self):
+        for name in "ab":
+            self.store(name, name.encode() * 100)
+        self.assertIsNotNone(self.cache.lookup("/a"))
+        self.store("c", b"c" * 100)
+        # b ít dùng nhất nên bị loại, a vừa được đọc thì còn
+        self.assertIsNone(self.cache.lookup("/b"))
+        self.assertIsNotNone(self.cache.lookup("/a"))
+        self.assertIsNotNone(self.cache.lookup("/c"))
+        stats = self.cache.stats()
+        self.assertEqual((stats["evictions"], stats["bytes"]), (1, 200))
+
+    def test_changed_file_is_invalidated(self):
+        self.store("a", b"old")
+        path = self.write("a", b"newer")
+        os.utime(path, ns=(0, 10 ** 9))
+        self.assertIsNone(self.cache.lookup("/a"))
+        self.assertEqual(self.cache.stats()["invalidations"], 1)
+
+    def test_validators(self):
+        entry = self.store("a", b"x")
+        self.assertTrue(entry.not_modified({"if-none-match": entry.etag}))
+        self.assertTrue(entry.not_modified({"if-none-match": '"other", W/' + entry.etag}))
+        self.assertTrue(entry.not_modified({"if-none-match": "*"}))
+        self.assertFalse(entry.not_modified({"if-none-match": '"other"'}))
+        later = formatdate(entry.mtime + 60, usegmt=True)
+        earlier = formatdate(entry.mtime - 60, usegmt=True)
+        self.assertTrue(entry.not_modified({"if-modified-since": later}))
+        self.assertFalse(entry.not_modified({"if-modified-since": earlier}))
+        self.assertFalse(entry.not_modified({"if-modified-since": "garbage"}))
+        # If-None-Match thắng If-Modified-Since
+        self.assertFalse(entry.not_modified({"if-none-match": '"other"',
+                                             "if-modified-since": later}))
+
+    def test_if_range(self):
+        path = self.write("a", b"x")
+        os.utime(path, (1700000000, 1700000000))
+        with open(path, "rb") as f:
+            entry = self.cache.store("/a", path, f, "text/plain")
+        self.assertTrue(entry.if_range(entry.etag))
+        self.assertFalse(entry.if_range("W/" + entry.etag))
+        self.assertTrue(entry.if_range(formatdate(1700000000, usegmt=True)))
+        self.assertFalse(entry.if_range(formatdate(1700000060, usegmt=True)))
+
+
+class FileResponseTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.dir.name, "static", "css"))
+        with open(os.path.join(self.dir.name, "static", "css", "site.css"), "wb") as f:
+            f.write(b"body { color: red }")
+        patcher = mock.patch.object(response_module, "BASE_DIR", self.dir.name + "/")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        STATIC_CACHE.clear()
+        self.addCleanup(STATIC_CACHE.clear)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def get(self, *fields):
+        raw = "GET /css/site.css HTTP/1.1\r\nHost: x\r\n{}\r\n".format(
+            "".join(f + "\r\n" for f in fields))
+        req = Request()
+        req.prepare(raw, None)
+        resp = Response(req)
+        data = resp.build_file_response(req)
+        resp.close_file()
+        return data
+
+    def test_repeat_hit_served_from_memory(self):
+        first = self.get()
+        hits = STATIC_CACHE.hits
+        second = self.get()
+        self.assertEqual(STATIC_CACHE.hits, hits + 1)
+        self.assertTrue(second.endswith(b"body { color: red }"))
+        self.assertEqual(first.split(b"\r\nDate:")[0], second.split(b"\r\nDate:")[0])
+
+    def test_etag_revalidation_gets_304(self):
+        first = self.get()
+        etag = [line for line in first.split(b"\r\n") if line.startswith(b"ETag:")][0]
+        data = self.get("If-None-Match: " + etag.split(b":", 1)[1].strip().decode())
+        self.assertTrue(data.startswith(b"HTTP/1.1 304"))
+        self.assertNotIn(b"color", data)
+        self.assertEqual(STATIC_CACHE.stats()["not_modified"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
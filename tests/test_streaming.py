@@ -0,0 +1,163 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_streaming
+~~~~~~~~~~~~~~~~~
+
+Tests of streamed responses (:mod:`daemon.streaming`): chunk and event
+framing, plain and async generators, and :meth:`Response.send_stream
+<daemon.response.Response.send_stream>`.
+"""
+
+import asyncio
+import unittest
+
+from daemon import streaming
+from daemon.eventloop import HANDLER_LOOP
+from daemon.request import Request
+from daemon.response import Response
+
+
+class FakeConn:
+    """A socket collecting each ``sendall``."""
+
+    def __init__(self):
+        self.sends = []
+
+    def setsockopt(self, *args):
+        pass
+
+    def sendall(self, data):
+        self.sends.append(bytes(data))
+
+
+class FramingTest(unittest.TestCase):
+
+    def test_encode_chunk(self):
+        self.assertEqual(streaming.encode_chunk(b"hello"), b"5\r\nhello\r\n")
+        self.assertEqual(streaming.encode_chunk("é" * 8), b"10\r\n" + "é".encode() * 8 + b"\r\n")
+        self.assertEqual(streaming.encode_chunk(b""), b"")
+
+    def test_sse_event(self):
+        self.assertEqual(streaming.sse_event("hi"), b"data: hi\n\n")
+        self.assertEqual(streaming.sse_event(None), streaming.HEARTBEAT)
+        self.assertEqual(streaming.sse_event({"event": "peer", "id": 7, "data": "a\nb"}),
+                         b"event: peer\nid: 7\ndata: a\ndata: b\n\n")
+        self.assertEqual(streaming.sse_event({"data": {"n": 1}, "retry": 500}),
+                         b'retry: 500\ndata: {"n": 1}\n\n')
+        self.assertEqual(streaming.sse_event({"event": "x\ny", "comment": "c"}),
+                         b": c\nevent: x y\n\n")
+
+
+class IterateTest(unittest.TestCase):
+
+    def test_async_generator_from_a_thread(self):
+        seen = []
+
+        async def chunks():
+            try:
+                for i in range(3):
+                    await asyncio.sleep(0)
+                    seen.append(asyncio.get_running_loop())
+                    yield b"%d" % i
+            finally:
+                seen.append("closed")
+
+        self.assertEqual(list(streaming.iterate(chunks())), [b"0", b"1", b"2"])
+        # Chạy trên loop dùng chung của các handler, không tạo loop mới
+        self.assertEqual(seen[:3], [HANDLER_LOOP.loop] * 3)
+        self.assertEqual(seen[-1], "closed")
+
+    def test_abandoned_async_generator_is_closed(self):
+        seen = []
+
+        async def chunks():
+            try:
+                while True:
+                    yield b"x"
+            finally:
+                seen.append("closed")
+
+        it = streaming.iterate(chunks())
+        next(it)
+        it.close()
+        self.assertEqual(seen, ["closed"])
+
+    def test_aiterate_plain_generator(self):
+        async def collect():
+            return [chunk async for chunk in streaming.aiterate(iter([b"a", b"b"]))]
+
+        self.assertEqual(asyncio.run(collect()), [b"a", b"b"])
+
+
+class SendStreamTest(unittest.TestCase):
+
+    def response(self, version="HTTP/1.1"):
+        req = Request()
+        req.prepare("GET /events {}\r\nHost: x\r\n\r\n".format(version), None)
+        resp = Response(req)
+        resp.keep_alive = True
+        return resp
+
+    def test_chunked_stream(self):
+        resp = self.response()
+
+        async def chunks():
+            yield "hello "
+            yield b""
+            yield b"world"
+
+        head = resp.build_stream(chunks(), "text/plain")
+        self.assertIn(b"Transfer-Encoding: chunked\r\n", head)
+        self.assertNotIn(b"Content-Length", head)
+        conn = FakeConn()
+        sent = resp.send_file(conn)
+        self.assertEqual(conn.sends, [b"6\r\nhello \r\n", b"5\r\nworld\r\n", b"0\r\n\r\n"])
+        self.assertEqual(sent, sum(len(s) for s in conn.sends))
+        self.assertTrue(resp.keep_alive)
+
+    def test_http10_stream_until_close(self):
+        resp = self.response("HTTP/1.0")
+        head = resp.build_stream(iter([b"a", b"b"]))
+        self.assertNotIn(b"Transfer-Encoding", head)
+        self.assertIn(b"Connection: close\r\n", head)
+        conn = FakeConn()
+        resp.send_file(conn)
+        self.assertEqual(conn.sends, [b"a", b"b"])
+
+    def test_failing_stream_is_cut_short(self):
+        resp = self.response()
+
+        def chunks():
+            yield b"a"
+            raise RuntimeError("boom")
+
+        resp.build_stream(chunks())
+        conn = FakeConn()
+        resp.send_file(conn)
+        self.assertEqual(conn.sends, [b"1\r\na\r\n"])
+        self.assertFalse(resp.keep_alive)
+
+    def test_event_stream(self):
+        resp = self.response()
+        head = resp.build_event_stream(["joined", None])
+        self.assertIn(b"Content-Type: text/event-stream; charset=utf-8\r\n", head)
+        self.assertIn(b"X-Accel-Buffering: no\r\n", head)
+        conn = FakeConn()
+        resp.send_file(conn)
+        self.assertEqual(conn.sends[:2], [streaming.encode_chunk(b"data: joined\n\n"),
+                                          streaming.encode_chunk(streaming.HEARTBEAT)])
+
+
+if __name__ == "__main__":
+    unittest.main()
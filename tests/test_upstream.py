@@ -0,0 +1,196 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_upstream
+~~~~~~~~~~~~~~~~~
+
+Tests of the pooled backend connections of the proxy (:mod:`daemon.upstream`):
+reuse, expiry, dead connection detection and retries.
+"""
+
+import re
+import socket
+import threading
+import time
+import unittest
+from unittest import mock
+
+from daemon import upstream
+from daemon.upstream import (ConnectFailed, StaleConnection, UpstreamConnection,
+                             UpstreamPool, client_response, keeps_alive,
+                             upstream_request)
+
+GET = b"GET / HTTP/1.1\r\nHost: app\r\nConnection: keep-alive\r\n\r\n"
+
+
+class KeepAliveBackend:
+    """A backend answering requests on persistent connections.
+
+    :param close_after (bool): Close each connection after its first
+        response, without saying so (like a backend keep-alive timeout).
+    """
+
+    def __init__(self, close_after=False, connection=None):
+        self.close_after = close_after
+        self.connection = connection
+        self.connections = 0
+        self.requests = []
+        self.listener = socket.socket()
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen(16)
+        self.address = self.listener.getsockname()
+        threading.Thread(target=self.accept, daemon=True).start()
+
+    def accept(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self.serve, args=(conn,), daemon=True).start()
+
+    def serve(self, conn):
+        data = b""
+        with conn:
+            while True:
+                while b"\r\n\r\n" not in data:
+                    chunk = conn.recv(4096)
+                    if not chunk:
+                        return
+                    data += chunk
+                head, _, data = data.partition(b"\r\n\r\n")
+                match = re.search(rb"content-length: *(\d+)", head, re.IGNORECASE)
+                length = int(match.group(1)) if match else 0
+                while len(data) < length:
+                    data += conn.recv(4096)
+                body, data = data[:length], data[length:]
+                self.requests.append(head + b"\r\n\r\n" + body)
+                reply = b"n=%d" % len(self.requests)
+                extra = b"Connection: %s\r\n" % self.connection if self.connection else b""
+                conn.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n%s\r\n%s"
+                             % (len(reply), extra, reply))
+                if self.close_after:
+                    return
+
+    def close(self):
+        self.listener.close()
+
+
+class UpstreamPoolTest(unittest.TestCase):
+
+    def backend(self, **kwargs):
+        backend = KeepAliveBackend(**kwargs)
+        self.addCleanup(backend.close)
+        return backend
+
+    def pool(self, backend, **kwargs):
+        pool = UpstreamPool(backend.address, **kwargs)
+        self.addCleanup(pool.clear)
+        return pool
+
+    def test_connection_is_reused(self):
+        backend = self.backend()
+        pool = self.pool(backend)
+        for i in range(1, 4):
+            self.assertTrue(pool.forward(GET).endswith(b"n=%d" % i))
+        self.assertEqual((pool.created, pool.reused, backend.connections), (1, 2, 1))
+        self.assertEqual(pool.active, 0)
+
+    def test_expired_connection_is_not_reused(self):
+        backend = self.backend()
+        pool = self.pool(backend, idle_timeout=0.05)
+        pool.forward(GET)
+        time.sleep(0.1)
+        pool.forward(GET)
+        self.assertEqual((pool.created, pool.reused, pool.discarded), (2, 0, 1))
+
+    def test_connection_closed_by_backend_is_detected(self):
+        backend = self.backend(close_after=True)
+        pool = self.pool(backend)
+        pool.forward(GET)
+        time.sleep(0.05)
+        self.assertTrue(pool.forward(GET).endswith(b"n=2"))
+        self.assertEqual((pool.created, pool.discarded, backend.connections), (2, 1, 2))
+
+    def test_close_response_is_not_pooled(self):
+        backend = self.backend(connection=b"close")
+        pool = self.pool(backend)
+        pool.forward(GET)
+        self.assertEqual(pool._idle, [])
+
+    def test_stale_idempotent_request_is_retried(self):
+        backend = self.backend(close_after=True)
+        pool = self.pool(backend)
+        pool.forward(GET)
+        time.sleep(0.05)
+        # Qua được bước kiểm tra khi lấy ra, nhưng backend đã đóng
+        with mock.patch.object(UpstreamConnection, "alive", return_value=True):
+            self.assertTrue(pool.forward(GET).endswith(b"n=2"))
+        self.assertEqual((pool.created, pool.reused), (2, 1))
+
+    def test_stale_post_is_not_retried(self):
+        backend = self.backend(close_after=True)
+        pool = self.pool(backend)
+        pool.forward(GET)
+        time.sleep(0.05)
+        post = b"POST /x HTTP/1.1\r\nHost: app\r\nContent-Length: 2\r\n\r\nhi"
+        with mock.patch.object(UpstreamConnection, "alive", return_value=True):
+            with self.assertRaises(StaleConnection):
+                pool.forward(post)
+        self.assertEqual(len(backend.requests), 1)
+
+    def test_no_reuse_when_disabled(self):
+        backend = self.backend()
+        pool = self.pool(backend, max_idle=0)
+        pool.forward(GET)
+        pool.forward(GET)
+        self.assertEqual((pool.created, backend.connections), (2, 2))
+
+    def test_unreachable_backend(self):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            address = s.getsockname()
+        with self.assertRaises(ConnectFailed):
+            UpstreamPool(address).forward(GET)
+
+    def test_upstream_pool_is_shared(self):
+        self.assertIs(upstream.upstream_pool("127.0.0.1", 1),
+                      upstream.upstream_pool("127.0.0.1", 1))
+
+
+class HeadersTest(unittest.TestCase):
+
+    def test_upstream_request_forces_keep_alive(self):
+        request = (b"POST / HTTP/1.1\r\nHost: app\r\nConnection: close\r\n"
+                   b"Expect: 100-continue\r\nContent-Length: 2\r\n\r\nhi")
+        self.assertEqual(upstream_request(request),
+                         b"POST / HTTP/1.1\r\nHost: app\r\nContent-Length: 2\r\n"
+                         b"Connection: keep-alive\r\n\r\nhi")
+
+    def test_client_response(self):
+        response = b"HTTP/1.1 200 OK\r\nConnection: keep-alive\r\nKeep-Alive: 5\r\n\r\nok"
+        self.assertEqual(client_response(response),
+                         b"HTTP/1.1 200 OK\r\nConnection: close\r\n\r\nok")
+        self.assertEqual(client_response(response, True),
+                         b"HTTP/1.1 200 OK\r\nConnection: keep-alive\r\n\r\nok")
+
+    def test_keeps_alive(self):
+        self.assertTrue(keeps_alive(b"HTTP/1.1 200 OK\r\nContent-Length: 0"))
+        self.assertFalse(keeps_alive(b"HTTP/1.1 200 OK\r\nConnection: Close"))
+        self.assertFalse(keeps_alive(b"HTTP/1.0 200 OK\r\nContent-Length: 0"))
+        self.assertTrue(keeps_alive(b"HTTP/1.0 200 OK\r\nConnection: keep-alive"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_workerpool
+~~~~~~~~~~~~~~~~~
+
+Tests of the backpressure of :mod:`daemon.workerpool` and of its export
+through :data:`METRICS <daemon.metrics.METRICS>`.
+"""
+
+import socket
+import threading
+import time
+import unittest
+from unittest import mock
+
+from daemon import backend
+from daemon.metrics import Metrics
+from daemon.workerpool import WorkerPool
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+class BlockedPoolTest(unittest.TestCase):
+    """One worker held by a handler, so submitted connections queue up."""
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.pool = WorkerPool(self.handler, workers=1, queue_size=2)
+        self.pool.start()
+        self.sockets = []
+
+    def tearDown(self):
+        self.release.set()
+        wait_for(lambda: self.pool.stats()["busy"] == 0)
+        for s in self.sockets:
+            s.close()
+
+    def handler(self, conn, addr):
+        self.started.set()
+        self.release.wait(5)
+        conn.close()
+
+    def submit(self):
+        a, b = socket.socketpair()
+        self.sockets.append(b)
+        return self.pool.submit(a, ("127.0.0.1", 0))
+
+    def fill(self):
+        self.assertTrue(self.submit())
+        self.assertTrue(self.started.wait(2))
+        self.assertTrue(self.submit())
+        self.assertTrue(self.submit())
+
+    def test_full_queue_rejects(self):
+        self.fill()
+        self.assertFalse(self.submit())
+        stats = self.pool.stats()
+        self.assertEqual((stats["busy"], stats["queue_depth"]), (1, 2))
+        self.assertEqual((stats["accepted"], stats["rejected"]), (3, 1))
+
+    def test_queue_wait_is_recorded(self):
+        self.fill()
+        time.sleep(0.05)
+        self.release.set()
+        wait_for(lambda: self.pool.stats()["completed"] == 3)
+        stats = self.pool.stats()
+        self.assertGreaterEqual(stats["wait_max_ms"], 50)
+        self.assertGreaterEqual(stats["wait_total_ms"], stats["wait_max_ms"])
+
+    def test_pool_exported_by_metrics(self):
+        self.fill()
+        metrics = Metrics()
+        metrics.add_collector("pool", backend.pool_metrics,
+                              counters=backend.POOL_COUNTERS + ("queue_wait_seconds",))
+        with mock.patch.object(backend, "worker_pool", self.pool):
+            text = metrics.render()
+        lines = text.splitlines()
+        self.assertIn("weaprous_pool_queue_depth 2", lines)
+        self.assertIn("weaprous_pool_busy 1", lines)
+        self.assertIn("weaprous_pool_accepted_total 3", lines)
+        self.assertIn("# TYPE weaprous_pool_queue_wait_seconds_total counter", lines)
+        self.assertIn("# TYPE weaprous_pool_queue_wait_max_seconds gauge", lines)
+
+    def test_no_pool_exports_nothing(self):
+        metrics = Metrics()
+        metrics.add_collector("pool", backend.pool_metrics)
+        with mock.patch.object(backend, "worker_pool", None):
+            self.assertNotIn("weaprous_pool_", metrics.render())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -95,6 +95,10 @@ def handler_submit_info(request, response):
 @app.route('/get-list', methods=['GET'])
 def handler_get_list(request, response):
     peers = tracker.list_peers()
+    # GET /get-list?limit=10
+    limit = request.query.get('limit', '')
+    if limit.isdigit():
+        peers = peers[:int(limit)]
     body = json.dumps({"peers": peers})
     return response.build_json_response(body, status_code=200, reason="OK")
 
@@ -131,6 +135,8 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(prog='Tracker', description='', epilog='Beckend daemon')
     parser.add_argument('--server-ip', default='0.0.0.0')
     parser.add_argument('--server-port', type=int, default=PORT)
+    # Tracker giữ danh sách peer trong bộ nhớ: chỉ chọn engine, không chạy nhiều tiến trình
+    parser.add_argument('--engine', choices=['thread', 'pool', 'asyncio'], default='thread')
  
     args = parser.parse_args()
     ip = args.server_ip
@@ -138,4 +144,4 @@ if __name__ == "__main__":
 
     # Prepare and launch the RESTful application
     app.prepare_address(ip, port)
-    app.run()
\ No newline at end of file
+    app.run(engine=args.engine)
\ No newline at end of file